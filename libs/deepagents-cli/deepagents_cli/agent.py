@@ -2,13 +2,17 @@
 
 import os
 import shutil
+from collections.abc import Sequence
 from pathlib import Path
 
 from deepagents import create_deep_agent
 from deepagents.backends import CompositeBackend
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import BackendCallbackHandler, instrument_backend
+from deepagents.backends.protocol import BackendProtocol
 from deepagents.backends.sandbox import SandboxBackendProtocol
-from deepagents.middleware import MemoryMiddleware, SkillsMiddleware
+from deepagents.graph_cache import AgentGraphCache
+from deepagents.middleware import FileChangesMiddleware, MemoryMiddleware, SkillsMiddleware
 from deepagents.middleware.subagents import CompiledSubAgent, SubAgent
 from langchain.agents.middleware import (
     InterruptOnConfig,
@@ -218,6 +222,20 @@ def _format_edit_file_description(
     )
 
 
+def _format_multi_edit_description(
+    tool_call: ToolCall, _state: AgentState, _runtime: Runtime
+) -> str:
+    """Format multi_edit tool call for approval prompt."""
+    edits = tool_call["args"].get("edits") or []
+    counts: dict[str, int] = {}
+    for edit in edits:
+        file_path = edit.get("file_path", "unknown")
+        counts[file_path] = counts.get(file_path, 0) + 1
+    files = "\n".join(f"  {file_path} ({count} edit(s))" for file_path, count in counts.items())
+
+    return f"Files:\n{files}\nAction: Apply {len(edits)} text replacement(s), all or nothing"
+
+
 def _format_web_search_description(
     tool_call: ToolCall, _state: AgentState, _runtime: Runtime
 ) -> str:
@@ -301,6 +319,11 @@ def _add_interrupt_on() -> dict[str, InterruptOnConfig]:
         "description": _format_edit_file_description,
     }
 
+    multi_edit_interrupt_config: InterruptOnConfig = {
+        "allowed_decisions": ["approve", "reject"],
+        "description": _format_multi_edit_description,
+    }
+
     web_search_interrupt_config: InterruptOnConfig = {
         "allowed_decisions": ["approve", "reject"],
         "description": _format_web_search_description,
@@ -320,6 +343,7 @@ def _add_interrupt_on() -> dict[str, InterruptOnConfig]:
         "execute": execute_interrupt_config,
         "write_file": write_file_interrupt_config,
         "edit_file": edit_file_interrupt_config,
+        "multi_edit": multi_edit_interrupt_config,
         "web_search": web_search_interrupt_config,
         "fetch_url": fetch_url_interrupt_config,
         "task": task_interrupt_config,
@@ -338,10 +362,14 @@ async def create_cli_agent(
     enable_memory: bool = True,
     enable_skills: bool = True,
     enable_shell: bool = True,
+    persistent_shell: bool = False,
     enable_cua: bool = True,
     cua_config: CuaConfig | None = None,
     subagents: list[SubAgent | CompiledSubAgent] | None = None,
     checkpointer: BaseCheckpointSaver | None = None,
+    backend_callbacks: Sequence[BackendCallbackHandler] | None = None,
+    watch_files: bool = False,
+    graph_cache: AgentGraphCache | None = None,
 ) -> tuple[Pregel, CompositeBackend]:
     """Create a CLI-configured agent with flexible options.
 
@@ -363,19 +391,42 @@ async def create_cli_agent(
         enable_memory: Enable MemoryMiddleware for persistent memory
         enable_skills: Enable SkillsMiddleware for custom agent skills
         enable_shell: Enable ShellMiddleware for local shell execution (only in local mode)
+        persistent_shell: Keep one long-lived shell session per thread so that the
+                         working directory and environment persist between commands
         enable_cua: Enable the CUA computer-use subagent.
         cua_config: Optional configuration for the CUA subagent.
         subagents: Optional list of additional subagent specs.
         checkpointer: Optional checkpointer for session persistence. If None, uses
                      InMemorySaver (no persistence across CLI invocations).
+        backend_callbacks: Optional handlers notified of every backend operation
+                          (e.g. a `BackendStatsCollector`). The file backend and
+                          the backends used for memory and skills are instrumented.
+        watch_files: In local mode, watch the working directory and tell the agent
+                    before each model call which files were changed outside its
+                    own tool calls (e.g. by the user in their editor).
+        graph_cache: Optional cache shared by callers that create many agents, e.g. one per
+                    web session. A call with the same arguments (in the same working
+                    directory) as an earlier one returns that call's agent and backend
+                    instead of building new ones; run each session on its own thread_id.
 
     Returns:
         2-tuple of (agent_graph, backend)
         - agent_graph: Configured LangGraph Pregel instance ready for execution
         - composite_backend: CompositeBackend for file operations
     """
+    if graph_cache is not None:
+        arguments = {name: value for name, value in locals().items() if name != "graph_cache"}
+        # The project memory, skills and shell workspace all follow the working directory
+        cache_config = {**arguments, "cwd": Path.cwd()}
+        return await graph_cache.aget_or_build(cache_config, lambda: create_cli_agent(**arguments))
+
     tools = tools or []
 
+    def instrument(backend: BackendProtocol) -> BackendProtocol:
+        if not backend_callbacks:
+            return backend
+        return instrument_backend(backend, backend_callbacks)
+
     # Setup agent directory for persistent memory (if enabled)
     if enable_memory or enable_skills:
         agent_dir = settings.ensure_agent_dir(assistant_id)
@@ -410,7 +461,7 @@ async def create_cli_agent(
 
         agent_middleware.append(
             MemoryMiddleware(
-                backend=FilesystemBackend(),
+                backend=instrument(FilesystemBackend()),
                 sources=memory_sources,
             )
         )
@@ -423,7 +474,7 @@ async def create_cli_agent(
 
         agent_middleware.append(
             SkillsMiddleware(
-                backend=FilesystemBackend(),
+                backend=instrument(FilesystemBackend()),
                 sources=sources,
             )
         )
@@ -432,6 +483,8 @@ async def create_cli_agent(
     if sandbox is None:
         # ========== LOCAL MODE ==========
         backend = FilesystemBackend()  # Current working directory
+        if watch_files:
+            agent_middleware.append(FileChangesMiddleware(backend.watch()))
 
         # Add shell middleware (only in local mode)
         if enable_shell:
@@ -445,6 +498,7 @@ async def create_cli_agent(
                 ShellMiddleware(
                     workspace_root=str(Path.cwd()),
                     env=shell_env,
+                    persistent_session=persistent_shell,
                 )
             )
     else:
@@ -466,7 +520,7 @@ async def create_cli_agent(
         interrupt_on = _add_interrupt_on()
 
     composite_backend = CompositeBackend(
-        default=backend,
+        default=instrument(backend),
         routes={},
     )
 
@@ -262,18 +262,7 @@ class FileOpTracker:
         )
         if tool_name in {"write_file", "edit_file"}:
             if self.backend and path_str:
-                try:
-                    responses = self.backend.download_files([path_str])
-                    if (
-                        responses
-                        and responses[0].content is not None
-                        and responses[0].error is None
-                    ):
-                        record.before_content = responses[0].content.decode("utf-8")
-                    else:
-                        record.before_content = ""
-                except Exception:
-                    record.before_content = ""
+                record.before_content = self._backend_before_content(path_str)
             elif record.physical_path:
                 record.before_content = _safe_read(record.physical_path) or ""
         self.active[tool_call_id] = record
@@ -293,18 +282,7 @@ class FileOpTracker:
                 record.display_path = format_display_path(path_str)
                 record.physical_path = resolve_physical_path(path_str, self.assistant_id)
                 if self.backend:
-                    try:
-                        responses = self.backend.download_files([path_str])
-                        if (
-                            responses
-                            and responses[0].content is not None
-                            and responses[0].error is None
-                        ):
-                            record.before_content = responses[0].content.decode("utf-8")
-                        else:
-                            record.before_content = ""
-                    except Exception:
-                        record.before_content = ""
+                    record.before_content = self._backend_before_content(path_str)
                 elif record.physical_path:
                     record.before_content = _safe_read(record.physical_path) or ""
 
@@ -413,6 +391,23 @@ class FileOpTracker:
                 if record_path == file_path:
                     record.hitl_approved = True
 
+    def _backend_before_content(self, path_str: str) -> str:
+        """Return the current content of a file about to be written, or "" if it does not exist.
+
+        The file is stat-ed first so that creating a new file, the common case for
+        write_file, does not download anything.
+        """
+        try:
+            infos = self.backend.stat_many([path_str])
+            if not infos or infos[0] is None or infos[0].get("is_dir"):
+                return ""
+            responses = self.backend.download_files([path_str])
+            if responses and responses[0].content is not None and responses[0].error is None:
+                return responses[0].content.decode("utf-8")
+        except Exception:  # noqa: BLE001
+            return ""
+        return ""
+
     def _populate_after_content(self, record: FileOperationRecord) -> None:
         # Use backend if available (works for any BackendProtocol implementation)
         if self.backend:
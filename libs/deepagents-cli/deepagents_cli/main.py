@@ -8,6 +8,8 @@ import os
 import sys
 from pathlib import Path
 
+from deepagents.backends.instrumented import BackendStatsCollector
+
 # Now safe to import agent (which imports LangChain modules)
 from deepagents_cli.agent import create_cli_agent, list_agents, reset_agent
 
@@ -138,6 +140,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Auto-approve tool usage without prompting (disables human-in-the-loop)",
     )
+    parser.add_argument(
+        "--persistent-shell",
+        action="store_true",
+        help="Keep the working directory and environment between shell commands",
+    )
     parser.add_argument(
         "--sandbox",
         choices=["none", "modal", "daytona", "runloop"],
@@ -173,6 +180,17 @@ def parse_args() -> argparse.Namespace:
         "--cua-trajectory-dir",
         help="Directory to store CUA trajectories/screenshots. Default: CUA_TRAJECTORY_DIR env.",
     )
+    parser.add_argument(
+        "--no-watch",
+        dest="watch_files",
+        action="store_false",
+        help="Do not tell the agent about files changed outside its tool calls (local mode)",
+    )
+    parser.add_argument(
+        "--backend-stats",
+        action="store_true",
+        help="Print per-operation latency statistics for file backends on exit",
+    )
     return parser.parse_args()
 
 
@@ -180,6 +198,7 @@ async def run_textual_cli_async(
     assistant_id: str,
     *,
     auto_approve: bool = False,
+    persistent_shell: bool = False,
     sandbox_type: str = "none",
     sandbox_id: str | None = None,
     model_name: str | None = None,
@@ -190,20 +209,27 @@ async def run_textual_cli_async(
     cua_provider: str | None = None,
     cua_os: str | None = None,
     cua_trajectory_dir: str | None = None,
+    backend_stats: bool = False,
+    watch_files: bool = True,
 ) -> None:
     """Run the Textual CLI interface (async version).
 
     Args:
         assistant_id: Agent identifier for memory storage
         auto_approve: Whether to auto-approve tool usage
+        persistent_shell: Whether shell commands share one session per thread
         sandbox_type: Type of sandbox ("none", "modal", "runloop", "daytona")
         sandbox_id: Optional existing sandbox ID to reuse
         model_name: Optional model name to use
         thread_id: Thread ID to use (new or resumed)
         is_resumed: Whether this is a resumed session
+        backend_stats: Whether to print backend operation statistics on exit
+        watch_files: Whether to report files changed outside the agent (local mode)
     """
     from deepagents_cli.app import run_textual_app
 
+    stats_collector = BackendStatsCollector() if backend_stats else None
+
     model = create_model(model_name)
 
     # Show thread info
@@ -252,9 +278,12 @@ async def run_textual_cli_async(
                 sandbox=sandbox_backend,
                 sandbox_type=sandbox_type if sandbox_type != "none" else None,
                 auto_approve=auto_approve,
+                persistent_shell=persistent_shell,
                 enable_cua=enable_cua,
                 cua_config=cua_config,
                 checkpointer=checkpointer,
+                backend_callbacks=[stats_collector] if stats_collector else None,
+                watch_files=watch_files,
             )
 
             # Run Textual app
@@ -274,6 +303,10 @@ async def run_textual_cli_async(
             if sandbox_cm is not None:
                 with contextlib.suppress(Exception):
                     sandbox_cm.__exit__(None, None, None)
+            if stats_collector is not None:
+                console.print()
+                console.print("[bold]Backend operation stats[/bold]")
+                console.print(stats_collector.summary(), markup=False, highlight=False)
 
 
 def cli_main() -> None:
@@ -361,6 +394,7 @@ def cli_main() -> None:
                 run_textual_cli_async(
                     assistant_id=args.agent,
                     auto_approve=args.auto_approve,
+                    persistent_shell=args.persistent_shell,
                     sandbox_type=args.sandbox,
                     sandbox_id=args.sandbox_id,
                     model_name=getattr(args, "model", None),
@@ -371,6 +405,8 @@ def cli_main() -> None:
                     cua_provider=args.cua_provider,
                     cua_os=args.cua_os,
                     cua_trajectory_dir=args.cua_trajectory_dir,
+                    backend_stats=args.backend_stats,
+                    watch_files=args.watch_files,
                 )
             )
     except KeyboardInterrupt:
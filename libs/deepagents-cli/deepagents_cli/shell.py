@@ -2,15 +2,235 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import codecs
+import contextlib
 import os
+import selectors
+import shlex
+import shutil
+import signal
 import subprocess
-from typing import Any
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any
 
 from langchain.agents.middleware.types import AgentMiddleware, AgentState
-from langchain.tools import ToolRuntime, tool
+from langchain.tools import ToolRuntime  # noqa: TC002  # resolved at runtime for injection
 from langchain_core.messages import ToolMessage
+from langchain_core.tools import StructuredTool
 from langchain_core.tools.base import ToolException
 
+if TYPE_CHECKING:
+    from langgraph.types import StreamWriter
+
+_DEFAULT_SESSION_KEY = "default"
+"""Session key used when the runtime config carries no `thread_id`."""
+
+_STREAM_READ_SIZE = 4096
+"""Number of bytes read from the child process per partial-output event."""
+
+
+class _SentinelCapture:
+    """Output of one stream of a persistent-shell command, up to its sentinel.
+
+    At most `limit` bytes of output are kept; the rest is dropped while reading.
+    Only bytes that may start the sentinel are carried over between chunks, so
+    each chunk is searched once.
+    """
+
+    def __init__(self, marker: bytes, limit: int) -> None:
+        self.marker = marker
+        self.limit = limit
+        self.output = bytearray()
+        # Bytes after the sentinel (the exit code on stdout)
+        self.trailer = bytearray()
+        self.found = False
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume a chunk read from the stream."""
+        if self.found:
+            self.trailer.extend(chunk)
+            return
+        data = self._pending + chunk
+        index = data.find(self.marker)
+        if index >= 0:
+            self._keep(data[:index])
+            self.trailer.extend(data[index + len(self.marker) :])
+            self._pending = b""
+            self.found = True
+            return
+        # The last bytes may be the start of a sentinel split across chunks.
+        split = max(len(data) - len(self.marker) + 1, 0)
+        self._keep(data[:split])
+        self._pending = data[split:]
+
+    def finish(self) -> bytes:
+        """Return the captured output, including bytes held back at EOF."""
+        if not self.found:
+            self._keep(self._pending)
+            self._pending = b""
+        return bytes(self.output)
+
+    def _keep(self, data: bytes) -> None:
+        room = self.limit - len(self.output)
+        if room > 0:
+            self.output.extend(data[:room])
+
+
+class _PersistentShell:
+    """A long-lived shell process that runs commands one at a time.
+
+    Commands are written to the shell's stdin and wrapped in `eval` so that
+    `cd`, `export`, aliases and shell functions persist between calls. After
+    each command the shell prints a unique sentinel (carrying the exit code) to
+    stdout and a second sentinel to stderr, which lets us delimit the output of
+    every command on the shared pipes without a PTY.
+    """
+
+    def __init__(
+        self,
+        *,
+        cwd: str,
+        env: dict[str, str],
+        max_output_bytes: int,
+    ) -> None:
+        """Start a new shell process.
+
+        Args:
+            cwd: Initial working directory of the shell.
+            env: Environment variables for the shell process.
+            max_output_bytes: Maximum number of bytes buffered per stream and command.
+        """
+        self._cwd = cwd
+        self._env = env
+        self._max_output_bytes = max_output_bytes
+        self._sentinel = f"__DEEPAGENTS_SHELL_{uuid.uuid4().hex}__"
+        self.lock = threading.Lock()
+        executable = shutil.which("bash") or "/bin/sh"
+        self._process = subprocess.Popen(  # noqa: S603
+            [executable],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            start_new_session=True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        """Whether the underlying shell process is still running."""
+        return self._process.poll() is None
+
+    def run(self, command: str, *, timeout: float) -> tuple[str, str, int | None]:
+        """Run a command in the shell and wait for it to finish.
+
+        Args:
+            command: The shell command to execute.
+            timeout: Maximum time in seconds to wait for the command.
+
+        Returns:
+            Tuple of `(stdout, stderr, exit_code)`. `exit_code` is `None` when the
+            shell process exited before reporting a status (e.g. the command ran
+            `exit`), in which case the session must be discarded.
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish in time. The
+                shell process group is killed before raising.
+        """
+        stdin = self._process.stdin
+        stdout = self._process.stdout
+        stderr = self._process.stderr
+        if stdin is None or stdout is None or stderr is None:
+            msg = "Shell session pipes are not available."
+            raise RuntimeError(msg)
+
+        script = (
+            f"eval {shlex.quote(command)} < /dev/null\n"
+            f"printf '\\n{self._sentinel} %d\\n' $?\n"
+            f"printf '\\n{self._sentinel}\\n' >&2\n"
+        )
+        try:
+            stdin.write(script.encode("utf-8"))
+            stdin.flush()
+        except (BrokenPipeError, OSError):
+            return "", "", None
+
+        captures = {
+            stdout.fileno(): _SentinelCapture(
+                f"\n{self._sentinel} ".encode(), self._max_output_bytes
+            ),
+            stderr.fileno(): _SentinelCapture(
+                f"\n{self._sentinel}\n".encode(), self._max_output_bytes
+            ),
+        }
+        done: dict[int, bool] = dict.fromkeys(captures, False)
+        deadline = time.monotonic() + timeout
+
+        with selectors.DefaultSelector() as selector:
+            for fd in captures:
+                selector.register(fd, selectors.EVENT_READ)
+            while not all(done.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.close()
+                    raise subprocess.TimeoutExpired(command, timeout)
+                for key, _ in selector.select(timeout=remaining):
+                    fd = key.fd
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        # EOF: the shell exited (e.g. the command called `exit`).
+                        selector.unregister(fd)
+                        done[fd] = True
+                        continue
+                    capture = captures[fd]
+                    capture.feed(chunk)
+                    # The stdout sentinel is followed by the exit code and a newline.
+                    complete = fd != stdout.fileno() or capture.trailer.endswith(b"\n")
+                    if capture.found and complete:
+                        selector.unregister(fd)
+                        done[fd] = True
+
+        out, err = captures[stdout.fileno()], captures[stderr.fileno()]
+        return self._decode(out.finish()), self._decode(err.finish()), self._exit_code(out)
+
+    @staticmethod
+    def _exit_code(capture: _SentinelCapture) -> int | None:
+        """Parse the exit code that follows the stdout sentinel."""
+        if not capture.found:
+            return None
+        try:
+            return int(bytes(capture.trailer).split(b"\n", 1)[0])
+        except ValueError:
+            return None
+
+    def _decode(self, data: bytes) -> str:
+        """Decode and bound captured output."""
+        return data[: self._max_output_bytes].decode("utf-8", errors="replace")
+
+    def kill(self) -> None:
+        """Kill the shell and every process it started, leaving the pipes open.
+
+        A `run` blocked on the pipes in another thread then reads EOF and returns.
+        """
+        if self._process.poll() is None:
+            with contextlib.suppress(ProcessLookupError, PermissionError):
+                os.killpg(self._process.pid, signal.SIGKILL)
+
+    def close(self) -> None:
+        """Kill the shell and every process it started, then release its pipes."""
+        self.kill()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            self._process.wait(timeout=5)
+        for pipe in (self._process.stdin, self._process.stdout, self._process.stderr):
+            if pipe is not None:
+                with contextlib.suppress(OSError):
+                    pipe.close()
+
 
 class ShellMiddleware(AgentMiddleware[AgentState, Any]):
     """Give basic shell access to agents via the shell.
@@ -26,6 +246,7 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
         timeout: float = 120.0,
         max_output_bytes: int = 100_000,
         env: dict[str, str] | None = None,
+        persistent_session: bool = False,
     ) -> None:
         """Initialize an instance of `ShellMiddleware`.
 
@@ -37,6 +258,10 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
                 Defaults to 100,000 bytes.
             env: Environment variables to pass to the subprocess. If None,
                 uses the current process's environment. Defaults to None.
+            persistent_session: If True, keep one long-lived shell per thread so that
+                the working directory, exported variables and shell functions persist
+                between commands. The session is restarted automatically if it
+                crashes, exits or times out. Defaults to False.
         """
         super().__init__()
         self._timeout = timeout
@@ -46,16 +271,30 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
         # Ensure UTF-8 encoding for Python subprocesses
         self._env["PYTHONIOENCODING"] = "utf-8"
         self._workspace_root = workspace_root
+        self._persistent_session = persistent_session
+        self._sessions: dict[str, _PersistentShell] = {}
+        self._sessions_lock = threading.Lock()
+        if persistent_session:
+            atexit.register(self.close_sessions)
 
         # Build description with working directory information
-        description = (
-            f"Execute a shell command directly on the host. Commands will run in "
-            f"the working directory: {workspace_root}. Each command runs in a fresh shell "
-            f"environment with the current process's environment variables. Commands may "
-            f"be truncated if they exceed the configured timeout or output limits."
-        )
+        if persistent_session:
+            description = (
+                f"Execute a shell command directly on the host. Commands run in a persistent "
+                f"shell session that starts in the working directory: {workspace_root}. "
+                f"State such as the current directory, exported environment variables and "
+                f"shell functions carries over between commands in this conversation. "
+                f"Commands may be truncated if they exceed the configured timeout or output "
+                f"limits; a command that times out restarts the session."
+            )
+        else:
+            description = (
+                f"Execute a shell command directly on the host. Commands will run in "
+                f"the working directory: {workspace_root}. Each command runs in a fresh shell "
+                f"environment with the current process's environment variables. Commands may "
+                f"be truncated if they exceed the configured timeout or output limits."
+            )
 
-        @tool(self._tool_name, description=description)
         def shell_tool(
             command: str,
             runtime: ToolRuntime[None, AgentState],
@@ -66,8 +305,43 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
                 command: The shell command to execute.
                 runtime: The tool runtime context.
             """
+            if self._persistent_session:
+                return self._run_in_session(
+                    command,
+                    session_key=_session_key(runtime),
+                    tool_call_id=runtime.tool_call_id,
+                )
             return self._run_shell_command(command, tool_call_id=runtime.tool_call_id)
 
+        async def ashell_tool(
+            command: str,
+            runtime: ToolRuntime[None, AgentState],
+        ) -> ToolMessage | str:
+            """Execute a shell command without blocking the event loop.
+
+            Args:
+                command: The shell command to execute.
+                runtime: The tool runtime context.
+            """
+            if self._persistent_session:
+                return await self._arun_in_session(
+                    command,
+                    session_key=_session_key(runtime),
+                    tool_call_id=runtime.tool_call_id,
+                )
+            return await self._arun_shell_command(
+                command,
+                tool_call_id=runtime.tool_call_id,
+                stream_writer=runtime.stream_writer,
+            )
+
+        shell_tool = StructuredTool.from_function(
+            name=self._tool_name,
+            description=description,
+            func=shell_tool,
+            coroutine=ashell_tool,
+        )
+
         self._shell_tool = shell_tool
         self.tools = [self._shell_tool]
 
@@ -103,29 +377,7 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
                 encoding="utf-8",
                 errors="replace",
             )
-
-            # Combine stdout and stderr
-            output_parts = []
-            if result.stdout:
-                output_parts.append(result.stdout)
-            if result.stderr:
-                stderr_lines = result.stderr.strip().split("\n")
-                for line in stderr_lines:
-                    output_parts.append(f"[stderr] {line}")
-
-            output = "\n".join(output_parts) if output_parts else "<no output>"
-
-            # Truncate output if needed
-            if len(output) > self._max_output_bytes:
-                output = output[: self._max_output_bytes]
-                output += f"\n\n... Output truncated at {self._max_output_bytes} bytes."
-
-            # Add exit code info if non-zero
-            if result.returncode != 0:
-                output = f"{output.rstrip()}\n\nExit code: {result.returncode}"
-                status = "error"
-            else:
-                status = "success"
+            output, status = self._format_output(result.stdout, result.stderr, result.returncode)
 
         except subprocess.TimeoutExpired:
             output = f"Error: Command timed out after {self._timeout:.1f} seconds."
@@ -138,5 +390,286 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
             status=status,
         )
 
+    async def _arun_shell_command(
+        self,
+        command: str,
+        *,
+        tool_call_id: str | None,
+        stream_writer: StreamWriter | None = None,
+    ) -> ToolMessage | str:
+        """Execute a shell command asynchronously, streaming partial output.
+
+        The command runs in its own process group. If the calling task is cancelled
+        (e.g. the user interrupts the agent) or the timeout expires, the whole group
+        is killed so no orphaned children keep running.
+
+        Each chunk of output is forwarded to `stream_writer` as a
+        `{"type": "tool_output", ...}` event on the `custom` stream mode so UIs can
+        display live progress before the final `ToolMessage` arrives.
+
+        Args:
+            command: The shell command to execute.
+            tool_call_id: The tool call ID for creating a ToolMessage.
+            stream_writer: Optional writer for partial output events.
+
+        Returns:
+            A ToolMessage with the command output or an error message.
+        """
+        if not command or not isinstance(command, str):
+            msg = "Shell tool expects a non-empty command string."
+            raise ToolException(msg)
+
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self._workspace_root,
+            env=self._env,
+            start_new_session=True,
+        )
+
+        async def read_stream(stream: asyncio.StreamReader | None, name: str) -> str:
+            if stream is None:
+                return ""
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            parts: list[str] = []
+            captured = 0
+            while chunk := await stream.read(_STREAM_READ_SIZE):
+                text = decoder.decode(chunk)
+                if captured < self._max_output_bytes:
+                    parts.append(text)
+                    captured += len(text)
+                if text and stream_writer is not None:
+                    stream_writer(
+                        {
+                            "type": "tool_output",
+                            "tool_call_id": tool_call_id,
+                            "tool_name": self._tool_name,
+                            "stream": name,
+                            "text": text,
+                        }
+                    )
+            parts.append(decoder.decode(b"", final=True))
+            return "".join(parts)
+
+        try:
+            stdout, stderr, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    read_stream(process.stdout, "stdout"),
+                    read_stream(process.stderr, "stderr"),
+                    process.wait(),
+                ),
+                timeout=self._timeout,
+            )
+        except TimeoutError:
+            await _kill_process_group(process)
+            return ToolMessage(
+                content=f"Error: Command timed out after {self._timeout:.1f} seconds.",
+                tool_call_id=tool_call_id,
+                name=self._tool_name,
+                status="error",
+            )
+        except asyncio.CancelledError:
+            await asyncio.shield(_kill_process_group(process))
+            raise
+
+        returncode = process.returncode if process.returncode is not None else -1
+        output, status = self._format_output(stdout, stderr, returncode)
+        return ToolMessage(
+            content=output,
+            tool_call_id=tool_call_id,
+            name=self._tool_name,
+            status=status,
+        )
+
+    def _run_in_session(
+        self,
+        command: str,
+        *,
+        session_key: str,
+        tool_call_id: str | None,
+    ) -> ToolMessage | str:
+        """Execute a shell command in the persistent session for `session_key`.
+
+        Args:
+            command: The shell command to execute.
+            session_key: Key of the session to use (the thread ID).
+            tool_call_id: The tool call ID for creating a ToolMessage.
+
+        Returns:
+            A ToolMessage with the command output or an error message.
+        """
+        if not command or not isinstance(command, str):
+            msg = "Shell tool expects a non-empty command string."
+            raise ToolException(msg)
+
+        session, restarted = self._get_session(session_key)
+        with session.lock:
+            try:
+                stdout, stderr, exit_code = session.run(command, timeout=self._timeout)
+            except subprocess.TimeoutExpired:
+                self._discard_session(session_key, session)
+                output = (
+                    f"Error: Command timed out after {self._timeout:.1f} seconds. "
+                    f"The shell session was restarted."
+                )
+                return ToolMessage(
+                    content=output,
+                    tool_call_id=tool_call_id,
+                    name=self._tool_name,
+                    status="error",
+                )
+
+        if exit_code is None:
+            # The shell itself went away; report what we got and start fresh next time.
+            self._discard_session(session_key, session)
+            output, _ = self._format_output(stdout, stderr, 0)
+            output = (
+                f"{output.rstrip()}\n\n"
+                "Shell session exited; a new session will be started for the next command."
+            )
+            status = "error"
+        else:
+            output, status = self._format_output(stdout, stderr, exit_code)
+
+        if restarted:
+            output = f"[shell session restarted in {self._workspace_root}]\n{output}"
+
+        return ToolMessage(
+            content=output,
+            tool_call_id=tool_call_id,
+            name=self._tool_name,
+            status=status,
+        )
+
+    async def _arun_in_session(
+        self,
+        command: str,
+        *,
+        session_key: str,
+        tool_call_id: str | None,
+    ) -> ToolMessage | str:
+        """Execute a command in the persistent session without blocking the event loop.
+
+        The session protocol is blocking, so the command runs in a worker thread.
+        Cancelling the calling task kills the session's process group, so the worker
+        reads EOF, discards the session and returns; cancellation propagates once the
+        worker is done with the pipes. The next command starts a fresh session.
+
+        Args:
+            command: The shell command to execute.
+            session_key: Key of the session to use (the thread ID).
+            tool_call_id: The tool call ID for creating a ToolMessage.
+
+        Returns:
+            A ToolMessage with the command output or an error message.
+        """
+        worker = asyncio.ensure_future(
+            asyncio.to_thread(
+                self._run_in_session,
+                command,
+                session_key=session_key,
+                tool_call_id=tool_call_id,
+            )
+        )
+        try:
+            return await asyncio.shield(worker)
+        except asyncio.CancelledError:
+            with self._sessions_lock:
+                session = self._sessions.get(session_key)
+            if session is not None:
+                # Closing the pipes here would race with the worker's select/read on them.
+                session.kill()
+            with contextlib.suppress(Exception):
+                await worker
+            raise
+
+    def _get_session(self, session_key: str) -> tuple[_PersistentShell, bool]:
+        """Return the live session for `session_key`, starting one if needed.
+
+        Returns:
+            Tuple of the session and whether a previous session for the key had died
+            and was replaced.
+        """
+        with self._sessions_lock:
+            session = self._sessions.get(session_key)
+            if session is not None and session.alive:
+                return session, False
+            restarted = session is not None
+            if session is not None:
+                session.close()
+            session = _PersistentShell(
+                cwd=self._workspace_root,
+                env=self._env,
+                max_output_bytes=self._max_output_bytes,
+            )
+            self._sessions[session_key] = session
+            return session, restarted
+
+    def _discard_session(self, session_key: str, session: _PersistentShell) -> None:
+        """Close `session` and forget it so the next command starts a fresh one."""
+        session.close()
+        with self._sessions_lock:
+            if self._sessions.get(session_key) is session:
+                del self._sessions[session_key]
+
+    def close_sessions(self) -> None:
+        """Terminate every persistent shell session."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _format_output(self, stdout: str, stderr: str, returncode: int) -> tuple[str, str]:
+        """Combine command output into the tool result text.
+
+        Args:
+            stdout: Captured standard output.
+            stderr: Captured standard error.
+            returncode: Exit code of the command.
+
+        Returns:
+            Tuple of the formatted output and the ToolMessage status.
+        """
+        # Combine stdout and stderr
+        output_parts = []
+        if stdout:
+            output_parts.append(stdout)
+        if stderr:
+            stderr_lines = stderr.strip().split("\n")
+            for line in stderr_lines:
+                output_parts.append(f"[stderr] {line}")
+
+        output = "\n".join(output_parts) if output_parts else "<no output>"
+
+        # Truncate output if needed
+        if len(output) > self._max_output_bytes:
+            output = output[: self._max_output_bytes]
+            output += f"\n\n... Output truncated at {self._max_output_bytes} bytes."
+
+        # Add exit code info if non-zero
+        if returncode != 0:
+            output = f"{output.rstrip()}\n\nExit code: {returncode}"
+            return output, "error"
+        return output, "success"
+
+
+async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill `process` and every process in its process group, then reap it."""
+    if process.returncode is None:
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(process.pid, signal.SIGKILL)
+    with contextlib.suppress(ProcessLookupError):
+        await process.wait()
+
+
+def _session_key(runtime: ToolRuntime) -> str:
+    """Return the persistent session key (the thread ID) for a tool runtime."""
+    config = getattr(runtime, "config", None) or {}
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else _DEFAULT_SESSION_KEY
+
 
 __all__ = ["ShellMiddleware"]
@@ -182,7 +182,7 @@ async def execute_task_textual(
 
             async for chunk in agent.astream(
                 stream_input,
-                stream_mode=["messages", "updates"],
+                stream_mode=["messages", "updates", "custom"],
                 subgraphs=True,
                 config=config,
                 durability="exit",
@@ -223,6 +223,15 @@ async def execute_task_textual(
                     if chunk_data and isinstance(chunk_data, dict) and "todos" in chunk_data:
                         pass  # Future: render todo list widget
 
+                # Handle CUSTOM stream - partial output from running tools
+                elif current_stream_mode == "custom":
+                    if not is_main_agent or not isinstance(data, dict):
+                        continue
+                    if data.get("type") == "tool_output":
+                        tool_msg = adapter._current_tool_messages.get(data.get("tool_call_id"))
+                        if tool_msg is not None:
+                            tool_msg.append_output(str(data.get("text", "")))
+
                 # Handle MESSAGES stream - for content and tool calls
                 elif current_stream_mode == "messages":
                     # Skip subagent outputs - only render main agent content in chat
@@ -71,6 +71,19 @@ def format_tool_display(tool_name: str, tool_args: dict) -> str:
             path = abbreviate_path(str(path_value))
             return f"{tool_name}({path})"
 
+    elif tool_name == "read_files":
+        # Batch read: show the number of files requested
+        if "files" in tool_args and isinstance(tool_args["files"], list):
+            count = len(tool_args["files"])
+            return f"{tool_name}({count} files)"
+
+    elif tool_name == "multi_edit":
+        # Multi edit: show how many edits across how many files
+        if "edits" in tool_args and isinstance(tool_args["edits"], list):
+            edits = tool_args["edits"]
+            files = {edit.get("file_path") for edit in edits if isinstance(edit, dict)}
+            return f"{tool_name}({len(edits)} edits, {len(files)} files)"
+
     elif tool_name == "web_search":
         # Web search: show the query string
         if "query" in tool_args:
@@ -184,6 +197,7 @@ def show_help() -> None:
         "  --model MODEL                 Model to use (e.g., claude-sonnet-4-5-20250929, gpt-4o)"
     )
     console.print("  --auto-approve                Auto-approve tool usage without prompting")
+    console.print("  --persistent-shell            Keep cwd and env between shell commands")
     console.print(
         "  --sandbox TYPE                Remote sandbox for execution (modal, runloop, daytona)"
     )
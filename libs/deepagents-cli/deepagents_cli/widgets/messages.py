@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from rich.text import Text
 from textual.containers import Vertical
 from textual.css.query import NoMatches
 from textual.widgets import Markdown, Static
@@ -220,6 +221,8 @@ class ToolCallMessage(Vertical):
     # Max lines/chars to show in preview mode
     _PREVIEW_LINES = 3
     _PREVIEW_CHARS = 200
+    # Max chars of partial output buffered while a tool is running
+    _LIVE_OUTPUT_CHARS = 20_000
 
     def __init__(
         self,
@@ -309,6 +312,28 @@ class ToolCallMessage(Vertical):
         self._expanded = True
         self._update_output_display()
 
+    def append_output(self, text: str) -> None:
+        """Append partial output while the tool is still running.
+
+        Shows the most recent lines as a live preview. The final result passed to
+        `set_success` or `set_error` replaces the partial output.
+
+        Args:
+            text: Chunk of output to append
+        """
+        if not text or self._status != "pending":
+            return
+        self._output = (self._output + text)[-self._LIVE_OUTPUT_CHARS :]
+        try:
+            preview = self.query_one("#output-preview", Static)
+            tail = "\n".join(self._output.rstrip().split("\n")[-self._PREVIEW_LINES :])
+            if len(tail) > self._PREVIEW_CHARS:
+                tail = "..." + tail[-self._PREVIEW_CHARS :]
+            preview.update(Text(tail))
+            preview.display = True
+        except NoMatches:
+            pass
+
     def set_rejected(self) -> None:
         """Mark the tool call as rejected by user."""
         self._status = "rejected"
@@ -7,13 +7,17 @@ from pathlib import Path
 from typing import Any
 from unittest.mock import patch
 
-from deepagents.backends import CompositeBackend
+import pytest
+from deepagents.backends import CompositeBackend, InstrumentedBackend
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import BackendStatsCollector
+from deepagents.graph_cache import AgentGraphCache
 from langchain_core.language_models import LanguageModelInput
 from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import Runnable
 from langchain_core.tools import BaseTool, tool
+from langgraph.pregel import Pregel
 
 from deepagents_cli.agent import create_cli_agent
 
@@ -333,3 +337,89 @@ class TestDeepAgentsCLIEndToEnd:
 
             assert isinstance(backend, CompositeBackend)
             assert isinstance(backend.default, FilesystemBackend)
+
+
+@pytest.mark.asyncio
+async def test_cli_agent_backend_callbacks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that backend callbacks see file operations made by the CLI agent."""
+    monkeypatch.chdir(tmp_path)
+    collector = BackendStatsCollector()
+    with mock_settings(tmp_path), patch("deepagents_cli.agent.get_mcp_tools", return_value=[]):
+        model = FixedGenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(
+                        content="",
+                        tool_calls=[
+                            {
+                                "name": "ls",
+                                "args": {"path": str(tmp_path)},
+                                "id": "call_1",
+                                "type": "tool_call",
+                            }
+                        ],
+                    ),
+                    AIMessage(content="Done."),
+                ]
+            )
+        )
+
+        agent, backend = await create_cli_agent(
+            model=model,
+            assistant_id="test-agent",
+            tools=[],
+            enable_cua=False,
+            auto_approve=True,
+            backend_callbacks=[collector],
+        )
+        assert isinstance(backend, CompositeBackend)
+        assert isinstance(backend.default, InstrumentedBackend)
+
+        await agent.ainvoke(
+            {"messages": [HumanMessage(content="List files")]},
+            {"configurable": {"thread_id": str(uuid.uuid4())}},
+        )
+
+    stats = collector.stats
+    # The ls tool call plus the skills directory listing
+    assert stats["FilesystemBackend", "ls_info"].count >= 1
+    # Memory is loaded through an instrumented backend as well
+    assert ("FilesystemBackend", "download_files") in stats
+
+
+@pytest.mark.asyncio
+async def test_cli_agent_graph_cache_shares_graph_between_sessions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that sessions created with one graph cache share the graph but not their threads."""
+    monkeypatch.chdir(tmp_path)
+    graphs = AgentGraphCache()
+    with mock_settings(tmp_path), patch("deepagents_cli.agent.get_mcp_tools", return_value=[]):
+        model = FixedGenericFakeChatModel(
+            messages=iter([AIMessage(content="Hello one."), AIMessage(content="Hello two.")])
+        )
+
+        async def create_session() -> Pregel:
+            agent, _backend = await create_cli_agent(
+                model=model,
+                assistant_id="test-agent",
+                tools=[sample_tool],
+                enable_cua=False,
+                auto_approve=True,
+                graph_cache=graphs,
+            )
+            return agent
+
+        first, second = await create_session(), await create_session()
+        assert second is first
+        assert (graphs.hits, graphs.misses) == (1, 1)
+
+        one = await first.ainvoke(
+            {"messages": [HumanMessage(content="one")]}, {"configurable": {"thread_id": "one"}}
+        )
+        two = await second.ainvoke(
+            {"messages": [HumanMessage(content="two")]}, {"configurable": {"thread_id": "two"}}
+        )
+
+    assert [m.content for m in one["messages"]] == ["one", "Hello one."]
+    assert [m.content for m in two["messages"]] == ["two", "Hello two."]
@@ -1,6 +1,8 @@
 import textwrap
 from pathlib import Path
 
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.protocol import FileDownloadResponse
 from langchain_core.messages import ToolMessage
 
 from deepagents_cli.file_ops import FileOpTracker, build_approval_preview
@@ -100,6 +102,41 @@ def test_tracker_records_edit_diff(tmp_path: Path) -> None:
     assert '+    return "hi"' in record.diff
 
 
+class CountingBackend(FilesystemBackend):
+    """FilesystemBackend that records which paths were downloaded."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.downloaded: list[str] = []
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        self.downloaded.extend(paths)
+        return super().download_files(paths)
+
+
+def test_tracker_stats_before_downloading_with_backend(tmp_path: Path) -> None:
+    backend = CountingBackend()
+    tracker = FileOpTracker(assistant_id=None, backend=backend)
+    new_file = tmp_path / "new.txt"
+    existing = tmp_path / "existing.txt"
+    existing.write_text("old\n")
+
+    tracker.start_operation("write_file", {"file_path": str(new_file)}, "write-1")
+    tracker.start_operation("edit_file", {"file_path": str(existing)}, "edit-1")
+
+    # Creating a file needs no download; editing one needs its current content
+    assert backend.downloaded == [str(existing)]
+    assert tracker.active["write-1"].before_content == ""
+    assert tracker.active["edit-1"].before_content == "old\n"
+
+    new_file.write_text("hello\n")
+    record = tracker.complete_with_message(
+        ToolMessage(content=f"Updated file {new_file}", tool_call_id="write-1", name="write_file")
+    )
+    assert record is not None
+    assert record.metrics.lines_added == 1
+
+
 def test_build_approval_preview_generates_diff(tmp_path: Path) -> None:
     target = tmp_path / "notes.txt"
     target.write_text("alpha\nbeta\n")
@@ -0,0 +1,242 @@
+import asyncio
+import os
+import signal
+import threading
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import ToolMessage
+
+from deepagents_cli.shell import ShellMiddleware, _SentinelCapture
+
+
+def _run(middleware: ShellMiddleware, command: str, *, thread_id: str = "t1") -> ToolMessage:
+    result = middleware._run_in_session(command, session_key=thread_id, tool_call_id="call-1")
+    assert isinstance(result, ToolMessage)
+    return result
+
+
+def test_default_shell_runs_each_command_in_fresh_environment(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path))
+
+    middleware._run_shell_command("export FOO=bar", tool_call_id="call-1")
+    result = middleware._run_shell_command("echo ${FOO:-unset}", tool_call_id="call-2")
+
+    assert isinstance(result, ToolMessage)
+    assert result.content.strip() == "unset"
+
+
+def test_persistent_session_keeps_cwd_and_env(tmp_path: Path) -> None:
+    (tmp_path / "sub").mkdir()
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    try:
+        _run(middleware, "cd sub && export FOO=bar")
+        result = _run(middleware, 'echo "$PWD $FOO"')
+        assert result.status == "success"
+        assert result.content.strip() == f"{tmp_path / 'sub'} bar"
+    finally:
+        middleware.close_sessions()
+
+
+def test_persistent_session_reports_exit_code_and_stderr(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    try:
+        result = _run(middleware, "echo out; echo err >&2; false")
+        assert result.status == "error"
+        assert "out" in result.content
+        assert "[stderr] err" in result.content
+        assert result.content.endswith("Exit code: 1")
+
+        # A syntax error must not take the session down.
+        result = _run(middleware, "if then")
+        assert result.status == "error"
+        assert "Exit code: 2" in result.content
+        assert _run(middleware, "echo still-alive").content.strip() == "still-alive"
+    finally:
+        middleware.close_sessions()
+
+
+def test_persistent_session_bounds_output_while_reading(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(
+        workspace_root=str(tmp_path), max_output_bytes=1000, persistent_session=True
+    )
+    try:
+        result = _run(middleware, "head -c 5000000 /dev/zero | tr '\\0' a")
+        assert result.status == "success"
+        assert result.content == "a" * 1000
+        assert _run(middleware, "echo next").content.strip() == "next"
+    finally:
+        middleware.close_sessions()
+
+
+def test_sentinel_capture_finds_marker_split_across_chunks() -> None:
+    capture = _SentinelCapture(b"\n__END__ ", limit=4)
+    data = b"abcdefgh\n__END__ 7\n"
+    for index in range(len(data)):
+        capture.feed(data[index : index + 1])
+        assert len(capture.output) <= 4
+
+    assert capture.found
+    assert capture.finish() == b"abcd"
+    assert bytes(capture.trailer) == b"7\n"
+
+
+def test_persistent_sessions_are_isolated_per_thread(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    try:
+        _run(middleware, "export FOO=one", thread_id="a")
+        result = _run(middleware, "echo ${FOO:-unset}", thread_id="b")
+        assert result.content.strip() == "unset"
+    finally:
+        middleware.close_sessions()
+
+
+def test_persistent_session_restarts_after_timeout(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), timeout=0.5, persistent_session=True)
+    try:
+        _run(middleware, "export FOO=bar")
+        result = _run(middleware, "sleep 5")
+        assert result.status == "error"
+        assert "timed out" in result.content
+
+        result = _run(middleware, "echo ${FOO:-unset}")
+        assert result.status == "success"
+        assert result.content.strip() == "unset"
+    finally:
+        middleware.close_sessions()
+
+
+def test_persistent_session_restarts_after_exit(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    try:
+        result = _run(middleware, "exit 3")
+        assert result.status == "error"
+        assert "Shell session exited" in result.content
+
+        result = _run(middleware, "pwd")
+        assert result.status == "success"
+        assert result.content.rstrip().endswith(str(tmp_path))
+    finally:
+        middleware.close_sessions()
+
+
+def test_persistent_session_restarts_after_crash(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    try:
+        _run(middleware, "cd /")
+        os.killpg(middleware._sessions["t1"]._process.pid, signal.SIGKILL)
+        middleware._sessions["t1"]._process.wait()
+
+        result = _run(middleware, "pwd")
+        assert result.status == "success"
+        assert result.content.startswith("[shell session restarted")
+        assert result.content.rstrip().endswith(str(tmp_path))
+    finally:
+        middleware.close_sessions()
+
+
+@pytest.mark.asyncio
+async def test_async_shell_streams_partial_output(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path))
+    events: list[dict] = []
+
+    result = await middleware._arun_shell_command(
+        "echo first; echo second >&2; exit 4",
+        tool_call_id="call-1",
+        stream_writer=events.append,
+    )
+
+    assert isinstance(result, ToolMessage)
+    assert result.status == "error"
+    assert "first" in result.content
+    assert "[stderr] second" in result.content
+    assert result.content.endswith("Exit code: 4")
+    streamed = {(event["stream"], event["text"].strip()) for event in events}
+    assert streamed == {("stdout", "first"), ("stderr", "second")}
+    assert all(event["tool_call_id"] == "call-1" for event in events)
+
+
+@pytest.mark.asyncio
+async def test_async_shell_timeout(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), timeout=0.5)
+
+    result = await middleware._arun_shell_command("sleep 5", tool_call_id="call-1")
+
+    assert isinstance(result, ToolMessage)
+    assert result.status == "error"
+    assert "timed out" in result.content
+
+
+@pytest.mark.asyncio
+async def test_async_shell_cancellation_kills_process_group(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path))
+    pid_file = tmp_path / "child.pid"
+
+    task = asyncio.create_task(
+        middleware._arun_shell_command(
+            f"sleep 30 & echo $! > {pid_file}; wait",
+            tool_call_id="call-1",
+        )
+    )
+    for _ in range(100):
+        if pid_file.exists() and pid_file.read_text().strip():
+            break
+        await asyncio.sleep(0.05)
+    child_pid = int(pid_file.read_text())
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    for _ in range(100):
+        if not _pid_alive(child_pid):
+            break
+        await asyncio.sleep(0.05)
+    assert not _pid_alive(child_pid)
+
+
+@pytest.mark.asyncio
+async def test_async_session_cancellation_waits_for_worker(tmp_path: Path) -> None:
+    middleware = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    run_in_session = middleware._run_in_session
+    finished = threading.Event()
+
+    def tracked(*args: object, **kwargs: object) -> ToolMessage | str:
+        try:
+            return run_in_session(*args, **kwargs)  # type: ignore[arg-type]
+        finally:
+            finished.set()
+
+    middleware._run_in_session = tracked  # type: ignore[method-assign]
+    try:
+        task = asyncio.create_task(
+            middleware._arun_in_session("sleep 30", session_key="t1", tool_call_id="call-1")
+        )
+        for _ in range(100):
+            if "t1" in middleware._sessions:
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.1)
+        session = middleware._sessions["t1"]
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The worker returned and released the session before cancellation surfaced
+        assert finished.is_set()
+        assert not session.alive
+        assert "t1" not in middleware._sessions
+        assert _run(middleware, "echo fresh").content.strip().endswith("fresh")
+    finally:
+        middleware.close_sessions()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Zombies are dead for our purposes.
+    stat = Path(f"/proc/{pid}/stat")
+    return not (stat.exists() and stat.read_text().split()[2] == "Z")
@@ -8,10 +8,12 @@ import uuid
 from collections.abc import Iterable
 from typing import TYPE_CHECKING, Any
 
+from deepagents.graph_cache import AgentGraphCache
 from deepagents_cli.agent import create_cli_agent
 from deepagents_cli.config import SessionState, create_model
 from deepagents_cli.integrations.cua import CuaConfig, load_cua_config
 from langchain_core.messages import ToolMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.types import Command
 from pydantic import ValidationError
 
@@ -79,6 +81,9 @@ class AgentService:
         self.cua_os = cua_os
         self.cua_trajectory_dir = cua_trajectory_dir
         self.sessions: dict[str, AgentSession] = {}
+        # Sessions with the same configuration share one compiled agent graph;
+        # their conversations are kept apart by thread_id
+        self.graph_cache = AgentGraphCache()
 
     async def create_session(self) -> str:
         """Create a new agent session."""
@@ -101,6 +106,7 @@ class AgentService:
             enable_shell=True,
             enable_cua=self.enable_cua,
             cua_config=cua_config,
+            graph_cache=self.graph_cache,
         )
 
         session_state = SessionState(auto_approve=self.auto_approve)
@@ -116,11 +122,15 @@ class AgentService:
         return self.sessions.get(session_id)
 
     def delete_session(self, session_id: str) -> bool:
-        """Delete a session."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        """Delete a session and the checkpoints of its thread."""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        # The checkpointer belongs to the shared graph, so only drop this session's thread
+        checkpointer = getattr(session.agent, "checkpointer", None)
+        if isinstance(checkpointer, BaseCheckpointSaver):
+            checkpointer.delete_thread(session.session_state.thread_id)
+        return True
 
     def list_sessions(self) -> list[str]:
         """List all session IDs."""
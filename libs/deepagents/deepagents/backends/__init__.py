@@ -1,15 +1,32 @@
 """Memory backends for pluggable file storage."""
 
+from deepagents.backends.change_feed import FileChangeFeed
 from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.content_addressed import ContentAddressedBackend, DedupStats
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import BackendStatsCollector, InstrumentedBackend
+from deepagents.backends.limiter import ConcurrencyLimiter, LimitedBackend
+from deepagents.backends.overlay import OverlayBackend
 from deepagents.backends.protocol import BackendProtocol
+from deepagents.backends.snapshot import SnapshotBackend
+from deepagents.backends.sqlite import SqliteBackend
 from deepagents.backends.state import StateBackend
 from deepagents.backends.store import StoreBackend
 
 __all__ = [
     "BackendProtocol",
+    "BackendStatsCollector",
     "CompositeBackend",
+    "ConcurrencyLimiter",
+    "ContentAddressedBackend",
+    "DedupStats",
+    "FileChangeFeed",
     "FilesystemBackend",
+    "InstrumentedBackend",
+    "LimitedBackend",
+    "OverlayBackend",
+    "SnapshotBackend",
+    "SqliteBackend",
     "StateBackend",
     "StoreBackend",
 ]
@@ -0,0 +1,429 @@
+"""Change feed that reports files changed outside the agent.
+
+`FilesystemBackend.watch()` starts a `FileChangeFeed` over the backend's root
+directory. On Linux it uses inotify, where the kernel queues events until the
+feed drains them, so no thread is needed; elsewhere, or when inotify is
+unavailable, a daemon thread rescans the tree every `poll_interval` seconds.
+
+Raw events are only classified when the feed is polled (e.g. before a model
+call). Writes made through the backend are recorded with the size and mtime
+they produced, so by then they can be told apart from edits made by the user
+or other processes and are not reported.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, Protocol
+
+logger = logging.getLogger(__name__)
+
+FileChangeKind = Literal["created", "modified", "deleted"]
+
+DEFAULT_IGNORED_DIRS = frozenset(
+    {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox"}
+)
+"""Directory names that are never watched."""
+
+MAX_OWN_WRITES = 10_000
+"""Bound on remembered backend writes; the oldest are forgotten first."""
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_MODIFY | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_Signature = tuple[int, int]
+"""`(st_mtime_ns, st_size)` of a file."""
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """A change to one file, as reported by `FileChangeFeed`."""
+
+    seq: int
+    """Position in the feed; compare with `FileChangeFeed.cursor`."""
+
+    path: str
+    """Path of the file as the backend names it."""
+
+    kind: FileChangeKind
+    """Whether the file was created, modified or deleted."""
+
+
+def _signature(path: str) -> _Signature | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _merge_kinds(first: FileChangeKind | None, then: FileChangeKind) -> FileChangeKind | None:
+    """Combine two changes to the same file; None when they cancel out."""
+    if first is None:
+        return then
+    if first == "created":
+        return None if then == "deleted" else "created"
+    if first == "deleted" and then != "deleted":
+        return "modified"
+    return then
+
+
+def _coalesce(events: Iterable[tuple[str, FileChangeKind]]) -> dict[str, FileChangeKind]:
+    """Collapse events to one net change per path, keeping first-seen order."""
+    merged: dict[str, FileChangeKind | None] = {}
+    for path, kind in events:
+        merged[path] = _merge_kinds(merged.get(path), kind)
+    return {path: kind for path, kind in merged.items() if kind is not None}
+
+
+class _Watcher(Protocol):
+    mode: str
+
+    def read(self) -> list[tuple[str, FileChangeKind]]: ...
+
+    def close(self) -> None: ...
+
+
+def _load_libc() -> ctypes.CDLL:
+    if not sys.platform.startswith("linux"):
+        msg = "inotify is only available on Linux"
+        raise OSError(msg)
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        msg = "libc does not provide inotify"
+        raise OSError(msg)
+    return libc
+
+
+class _InotifyWatcher:
+    """Watch a directory tree with inotify, draining queued events on `read`."""
+
+    mode = "inotify"
+
+    def __init__(self, root: str, ignored_dirs: frozenset[str]) -> None:
+        self._libc = _load_libc()
+        self._ignored_dirs = ignored_dirs
+        self._dirs: dict[int, str] = {}
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        try:
+            self._watch_tree(root, None)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                # Vanished or unreadable directories are simply not watched
+                return
+            raise OSError(err, os.strerror(err), directory)
+        self._dirs[wd] = directory
+
+    def _watch_tree(self, directory: str, events: list[tuple[str, FileChangeKind]] | None) -> None:
+        """Watch `directory` and its subdirectories, reporting files already in it when `events` is given."""
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [name for name in dirnames if name not in self._ignored_dirs]
+            self._add_watch(dirpath)
+            if events is not None:
+                events.extend((os.path.join(dirpath, name), "created") for name in filenames)
+
+    def _unwatch_tree(self, directory: str) -> None:
+        prefix = directory + os.sep
+        for wd, watched in list(self._dirs.items()):
+            if watched == directory or watched.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+
+    def read(self) -> list[tuple[str, FileChangeKind]]:
+        events: list[tuple[str, FileChangeKind]] = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0"))
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    logger.warning("inotify queue overflowed; some file changes were not reported")
+                    continue
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & _IN_ISDIR:
+                    if name in self._ignored_dirs:
+                        continue
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        try:
+                            self._watch_tree(path, events)
+                        except OSError:
+                            logger.warning("Could not watch new directory %s", path, exc_info=True)
+                    elif mask & _IN_MOVED_FROM:
+                        self._unwatch_tree(path)
+                    continue
+                if mask & _IN_CREATE:
+                    events.append((path, "created"))
+                elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                    events.append((path, "deleted"))
+                else:
+                    # Writes and atomic saves (rename over the old file)
+                    events.append((path, "modified"))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingWatcher:
+    """Watch a directory tree by rescanning it from a daemon thread."""
+
+    mode = "polling"
+
+    def __init__(self, root: str, ignored_dirs: frozenset[str], interval: float) -> None:
+        self._root = root
+        self._ignored_dirs = ignored_dirs
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, FileChangeKind]] = []
+        self._snapshot = self._scan()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="deepagents-file-poller", daemon=True)
+        self._thread.start()
+
+    def _scan(self) -> dict[str, _Signature]:
+        snapshot: dict[str, _Signature] = {}
+        for dirpath, dirnames, filenames in os.walk(self._root):
+            dirnames[:] = [name for name in dirnames if name not in self._ignored_dirs]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                signature = _signature(path)
+                if signature is not None:
+                    snapshot[path] = signature
+        return snapshot
+
+    def scan(self) -> None:
+        """Rescan the tree and queue the differences from the previous scan."""
+        with self._lock:
+            current = self._scan()
+            for path, signature in current.items():
+                previous = self._snapshot.get(path)
+                if previous is None:
+                    self._pending.append((path, "created"))
+                elif previous != signature:
+                    self._pending.append((path, "modified"))
+            self._pending.extend((path, "deleted") for path in self._snapshot.keys() - current.keys())
+            self._snapshot = current
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.scan()
+            except Exception:  # noqa: BLE001
+                logger.warning("File change scan failed", exc_info=True)
+
+    def read(self) -> list[tuple[str, FileChangeKind]]:
+        with self._lock:
+            events, self._pending = self._pending, []
+        return events
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+
+class FileChangeFeed:
+    """Record changes made to files under a directory by anything but the backend itself.
+
+    Consumers keep a cursor and ask for the net changes since it with
+    `changes_since`, or `subscribe` to be called with each change (e.g. to drop
+    a cache entry). Changes are picked up whenever the feed is polled.
+
+    Args:
+        root: Directory to watch, recursively.
+        to_path: Maps an absolute filesystem path to the path reported in
+            `FileChange.path`. Defaults to the absolute path.
+        poll_interval: Seconds between rescans when polling.
+        use_inotify: Force (True) or disable (False) inotify. By default inotify
+            is used when available, with polling as the fallback.
+        ignored_dirs: Directory names that are not watched.
+        max_changes: Number of changes kept for `changes_since`.
+
+    Example:
+        ```python
+        backend = FilesystemBackend(root_dir=".", virtual_mode=True)
+        feed = backend.watch()
+        cursor = feed.cursor
+        ...
+        changes, cursor = feed.changes_since(cursor)
+        ```
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        to_path: Callable[[str], str] | None = None,
+        poll_interval: float = 1.0,
+        use_inotify: bool | None = None,
+        ignored_dirs: Iterable[str] = DEFAULT_IGNORED_DIRS,
+        max_changes: int = 10_000,
+    ) -> None:
+        """Start watching `root`."""
+        self.root = Path(root).resolve()
+        self._to_path = to_path or (lambda path: path)
+        self._lock = threading.RLock()
+        self._seq = 0
+        self._changes: deque[FileChange] = deque(maxlen=max_changes)
+        self._own_writes: OrderedDict[str, _Signature] = OrderedDict()
+        self._subscribers: list[Callable[[FileChange], None]] = []
+        self._watcher = self._start_watcher(frozenset(ignored_dirs), poll_interval, use_inotify=use_inotify)
+
+    def _start_watcher(self, ignored_dirs: frozenset[str], poll_interval: float, *, use_inotify: bool | None) -> _Watcher:
+        if use_inotify is not False:
+            try:
+                return _InotifyWatcher(str(self.root), ignored_dirs)
+            except (OSError, AttributeError):
+                if use_inotify:
+                    raise
+                logger.debug("inotify unavailable, polling %s for changes", self.root, exc_info=True)
+        return _PollingWatcher(str(self.root), ignored_dirs, poll_interval)
+
+    @property
+    def mode(self) -> str:
+        """How changes are detected: `"inotify"` or `"polling"`."""
+        return self._watcher.mode
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the latest change; pass it to `changes_since` later."""
+        return self._seq
+
+    def record_own_write(self, path: str | Path) -> None:
+        """Remember a write made through the backend so the feed does not report it.
+
+        Args:
+            path: Absolute path of the file that was just written.
+        """
+        path = os.fspath(path)
+        signature = _signature(path)
+        if signature is None:
+            return
+        with self._lock:
+            self._own_writes[path] = signature
+            self._own_writes.move_to_end(path)
+            while len(self._own_writes) > MAX_OWN_WRITES:
+                self._own_writes.popitem(last=False)
+
+    def _is_own_write(self, path: str, kind: FileChangeKind) -> bool:
+        signature = self._own_writes.get(path)
+        if signature is None:
+            return False
+        if kind != "deleted" and _signature(path) == signature:
+            return True
+        # Changed again since the backend wrote it
+        del self._own_writes[path]
+        return False
+
+    def poll(self) -> list[FileChange]:
+        """Pick up pending events and return the new changes.
+
+        Subscribers are called with each new change.
+        """
+        new_changes: list[FileChange] = []
+        with self._lock:
+            for path, kind in _coalesce(self._watcher.read()).items():
+                if self._is_own_write(path, kind):
+                    continue
+                self._seq += 1
+                change = FileChange(seq=self._seq, path=self._to_path(path), kind=kind)
+                self._changes.append(change)
+                new_changes.append(change)
+            subscribers = list(self._subscribers)
+        for change in new_changes:
+            for callback in subscribers:
+                try:
+                    callback(change)
+                except Exception:  # noqa: BLE001
+                    logger.warning("File change subscriber failed", exc_info=True)
+        return new_changes
+
+    def changes_since(self, cursor: int) -> tuple[list[FileChange], int]:
+        """Return the net change per file since `cursor`, and the new cursor.
+
+        Args:
+            cursor: A value of `cursor` read earlier.
+
+        Returns:
+            The changes, one per path in first-changed order (a file created and
+            deleted in between is omitted), and the cursor to pass next time.
+        """
+        self.poll()
+        with self._lock:
+            changes = [change for change in self._changes if change.seq > cursor]
+            latest = self._seq
+        net = _coalesce((change.path, change.kind) for change in changes)
+        last_seq = {change.path: change.seq for change in changes}
+        return [FileChange(seq=last_seq[path], path=path, kind=kind) for path, kind in net.items()], latest
+
+    def subscribe(self, callback: Callable[[FileChange], None]) -> Callable[[], None]:
+        """Call `callback` with every change the feed picks up.
+
+        Args:
+            callback: Invoked with each `FileChange`.
+
+        Returns:
+            A function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def close(self) -> None:
+        """Stop watching."""
+        self._watcher.close()
+
+    def __enter__(self) -> "FileChangeFeed":
+        """Return the feed."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop watching."""
+        self.close()
+
+
+__all__ = ["DEFAULT_IGNORED_DIRS", "FileChange", "FileChangeFeed", "FileChangeKind"]
@@ -18,20 +18,29 @@ Examples:
     ```
 """
 
+import base64
+import json
 from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import replace
+from typing import Any
 
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
     ExecuteResponse,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    MultiEditResult,
+    ResultPage,
     SandboxBackendProtocol,
     WriteResult,
 )
 from deepagents.backends.state import StateBackend
+from deepagents.backends.utils import plan_multi_edit
 
 
 class CompositeBackend(BackendProtocol):
@@ -216,11 +225,105 @@ class CompositeBackend(BackendProtocol):
         backend, stripped_key = self._get_backend_and_key(file_path)
         return await backend.aread(stripped_key, offset=offset, limit=limit)
 
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset, routing to appropriate backend.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse for the original path.
+        """
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        return replace(backend.read_range(stripped_key, start_byte, length), path=file_path)
+
+    async def aread_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Async version of read_range."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        return replace(await backend.aread_range(stripped_key, start_byte, length), path=file_path)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file, routing to appropriate backend.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse for the original path.
+        """
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        return replace(backend.tail(stripped_key, n_lines), path=file_path)
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Async version of tail."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        return replace(await backend.atail(stripped_key, n_lines), path=file_path)
+
+    def _search_sources(self, path: str | None) -> list[tuple[str | None, BackendProtocol, str | None]]:
+        """Backends searched by the merged view, in page order: default first, then routes."""
+        return [(None, self.default, path)] + [(route_prefix, backend, "/") for route_prefix, backend in self.routes.items()]
+
+    def _merge_pages(
+        self,
+        search: Callable[[BackendProtocol, str | None, dict[str, Any]], list[Any] | str],
+        sources: list[tuple[str | None, BackendProtocol, str | None]],
+        max_results: int | None,
+        cursor: str | None,
+    ) -> list[Any] | str:
+        """Page through several backends in order, querying the next one only while the page has room."""
+        index, sub_cursor, skip = _decode_merge_cursor(cursor)
+        page = ResultPage()
+        while index < len(sources):
+            remaining = None if max_results is None else max_results - len(page)
+            route_prefix, backend, search_path = sources[index]
+            raw = search(backend, search_path, _page_kwargs(remaining, sub_cursor))
+            if isinstance(raw, str):
+                return raw
+            page.cursor = _extend_page(page, raw, route_prefix, index, skip, remaining)
+            if page.cursor is not None:
+                return page
+            index, sub_cursor, skip = index + 1, None, 0
+            if max_results is not None and len(page) >= max_results:
+                # The remaining backends may turn out to be empty, so the next page can be empty
+                page.cursor = _encode_merge_cursor(index) if index < len(sources) else None
+                return page
+        return page
+
+    async def _amerge_pages(
+        self,
+        search: Callable[[BackendProtocol, str | None, dict[str, Any]], Awaitable[list[Any] | str]],
+        sources: list[tuple[str | None, BackendProtocol, str | None]],
+        max_results: int | None,
+        cursor: str | None,
+    ) -> list[Any] | str:
+        """Async version of _merge_pages."""
+        index, sub_cursor, skip = _decode_merge_cursor(cursor)
+        page = ResultPage()
+        while index < len(sources):
+            remaining = None if max_results is None else max_results - len(page)
+            route_prefix, backend, search_path = sources[index]
+            raw = await search(backend, search_path, _page_kwargs(remaining, sub_cursor))
+            if isinstance(raw, str):
+                return raw
+            page.cursor = _extend_page(page, raw, route_prefix, index, skip, remaining)
+            if page.cursor is not None:
+                return page
+            index, sub_cursor, skip = index + 1, None, 0
+            if max_results is not None and len(page) >= max_results:
+                page.cursor = _encode_merge_cursor(index) if index < len(sources) else None
+                return page
+        return page
+
     def grep_raw(
         self,
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
         """Search files for regex pattern.
 
@@ -232,6 +335,10 @@ class CompositeBackend(BackendProtocol):
             path: Directory to search. None searches all backends.
             glob: Glob pattern to filter files (e.g., "*.py", "**/*.txt").
                 Filters by filename, not content.
+            max_results: Optional page size. When searching all backends, the
+                default backend is paged first, then each route in order, and a
+                backend is only queried while the page has room.
+            cursor: Cursor from a previous page.
 
         Returns:
             List of GrepMatch dicts with path (route prefix restored), line
@@ -244,18 +351,25 @@ class CompositeBackend(BackendProtocol):
             matches = composite.grep_raw("import", path="/", glob="*.py")
             ```
         """
+        page_kwargs = _page_kwargs(max_results, cursor)
         # If path targets a specific route, search only that backend
         for route_prefix, backend in self.sorted_routes:
             if path is not None and path.startswith(route_prefix.rstrip("/")):
                 search_path = path[len(route_prefix) - 1 :]
-                raw = backend.grep_raw(pattern, search_path if search_path else "/", glob)
-                if isinstance(raw, str):
-                    return raw
-                return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
+                raw = backend.grep_raw(pattern, search_path if search_path else "/", glob, **page_kwargs)
+                return raw if isinstance(raw, str) else _with_route_prefix(raw, route_prefix)
 
         # If path is None or "/", search default and all routed backends and merge
         # Otherwise, search only the default backend
         if path is None or path == "/":
+            if page_kwargs:
+                return self._merge_pages(
+                    lambda backend, search_path, kwargs: backend.grep_raw(pattern, search_path, glob, **kwargs),
+                    self._search_sources(path),
+                    max_results,
+                    cursor,
+                )
+
             all_matches: list[GrepMatch] = []
             raw_default = self.default.grep_raw(pattern, path, glob)  # type: ignore[attr-defined]
             if isinstance(raw_default, str):
@@ -272,30 +386,39 @@ class CompositeBackend(BackendProtocol):
 
             return all_matches
         # Path specified but doesn't match a route - search only default
-        return self.default.grep_raw(pattern, path, glob)  # type: ignore[attr-defined]
+        return self.default.grep_raw(pattern, path, glob, **page_kwargs)  # type: ignore[attr-defined]
 
     async def agrep_raw(
         self,
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
         """Async version of grep_raw.
 
         See grep_raw() for detailed documentation on routing behavior and parameters.
         """
+        page_kwargs = _page_kwargs(max_results, cursor)
         # If path targets a specific route, search only that backend
         for route_prefix, backend in self.sorted_routes:
             if path is not None and path.startswith(route_prefix.rstrip("/")):
                 search_path = path[len(route_prefix) - 1 :]
-                raw = await backend.agrep_raw(pattern, search_path if search_path else "/", glob)
-                if isinstance(raw, str):
-                    return raw
-                return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
+                raw = await backend.agrep_raw(pattern, search_path if search_path else "/", glob, **page_kwargs)
+                return raw if isinstance(raw, str) else _with_route_prefix(raw, route_prefix)
 
         # If path is None or "/", search default and all routed backends and merge
         # Otherwise, search only the default backend
         if path is None or path == "/":
+            if page_kwargs:
+                return await self._amerge_pages(
+                    lambda backend, search_path, kwargs: backend.agrep_raw(pattern, search_path, glob, **kwargs),
+                    self._search_sources(path),
+                    max_results,
+                    cursor,
+                )
+
             all_matches: list[GrepMatch] = []
             raw_default = await self.default.agrep_raw(pattern, path, glob)  # type: ignore[attr-defined]
             if isinstance(raw_default, str):
@@ -312,17 +435,38 @@ class CompositeBackend(BackendProtocol):
 
             return all_matches
         # Path specified but doesn't match a route - search only default
-        return await self.default.agrep_raw(pattern, path, glob)  # type: ignore[attr-defined]
+        return await self.default.agrep_raw(pattern, path, glob, **page_kwargs)  # type: ignore[attr-defined]
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
+        """Find files matching a glob pattern across the routed backends.
+
+        Without pagination, the merged results are sorted by path. With
+        `max_results` or `cursor`, backends are paged in order (default first,
+        then each route) and each page keeps its backend's own ordering.
+        """
+        page_kwargs = _page_kwargs(max_results, cursor)
         results: list[FileInfo] = []
 
         # Route based on path, not pattern
         for route_prefix, backend in self.sorted_routes:
             if path.startswith(route_prefix.rstrip("/")):
                 search_path = path[len(route_prefix) - 1 :]
-                infos = backend.glob_info(pattern, search_path if search_path else "/")
-                return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
+                infos = backend.glob_info(pattern, search_path if search_path else "/", **page_kwargs)
+                return _with_route_prefix(infos, route_prefix)
+
+        if page_kwargs:
+            return self._merge_pages(
+                lambda backend, search_path, kwargs: backend.glob_info(pattern, search_path, **kwargs),
+                self._search_sources(path),
+                max_results,
+                cursor,
+            )
 
         # Path doesn't match any specific route - search default backend AND all routed backends
         results.extend(self.default.glob_info(pattern, path))
@@ -335,16 +479,31 @@ class CompositeBackend(BackendProtocol):
         results.sort(key=lambda x: x.get("path", ""))
         return results
 
-    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    async def aglob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
         """Async version of glob_info."""
+        page_kwargs = _page_kwargs(max_results, cursor)
         results: list[FileInfo] = []
 
         # Route based on path, not pattern
         for route_prefix, backend in self.sorted_routes:
             if path.startswith(route_prefix.rstrip("/")):
                 search_path = path[len(route_prefix) - 1 :]
-                infos = await backend.aglob_info(pattern, search_path if search_path else "/")
-                return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
+                infos = await backend.aglob_info(pattern, search_path if search_path else "/", **page_kwargs)
+                return _with_route_prefix(infos, route_prefix)
+
+        if page_kwargs:
+            return await self._amerge_pages(
+                lambda backend, search_path, kwargs: backend.aglob_info(pattern, search_path, **kwargs),
+                self._search_sources(path),
+                max_results,
+                cursor,
+            )
 
         # Path doesn't match any specific route - search default backend AND all routed backends
         results.extend(await self.default.aglob_info(pattern, path))
@@ -461,6 +620,94 @@ class CompositeBackend(BackendProtocol):
                 pass
         return res
 
+    def _group_edits(self, edits: list[FileEdit]) -> dict[BackendProtocol, list[FileEdit]]:
+        """Group edits by target backend, with route prefixes stripped and order preserved."""
+        backend_batches: dict[BackendProtocol, list[FileEdit]] = defaultdict(list)
+        for edit in edits:
+            backend, stripped_key = self._get_backend_and_key(edit["file_path"])
+            backend_batches[backend].append({**edit, "file_path": stripped_key})
+        return backend_batches
+
+    def _restore_prefix(self, backend: BackendProtocol, stripped_key: str) -> str:
+        """Map a stripped key returned by a routed backend back to its composite path."""
+        for prefix, route_backend in self.sorted_routes:
+            if route_backend is backend:
+                return f"{prefix.rstrip('/')}{stripped_key}"
+        return stripped_key
+
+    def _merge_multi_edit_results(self, results: list[tuple[BackendProtocol, MultiEditResult]]) -> MultiEditResult:
+        """Combine per-backend multi_edit results, restoring route prefixes on returned paths."""
+        paths: list[str] = []
+        occurrences: dict[str, int] = {}
+        files_update: dict = {}
+        for backend, res in results:
+            for path in res.paths or []:
+                full_path = self._restore_prefix(backend, path)
+                paths.append(full_path)
+                occurrences[full_path] = (res.occurrences or {}).get(path, 0)
+            files_update.update(res.files_update or {})
+        if files_update:
+            try:
+                runtime = getattr(self.default, "runtime", None)
+                if runtime is not None:
+                    state = runtime.state
+                    files = state.get("files", {})
+                    files.update(files_update)
+                    state["files"] = files
+            except Exception:
+                pass
+        return MultiEditResult(paths=paths, files_update=files_update or None, occurrences=occurrences)
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply edits across files, batching by backend.
+
+        Each backend's `multi_edit` is called once with all edits for that backend.
+        When the edits span several backends, every edit is first validated against
+        the current contents (one `download_files` per backend), so a failure in one
+        route leaves every route untouched.
+
+        Args:
+            edits: Edits to apply, in order.
+
+        Returns:
+            MultiEditResult with route prefixes restored in paths.
+        """
+        backend_batches = self._group_edits(edits)
+        if len(backend_batches) > 1:
+            paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+            responses = self.download_files(paths)
+            contents = {r.path: r.content.decode("utf-8", errors="replace") if r.content is not None else None for r in responses}
+            plan = plan_multi_edit(edits, contents)
+            if isinstance(plan, str):
+                return MultiEditResult(error=plan)
+
+        results: list[tuple[BackendProtocol, MultiEditResult]] = []
+        for backend, batch in backend_batches.items():
+            res = backend.multi_edit(batch)
+            if res.error:
+                return res
+            results.append((backend, res))
+        return self._merge_multi_edit_results(results)
+
+    async def amulti_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Async version of multi_edit."""
+        backend_batches = self._group_edits(edits)
+        if len(backend_batches) > 1:
+            paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+            responses = await self.adownload_files(paths)
+            contents = {r.path: r.content.decode("utf-8", errors="replace") if r.content is not None else None for r in responses}
+            plan = plan_multi_edit(edits, contents)
+            if isinstance(plan, str):
+                return MultiEditResult(error=plan)
+
+        results: list[tuple[BackendProtocol, MultiEditResult]] = []
+        for backend, batch in backend_batches.items():
+            res = await backend.amulti_edit(batch)
+            if res.error:
+                return res
+            results.append((backend, res))
+        return self._merge_multi_edit_results(results)
+
     def execute(
         self,
         command: str,
@@ -649,3 +896,92 @@ class CompositeBackend(BackendProtocol):
                 )
 
         return results  # type: ignore[return-value]
+
+    def _stat_batches(self, paths: list[str]) -> dict[BackendProtocol, list[tuple[int, str]]]:
+        backend_batches: dict[BackendProtocol, list[tuple[int, str]]] = defaultdict(list)
+        for idx, path in enumerate(paths):
+            backend, stripped_path = self._get_backend_and_key(path)
+            backend_batches[backend].append((idx, stripped_path))
+        return backend_batches
+
+    @staticmethod
+    def _place_stats(
+        results: list[FileInfo | None],
+        paths: list[str],
+        indices: tuple[int, ...],
+        infos: list[FileInfo | None],
+    ) -> None:
+        for orig_idx, info in zip(indices, infos, strict=True):
+            results[orig_idx] = {**info, "path": paths[orig_idx]} if info is not None else None
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up metadata for several paths, batching by backend.
+
+        Groups paths by their target backend and calls each backend's stat_many
+        once, then merges results in original order with the original paths.
+
+        Args:
+            paths: List of paths to look up.
+
+        Returns:
+            One FileInfo (or None if nothing exists at the path) per input path.
+        """
+        results: list[FileInfo | None] = [None] * len(paths)
+        for backend, batch in self._stat_batches(paths).items():
+            indices, stripped_paths = zip(*batch, strict=True)
+            self._place_stats(results, paths, indices, backend.stat_many(list(stripped_paths)))
+        return results
+
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Async version of stat_many."""
+        results: list[FileInfo | None] = [None] * len(paths)
+        for backend, batch in self._stat_batches(paths).items():
+            indices, stripped_paths = zip(*batch, strict=True)
+            self._place_stats(results, paths, indices, await backend.astat_many(list(stripped_paths)))
+        return results
+
+
+def _page_kwargs(max_results: int | None, cursor: str | None) -> dict[str, Any]:
+    """Pagination arguments to forward, empty when not paginating so older backends keep working."""
+    if max_results is None and cursor is None:
+        return {}
+    return {"max_results": max_results, "cursor": cursor}
+
+
+def _with_route_prefix(items: list[Any], route_prefix: str) -> list[Any]:
+    """Restore the route prefix on result paths, keeping the page cursor if there is one."""
+    restored = [{**item, "path": f"{route_prefix[:-1]}{item['path']}"} for item in items]
+    if isinstance(items, ResultPage):
+        return ResultPage(restored, cursor=items.cursor)
+    return restored
+
+
+def _encode_merge_cursor(index: int, sub_cursor: str | None = None, skip: int = 0) -> str:
+    """Encode a merged-view position: backend index, that backend's cursor, and results to skip."""
+    payload = json.dumps({"i": index, "c": sub_cursor, "s": skip})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_merge_cursor(cursor: str | None) -> tuple[int, str | None, int]:
+    """Decode `_encode_merge_cursor`. Malformed cursors restart from the beginning."""
+    if not cursor:
+        return 0, None, 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(payload["i"]), payload.get("c"), int(payload.get("s", 0))
+    except (ValueError, KeyError, TypeError):
+        return 0, None, 0
+
+
+def _extend_page(page: ResultPage, raw: list[Any], route_prefix: str | None, index: int, skip: int, remaining: int | None) -> str | None:
+    """Add one backend's results to a merged page and return the merged cursor if that backend has more."""
+    items = _with_route_prefix(raw, route_prefix) if route_prefix else raw
+    if isinstance(raw, ResultPage):
+        page.extend(items)
+        return None if raw.cursor is None else _encode_merge_cursor(index, raw.cursor)
+    # The backend ignored pagination and returned everything: cut the page here
+    end = None if remaining is None else skip + remaining
+    page.extend(items[skip:end])
+    if end is not None and len(items) > end:
+        return _encode_merge_cursor(index, None, end)
+    return None
@@ -0,0 +1,514 @@
+"""ContentAddressedBackend: Store file contents once by hash, shared across threads and namespaces."""
+
+import hashlib
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from langgraph.store.base import BaseStore, GetOp, Item, PutOp
+
+from deepagents.backends.protocol import (
+    BackendProtocol,
+    EditResult,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    MultiEditResult,
+    WriteResult,
+)
+from deepagents.backends.store import StoreBackend
+from deepagents.backends.utils import (
+    CompressionCodec,
+    _glob_search_files,
+    _validate_path,
+    compress_text,
+    decompress_text,
+    file_data_to_string,
+    format_read_response,
+    grep_matches_from_files,
+    paginate,
+    perform_string_replacement,
+    plan_multi_edit,
+    tail_bytes,
+)
+
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+
+DEFAULT_BLOB_NAMESPACE = ("filesystem_blobs",)
+"""Store namespace holding the shared blobs."""
+
+BLOB_FETCH_BATCH_SIZE = 100
+"""Blobs fetched per store round trip when streaming file contents (e.g. for grep)."""
+
+# Refcount updates are read-modify-write on the store, so mutations from all
+# backend instances in this process are serialized.
+_REFCOUNT_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class DedupStats:
+    """Deduplication summary over every blob in the store."""
+
+    files: int
+    """Number of file references (paths) across all namespaces."""
+
+    blobs: int
+    """Number of distinct blobs stored."""
+
+    logical_bytes: int
+    """Total size of all referenced files, as if every copy were stored in full."""
+
+    stored_bytes: int
+    """Total size of the distinct blobs (before compression)."""
+
+    @property
+    def ratio(self) -> float:
+        """Logical bytes per stored byte; 1.0 means nothing was deduplicated."""
+        return self.logical_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+
+def content_hash(content: str) -> str:
+    """Return the blob key for `content` (hex SHA-256 of its UTF-8 encoding)."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+class ContentAddressedBackend(BackendProtocol):
+    """Backend that stores each distinct file content once, in LangGraph's BaseStore.
+
+    A drop-in alternative to `StoreBackend` for deployments where many threads
+    write the same files (identical evicted tool results, shared templates,
+    project files copied into every thread). File contents are stored as blobs
+    keyed by their SHA-256 hash in a shared blob namespace; each backend
+    namespace only holds small `path -> hash` references with the file's size
+    and timestamps. Blobs carry a reference count that is updated on every
+    write, edit and overwrite, and a blob is deleted as soon as nothing refers
+    to it. `collect_garbage` rebuilds the counts from the references, which
+    repairs drift left by writers in other processes.
+
+    The reference namespace is resolved exactly like `StoreBackend`'s, and items
+    written there by a `StoreBackend` stay readable, so existing data can be
+    migrated in place.
+
+    Listing, glob and stat only read references; blobs are fetched in batches
+    when content is needed.
+    """
+
+    def __init__(
+        self,
+        runtime: "ToolRuntime",
+        *,
+        blob_namespace: tuple[str, ...] = DEFAULT_BLOB_NAMESPACE,
+        compression: CompressionCodec | None = None,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            runtime: The ToolRuntime instance providing store access and configuration.
+            blob_namespace: Store namespace for the shared blobs. Every backend that
+                should share blobs must use the same namespace.
+            compression: Optional codec (`"gzip"` or `"zstd"`) for newly stored blobs.
+        """
+        self.runtime = runtime
+        self.blob_namespace = blob_namespace
+        self.compression = compression
+        # Store and namespace resolution, and reading of plain StoreBackend items
+        self._store_backend = StoreBackend(runtime)
+
+    def _get_store(self) -> BaseStore:
+        return self._store_backend._get_store()
+
+    def _get_namespace(self) -> tuple[str, ...]:
+        return self._store_backend._get_namespace()
+
+    def _blob_value(self, content: str, refcount: int) -> dict[str, Any]:
+        size = len(content.encode("utf-8"))
+        if self.compression is not None:
+            return {
+                "content_compressed": compress_text(content, self.compression),
+                "compression": self.compression,
+                "size": size,
+                "refcount": refcount,
+            }
+        return {"content": content, "size": size, "refcount": refcount}
+
+    @staticmethod
+    def _blob_content(value: dict[str, Any]) -> str:
+        if "compression" in value:
+            return decompress_text(value["content_compressed"], value["compression"])
+        return value["content"]
+
+    def _ref_info(self, item: Item) -> FileInfo | None:
+        """Build FileInfo from a reference item, or from a plain StoreBackend item."""
+        if "blob" in item.value:
+            return {"path": item.key, "is_dir": False, "size": item.value["size"], "modified_at": item.value["modified_at"]}
+        try:
+            file_data = self._store_backend._convert_store_item_to_file_data(item)
+        except ValueError:
+            return None
+        return {"path": item.key, "is_dir": False, "size": len(file_data_to_string(file_data)), "modified_at": file_data["modified_at"]}
+
+    def _load_contents(self, store: BaseStore, items: list[Item]) -> dict[str, str]:
+        """Resolve file contents for reference items, fetching each distinct blob once."""
+        hashes = list(dict.fromkeys(item.value["blob"] for item in items if "blob" in item.value))
+        blobs = store.batch([GetOp(self.blob_namespace, h) for h in hashes]) if hashes else []
+        by_hash = {h: self._blob_content(blob.value) for h, blob in zip(hashes, blobs, strict=True) if blob is not None}
+        contents: dict[str, str] = {}
+        for item in items:
+            if "blob" in item.value:
+                if item.value["blob"] in by_hash:
+                    contents[item.key] = by_hash[item.value["blob"]]
+                continue
+            try:
+                contents[item.key] = file_data_to_string(self._store_backend._convert_store_item_to_file_data(item))
+            except ValueError:
+                continue
+        return contents
+
+    def _get_items(self, store: BaseStore, paths: list[str]) -> dict[str, Item]:
+        unique = list(dict.fromkeys(paths))
+        items = store.batch([GetOp(self._get_namespace(), path) for path in unique]) if unique else []
+        return {path: item for path, item in zip(unique, items, strict=True) if item is not None}
+
+    def _read_content(self, file_path: str) -> str | None:
+        store = self._get_store()
+        item = store.get(self._get_namespace(), file_path)
+        if item is None:
+            return None
+        return self._load_contents(store, [item]).get(file_path)
+
+    def _commit(self, store: BaseStore, new_contents: dict[str, str], previous: dict[str, Item]) -> None:
+        """Point each path at the blob for its new content, adjusting refcounts in one batched write.
+
+        Must be called while holding `_REFCOUNT_LOCK`, with `previous` read under the same lock.
+        """
+        namespace = self._get_namespace()
+        new_hashes = {path: content_hash(content) for path, content in new_contents.items()}
+        delta: Counter[str] = Counter(new_hashes.values())
+        delta.subtract(item.value["blob"] for item in previous.values() if "blob" in item.value)
+        affected = [h for h, change in delta.items() if change]
+        blobs = dict(zip(affected, store.batch([GetOp(self.blob_namespace, h) for h in affected]) if affected else [], strict=True))
+        content_by_hash = {new_hashes[path]: content for path, content in new_contents.items()}
+
+        ops: list[PutOp] = []
+        for h in affected:
+            blob = blobs[h]
+            refcount = (blob.value.get("refcount", 0) if blob is not None else 0) + delta[h]
+            if refcount <= 0:
+                if blob is not None:
+                    ops.append(PutOp(self.blob_namespace, h, None))
+            elif blob is None:
+                ops.append(PutOp(self.blob_namespace, h, self._blob_value(content_by_hash[h], refcount)))
+            else:
+                ops.append(PutOp(self.blob_namespace, h, {**blob.value, "refcount": refcount}))
+        now = _now()
+        for path, h in new_hashes.items():
+            old = previous.get(path)
+            created_at = old.value.get("created_at", now) if old is not None else now
+            ref = {"blob": h, "size": len(new_contents[path].encode("utf-8")), "created_at": created_at, "modified_at": now}
+            ops.append(PutOp(namespace, path, ref))
+        store.batch(ops)
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List files and directories in the specified directory (non-recursive).
+
+        Only file references are read; no blob is fetched.
+
+        Args:
+            path: Absolute path to directory.
+
+        Returns:
+            List of FileInfo-like dicts for files and directories directly in the directory.
+            Directories have a trailing / in their path and is_dir=True.
+        """
+        normalized_path = path if path.endswith("/") else path + "/"
+        infos: list[FileInfo] = []
+        subdirs: set[str] = set()
+        for item in StoreBackend._iter_store_items(self._get_store(), self._get_namespace()):
+            if not item.key.startswith(normalized_path):
+                continue
+            relative = item.key[len(normalized_path) :]
+            if "/" in relative:
+                subdirs.add(normalized_path + relative.split("/")[0] + "/")
+                continue
+            info = self._ref_info(item)
+            if info is not None:
+                infos.append(info)
+        infos.extend({"path": subdir, "is_dir": True, "size": 0, "modified_at": ""} for subdir in subdirs)
+        infos.sort(key=lambda x: x.get("path", ""))
+        return infos
+
+    def read(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Read file content with line numbers.
+
+        Args:
+            file_path: Absolute file path.
+            offset: Line offset to start reading from (0-indexed).
+            limit: Maximum number of lines to read.
+
+        Returns:
+            Formatted file content with line numbers, or error message.
+        """
+        content = self._read_content(file_path)
+        if content is None:
+            return f"Error: File '{file_path}' not found"
+        return format_read_response({"content": content.split("\n")}, offset, limit)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset of a stored file.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+        content = self._read_content(file_path)
+        if content is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        data = content.encode("utf-8")
+        end = None if length is None else start_byte + max(length, 0)
+        return FileDownloadResponse(path=file_path, content=data[start_byte:end], error=None)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a stored file.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+        content = self._read_content(file_path)
+        if content is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        return FileDownloadResponse(path=file_path, content=tail_bytes(content.encode("utf-8"), n_lines), error=None)
+
+    def write(
+        self,
+        file_path: str,
+        content: str,
+    ) -> WriteResult:
+        """Create a new file with content.
+        Returns WriteResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        with _REFCOUNT_LOCK:
+            if store.get(self._get_namespace(), file_path) is not None:
+                return WriteResult(
+                    error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path."
+                )
+            self._commit(store, {file_path: content}, {})
+        return WriteResult(path=file_path, files_update=None)
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Edit a file by replacing string occurrences.
+        Returns EditResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        with _REFCOUNT_LOCK:
+            item = store.get(self._get_namespace(), file_path)
+            content = self._load_contents(store, [item]).get(file_path) if item is not None else None
+            if item is None or content is None:
+                return EditResult(error=f"Error: File '{file_path}' not found")
+            result = perform_string_replacement(content, old_string, new_string, replace_all)
+            if isinstance(result, str):
+                return EditResult(error=result)
+            new_content, occurrences = result
+            self._commit(store, {file_path: new_content}, {file_path: item})
+        return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files with one batched read and one batched write.
+        Returns MultiEditResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+        with _REFCOUNT_LOCK:
+            items = self._get_items(store, paths)
+            contents = self._load_contents(store, list(items.values()))
+            plan = plan_multi_edit(edits, {path: contents.get(path) for path in paths})
+            if isinstance(plan, str):
+                return MultiEditResult(error=plan)
+            self._commit(store, {path: new_content for path, (new_content, _) in plan.items()}, {path: items[path] for path in plan})
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=None,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
+    def _iter_files(self, prefix: str) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Lazily yield `(path, file_data)` under `prefix`, fetching blobs a batch at a time."""
+        store = self._get_store()
+        batch: list[Item] = []
+        for item in StoreBackend._iter_store_items(store, self._get_namespace()):
+            if not item.key.startswith(prefix):
+                continue
+            batch.append(item)
+            if len(batch) == BLOB_FETCH_BATCH_SIZE:
+                yield from self._file_datas(store, batch)
+                batch = []
+        yield from self._file_datas(store, batch)
+
+    def _file_datas(self, store: BaseStore, items: list[Item]) -> Iterator[tuple[str, dict[str, Any]]]:
+        contents = self._load_contents(store, items) if items else {}
+        for item in items:
+            if item.key in contents:
+                yield item.key, {"content": contents[item.key].split("\n")}
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str = "/",
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        try:
+            prefix = _validate_path(path)
+        except ValueError:
+            return paginate((), max_results, cursor)
+        return grep_matches_from_files(self._iter_files(prefix), pattern, prefix, glob, max_results, cursor)
+
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
+        infos: dict[str, FileInfo] = {}
+        for item in StoreBackend._iter_store_items(self._get_store(), self._get_namespace()):
+            info = self._ref_info(item)
+            if info is not None:
+                infos[item.key] = info
+        result = _glob_search_files(infos, pattern, path)
+        if result == "No files found":
+            return []
+        return paginate([infos[p] for p in result.split("\n")], max_results, cursor)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload multiple files, overwriting existing ones, with one batched write.
+
+        Args:
+            files: List of (path, content) tuples where content is bytes.
+
+        Returns:
+            List of FileUploadResponse objects, one per input file.
+            Response order matches input order. Content that is not UTF-8 text
+            is rejected with `invalid_content`; the other files are still written.
+        """
+        new_contents: dict[str, str] = {}
+        responses = []
+        for path, content in files:
+            try:
+                new_contents[path] = content.decode("utf-8")
+            except UnicodeDecodeError:
+                responses.append(FileUploadResponse(path=path, error="invalid_content"))
+                continue
+            responses.append(FileUploadResponse(path=path, error=None))
+        if new_contents:
+            store = self._get_store()
+            with _REFCOUNT_LOCK:
+                self._commit(store, new_contents, self._get_items(store, list(new_contents)))
+        return responses
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download multiple files, fetching references and distinct blobs in one batch each.
+
+        Args:
+            paths: List of file paths to download.
+
+        Returns:
+            List of FileDownloadResponse objects, one per input path.
+            Response order matches input order.
+        """
+        store = self._get_store()
+        contents = self._load_contents(store, list(self._get_items(store, paths).values()))
+        return [
+            FileDownloadResponse(path=path, content=contents[path].encode("utf-8"), error=None)
+            if path in contents
+            else FileDownloadResponse(path=path, content=None, error="file_not_found")
+            for path in paths
+        ]
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up file metadata from the references alone, in one store round trip.
+
+        Args:
+            paths: List of file paths to look up.
+
+        Returns:
+            One FileInfo (or None if the file does not exist) per input path.
+        """
+        items = self._get_items(self._get_store(), paths)
+        return [self._ref_info(items[path]) if path in items else None for path in paths]
+
+    def dedup_stats(self) -> DedupStats:
+        """Summarize deduplication across every namespace sharing the blob namespace.
+
+        Returns:
+            DedupStats with reference and blob counts and their total sizes.
+        """
+        files = blobs = logical_bytes = stored_bytes = 0
+        for blob in StoreBackend._iter_store_items(self._get_store(), self.blob_namespace):
+            refcount = blob.value.get("refcount", 0)
+            files += refcount
+            blobs += 1
+            logical_bytes += blob.value["size"] * refcount
+            stored_bytes += blob.value["size"]
+        return DedupStats(files=files, blobs=blobs, logical_bytes=logical_bytes, stored_bytes=stored_bytes)
+
+    def collect_garbage(self) -> int:
+        """Recount blob references from every namespace and delete unreferenced blobs.
+
+        Refcounts are kept up to date on every write, so this is only needed to
+        repair counts after writers in other processes raced on the same blob, or
+        after references were deleted from the store directly.
+
+        Returns:
+            Number of blobs deleted.
+        """
+        store = self._get_store()
+        with _REFCOUNT_LOCK:
+            counts: Counter[str] = Counter()
+            offset = 0
+            while namespaces := store.list_namespaces(limit=100, offset=offset):
+                for namespace in namespaces:
+                    if namespace != self.blob_namespace:
+                        counts.update(item.value["blob"] for item in StoreBackend._iter_store_items(store, namespace) if "blob" in item.value)
+                offset += len(namespaces)
+
+            ops: list[PutOp] = []
+            for blob in StoreBackend._iter_store_items(store, self.blob_namespace):
+                refcount = counts.get(blob.key, 0)
+                if refcount == 0:
+                    ops.append(PutOp(self.blob_namespace, blob.key, None))
+                elif blob.value.get("refcount") != refcount:
+                    ops.append(PutOp(self.blob_namespace, blob.key, {**blob.value, "refcount": refcount}))
+            if ops:
+                store.batch(ops)
+        return sum(op.value is None for op in ops)
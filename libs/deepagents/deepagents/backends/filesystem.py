@@ -7,30 +7,46 @@ Security and search upgrades:
   and optional glob include filtering, while preserving virtual path behavior
 """
 
+import contextlib
 import json
 import os
 import re
+import shutil
+import stat
 import subprocess
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO
 
 import wcmatch.glob as wcglob
 
+from deepagents.backends.change_feed import FileChangeFeed
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    MultiEditResult,
     WriteResult,
 )
 from deepagents.backends.utils import (
     check_empty_content,
     format_content_with_line_numbers,
+    paginate,
     perform_string_replacement,
+    plan_multi_edit,
+    tail_bytes,
 )
 
+TAIL_BLOCK_SIZE = 64 * 1024
+"""Bytes read per step when `tail` scans a file backwards from its end."""
+
 
 class FilesystemBackend(BackendProtocol):
     """Backend that reads and writes files directly from the filesystem.
@@ -60,6 +76,36 @@ class FilesystemBackend(BackendProtocol):
     
         self.virtual_mode = virtual_mode
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        self.change_feed: FileChangeFeed | None = None
+
+    def watch(self, *, poll_interval: float = 1.0, use_inotify: bool | None = None) -> FileChangeFeed:
+        """Start reporting changes made to files under the root directory by other processes.
+
+        Writes made through this backend are not reported. Calling `watch` again
+        returns the running feed.
+
+        Args:
+            poll_interval: Seconds between rescans when inotify is unavailable.
+            use_inotify: Force (True) or disable (False) inotify; by default it is
+                used when available.
+
+        Returns:
+            The backend's `FileChangeFeed`, reporting paths the way this backend names them.
+        """
+        if self.change_feed is None:
+            self.change_feed = FileChangeFeed(self.cwd, to_path=self._to_backend_path, poll_interval=poll_interval, use_inotify=use_inotify)
+        return self.change_feed
+
+    def _to_backend_path(self, path: str) -> str:
+        """Map an absolute filesystem path under the root to the path this backend reports."""
+        if self.virtual_mode:
+            return "/" + Path(path).relative_to(self.cwd).as_posix()
+        return path
+
+    def _record_own_write(self, resolved_path: Path) -> None:
+        """Tell the change feed, if any, that this backend just wrote `resolved_path`."""
+        if self.change_feed is not None:
+            self.change_feed.record_own_write(resolved_path)
 
     def _resolve_path(self, key: str) -> Path:
         """Resolve a file path with security checks.
@@ -260,6 +306,67 @@ class FilesystemBackend(BackendProtocol):
         except (OSError, UnicodeDecodeError) as e:
             return f"Error reading file '{file_path}': {e}"
 
+    def _read_bytes(self, file_path: str, reader: Callable[[BinaryIO], bytes]) -> FileDownloadResponse:
+        """Open a file without following symlinks and return what `reader` reads from it."""
+        try:
+            fd = os.open(self._resolve_path(file_path), os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except FileNotFoundError:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        except PermissionError:
+            return FileDownloadResponse(path=file_path, content=None, error="permission_denied")
+        except (OSError, ValueError):
+            return FileDownloadResponse(path=file_path, content=None, error="invalid_path")
+        if stat.S_ISDIR(os.fstat(fd).st_mode):
+            os.close(fd)
+            return FileDownloadResponse(path=file_path, content=None, error="is_directory")
+        with os.fdopen(fd, "rb") as f:
+            return FileDownloadResponse(path=file_path, content=reader(f), error=None)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset by seeking, without reading the rest of the file.
+
+        Args:
+            file_path: Absolute or relative file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+
+        def reader(f: BinaryIO) -> bytes:
+            f.seek(start_byte)
+            return f.read() if length is None else f.read(length)
+
+        return self._read_bytes(file_path, reader)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file with reverse block reads from its end.
+
+        Args:
+            file_path: Absolute or relative file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+
+        def reader(f: BinaryIO) -> bytes:
+            pos = f.seek(0, os.SEEK_END)
+            blocks: list[bytes] = []
+            newlines = 0
+            # One more newline than requested, since the last one may just end the file
+            while pos > 0 and newlines <= n_lines:
+                step = min(TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                block = f.read(step)
+                blocks.append(block)
+                newlines += block.count(b"\n")
+            return tail_bytes(b"".join(reversed(blocks)), n_lines)
+
+        return self._read_bytes(file_path, reader)
+
     def write(
         self,
         file_path: str,
@@ -273,22 +380,23 @@ class FilesystemBackend(BackendProtocol):
         except ValueError as e:
             return WriteResult(error=f"Invalid path: {e}")
 
-        if resolved_path.exists():
-            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
-
         try:
             # Create parent directories if needed
             resolved_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Prefer O_NOFOLLOW to avoid writing through symlinks
-            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+            # O_EXCL makes the existence check part of the open (no separate stat, no race);
+            # prefer O_NOFOLLOW to avoid writing through symlinks
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
             if hasattr(os, "O_NOFOLLOW"):
                 flags |= os.O_NOFOLLOW
             fd = os.open(resolved_path, flags, 0o644)
             with os.fdopen(fd, "w", encoding="utf-8") as f:
                 f.write(content)
+            self._record_own_write(resolved_path)
 
             return WriteResult(path=file_path, files_update=None)
+        except FileExistsError:
+            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
         except (OSError, UnicodeEncodeError) as e:
             return WriteResult(error=f"Error writing file '{file_path}': {e}")
 
@@ -327,16 +435,98 @@ class FilesystemBackend(BackendProtocol):
             fd = os.open(resolved_path, flags)
             with os.fdopen(fd, "w", encoding="utf-8") as f:
                 f.write(new_content)
+            self._record_own_write(resolved_path)
 
             return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
         except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
             return EditResult(error=f"Error editing file '{file_path}': {e}")
 
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files, reading and writing each file once.
+        Returns MultiEditResult. External storage sets files_update=None.
+
+        New contents are staged in temporary files next to their targets and only
+        moved into place once every edit has validated and every file is staged.
+        Each original is kept as a hard link (or copy) until every file is in
+        place, so a failure while moving them puts the originals back and leaves
+        all files untouched. Other processes may briefly see some files edited
+        and others not.
+        """
+        paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+        resolved: dict[str, Path] = {}
+        contents: dict[str, str | None] = {}
+        for path in paths:
+            try:
+                resolved[path] = self._resolve_path(path)
+            except ValueError as e:
+                return MultiEditResult(error=f"Invalid path: {e}")
+            if not resolved[path].is_file():
+                contents[path] = None
+                continue
+            try:
+                # Read securely
+                fd = os.open(resolved[path], os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+                with os.fdopen(fd, "r", encoding="utf-8") as f:
+                    contents[path] = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                return MultiEditResult(error=f"Error editing file '{path}': {e}")
+
+        plan = plan_multi_edit(edits, contents)
+        if isinstance(plan, str):
+            return MultiEditResult(error=plan)
+
+        staged: list[tuple[str, Path]] = []
+        for path, (new_content, _) in plan.items():
+            target = resolved[path]
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+                staged.append((tmp_path, target))
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(new_content)
+                shutil.copymode(target, tmp_path)
+            except (OSError, UnicodeEncodeError) as e:
+                for staged_path, _ in staged:
+                    with contextlib.suppress(OSError):
+                        Path(staged_path).unlink()
+                return MultiEditResult(error=f"Error editing file '{path}': {e}")
+
+        swapped: list[tuple[Path, str]] = []
+        for path, (tmp_path, target) in zip(plan, staged, strict=True):
+            backup = f"{tmp_path}.orig"
+            try:
+                try:
+                    os.link(target, backup)
+                except OSError:
+                    shutil.copy2(target, backup)
+                swapped.append((target, backup))
+                Path(tmp_path).replace(target)
+            except OSError as e:
+                for swapped_target, swapped_backup in reversed(swapped):
+                    with contextlib.suppress(OSError):
+                        Path(swapped_backup).replace(swapped_target)
+                        # Renaming a hard link onto a target it still links to does nothing
+                        Path(swapped_backup).unlink(missing_ok=True)
+                for staged_path, _ in staged:
+                    with contextlib.suppress(OSError):
+                        Path(staged_path).unlink(missing_ok=True)
+                return MultiEditResult(error=f"Error editing file '{path}': {e}")
+        for target, backup in swapped:
+            with contextlib.suppress(OSError):
+                Path(backup).unlink()
+            self._record_own_write(target)
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=None,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
     def grep_raw(
         self,
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
         # Validate regex
         try:
@@ -348,10 +538,18 @@ class FilesystemBackend(BackendProtocol):
         try:
             base_full = self._resolve_path(path or ".")
         except ValueError:
-            return []
+            return paginate((), max_results, cursor)
 
         if not base_full.exists():
-            return []
+            return paginate((), max_results, cursor)
+
+        if max_results is not None or cursor is not None:
+            # Paginated: stream matches in path order and stop once the page is full
+            stream = self._ripgrep_stream(pattern, base_full, glob)
+            if stream is None:
+                stream = self._python_stream(pattern, base_full, glob)
+            with contextlib.closing(stream):
+                return paginate(stream, max_results, cursor)
 
         # Try ripgrep first
         results = self._ripgrep_search(pattern, base_full, glob)
@@ -383,42 +581,88 @@ class FilesystemBackend(BackendProtocol):
 
         results: dict[str, list[tuple[int, str]]] = {}
         for line in proc.stdout.splitlines():
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if data.get("type") != "match":
-                continue
-            pdata = data.get("data", {})
-            ftext = pdata.get("path", {}).get("text")
-            if not ftext:
-                continue
-            p = Path(ftext)
-            if self.virtual_mode:
-                try:
-                    virt = "/" + str(p.resolve().relative_to(self.cwd))
-                except Exception:
-                    continue
-            else:
-                virt = str(p)
-            ln = pdata.get("line_number")
-            lt = pdata.get("lines", {}).get("text", "").rstrip("\n")
-            if ln is None:
-                continue
-            results.setdefault(virt, []).append((int(ln), lt))
+            match = self._parse_ripgrep_line(line)
+            if match is not None:
+                results.setdefault(match["path"], []).append((match["line"], match["text"]))
 
         return results
 
+    def _parse_ripgrep_line(self, line: str) -> GrepMatch | None:
+        """Turn one line of `rg --json` output into a match, or None for non-match events."""
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if data.get("type") != "match":
+            return None
+        pdata = data.get("data", {})
+        ftext = pdata.get("path", {}).get("text")
+        if not ftext:
+            return None
+        p = Path(ftext)
+        if self.virtual_mode:
+            try:
+                virt = "/" + str(p.resolve().relative_to(self.cwd))
+            except Exception:
+                return None
+        else:
+            virt = str(p)
+        ln = pdata.get("line_number")
+        lt = pdata.get("lines", {}).get("text", "").rstrip("\n")
+        if ln is None:
+            return None
+        return {"path": virt, "line": int(ln), "text": lt}
+
+    def _ripgrep_stream(self, pattern: str, base_full: Path, include_glob: str | None) -> Iterator[GrepMatch] | None:
+        """Start ripgrep sorted by path and stream its matches, or return None if rg is unavailable.
+
+        Closing the returned generator kills ripgrep, so a paginated caller that
+        stops early does not wait for the rest of the tree to be searched.
+        """
+        cmd = ["rg", "--json", "--sort", "path"]
+        if include_glob:
+            cmd.extend(["--glob", include_glob])
+        cmd.extend(["--", pattern, str(base_full)])
+
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)  # noqa: S603
+        except FileNotFoundError:
+            return None
+
+        def stream() -> Iterator[GrepMatch]:
+            timer = threading.Timer(30, proc.kill)
+            timer.start()
+            try:
+                for line in proc.stdout or ():
+                    match = self._parse_ripgrep_line(line)
+                    if match is not None:
+                        yield match
+            finally:
+                timer.cancel()
+                proc.kill()
+                proc.wait()
+                if proc.stdout is not None:
+                    proc.stdout.close()
+
+        return stream()
+
     def _python_search(self, pattern: str, base_full: Path, include_glob: str | None) -> dict[str, list[tuple[int, str]]]:
+        results: dict[str, list[tuple[int, str]]] = {}
+        for match in self._python_stream(pattern, base_full, include_glob, sort_paths=False):
+            results.setdefault(match["path"], []).append((match["line"], match["text"]))
+        return results
+
+    def _python_stream(self, pattern: str, base_full: Path, include_glob: str | None, sort_paths: bool = True) -> Iterator[GrepMatch]:
+        """Lazily search files under `base_full`, reading each file only when the previous one is consumed."""
         try:
             regex = re.compile(pattern)
         except re.error:
-            return {}
+            return
 
-        results: dict[str, list[tuple[int, str]]] = {}
         root = base_full if base_full.is_dir() else base_full.parent
+        candidates = sorted(root.rglob("*")) if sort_paths else root.rglob("*")
 
-        for fp in root.rglob("*"):
+        for fp in candidates:
             if not fp.is_file():
                 continue
             if include_glob and not wcglob.globmatch(fp.name, include_glob, flags=wcglob.BRACE):
@@ -441,19 +685,23 @@ class FilesystemBackend(BackendProtocol):
                             continue
                     else:
                         virt_path = str(fp)
-                    results.setdefault(virt_path, []).append((line_num, line))
+                    yield {"path": virt_path, "line": line_num, "text": line}
 
-        return results
-
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
         if pattern.startswith("/"):
             pattern = pattern.lstrip("/")
 
         search_path = self.cwd if path == "/" else self._resolve_path(path)
         if not search_path.exists() or not search_path.is_dir():
-            return []
+            return paginate((), max_results, cursor)
 
-        results: list[FileInfo] = []
+        matched: list[tuple[str, Path]] = []
         try:
             # Use recursive globbing to match files in subdirectories as tests expect
             for matched_path in search_path.rglob(pattern):
@@ -463,48 +711,67 @@ class FilesystemBackend(BackendProtocol):
                     continue
                 if not is_file:
                     continue
-                abs_path = str(matched_path).replace('\\','/')
-                if not self.virtual_mode:
-                    try:
-                        st = matched_path.stat()
-                        results.append(
-                            {
-                                "path": abs_path,
-                                "is_dir": False,
-                                "size": int(st.st_size),
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            }
-                        )
-                    except OSError:
-                        results.append({"path": abs_path, "is_dir": False})
-                else:
-                    cwd_str = str(self.cwd).replace('\\','/')
-                    if not cwd_str.endswith("/"):
-                        cwd_str += "/"
-                    if abs_path.startswith(cwd_str):
-                        relative_path = abs_path[len(cwd_str):]
-                    elif abs_path.startswith(str(self.cwd).replace('\\', '/')):
-                        relative_path = abs_path[len(str(self.cwd).replace('\\', '/')):].lstrip("/")
-                    else:
-                        relative_path = abs_path
-                    virt = "/" + relative_path
-                    try:
-                        st = matched_path.stat()
-                        results.append(
-                            {
-                                "path": virt,
-                                "is_dir": False,
-                                "size": int(st.st_size),
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            }
-                        )
-                    except OSError:
-                        results.append({"path": virt, "is_dir": False})
+                matched.append((self._glob_result_path(matched_path), matched_path))
         except (OSError, ValueError):
             pass
 
-        results.sort(key=lambda x: x.get("path", ""))
-        return results
+        # Sort before stat-ing so a paginated call only stats the files on its page
+        matched.sort(key=lambda x: x[0])
+        return paginate((self._glob_file_info(result_path, fp) for result_path, fp in matched), max_results, cursor)
+
+    def _glob_result_path(self, matched_path: Path) -> str:
+        abs_path = str(matched_path).replace("\\", "/")
+        if not self.virtual_mode:
+            return abs_path
+        cwd_str = str(self.cwd).replace("\\", "/")
+        if not cwd_str.endswith("/"):
+            cwd_str += "/"
+        if abs_path.startswith(cwd_str):
+            relative_path = abs_path[len(cwd_str) :]
+        elif abs_path.startswith(str(self.cwd).replace("\\", "/")):
+            relative_path = abs_path[len(str(self.cwd).replace("\\", "/")) :].lstrip("/")
+        else:
+            relative_path = abs_path
+        return "/" + relative_path
+
+    def _glob_file_info(self, result_path: str, matched_path: Path) -> FileInfo:
+        try:
+            st = matched_path.stat()
+        except OSError:
+            return {"path": result_path, "is_dir": False}
+        return {
+            "path": result_path,
+            "is_dir": False,
+            "size": int(st.st_size),
+            "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
+        }
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Stat several paths without reading them.
+
+        Args:
+            paths: List of file or directory paths.
+
+        Returns:
+            One FileInfo (or None if the path does not exist or is invalid) per input path.
+        """
+        infos: list[FileInfo | None] = []
+        for path in paths:
+            try:
+                st = self._resolve_path(path).stat()
+            except (OSError, ValueError):
+                infos.append(None)
+                continue
+            is_dir = stat.S_ISDIR(st.st_mode)
+            infos.append(
+                {
+                    "path": path,
+                    "is_dir": is_dir,
+                    "size": 0 if is_dir else int(st.st_size),
+                    "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                }
+            )
+        return infos
 
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the filesystem.
@@ -530,6 +797,7 @@ class FilesystemBackend(BackendProtocol):
                 fd = os.open(resolved_path, flags, 0o644)
                 with os.fdopen(fd, "wb") as f:
                     f.write(content)
+                self._record_own_write(resolved_path)
 
                 responses.append(FileUploadResponse(path=path, error=None))
             except FileNotFoundError:
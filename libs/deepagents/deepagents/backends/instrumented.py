@@ -0,0 +1,527 @@
+"""Instrumentation for backend operations.
+
+`InstrumentedBackend` wraps any backend and reports every operation to a list of
+`BackendCallbackHandler`s: the op name, the path it touched, how long it took,
+how many bytes went in and out, and the error if it failed.
+`BackendStatsCollector` is a built-in handler that aggregates latency histograms
+per backend class and op.
+
+Examples:
+    ```python
+    from deepagents import create_deep_agent
+    from deepagents.backends.instrumented import BackendStatsCollector
+
+    stats = BackendStatsCollector()
+    agent = create_deep_agent(backend_callbacks=[stats])
+    agent.invoke({"messages": [{"role": "user", "content": "..."}]})
+    print(stats.summary())
+    ```
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.protocol import (
+    BackendFactory,
+    BackendProtocol,
+    EditResult,
+    ExecuteResponse,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    MultiEditResult,
+    SandboxBackendProtocol,
+    WriteResult,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LATENCY_BUCKETS_MS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+"""Upper bounds (inclusive, in milliseconds) of the latency histogram buckets. Slower ops land in an overflow bucket."""
+
+
+@dataclass
+class BackendOpEvent:
+    """One backend operation, as reported to `BackendCallbackHandler`s.
+
+    The same object is passed to `on_op_start` and then, completed, to `on_op_end`.
+
+    Attributes:
+        op: Operation name, the sync method name for both sync and async calls (e.g. "read").
+        backend: Class name of the wrapped backend.
+        path: The path the operation targets, or None for commands and multi-path batches.
+        bytes_in: Bytes sent to the backend (written content, edit strings, uploads, commands).
+        bytes_out: Bytes returned by the backend (read content, downloads, command output,
+            listed paths and grep lines). Set when the operation ends.
+        duration_s: Wall-clock duration in seconds. Set when the operation ends.
+        error: Error reported by the backend or raised by it, None on success. Set when
+            the operation ends.
+    """
+
+    op: str
+    backend: str
+    path: str | None = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+    duration_s: float = 0.0
+    error: str | None = None
+
+
+class BackendCallbackHandler:
+    """Base class for receiving backend operation events.
+
+    Override either method. Handlers are called synchronously on the thread (or
+    event loop) that runs the operation, so they should be cheap. Exceptions
+    raised by a handler are logged and never break the operation.
+    """
+
+    def on_op_start(self, event: BackendOpEvent) -> None:
+        """Called before a backend operation runs."""
+
+    def on_op_end(self, event: BackendOpEvent) -> None:
+        """Called after a backend operation finished, successfully or not."""
+
+
+class InstrumentedBackend(BackendProtocol):
+    """Backend wrapper that reports every operation to callback handlers.
+
+    Attributes that are not part of the protocol (e.g. `runtime` or `cwd`) are
+    read from the wrapped backend. Use `instrument_backend` to also wrap sandbox
+    backends, factories and the children of a `CompositeBackend`.
+
+    Args:
+        backend: The backend to wrap.
+        handlers: Handlers notified of every operation.
+    """
+
+    def __init__(self, backend: BackendProtocol, handlers: Sequence[BackendCallbackHandler]) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend: The backend to wrap.
+            handlers: Handlers notified of every operation.
+        """
+        self.backend = backend
+        self.handlers = list(handlers)
+        self.backend_name = type(backend).__name__
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Fall back to the wrapped backend for attributes outside the protocol."""
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _emit(self, method: str, event: BackendOpEvent) -> None:
+        for handler in self.handlers:
+            try:
+                getattr(handler, method)(event)
+            except Exception:  # noqa: BLE001
+                logger.warning("Backend callback %s.%s failed", type(handler).__name__, method, exc_info=True)
+
+    def _run(self, op: str, path: str | None, bytes_in: int, call: Callable[[], T]) -> T:
+        event = BackendOpEvent(op=op, backend=self.backend_name, path=path, bytes_in=bytes_in)
+        self._emit("on_op_start", event)
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            event.error = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            event.bytes_out, event.error = _describe_result(result)
+            return result
+        finally:
+            event.duration_s = time.perf_counter() - start
+            self._emit("on_op_end", event)
+
+    async def _arun(self, op: str, path: str | None, bytes_in: int, call: Callable[[], Awaitable[T]]) -> T:
+        event = BackendOpEvent(op=op, backend=self.backend_name, path=path, bytes_in=bytes_in)
+        self._emit("on_op_start", event)
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as e:
+            event.error = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            event.bytes_out, event.error = _describe_result(result)
+            return result
+        finally:
+            event.duration_s = time.perf_counter() - start
+            self._emit("on_op_end", event)
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List a directory through the wrapped backend and report it."""
+        return self._run("ls_info", path, 0, lambda: self.backend.ls_info(path))
+
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """(async) List a directory through the wrapped backend and report it."""
+        return await self._arun("ls_info", path, 0, lambda: self.backend.als_info(path))
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """Read a file through the wrapped backend and report it."""
+        return self._run("read", file_path, 0, lambda: self.backend.read(file_path, offset=offset, limit=limit))
+
+    async def aread(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """(async) Read a file through the wrapped backend and report it."""
+        return await self._arun("read", file_path, 0, lambda: self.backend.aread(file_path, offset=offset, limit=limit))
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read a byte range through the wrapped backend and report it."""
+        return self._run("read_range", file_path, 0, lambda: self.backend.read_range(file_path, start_byte, length))
+
+    async def aread_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """(async) Read a byte range through the wrapped backend and report it."""
+        return await self._arun("read_range", file_path, 0, lambda: self.backend.aread_range(file_path, start_byte, length))
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file through the wrapped backend and report it."""
+        return self._run("tail", file_path, 0, lambda: self.backend.tail(file_path, n_lines))
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """(async) Read the last lines of a file through the wrapped backend and report it."""
+        return await self._arun("tail", file_path, 0, lambda: self.backend.atail(file_path, n_lines))
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Search file contents through the wrapped backend and report it."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return self._run("grep_raw", path, _text_bytes(pattern), lambda: self.backend.grep_raw(pattern, path, glob, **kwargs))
+
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """(async) Search file contents through the wrapped backend and report it."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return await self._arun("grep_raw", path, _text_bytes(pattern), lambda: self.backend.agrep_raw(pattern, path, glob, **kwargs))
+
+    def glob_info(self, pattern: str, path: str = "/", max_results: int | None = None, cursor: str | None = None) -> list[FileInfo]:
+        """Find files by glob pattern through the wrapped backend and report it."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return self._run("glob_info", path, _text_bytes(pattern), lambda: self.backend.glob_info(pattern, path, **kwargs))
+
+    async def aglob_info(self, pattern: str, path: str = "/", max_results: int | None = None, cursor: str | None = None) -> list[FileInfo]:
+        """(async) Find files by glob pattern through the wrapped backend and report it."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return await self._arun("glob_info", path, _text_bytes(pattern), lambda: self.backend.aglob_info(pattern, path, **kwargs))
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        """Write a new file through the wrapped backend and report it."""
+        return self._run("write", file_path, _text_bytes(content), lambda: self.backend.write(file_path, content))
+
+    async def awrite(self, file_path: str, content: str) -> WriteResult:
+        """(async) Write a new file through the wrapped backend and report it."""
+        return await self._arun("write", file_path, _text_bytes(content), lambda: self.backend.awrite(file_path, content))
+
+    def edit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:  # noqa: FBT001, FBT002
+        """Edit a file through the wrapped backend and report it."""
+        bytes_in = _text_bytes(old_string) + _text_bytes(new_string)
+        return self._run("edit", file_path, bytes_in, lambda: self.backend.edit(file_path, old_string, new_string, replace_all=replace_all))
+
+    async def aedit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:  # noqa: FBT001, FBT002
+        """(async) Edit a file through the wrapped backend and report it."""
+        bytes_in = _text_bytes(old_string) + _text_bytes(new_string)
+        return await self._arun("edit", file_path, bytes_in, lambda: self.backend.aedit(file_path, old_string, new_string, replace_all=replace_all))
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply a batch of edits through the wrapped backend and report it."""
+        path = _single_path([edit["file_path"] for edit in edits])
+        bytes_in = sum(_text_bytes(edit["old_string"]) + _text_bytes(edit["new_string"]) for edit in edits)
+        return self._run("multi_edit", path, bytes_in, lambda: self.backend.multi_edit(edits))
+
+    async def amulti_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """(async) Apply a batch of edits through the wrapped backend and report it."""
+        path = _single_path([edit["file_path"] for edit in edits])
+        bytes_in = sum(_text_bytes(edit["old_string"]) + _text_bytes(edit["new_string"]) for edit in edits)
+        return await self._arun("multi_edit", path, bytes_in, lambda: self.backend.amulti_edit(edits))
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload files through the wrapped backend and report it."""
+        path = _single_path([p for p, _ in files])
+        return self._run("upload_files", path, sum(len(content) for _, content in files), lambda: self.backend.upload_files(files))
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """(async) Upload files through the wrapped backend and report it."""
+        path = _single_path([p for p, _ in files])
+        return await self._arun("upload_files", path, sum(len(content) for _, content in files), lambda: self.backend.aupload_files(files))
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files through the wrapped backend and report it."""
+        return self._run("download_files", _single_path(paths), 0, lambda: self.backend.download_files(paths))
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """(async) Download files through the wrapped backend and report it."""
+        return await self._arun("download_files", _single_path(paths), 0, lambda: self.backend.adownload_files(paths))
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Stat paths through the wrapped backend and report it."""
+        return self._run("stat_many", _single_path(paths), 0, lambda: self.backend.stat_many(paths))
+
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """(async) Stat paths through the wrapped backend and report it."""
+        return await self._arun("stat_many", _single_path(paths), 0, lambda: self.backend.astat_many(paths))
+
+
+class InstrumentedSandboxBackend(InstrumentedBackend, SandboxBackendProtocol):
+    """`InstrumentedBackend` for sandbox backends, which also reports `execute`."""
+
+    backend: SandboxBackendProtocol
+
+    def execute(self, command: str) -> ExecuteResponse:
+        """Run a command through the wrapped backend and report it."""
+        return self._run("execute", None, _text_bytes(command), lambda: self.backend.execute(command))
+
+    async def aexecute(self, command: str) -> ExecuteResponse:
+        """(async) Run a command through the wrapped backend and report it."""
+        return await self._arun("execute", None, _text_bytes(command), lambda: self.backend.aexecute(command))
+
+    @property
+    def id(self) -> str:
+        """Identifier of the wrapped sandbox."""
+        return self.backend.id
+
+
+def instrument_backend(
+    backend: BackendProtocol | BackendFactory,
+    handlers: Sequence[BackendCallbackHandler],
+) -> BackendProtocol | BackendFactory:
+    """Wrap a backend, or a backend factory, so every operation is reported to `handlers`.
+
+    Sandbox backends keep their `execute` support. For a `CompositeBackend` the
+    default backend and each route are wrapped instead of the composite itself,
+    so operations are attributed to the backend class that actually served them.
+
+    Args:
+        backend: A backend instance or a factory like `lambda rt: StateBackend(rt)`.
+        handlers: Handlers notified of every operation.
+
+    Returns:
+        A backend (or factory) of the same kind as `backend`.
+    """
+    if isinstance(backend, CompositeBackend):
+        return CompositeBackend(
+            default=instrument_backend(backend.default, handlers),  # type: ignore[arg-type]
+            routes={prefix: instrument_backend(route, handlers) for prefix, route in backend.routes.items()},  # type: ignore[misc]
+        )
+    if isinstance(backend, InstrumentedBackend):
+        return type(backend)(backend.backend, [*backend.handlers, *handlers])
+    if isinstance(backend, SandboxBackendProtocol):
+        return InstrumentedSandboxBackend(backend, handlers)
+    if isinstance(backend, BackendProtocol):
+        return InstrumentedBackend(backend, handlers)
+    return lambda runtime: instrument_backend(backend(runtime), handlers)
+
+
+@dataclass
+class OpStats:
+    """Aggregated statistics for one (backend class, op) pair.
+
+    Attributes:
+        count: Number of operations.
+        errors: Number of operations that reported or raised an error.
+        bytes_in: Total bytes sent to the backend.
+        bytes_out: Total bytes returned by the backend.
+        total_s: Total duration in seconds.
+        max_s: Slowest duration in seconds.
+        buckets: Latency histogram counts, one per `LATENCY_BUCKETS_MS` bound plus an overflow bucket.
+    """
+
+    count: int = 0
+    errors: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def record(self, event: BackendOpEvent) -> None:
+        """Add a finished operation."""
+        self.count += 1
+        self.errors += event.error is not None
+        self.bytes_in += event.bytes_in
+        self.bytes_out += event.bytes_out
+        self.total_s += event.duration_s
+        self.max_s = max(self.max_s, event.duration_s)
+        duration_ms = event.duration_s * 1000
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if duration_ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.buckets[index] += 1
+
+    def percentile(self, q: float) -> float:
+        """Estimate a latency percentile in milliseconds from the histogram.
+
+        Args:
+            q: Percentile between 0 and 100.
+
+        Returns:
+            Upper bound of the bucket holding the percentile, capped at the slowest
+            observed duration. 0.0 when nothing was recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * q / 100))
+        seen = 0
+        for bound, bucket_count in zip((*LATENCY_BUCKETS_MS, float("inf")), self.buckets, strict=True):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, self.max_s * 1000)
+        return self.max_s * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summarize as a JSON-serializable dict (durations in milliseconds)."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "total_ms": self.total_s * 1000,
+            "mean_ms": self.total_s * 1000 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_s * 1000,
+            "histogram": dict(zip([f"<={bound:g}ms" for bound in LATENCY_BUCKETS_MS] + ["overflow"], self.buckets, strict=True)),
+        }
+
+
+class BackendStatsCollector(BackendCallbackHandler):
+    """Callback handler that aggregates latency histograms per backend class and op.
+
+    Safe to share between threads and between the main agent and subagents.
+
+    Example:
+        ```python
+        stats = BackendStatsCollector()
+        backend = instrument_backend(FilesystemBackend(root_dir="."), [stats])
+        backend.read("/README.md")
+        print(stats.summary())
+        ```
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty collector."""
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], OpStats] = {}
+
+    def on_op_end(self, event: BackendOpEvent) -> None:
+        """Record a finished operation."""
+        with self._lock:
+            self._stats.setdefault((event.backend, event.op), OpStats()).record(event)
+
+    @property
+    def stats(self) -> dict[tuple[str, str], OpStats]:
+        """Snapshot of the statistics keyed by `(backend class, op)`."""
+        with self._lock:
+            return {key: OpStats(**{**vars(value), "buckets": list(value.buckets)}) for key, value in self._stats.items()}
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def to_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Summarize as `{backend class: {op: stats}}`, JSON-serializable."""
+        result: dict[str, dict[str, dict[str, Any]]] = {}
+        for (backend, op), op_stats in sorted(self.stats.items()):
+            result.setdefault(backend, {})[op] = op_stats.to_dict()
+        return result
+
+    def summary(self) -> str:
+        """Render a plain-text table, slowest (by total time) first."""
+        rows = sorted(self.stats.items(), key=lambda item: item[1].total_s, reverse=True)
+        if not rows:
+            return "No backend operations recorded."
+        header = ("backend", "op", "count", "errors", "total ms", "p50 ms", "p99 ms", "max ms", "bytes in", "bytes out")
+        table = [header]
+        for (backend, op), s in rows:
+            table.append(
+                (
+                    backend,
+                    op,
+                    str(s.count),
+                    str(s.errors),
+                    f"{s.total_s * 1000:.1f}",
+                    f"{s.percentile(50):.1f}",
+                    f"{s.percentile(99):.1f}",
+                    f"{s.max_s * 1000:.1f}",
+                    str(s.bytes_in),
+                    str(s.bytes_out),
+                )
+            )
+        widths = [max(len(row[i]) for row in table) for i in range(len(header))]
+        # Left-align the backend and op names, right-align the numbers
+        lines = [
+            "  ".join([row[0].ljust(widths[0]), row[1].ljust(widths[1]), *(cell.rjust(w) for cell, w in zip(row[2:], widths[2:], strict=True))])
+            for row in table
+        ]
+        return "\n".join(lines)
+
+
+def _text_bytes(text: str | None) -> int:
+    return len(text.encode("utf-8")) if text else 0
+
+
+def _single_path(paths: list[str]) -> str | None:
+    """The path of a batch that touches exactly one path, otherwise None."""
+    unique = set(paths)
+    return next(iter(unique)) if len(unique) == 1 else None
+
+
+def _page_kwargs(max_results: int | None, cursor: str | None) -> dict[str, Any]:
+    if max_results is None and cursor is None:
+        return {}
+    return {"max_results": max_results, "cursor": cursor}
+
+
+def _describe_result(result: object) -> tuple[int, str | None]:
+    """Return `(bytes_out, error)` for any backend operation result."""
+    if isinstance(result, str):
+        # read() and grep_raw() report errors as strings
+        return _text_bytes(result), result if result.startswith(("Error", "Invalid")) else None
+    if isinstance(result, ExecuteResponse):
+        return _text_bytes(result.output), f"exit code {result.exit_code}" if result.exit_code else None
+    if isinstance(result, FileDownloadResponse):
+        return len(result.content or b""), result.error
+    if isinstance(result, list):
+        bytes_out = 0
+        error = None
+        for item in result:
+            if isinstance(item, FileDownloadResponse):
+                bytes_out += len(item.content or b"")
+                error = error or item.error
+            elif isinstance(item, FileUploadResponse):
+                error = error or item.error
+            elif isinstance(item, dict):
+                bytes_out += _text_bytes(item.get("path")) + _text_bytes(item.get("text"))
+        return bytes_out, error
+    return 0, getattr(result, "error", None)
+
+
+__all__ = [
+    "LATENCY_BUCKETS_MS",
+    "BackendCallbackHandler",
+    "BackendOpEvent",
+    "BackendStatsCollector",
+    "InstrumentedBackend",
+    "InstrumentedSandboxBackend",
+    "OpStats",
+    "instrument_backend",
+]
@@ -0,0 +1,490 @@
+"""Backpressure and request coalescing for backend operations.
+
+`LimitedBackend` wraps any backend so that at most `max_concurrency` of its
+operations run at once, optionally under a `ConcurrencyLimiter` shared by many
+backends as a global cap. Identical read-only async operations that are in
+flight at the same time are coalesced into a single call (single-flight).
+Every limiter records how long operations queued for a slot.
+
+Examples:
+    ```python
+    from deepagents.backends.limiter import ConcurrencyLimiter, limit_backend
+
+    # At most 8 concurrent calls per sandbox, 32 across all sessions of the server
+    server_limit = ConcurrencyLimiter(32, name="server")
+    backend = limit_backend(sandbox, max_concurrency=8, global_limiter=server_limit)
+    ...
+    print(server_limit.to_dict()["wait"]["p99_ms"])
+    ```
+"""
+
+import asyncio
+import copy
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterator
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from typing import Any, TypeVar
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.instrumented import BackendOpEvent, OpStats
+from deepagents.backends.protocol import (
+    BackendFactory,
+    BackendProtocol,
+    EditResult,
+    ExecuteResponse,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    MultiEditResult,
+    SandboxBackendProtocol,
+    WriteResult,
+)
+
+T = TypeVar("T")
+
+
+class ConcurrencyLimiter:
+    """A budget of concurrent backend operations, shareable between backends.
+
+    Async operations wait on an `asyncio.Semaphore` (one per event loop) and
+    sync operations on a `threading.Semaphore`; the two budgets are separate.
+    The time every operation spent waiting for a slot is recorded in a latency
+    histogram.
+
+    Args:
+        max_concurrency: Maximum number of operations running at once.
+        name: Label used in metrics.
+    """
+
+    def __init__(self, max_concurrency: int, name: str = "global") -> None:
+        """Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of operations running at once.
+            name: Label used in metrics.
+        """
+        if max_concurrency < 1:
+            msg = f"max_concurrency must be at least 1, got {max_concurrency}"
+            raise ValueError(msg)
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self._thread_semaphore = threading.Semaphore(max_concurrency)
+        self._loop_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._wait = OpStats()
+        self.in_flight = 0
+        """Operations currently holding a slot."""
+        self.waiting = 0
+        """Operations currently queued for a slot."""
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._loop_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._loop_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    def _queued(self, delta: int) -> None:
+        with self._lock:
+            self.waiting += delta
+
+    def _acquired(self, wait_s: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.in_flight += 1
+            self._wait.record(BackendOpEvent(op="wait", backend=self.name, duration_s=wait_s))
+
+    def _released(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the block (async)."""
+        semaphore = self._semaphore()
+        self._queued(1)
+        start = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._queued(-1)
+            raise
+        self._acquired(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            semaphore.release()
+            self._released()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one slot for the duration of the block (sync)."""
+        self._queued(1)
+        start = time.perf_counter()
+        self._thread_semaphore.acquire()
+        self._acquired(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._thread_semaphore.release()
+            self._released()
+
+    @property
+    def wait_stats(self) -> OpStats:
+        """Snapshot of the queueing-delay statistics (`duration` is the time spent waiting)."""
+        with self._lock:
+            return OpStats(**{**vars(self._wait), "buckets": list(self._wait.buckets)})
+
+    def reset(self) -> None:
+        """Discard the recorded queueing delays."""
+        with self._lock:
+            self._wait = OpStats()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summarize as a JSON-serializable dict (waits in milliseconds)."""
+        wait = self.wait_stats.to_dict()
+        for key in ("errors", "bytes_in", "bytes_out"):
+            wait.pop(key)
+        with self._lock:
+            return {"name": self.name, "max_concurrency": self.max_concurrency, "in_flight": self.in_flight, "waiting": self.waiting, "wait": wait}
+
+
+def _freeze(value: object) -> Hashable:
+    """Make operation arguments hashable so they can key the in-flight table."""
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(item) for item in value)
+    return value  # type: ignore[return-value]
+
+
+class _Flights:
+    """Write generation and in-flight async reads, shared by every wrapper of one backend."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self.coalesced = 0
+
+
+class LimitedBackend(BackendProtocol):
+    """Backend wrapper that bounds concurrent operations and coalesces identical async reads.
+
+    Every operation takes a slot from the backend's own limiter and then from
+    the optional global limiter, so a busy backend never holds global slots
+    while it queues. Read-only async operations (`als_info`, `aread`,
+    `agrep_raw`, `aglob_info`, `adownload_files`, ...) with identical arguments
+    that are in flight at the same time share one call; waiters get a shallow
+    copy of its result. A write through the wrapper starts a new generation, so
+    reads issued after it never join a read that started before it. Writes and
+    sandbox commands are limited but never coalesced; sync calls are limited
+    but not coalesced.
+
+    Attributes that are not part of the protocol are read from the wrapped
+    backend. Use `limit_backend` to also wrap sandbox backends, factories and
+    the children of a `CompositeBackend`.
+
+    Args:
+        backend: The backend to wrap.
+        max_concurrency: Maximum concurrent operations on this backend, or None for no per-backend cap.
+        global_limiter: Limiter shared with other backends, or None.
+        coalesce: Whether to coalesce identical in-flight async reads.
+    """
+
+    def __init__(
+        self,
+        backend: BackendProtocol,
+        *,
+        max_concurrency: int | None = 8,
+        global_limiter: ConcurrencyLimiter | None = None,
+        coalesce: bool = True,
+    ) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend: The backend to wrap.
+            max_concurrency: Maximum concurrent operations on this backend, or None for no per-backend cap.
+            global_limiter: Limiter shared with other backends, or None.
+            coalesce: Whether to coalesce identical in-flight async reads.
+        """
+        self.backend = backend
+        self.limiter = ConcurrencyLimiter(max_concurrency, name=type(backend).__name__) if max_concurrency is not None else None
+        self.global_limiter = global_limiter
+        self.coalesce = coalesce
+        self._flights = _Flights()
+        self._scope: Hashable = None
+
+    def _share(self, limiter: ConcurrencyLimiter | None, flights: _Flights, scope: Hashable) -> "LimitedBackend":
+        """Use a limiter and in-flight table shared with other wrappers; reads only join those in the same `scope`."""
+        self.limiter = limiter
+        self._flights = flights
+        self._scope = scope
+        return self
+
+    @property
+    def coalesced(self) -> int:
+        """Number of async reads answered by joining an identical in-flight call."""
+        return self._flights.coalesced
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Fall back to the wrapped backend for attributes outside the protocol."""
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    @property
+    def _limiters(self) -> list[ConcurrencyLimiter]:
+        return [limiter for limiter in (self.limiter, self.global_limiter) if limiter is not None]
+
+    def _run(self, call: Callable[[], T], *, write: bool = False) -> T:
+        with ExitStack() as stack:
+            for limiter in self._limiters:
+                stack.enter_context(limiter.slot())
+            result = call()
+        if write:
+            self._flights.generation += 1
+        return result
+
+    async def _arun(self, call: Callable[[], Awaitable[T]], *, write: bool = False) -> T:
+        async with AsyncExitStack() as stack:
+            for limiter in self._limiters:
+                await stack.enter_async_context(limiter.aslot())
+            result = await call()
+        if write:
+            self._flights.generation += 1
+        return result
+
+    async def _aread(self, key: tuple[Any, ...], call: Callable[[], Awaitable[T]]) -> T:
+        """Run a read-only async operation, joining an identical one already in flight."""
+        if not self.coalesce:
+            return await self._arun(call)
+        flights = self._flights
+        flight_key = (id(asyncio.get_running_loop()), self._scope, flights.generation, _freeze(key))
+        task = flights.inflight.get(flight_key)
+        if task is not None:
+            flights.coalesced += 1
+            # Shielded so a cancelled waiter does not cancel the call others are waiting on
+            return copy.copy(await asyncio.shield(task))
+        task = asyncio.ensure_future(self._arun(call))
+        flights.inflight[flight_key] = task
+        task.add_done_callback(lambda _: flights.inflight.pop(flight_key, None))
+        return await asyncio.shield(task)
+
+    def metrics(self) -> dict[str, Any]:
+        """Queueing-delay and coalescing metrics, JSON-serializable (waits in milliseconds)."""
+        return {
+            "backend": self.limiter.to_dict() if self.limiter is not None else None,
+            "global": self.global_limiter.to_dict() if self.global_limiter is not None else None,
+            "coalesced": self.coalesced,
+        }
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List a directory through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.ls_info(path))
+
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """(async) List a directory, coalesced with identical in-flight listings."""
+        return await self._aread(("ls_info", path), lambda: self.backend.als_info(path))
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """Read a file through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.read(file_path, offset=offset, limit=limit))
+
+    async def aread(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """(async) Read a file, coalesced with identical in-flight reads."""
+        return await self._aread(("read", file_path, offset, limit), lambda: self.backend.aread(file_path, offset=offset, limit=limit))
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read a byte range through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.read_range(file_path, start_byte, length))
+
+    async def aread_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """(async) Read a byte range, coalesced with identical in-flight reads."""
+        return await self._aread(("read_range", file_path, start_byte, length), lambda: self.backend.aread_range(file_path, start_byte, length))
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.tail(file_path, n_lines))
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """(async) Read the last lines of a file, coalesced with identical in-flight reads."""
+        return await self._aread(("tail", file_path, n_lines), lambda: self.backend.atail(file_path, n_lines))
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Search file contents through the wrapped backend, within the concurrency limits."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return self._run(lambda: self.backend.grep_raw(pattern, path, glob, **kwargs))
+
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """(async) Search file contents, coalesced with identical in-flight searches."""
+        kwargs = _page_kwargs(max_results, cursor)
+        key = ("grep_raw", pattern, path, glob, max_results, cursor)
+        return await self._aread(key, lambda: self.backend.agrep_raw(pattern, path, glob, **kwargs))
+
+    def glob_info(self, pattern: str, path: str = "/", max_results: int | None = None, cursor: str | None = None) -> list[FileInfo]:
+        """Find files by glob pattern through the wrapped backend, within the concurrency limits."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return self._run(lambda: self.backend.glob_info(pattern, path, **kwargs))
+
+    async def aglob_info(self, pattern: str, path: str = "/", max_results: int | None = None, cursor: str | None = None) -> list[FileInfo]:
+        """(async) Find files by glob pattern, coalesced with identical in-flight globs."""
+        kwargs = _page_kwargs(max_results, cursor)
+        return await self._aread(("glob_info", pattern, path, max_results, cursor), lambda: self.backend.aglob_info(pattern, path, **kwargs))
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        """Write a new file through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.write(file_path, content), write=True)
+
+    async def awrite(self, file_path: str, content: str) -> WriteResult:
+        """(async) Write a new file through the wrapped backend, within the concurrency limits."""
+        return await self._arun(lambda: self.backend.awrite(file_path, content), write=True)
+
+    def edit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:
+        """Edit a file through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.edit(file_path, old_string, new_string, replace_all=replace_all), write=True)
+
+    async def aedit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:
+        """(async) Edit a file through the wrapped backend, within the concurrency limits."""
+        return await self._arun(lambda: self.backend.aedit(file_path, old_string, new_string, replace_all=replace_all), write=True)
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply a batch of edits through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.multi_edit(edits), write=True)
+
+    async def amulti_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """(async) Apply a batch of edits through the wrapped backend, within the concurrency limits."""
+        return await self._arun(lambda: self.backend.amulti_edit(edits), write=True)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload files through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.upload_files(files), write=True)
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """(async) Upload files through the wrapped backend, within the concurrency limits."""
+        return await self._arun(lambda: self.backend.aupload_files(files), write=True)
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.download_files(paths))
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """(async) Download files, coalesced with identical in-flight downloads."""
+        return await self._aread(("download_files", paths), lambda: self.backend.adownload_files(paths))
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Stat paths through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.stat_many(paths))
+
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """(async) Stat paths, coalesced with identical in-flight stats."""
+        return await self._aread(("stat_many", paths), lambda: self.backend.astat_many(paths))
+
+
+class LimitedSandboxBackend(LimitedBackend, SandboxBackendProtocol):
+    """`LimitedBackend` for sandbox backends, which also limits `execute` (never coalesced)."""
+
+    backend: SandboxBackendProtocol
+
+    def execute(self, command: str) -> ExecuteResponse:
+        """Run a command through the wrapped backend, within the concurrency limits."""
+        return self._run(lambda: self.backend.execute(command), write=True)
+
+    async def aexecute(self, command: str) -> ExecuteResponse:
+        """(async) Run a command through the wrapped backend, within the concurrency limits."""
+        return await self._arun(lambda: self.backend.aexecute(command), write=True)
+
+    @property
+    def id(self) -> str:
+        """Identifier of the wrapped sandbox."""
+        return self.backend.id
+
+
+def limit_backend(
+    backend: BackendProtocol | BackendFactory,
+    *,
+    max_concurrency: int | None = 8,
+    global_limiter: ConcurrencyLimiter | None = None,
+    coalesce: bool = True,
+) -> BackendProtocol | BackendFactory:
+    """Wrap a backend, or a backend factory, with concurrency limits and read coalescing.
+
+    Sandbox backends keep their `execute` support. For a `CompositeBackend` the
+    default backend and each route get their own per-backend limit instead of
+    the composite as a whole.
+
+    For a factory, the per-backend limit and the in-flight reads are shared by
+    every backend it builds (per route of a composite), so the cap holds across
+    calls. Reads are only coalesced between backends built for the same sandbox,
+    or for the same agent state.
+
+    Args:
+        backend: A backend instance or a factory like `lambda rt: StateBackend(rt)`.
+        max_concurrency: Maximum concurrent operations per wrapped backend, or None for no per-backend cap.
+        global_limiter: Limiter shared by every wrapped backend (and any other backend given the same limiter).
+        coalesce: Whether to coalesce identical in-flight async reads.
+
+    Returns:
+        A backend (or factory) of the same kind as `backend`.
+    """
+    options = {"max_concurrency": max_concurrency, "global_limiter": global_limiter, "coalesce": coalesce}
+    if isinstance(backend, CompositeBackend):
+        return CompositeBackend(
+            default=limit_backend(backend.default, **options),  # type: ignore[arg-type]
+            routes={prefix: limit_backend(route, **options) for prefix, route in backend.routes.items()},  # type: ignore[misc]
+        )
+    if isinstance(backend, SandboxBackendProtocol):
+        return LimitedSandboxBackend(backend, **options)
+    if isinstance(backend, BackendProtocol):
+        return LimitedBackend(backend, **options)
+    factory = backend
+    lock = threading.Lock()
+    shared: dict[str | None, tuple[ConcurrencyLimiter | None, _Flights]] = {}
+
+    def limit(resolved: BackendProtocol, scope: Hashable, route: str | None) -> BackendProtocol:
+        if isinstance(resolved, CompositeBackend):
+            return CompositeBackend(
+                default=limit(resolved.default, scope, ""),
+                routes={prefix: limit(child, scope, prefix) for prefix, child in resolved.routes.items()},
+            )
+        with lock:
+            if route not in shared:
+                name = type(resolved).__name__
+                shared[route] = (ConcurrencyLimiter(max_concurrency, name=name) if max_concurrency is not None else None, _Flights())
+            limiter, flights = shared[route]
+        wrapper = limit_backend(resolved, max_concurrency=None, global_limiter=global_limiter, coalesce=coalesce)
+        if isinstance(resolved, SandboxBackendProtocol):
+            scope = ("sandbox", resolved.id)
+        return wrapper._share(limiter, flights, scope)  # type: ignore[union-attr]
+
+    return lambda runtime: limit(factory(runtime), ("state", id(getattr(runtime, "state", runtime))), None)
+
+
+def _page_kwargs(max_results: int | None, cursor: str | None) -> dict[str, Any]:
+    if max_results is None and cursor is None:
+        return {}
+    return {"max_results": max_results, "cursor": cursor}
+
+
+__all__ = [
+    "ConcurrencyLimiter",
+    "LimitedBackend",
+    "LimitedSandboxBackend",
+    "limit_backend",
+]
@@ -0,0 +1,403 @@
+"""OverlayBackend: Copy-on-write layer over another backend, for speculative edits."""
+
+import difflib
+import heapq
+from collections.abc import Callable, Iterator, MutableMapping
+from typing import Any
+
+from deepagents.backends.protocol import (
+    BackendProtocol,
+    EditResult,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    MultiEditResult,
+    WriteResult,
+)
+from deepagents.backends.utils import (
+    _glob_search_files,
+    create_file_data,
+    file_data_byte_range,
+    file_data_tail,
+    file_data_to_string,
+    format_read_response,
+    grep_matches_from_files,
+    paginate,
+    parse_cursor,
+    perform_string_replacement,
+    plan_multi_edit,
+    update_file_data,
+)
+
+
+class OverlayBackend(BackendProtocol):
+    """Backend that reads through to a base backend and keeps every write in an overlay.
+
+    The base backend is never modified until `commit()`. Reads return the
+    overlay's version of a file when there is one and the base's otherwise;
+    listings, glob and grep merge both views, with the overlay shadowing the
+    base. Setting an overlay up costs nothing, so several subagents can each
+    explore and edit the same repository speculatively, and only the winning
+    overlay is written back.
+
+    Glob and grep results of both layers are merged in path order. A page of
+    `max_results` fetches the base's results in pages too, enough to fill the
+    overlay's page after dropping the files the overlay shadows. Like every
+    offset cursor, a cursor may skip or repeat results if the files change
+    between pages.
+
+    The overlay holds FileData dicts (the same format as the `files` state
+    channel) in any mutable mapping: a fresh dict by default, or a mapping the
+    caller keeps, such as a dict persisted in agent state.
+
+    Example:
+        ```python
+        from deepagents.backends import FilesystemBackend, OverlayBackend
+
+        repo = FilesystemBackend(root_dir="/path/to/repo", virtual_mode=True)
+        attempts = [OverlayBackend(repo) for _ in range(3)]
+        # ... run one subagent per overlay ...
+        print(attempts[1].diff())
+        attempts[1].commit()
+        ```
+    """
+
+    def __init__(self, base: BackendProtocol, files: MutableMapping[str, dict[str, Any]] | None = None) -> None:
+        """Initialize the overlay.
+
+        Args:
+            base: Backend to read through to and to commit into.
+            files: Mapping holding the overlay's files (path -> FileData). Defaults to a new dict.
+        """
+        self.base = base
+        self.files: MutableMapping[str, dict[str, Any]] = files if files is not None else {}
+
+    def _contents(self, paths: list[str]) -> dict[str, str | None] | str:
+        """Return the current content of each path, None when it exists in neither layer.
+
+        Returns an error message instead if a base file is not UTF-8 text, which the overlay cannot hold.
+        """
+        contents: dict[str, str | None] = {path: file_data_to_string(self.files[path]) for path in paths if path in self.files}
+        missing = [path for path in dict.fromkeys(paths) if path not in self.files]
+        for response in self.base.download_files(missing) if missing else []:
+            if response.content is None or response.error is not None:
+                contents[response.path] = None
+                continue
+            try:
+                contents[response.path] = response.content.decode("utf-8")
+            except UnicodeDecodeError:
+                return f"Error: File '{response.path}' is not UTF-8 text and cannot be edited"
+        return contents
+
+    def _put(self, path: str, content: str) -> None:
+        existing = self.files.get(path)
+        self.files[path] = update_file_data(existing, content) if existing is not None else create_file_data(content)
+
+    def _overlay_info(self, path: str) -> FileInfo:
+        file_data = self.files[path]
+        return {"path": path, "is_dir": False, "size": len(file_data_to_string(file_data).encode("utf-8")), "modified_at": file_data["modified_at"]}
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List the merged contents of a directory (non-recursive).
+
+        Args:
+            path: Absolute path to directory.
+
+        Returns:
+            List of FileInfo-like dicts, the overlay's entries replacing the base's.
+            Directories have a trailing / in their path and is_dir=True.
+        """
+        merged = {info["path"]: info for info in self.base.ls_info(path)}
+        prefix = path if path.endswith("/") else path + "/"
+        for file_path in self.files:
+            if not file_path.startswith(prefix):
+                continue
+            relative = file_path[len(prefix) :]
+            if "/" in relative:
+                subdir = prefix + relative.split("/")[0] + "/"
+                merged.setdefault(subdir, {"path": subdir, "is_dir": True, "size": 0, "modified_at": ""})
+            else:
+                merged[file_path] = self._overlay_info(file_path)
+        return sorted(merged.values(), key=lambda x: x.get("path", ""))
+
+    def read(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Read file content with line numbers, from the overlay if it has the file.
+
+        Args:
+            file_path: Absolute file path.
+            offset: Line offset to start reading from (0-indexed).
+            limit: Maximum number of lines to read.
+
+        Returns:
+            Formatted file content with line numbers, or error message.
+        """
+        if file_path in self.files:
+            return format_read_response(self.files[file_path], offset, limit)
+        return self.base.read(file_path, offset, limit)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset, from the overlay if it has the file.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+        if file_path in self.files:
+            return FileDownloadResponse(path=file_path, content=file_data_byte_range(self.files[file_path], start_byte, length), error=None)
+        return self.base.read_range(file_path, start_byte, length)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file, from the overlay if it has the file.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+        if file_path in self.files:
+            return FileDownloadResponse(path=file_path, content=file_data_tail(self.files[file_path], n_lines), error=None)
+        return self.base.tail(file_path, n_lines)
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str = "/",
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        overlay_matches = grep_matches_from_files(self.files, pattern, path, glob)
+        if isinstance(overlay_matches, str):
+            return overlay_matches
+        page_size = _base_page_size(max_results, cursor)
+        first_page = self.base.grep_raw(pattern, path, glob, **_page_kwargs(page_size, None))
+        if isinstance(first_page, str):
+            return first_page
+        base_matches = self._unshadowed(first_page, page_size, lambda base_cursor: self.base.grep_raw(pattern, path, glob, page_size, base_cursor))
+        merged = heapq.merge(base_matches, sorted(overlay_matches, key=_path), key=_path)
+        return paginate(merged, max_results, cursor)
+
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
+        page_size = _base_page_size(max_results, cursor)
+        first_page = self.base.glob_info(pattern, path, **_page_kwargs(page_size, None))
+        base_infos = self._unshadowed(first_page, page_size, lambda base_cursor: self.base.glob_info(pattern, path, page_size, base_cursor))
+        result = _glob_search_files(self.files, pattern, path)
+        overlay_infos = [] if result == "No files found" else [self._overlay_info(file_path) for file_path in result.split("\n")]
+        merged = heapq.merge(base_infos, sorted(overlay_infos, key=_path), key=_path)
+        return paginate(merged, max_results, cursor)
+
+    def _unshadowed(self, page: list[Any], page_size: int | None, fetch: Callable[[str], list[Any] | str]) -> Iterator[Any]:
+        """Yield the base's results outside the overlay in path order, fetching further pages of `page_size` as they are consumed."""
+        if page_size is None:
+            # Unpaged results need not come in path order
+            page = sorted(page, key=_path)
+        while True:
+            yield from (item for item in page if item["path"] not in self.files)
+            base_cursor = getattr(page, "cursor", None)
+            if page_size is None or base_cursor is None:
+                return
+            next_page = fetch(base_cursor)
+            if isinstance(next_page, str):
+                return
+            page = next_page
+
+    def write(
+        self,
+        file_path: str,
+        content: str,
+    ) -> WriteResult:
+        """Create a new file in the overlay.
+        Returns WriteResult. The overlay is held by the backend, so files_update=None.
+        """
+        if file_path in self.files or self.base.stat_many([file_path])[0] is not None:
+            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+        self.files[file_path] = create_file_data(content)
+        return WriteResult(path=file_path, files_update=None)
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Edit a file, copying it from the base into the overlay first if needed.
+        Returns EditResult. The overlay is held by the backend, so files_update=None.
+        """
+        contents = self._contents([file_path])
+        if isinstance(contents, str):
+            return EditResult(error=contents)
+        content = contents.get(file_path)
+        if content is None:
+            return EditResult(error=f"Error: File '{file_path}' not found")
+        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        if isinstance(result, str):
+            return EditResult(error=result)
+        new_content, occurrences = result
+        self._put(file_path, new_content)
+        return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files in the overlay, all or nothing.
+        Returns MultiEditResult. The overlay is held by the backend, so files_update=None.
+        """
+        contents = self._contents([edit["file_path"] for edit in edits])
+        if isinstance(contents, str):
+            return MultiEditResult(error=contents)
+        plan = plan_multi_edit(edits, contents)
+        if isinstance(plan, str):
+            return MultiEditResult(error=plan)
+        for path, (new_content, _) in plan.items():
+            self._put(path, new_content)
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=None,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload multiple files into the overlay.
+
+        Args:
+            files: List of (path, content) tuples where content is bytes.
+
+        Returns:
+            List of FileUploadResponse objects, one per input file.
+            Response order matches input order. Content that is not UTF-8 text
+            is rejected with `invalid_content`.
+        """
+        responses = []
+        for path, content in files:
+            try:
+                self._put(path, content.decode("utf-8"))
+            except UnicodeDecodeError:
+                responses.append(FileUploadResponse(path=path, error="invalid_content"))
+                continue
+            responses.append(FileUploadResponse(path=path, error=None))
+        return responses
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download multiple files, fetching the ones not in the overlay from the base in one batch.
+
+        Args:
+            paths: List of file paths to download.
+
+        Returns:
+            List of FileDownloadResponse objects, one per input path.
+            Response order matches input order.
+        """
+        missing = [path for path in paths if path not in self.files]
+        from_base = iter(self.base.download_files(missing) if missing else [])
+        return [
+            FileDownloadResponse(path=path, content=file_data_to_string(self.files[path]).encode("utf-8"), error=None)
+            if path in self.files
+            else next(from_base)
+            for path in paths
+        ]
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up file metadata, asking the base only about files not in the overlay.
+
+        Args:
+            paths: List of file paths to look up.
+
+        Returns:
+            One FileInfo (or None if the file does not exist) per input path.
+        """
+        missing = [path for path in paths if path not in self.files]
+        from_base = iter(self.base.stat_many(missing) if missing else [])
+        return [self._overlay_info(path) if path in self.files else next(from_base) for path in paths]
+
+    def _selected(self, paths: list[str] | None) -> list[str]:
+        return sorted(self.files) if paths is None else [path for path in paths if path in self.files]
+
+    def diff(self, paths: list[str] | None = None) -> str:
+        """Return a unified diff of the overlay against the base.
+
+        Args:
+            paths: Overlay paths to include. Defaults to every file in the overlay.
+
+        Returns:
+            The concatenated unified diffs; empty if nothing differs from the base.
+        """
+        selected = self._selected(paths)
+        responses = self.base.download_files(selected) if selected else []
+        chunks: list[str] = []
+        for path, response in zip(selected, responses, strict=True):
+            exists = response.content is not None and response.error is None
+            before = response.content.decode("utf-8") if exists else ""
+            after = file_data_to_string(self.files[path])
+            if exists and before == after:
+                continue
+            lines = difflib.unified_diff(
+                before.splitlines(keepends=True),
+                after.splitlines(keepends=True),
+                fromfile=f"a{path}" if exists else "/dev/null",
+                tofile=f"b{path}",
+            )
+            # Like `diff -u`, mark every line (old or new) that ends its file without a newline
+            chunks.extend(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n" for line in lines)
+        return "".join(chunks)
+
+    def commit(self, paths: list[str] | None = None) -> list[FileUploadResponse]:
+        """Write overlay files into the base with one `upload_files` call and drop them from the overlay.
+
+        Files the base fails to write stay in the overlay.
+
+        Args:
+            paths: Overlay paths to commit. Defaults to every file in the overlay.
+
+        Returns:
+            The base backend's upload responses, one per committed path.
+        """
+        selected = self._selected(paths)
+        if not selected:
+            return []
+        responses = self.base.upload_files([(path, file_data_to_string(self.files[path]).encode("utf-8")) for path in selected])
+        for response in responses:
+            if response.error is None:
+                self.files.pop(response.path, None)
+        return responses
+
+    def discard(self, paths: list[str] | None = None) -> None:
+        """Drop overlay files without writing them, so reads see the base again.
+
+        Args:
+            paths: Overlay paths to discard. Defaults to every file in the overlay.
+        """
+        for path in self._selected(paths):
+            del self.files[path]
+
+
+def _path(item: Any) -> str:  # noqa: ANN401
+    return item["path"]
+
+
+def _base_page_size(max_results: int | None, cursor: str | None) -> int | None:
+    """Page size to request from the base: everything before and on the overlay's page, plus one to detect a next page."""
+    return None if max_results is None else parse_cursor(cursor) + max_results + 1
+
+
+def _page_kwargs(max_results: int | None, cursor: str | None) -> dict[str, Any]:
+    if max_results is None and cursor is None:
+        return {}
+    return {"max_results": max_results, "cursor": cursor}
@@ -7,7 +7,7 @@ database, etc.) and provide a uniform interface for file operations.
 
 import abc
 import asyncio
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from typing import Any, Literal, NotRequired, TypeAlias
 
@@ -19,6 +19,7 @@ FileOperationError = Literal[
     "permission_denied",  # Both: access denied
     "is_directory",  # Download: tried to download directory as file
     "invalid_path",  # Both: path syntax malformed (parent dir missing, invalid chars)
+    "invalid_content",  # Upload: content the backend cannot store (e.g. not UTF-8 text)
 ]
 """Standardized error codes for file upload/download operations.
 
@@ -28,6 +29,7 @@ These represent common, recoverable errors that an LLM can understand and potent
 - permission_denied: Access denied for the operation
 - is_directory: Attempted to download a directory as a file
 - invalid_path: Path syntax is malformed or contains invalid characters
+- invalid_content: The backend only stores text and the content is not valid UTF-8 (upload)
 """
 
 
@@ -106,6 +108,26 @@ class GrepMatch(TypedDict):
     text: str
 
 
+class ResultPage(list):
+    """One page of `grep_raw`/`glob_info` results.
+
+    A plain list of results with an extra `cursor` attribute. `cursor` is an
+    opaque string to pass back to the same call to fetch the next page, or None
+    when there are no more results. Backends return a `ResultPage` when called
+    with `max_results`; callers that ignore pagination can treat it as a list.
+    """
+
+    def __init__(self, items: Iterable[Any] = (), cursor: str | None = None) -> None:
+        """Initialize the page.
+
+        Args:
+            items: Results on this page.
+            cursor: Cursor for the next page, or None if this is the last page.
+        """
+        super().__init__(items)
+        self.cursor = cursor
+
+
 @dataclass
 class WriteResult:
     """Result from backend write operations.
@@ -158,6 +180,42 @@ class EditResult:
     occurrences: int | None = None
 
 
+class FileEdit(TypedDict):
+    """A single exact string replacement applied by `multi_edit`."""
+
+    file_path: str
+    old_string: str
+    new_string: str
+    replace_all: NotRequired[bool]
+
+
+@dataclass
+class MultiEditResult:
+    """Result from backend multi_edit operations.
+
+    Attributes:
+        error: Error message on failure, None on success. On failure no file was changed.
+        paths: Absolute paths of the edited files in first-edit order, None on failure.
+        files_update: State update dict for checkpoint backends, None for external storage.
+            Checkpoint backends populate this with {file_path: file_data} for LangGraph state.
+            External backends set None (already persisted to disk/S3/database/etc).
+        occurrences: Number of replacements made per file, None on failure.
+
+    Examples:
+        >>> # Checkpoint storage
+        >>> MultiEditResult(paths=["/a.py"], files_update={"/a.py": {...}}, occurrences={"/a.py": 3})
+        >>> # External storage
+        >>> MultiEditResult(paths=["/a.py", "/b.py"], files_update=None, occurrences={"/a.py": 1, "/b.py": 2})
+        >>> # Error
+        >>> MultiEditResult(error="Error: edit 2 of 3 failed for '/b.py': ...")
+    """
+
+    error: str | None = None
+    paths: list[str] | None = None
+    files_update: dict[str, Any] | None = None
+    occurrences: dict[str, int] | None = None
+
+
 class BackendProtocol(abc.ABC):
     """Protocol for pluggable memory backends (single, unified).
 
@@ -227,11 +285,65 @@ class BackendProtocol(abc.ABC):
         """Async version of read."""
         return await asyncio.to_thread(self.read, file_path, offset, limit)
 
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset, without decoding or line numbering.
+
+        Useful for sampling binary files or a slice of a large file. Backends should
+        override it with a native ranged read; the default implementation downloads
+        the whole file and slices it.
+
+        Args:
+            file_path: Absolute path to the file to read.
+            start_byte: Offset of the first byte to read. Default: 0.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes (empty when `start_byte` is
+            past the end of the file) or an error.
+        """
+        (response,) = self.download_files([file_path])
+        if response.content is None:
+            return response
+        end = None if length is None else start_byte + length
+        return FileDownloadResponse(path=file_path, content=response.content[start_byte:end], error=None)
+
+    async def aread_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Async version of read_range."""
+        return await asyncio.to_thread(self.read_range, file_path, start_byte, length)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file, like `tail -n`.
+
+        Lets callers check the end of a growing file (e.g. a build log) without
+        reading all of it. Backends should override it with a native implementation;
+        the default implementation downloads the whole file.
+
+        Args:
+            file_path: Absolute path to the file to read.
+            n_lines: Number of lines to return. Default: 100.
+
+        Returns:
+            FileDownloadResponse with the raw bytes of the last `n_lines` lines
+            (including the file's trailing newline, if any) or an error.
+        """
+        from deepagents.backends.utils import tail_bytes
+
+        (response,) = self.download_files([file_path])
+        if response.content is None:
+            return response
+        return FileDownloadResponse(path=file_path, content=tail_bytes(response.content, n_lines), error=None)
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Async version of tail."""
+        return await asyncio.to_thread(self.tail, file_path, n_lines)
+
     def grep_raw(
         self,
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list["GrepMatch"] | str:
         """Search for a literal text pattern in files.
 
@@ -252,6 +364,13 @@ class BackendProtocol(abc.ABC):
                   - `?` matches single character
                   - `[abc]` matches one character from set
 
+            max_results: Optional maximum number of matches to return. When set,
+                  the backend stops searching once the page is full and returns
+                  a `ResultPage` whose `cursor` fetches the next page.
+
+            cursor: Cursor from a previous `ResultPage` to resume from.
+                  Only valid with the same pattern, path and glob.
+
         Examples:
                   - "*.py" - only search Python files
                   - "**/*.txt" - search all .txt files recursively
@@ -272,11 +391,21 @@ class BackendProtocol(abc.ABC):
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list["GrepMatch"] | str:
         """Async version of grep_raw."""
-        return await asyncio.to_thread(self.grep_raw, pattern, path, glob)
+        if max_results is None and cursor is None:
+            return await asyncio.to_thread(self.grep_raw, pattern, path, glob)
+        return await asyncio.to_thread(self.grep_raw, pattern, path, glob, max_results, cursor)
 
-    def glob_info(self, pattern: str, path: str = "/") -> list["FileInfo"]:
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list["FileInfo"]:
         """Find files matching a glob pattern.
 
         Args:
@@ -290,13 +419,28 @@ class BackendProtocol(abc.ABC):
             path: Base directory to search from. Default: "/" (root).
                   The pattern is applied relative to this path.
 
+            max_results: Optional maximum number of entries to return. When set,
+                  the backend returns a `ResultPage` whose `cursor` fetches the
+                  next page.
+
+            cursor: Cursor from a previous `ResultPage` to resume from.
+                  Only valid with the same pattern and path.
+
         Returns:
             list of FileInfo
         """
 
-    async def aglob_info(self, pattern: str, path: str = "/") -> list["FileInfo"]:
+    async def aglob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list["FileInfo"]:
         """Async version of glob_info."""
-        return await asyncio.to_thread(self.glob_info, pattern, path)
+        if max_results is None and cursor is None:
+            return await asyncio.to_thread(self.glob_info, pattern, path)
+        return await asyncio.to_thread(self.glob_info, pattern, path, max_results, cursor)
 
     def write(
         self,
@@ -354,6 +498,52 @@ class BackendProtocol(abc.ABC):
         """Async version of edit."""
         return await asyncio.to_thread(self.edit, file_path, old_string, new_string, replace_all)
 
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply an ordered list of exact string replacements across one or more files.
+
+        Edits are applied in order, so a later edit sees the result of earlier
+        edits to the same file. The operation is all-or-nothing: if any edit
+        fails validation (missing file, string not found, ambiguous match without
+        `replace_all`), no file is changed.
+
+        Backends should override this to read and write each file once. The
+        default implementation validates every edit against `download_files`
+        and then replays them through `edit`.
+
+        Args:
+            edits: Edits to apply. Each has the same meaning as the arguments of `edit`.
+
+        Returns:
+            MultiEditResult
+        """
+        from deepagents.backends.utils import plan_multi_edit
+
+        paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+        responses = self.download_files(paths) if paths else []
+        if responses is None:
+            msg = f"{type(self).__name__} must implement download_files or override multi_edit"
+            raise NotImplementedError(msg)
+        contents = {r.path: r.content.decode("utf-8", errors="replace") if r.content is not None else None for r in responses}
+        plan = plan_multi_edit(edits, contents)
+        if isinstance(plan, str):
+            return MultiEditResult(error=plan)
+
+        files_update: dict[str, Any] = {}
+        for edit in edits:
+            res = self.edit(edit["file_path"], edit["old_string"], edit["new_string"], replace_all=edit.get("replace_all", False))
+            if res.error:
+                return MultiEditResult(error=res.error)
+            files_update.update(res.files_update or {})
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=files_update or None,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
+    async def amulti_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Async version of multi_edit."""
+        return await asyncio.to_thread(self.multi_edit, edits)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the sandbox.
 
@@ -402,6 +592,40 @@ class BackendProtocol(abc.ABC):
         """Async version of download_files."""
         return await asyncio.to_thread(self.download_files, paths)
 
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up metadata for several paths without transferring their contents.
+
+        Use this instead of `download_files` when only existence or size is needed.
+        Backends should override it with a native batched lookup; the default
+        implementation falls back to `download_files`.
+
+        Args:
+            paths: List of absolute paths to look up.
+
+        Returns:
+            One entry per input path, in the same order: a FileInfo (with the input
+            path, `is_dir` and, for files, `size` in bytes) or None if nothing exists
+            at that path. Backends without real directories (state, store) report
+            directories as None.
+        """
+        responses = self.download_files(paths) if paths else []
+        if responses is None:
+            msg = f"{type(self).__name__} must implement download_files or override stat_many"
+            raise NotImplementedError(msg)
+        infos: list[FileInfo | None] = []
+        for path, response in zip(paths, responses, strict=True):
+            if response.content is not None:
+                infos.append({"path": path, "is_dir": False, "size": len(response.content)})
+            elif response.error == "is_directory":
+                infos.append({"path": path, "is_dir": True})
+            else:
+                infos.append(None)
+        return infos
+
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Async version of stat_many."""
+        return await asyncio.to_thread(self.stat_many, paths)
+
 
 @dataclass
 class ExecuteResponse:
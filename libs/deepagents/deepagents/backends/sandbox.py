@@ -8,20 +8,26 @@ only need to implement the execute() method.
 from __future__ import annotations
 
 import base64
+import binascii
 import json
 import shlex
 from abc import ABC, abstractmethod
+from datetime import UTC, datetime
 
 from deepagents.backends.protocol import (
     EditResult,
     ExecuteResponse,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    MultiEditResult,
+    ResultPage,
     SandboxBackendProtocol,
     WriteResult,
 )
+from deepagents.backends.utils import page_from_window, parse_cursor
 
 _GLOB_COMMAND_TEMPLATE = """python3 -c "
 import glob
@@ -35,7 +41,7 @@ pattern = base64.b64decode('{pattern_b64}').decode('utf-8')
 
 os.chdir(path)
 matches = sorted(glob.glob(pattern, recursive=True))
-for m in matches:
+for m in matches[{start}:{stop}]:
     stat = os.stat(m)
     result = {{
         'path': m,
@@ -46,6 +52,37 @@ for m in matches:
     print(json.dumps(result))
 " 2>/dev/null"""
 
+_STAT_MANY_COMMAND_TEMPLATE = """python3 -c "
+import os
+import json
+import base64
+
+# Decode base64-encoded JSON list of paths
+paths = json.loads(base64.b64decode('{paths_b64}').decode('utf-8'))
+
+# One JSON line per path, in input order (null when missing)
+for path in paths:
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        print('null')
+        continue
+    is_dir = os.path.isdir(path)
+    print(json.dumps({{'size': 0 if is_dir else stat.st_size, 'mtime': stat.st_mtime, 'is_dir': is_dir}}))
+" 2>/dev/null"""
+
+_READ_BYTES_COMMAND_TEMPLATE = """if [ -d {path} ]; then
+    echo is_directory
+elif [ ! -f {path} ]; then
+    echo file_not_found
+elif [ ! -r {path} ]; then
+    echo permission_denied
+else
+    echo ok
+    {read_command} 2>/dev/null | base64
+fi"""
+"""Prints an error code, or `ok` followed by the base64-encoded output of `read_command`."""
+
 _WRITE_COMMAND_TEMPLATE = """python3 -c "
 import os
 import sys
@@ -102,6 +139,41 @@ with open('{file_path}', 'w') as f:
 print(count)
 " 2>&1"""
 
+_MULTI_EDIT_COMMAND_TEMPLATE = """python3 -c "
+import os
+import sys
+import json
+import base64
+
+# Decode base64-encoded edits: a list of [file_path, old, new, replace_all]
+edits = json.loads(base64.b64decode('{edits_b64}').decode('utf-8'))
+
+# Apply every edit in memory first; nothing is written unless all of them succeed
+contents = {{}}
+counts = {{}}
+for index, (file_path, old, new, replace_all) in enumerate(edits):
+    if file_path not in contents:
+        if not os.path.isfile(file_path):
+            print(json.dumps({{'index': index, 'count': None}}))
+            sys.exit(1)
+        with open(file_path, 'r') as f:
+            contents[file_path] = f.read()
+        counts[file_path] = 0
+    count = contents[file_path].count(old)
+    if count == 0 or (count > 1 and not replace_all):
+        print(json.dumps({{'index': index, 'count': count}}))
+        sys.exit(1)
+    contents[file_path] = contents[file_path].replace(old, new)
+    counts[file_path] += count
+
+# Write each file once
+for file_path, text in contents.items():
+    with open(file_path, 'w') as f:
+        f.write(text)
+
+print(json.dumps(counts))
+" 2>&1"""
+
 _READ_COMMAND_TEMPLATE = """python3 -c "
 import os
 import sys
@@ -215,6 +287,31 @@ except PermissionError:
 
         return output
 
+    def _read_bytes(self, file_path: str, read_command: str) -> FileDownloadResponse:
+        """Run a command that prints (part of) a file and return its output as raw bytes."""
+        result = self.execute(_READ_BYTES_COMMAND_TEMPLATE.format(path=shlex.quote(file_path), read_command=read_command))
+        status, _, payload = result.output.partition("\n")
+        status = status.strip()
+        if status != "ok":
+            error = status if status in ("is_directory", "file_not_found", "permission_denied") else "file_not_found"
+            return FileDownloadResponse(path=file_path, content=None, error=error)
+        try:
+            content = base64.b64decode(payload)
+        except binascii.Error:
+            return FileDownloadResponse(path=file_path, content=None, error="invalid_path")
+        return FileDownloadResponse(path=file_path, content=content, error=None)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset with `tail -c`/`head -c`, transferring only the range."""
+        read_command = f"tail -c +{start_byte + 1} -- {shlex.quote(file_path)}"
+        if length is not None:
+            read_command += f" | head -c {length}"
+        return self._read_bytes(file_path, read_command)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file with `tail -n`, transferring only those lines."""
+        return self._read_bytes(file_path, f"tail -n {n_lines} -- {shlex.quote(file_path)}")
+
     def write(
         self,
         file_path: str,
@@ -266,13 +363,50 @@ except PermissionError:
         # External storage - no files_update needed
         return EditResult(path=file_path, files_update=None, occurrences=count)
 
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files in a single command. Returns MultiEditResult."""
+        if not edits:
+            return MultiEditResult(error="Error: No edits provided")
+        # Encode edits as base64 JSON to avoid any escaping issues
+        payload = [[edit["file_path"], edit["old_string"], edit["new_string"], edit.get("replace_all", False)] for edit in edits]
+        edits_b64 = base64.b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+        result = self.execute(_MULTI_EDIT_COMMAND_TEMPLATE.format(edits_b64=edits_b64))
+
+        try:
+            output = json.loads(result.output.strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError):
+            output = None
+        if not isinstance(output, dict) or (result.exit_code != 0 and "index" not in output):
+            return MultiEditResult(error=f"Error: multi_edit failed: {result.output.strip()}")
+
+        if result.exit_code != 0:
+            index, count = output["index"], output["count"]
+            edit = edits[index]
+            if count is None:
+                reason = f"File '{edit['file_path']}' not found"
+            elif count == 0:
+                reason = f"String not found in file: '{edit['old_string']}'"
+            else:
+                reason = f"String '{edit['old_string']}' appears {count} times in file. Use replace_all=True to replace all instances."
+            error = f"Error: Edit {index + 1} of {len(edits)} failed for '{edit['file_path']}': {reason}"
+            return MultiEditResult(error=f"{error}\nNo files were changed.")
+
+        # External storage - no files_update needed
+        return MultiEditResult(paths=list(output), files_update=None, occurrences=output)
+
     def grep_raw(
         self,
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
-        """Structured search results or error string for invalid input."""
+        """Structured search results or error string for invalid input.
+
+        When paginating, the page is cut inside the sandbox with `tail`/`head`, so
+        grep stops as soon as the page is full and only the page is transferred.
+        """
         search_path = shlex.quote(path or ".")
 
         # Build grep command to get structured output
@@ -287,11 +421,17 @@ except PermissionError:
         pattern_escaped = shlex.quote(pattern)
 
         cmd = f"grep {grep_opts} {glob_pattern} -e {pattern_escaped} {search_path} 2>/dev/null || true"
+        paginated = max_results is not None or cursor is not None
+        skip = parse_cursor(cursor)
+        if paginated:
+            # Fetch one extra match to know whether there is a next page
+            window = f" | head -n {max_results + 1}" if max_results is not None else ""
+            cmd = f"{{ {cmd}; }} | tail -n +{skip + 1}{window}"
         result = self.execute(cmd)
 
         output = result.output.rstrip()
         if not output:
-            return []
+            return ResultPage() if paginated else []
 
         # Parse grep output into GrepMatch objects
         matches: list[GrepMatch] = []
@@ -307,20 +447,35 @@ except PermissionError:
                     }
                 )
 
+        if paginated:
+            return page_from_window(matches, skip, max_results)
         return matches
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
-        """Structured glob matching returning FileInfo dicts."""
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
+        """Structured glob matching returning FileInfo dicts.
+
+        When paginating, only the files on the requested page are stat-ed and returned.
+        """
         # Encode pattern and path as base64 to avoid escaping issues
         pattern_b64 = base64.b64encode(pattern.encode("utf-8")).decode("ascii")
         path_b64 = base64.b64encode(path.encode("utf-8")).decode("ascii")
 
-        cmd = _GLOB_COMMAND_TEMPLATE.format(path_b64=path_b64, pattern_b64=pattern_b64)
+        paginated = max_results is not None or cursor is not None
+        skip = parse_cursor(cursor)
+        # Fetch one extra entry to know whether there is a next page
+        stop = skip + max_results + 1 if max_results is not None else None
+        cmd = _GLOB_COMMAND_TEMPLATE.format(path_b64=path_b64, pattern_b64=pattern_b64, start=skip, stop=stop)
         result = self.execute(cmd)
 
         output = result.output.strip()
         if not output:
-            return []
+            return ResultPage() if paginated else []
 
         # Parse JSON output into FileInfo dicts
         file_infos: list[FileInfo] = []
@@ -336,8 +491,38 @@ except PermissionError:
             except json.JSONDecodeError:
                 continue
 
+        if paginated:
+            return page_from_window(file_infos, skip, max_results)
         return file_infos
 
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Stat several paths with a single command, without transferring their contents."""
+        if not paths:
+            return []
+        # Encode paths as base64 JSON to avoid any escaping issues
+        paths_b64 = base64.b64encode(json.dumps(paths).encode("utf-8")).decode("ascii")
+        result = self.execute(_STAT_MANY_COMMAND_TEMPLATE.format(paths_b64=paths_b64))
+
+        lines = result.output.strip().splitlines()
+        infos: list[FileInfo | None] = []
+        for index, path in enumerate(paths):
+            try:
+                data = json.loads(lines[index])
+            except (IndexError, json.JSONDecodeError):
+                data = None
+            if not isinstance(data, dict):
+                infos.append(None)
+                continue
+            infos.append(
+                {
+                    "path": path,
+                    "is_dir": data["is_dir"],
+                    "size": int(data["size"]),
+                    "modified_at": datetime.fromtimestamp(data["mtime"], tz=UTC).isoformat(),
+                }
+            )
+        return infos
+
     @property
     @abstractmethod
     def id(self) -> str:
@@ -0,0 +1,443 @@
+"""SnapshotBackend: Serve a packed, read-only directory snapshot from a memory map.
+
+A pack is one file holding every file of a directory tree plus an index, so a
+large reference corpus can be mounted into many agents (and processes) at the
+cost of a single open file: the operating system shares the mapped pages
+through its page cache.
+
+Layout (all integers little- or big-endian as recorded in the index)::
+
+    header   MAGIC (8 bytes) | index offset (u64) | index length (u64)
+    body     for each file: content bytes, padding to 4 bytes, line-offset table (u32 per line)
+    index    UTF-8 JSON: {"version", "byteorder", "files": {path: [offset, length, mtime, lines_offset, n_lines, blank]}}
+
+`n_lines` is -1 for files that are not valid UTF-8; their content is kept
+but they cannot be read as text or searched.
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import NamedTuple, Self
+
+import wcmatch.glob as wcglob
+
+from deepagents.backends.protocol import (
+    BackendProtocol,
+    EditResult,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    MultiEditResult,
+    WriteResult,
+)
+from deepagents.backends.utils import (
+    EMPTY_CONTENT_WARNING,
+    _glob_search_files,
+    _required_literals,
+    _validate_path,
+    format_content_with_line_numbers,
+    paginate,
+    tail_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DASNAP1\0"
+"""First bytes of every pack file."""
+
+PACK_VERSION = 1
+
+_HEADER = struct.Struct("<8sQQ")
+_MAX_FILE_SIZE = 2**32 - 1  # line offsets are stored as u32
+
+DEFAULT_EXCLUDED_DIRS = frozenset({".git", ".hg", ".svn", "__pycache__"})
+"""Directory names skipped by `pack_directory` unless told otherwise."""
+
+
+class PackStats(NamedTuple):
+    """Summary of a `pack_directory` run."""
+
+    files: int
+    """Number of files packed."""
+
+    skipped: int
+    """Number of files skipped (symlinks, unreadable or larger than 4 GiB)."""
+
+    bytes: int
+    """Total size of the packed file contents."""
+
+
+class _Entry(NamedTuple):
+    offset: int
+    length: int
+    modified_at: str
+    lines_offset: int
+    n_lines: int
+    blank: bool
+
+
+def _line_starts(data: bytes) -> tuple[array, bool] | None:
+    """Return the byte offset of every line (as split by `str.splitlines`) and whether the text is blank."""
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    starts = array("I")
+    position = 0
+    for line in text.splitlines(keepends=True):
+        starts.append(position)
+        position += len(line.encode("utf-8"))
+    return starts, not text.strip()
+
+
+def pack_directory(root: str | Path, output: str | Path, *, exclude_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS) -> PackStats:
+    """Pack every regular file under `root` into a single snapshot file.
+
+    Paths inside the pack are virtual absolute paths relative to `root`
+    (`root/docs/a.md` becomes `/docs/a.md`). Symlinks are not followed. The
+    pack is written next to `output` and moved into place atomically.
+
+    Args:
+        root: Directory to pack.
+        output: Path of the pack file to create or replace.
+        exclude_dirs: Directory names to skip anywhere in the tree.
+
+    Returns:
+        PackStats with the number of files packed and skipped and the bytes packed.
+    """
+    root = Path(root).resolve()
+    output = Path(output)
+    excluded = frozenset(exclude_dirs)
+    tmp_path = output.with_name(output.name + ".tmp")
+    files: dict[str, list] = {}
+    skipped = total = 0
+
+    with tmp_path.open("wb") as out:
+        out.write(_HEADER.pack(MAGIC, 0, 0))
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name not in excluded)
+            for name in sorted(filenames):
+                full = Path(dirpath) / name
+                try:
+                    st = full.lstat()
+                    if not full.is_file() or full.is_symlink() or st.st_size > _MAX_FILE_SIZE:
+                        skipped += 1
+                        continue
+                    data = full.read_bytes()
+                except OSError:
+                    logger.warning("Skipping unreadable file %s", full, exc_info=True)
+                    skipped += 1
+                    continue
+                offset = out.tell()
+                out.write(data)
+                out.write(b"\0" * (-out.tell() % 4))
+                lines_offset = out.tell()
+                line_info = _line_starts(data)
+                n_lines, blank = -1, False
+                if line_info is not None:
+                    starts, blank = line_info
+                    starts.tofile(out)
+                    n_lines = len(starts)
+                virtual_path = "/" + full.relative_to(root).as_posix()
+                modified_at = datetime.fromtimestamp(st.st_mtime).isoformat()  # noqa: DTZ006
+                files[virtual_path] = [offset, len(data), modified_at, lines_offset, n_lines, blank]
+                total += len(data)
+
+        index = json.dumps({"version": PACK_VERSION, "byteorder": sys.byteorder, "files": files}, separators=(",", ":")).encode("utf-8")
+        index_offset = out.tell()
+        out.write(index)
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, index_offset, len(index)))
+    tmp_path.replace(output)
+    return PackStats(files=len(files), skipped=skipped, bytes=total)
+
+
+class SnapshotBackend(BackendProtocol):
+    """Read-only backend serving a pack created by `pack_directory` from a memory map.
+
+    Nothing is read from the pack up front except its index: listings are
+    binary searches over the sorted paths, `read` decodes only the requested
+    line range using the file's line-offset table, and `grep_raw` first looks
+    for literal substrings the pattern requires directly in the mapped bytes,
+    only decoding lines that contain them. Every process that opens the same
+    pack shares its pages through the page cache.
+
+    Writes, edits and uploads are rejected.
+
+    Example:
+        ```python
+        from deepagents.backends import CompositeBackend, SnapshotBackend, StateBackend
+        from deepagents.backends.snapshot import pack_directory
+
+        pack_directory("vendor/docs", "docs.pack")  # once, e.g. when building the eval image
+        backend = lambda rt: CompositeBackend(default=StateBackend(rt), routes={"/docs/": SnapshotBackend("docs.pack")})
+        ```
+    """
+
+    def __init__(self, pack_path: str | Path) -> None:
+        """Map a pack file and load its index.
+
+        Args:
+            pack_path: Path of a file created by `pack_directory`.
+
+        Raises:
+            ValueError: If the file is not a pack, or was packed with another version or byte order.
+        """
+        self.pack_path = Path(pack_path)
+        with self.pack_path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            msg = f"{self.pack_path} is not a snapshot pack"
+            raise ValueError(msg)
+        index = json.loads(self._mm[index_offset : index_offset + index_length])
+        if index.get("version") != PACK_VERSION or index.get("byteorder") != sys.byteorder:
+            self._mm.close()
+            msg = f"{self.pack_path} was packed with version {index.get('version')} on a {index.get('byteorder')}-endian machine"
+            raise ValueError(msg)
+        self._entries = {path: _Entry(*values) for path, values in index["files"].items()}
+        self._paths = sorted(self._entries)
+
+    def close(self) -> None:
+        """Unmap the pack."""
+        self._mm.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+    def _line_table(self, entry: _Entry) -> memoryview:
+        return memoryview(self._mm)[entry.lines_offset : entry.lines_offset + 4 * entry.n_lines].cast("I")
+
+    def _line_end(self, entry: _Entry, table: memoryview, index: int) -> int:
+        return table[index + 1] if index + 1 < entry.n_lines else entry.length
+
+    def _iter_prefix(self, prefix: str) -> Iterator[str]:
+        """Yield packed paths starting with `prefix`, in sorted order."""
+        for i in range(bisect.bisect_left(self._paths, prefix), len(self._paths)):
+            if not self._paths[i].startswith(prefix):
+                return
+            yield self._paths[i]
+
+    def _info(self, path: str) -> FileInfo:
+        entry = self._entries[path]
+        return {"path": path, "is_dir": False, "size": entry.length, "modified_at": entry.modified_at}
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List files and directories in the specified directory (non-recursive).
+
+        Subdirectories are skipped over with a binary search instead of being walked.
+
+        Args:
+            path: Absolute path to directory.
+
+        Returns:
+            List of FileInfo-like dicts for files and directories directly in the directory.
+            Directories have a trailing / in their path and is_dir=True.
+        """
+        prefix = path if path.endswith("/") else path + "/"
+        infos: list[FileInfo] = []
+        i = bisect.bisect_left(self._paths, prefix)
+        while i < len(self._paths) and self._paths[i].startswith(prefix):
+            relative = self._paths[i][len(prefix) :]
+            if "/" in relative:
+                subdir = prefix + relative.split("/", 1)[0] + "/"
+                infos.append({"path": subdir, "is_dir": True, "size": 0, "modified_at": ""})
+                # "0" sorts right after "/", so this skips every path inside the subdirectory
+                i = bisect.bisect_left(self._paths, subdir[:-1] + "0", i)
+            else:
+                infos.append(self._info(self._paths[i]))
+                i += 1
+        infos.sort(key=lambda x: x.get("path", ""))
+        return infos
+
+    def read(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Read file content with line numbers, decoding only the requested lines.
+
+        Args:
+            file_path: Absolute file path.
+            offset: Line offset to start reading from (0-indexed).
+            limit: Maximum number of lines to read.
+
+        Returns:
+            Formatted file content with line numbers, or error message.
+        """
+        entry = self._entries.get(file_path)
+        if entry is None:
+            return f"Error: File '{file_path}' not found"
+        if entry.n_lines < 0:
+            return f"Error reading file '{file_path}': file is not valid UTF-8 text"
+        if entry.blank:
+            return EMPTY_CONTENT_WARNING
+        if offset >= entry.n_lines:
+            return f"Error: Line offset {offset} exceeds file length ({entry.n_lines} lines)"
+        table = self._line_table(entry)
+        end_index = min(offset + limit, entry.n_lines) - 1
+        start, end = table[offset], self._line_end(entry, table, end_index)
+        lines = self._mm[entry.offset + start : entry.offset + end].decode("utf-8").splitlines()
+        return format_content_with_line_numbers(lines, start_line=offset + 1)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset of a packed file.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+        entry = self._entries.get(file_path)
+        if entry is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        start = min(max(start_byte, 0), entry.length)
+        end = entry.length if length is None else min(start + max(length, 0), entry.length)
+        return FileDownloadResponse(path=file_path, content=self._mm[entry.offset + start : entry.offset + end], error=None)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a packed file, using its line-offset table when it has one.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+        entry = self._entries.get(file_path)
+        if entry is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        if entry.n_lines < 0:
+            content = tail_bytes(self._mm[entry.offset : entry.offset + entry.length], n_lines)
+        else:
+            start = self._line_table(entry)[entry.n_lines - n_lines] if 0 < n_lines < entry.n_lines else 0
+            content = self._mm[entry.offset + start : entry.offset + entry.length] if n_lines > 0 else b""
+        return FileDownloadResponse(path=file_path, content=content, error=None)
+
+    def _grep_file(self, path: str, regex: re.Pattern[str], literals: list[bytes]) -> Iterator[GrepMatch]:
+        entry = self._entries[path]
+        if entry.n_lines <= 0:
+            return
+        start, end = entry.offset, entry.offset + entry.length
+        if not literals:
+            for line_num, line in enumerate(self._mm[start:end].decode("utf-8").splitlines(), 1):
+                if regex.search(line):
+                    yield {"path": path, "line": line_num, "text": line}
+            return
+        if any(self._mm.find(literal, start, end) == -1 for literal in literals):
+            return
+        # Every matching line contains the first literal, so only those lines are decoded
+        table = self._line_table(entry)
+        position = self._mm.find(literals[0], start, end)
+        while position != -1:
+            index = bisect.bisect_right(table, position - start) - 1
+            line_end = self._line_end(entry, table, index)
+            line = self._mm[start + table[index] : start + line_end].decode("utf-8").splitlines()
+            if line and regex.search(line[0]):
+                yield {"path": path, "line": index + 1, "text": line[0]}
+            position = self._mm.find(literals[0], start + line_end, end)
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str = "/",
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            return f"Invalid regex pattern: {e}"
+        try:
+            prefix = _validate_path(path)
+        except ValueError:
+            return paginate((), max_results, cursor)
+        literals = [literal.encode("utf-8") for literal in _required_literals(pattern)]
+
+        def matches() -> Iterator[GrepMatch]:
+            for file_path in self._iter_prefix(prefix):
+                if glob and not wcglob.globmatch(PurePosixPath(file_path).name, glob, flags=wcglob.BRACE):
+                    continue
+                yield from self._grep_file(file_path, regex, literals)
+
+        return paginate(matches(), max_results, cursor)
+
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
+        try:
+            prefix = _validate_path(path)
+        except ValueError:
+            return paginate((), max_results, cursor)
+        files = {file_path: {"modified_at": self._entries[file_path].modified_at} for file_path in self._iter_prefix(prefix)}
+        result = _glob_search_files(files, pattern, prefix)
+        if result == "No files found":
+            return []
+        return paginate([self._info(file_path) for file_path in result.split("\n")], max_results, cursor)
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download multiple files from the pack.
+
+        Args:
+            paths: List of file paths to download.
+
+        Returns:
+            List of FileDownloadResponse objects, one per input path.
+            Response order matches input order.
+        """
+        return [self.read_range(path) for path in paths]
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up file metadata from the index.
+
+        Args:
+            paths: List of file paths to look up.
+
+        Returns:
+            One FileInfo (or None if the file is not in the pack) per input path.
+        """
+        return [self._info(path) if path in self._entries else None for path in paths]
+
+    def write(self, file_path: str, content: str) -> WriteResult:  # noqa: ARG002
+        """Reject the write: snapshots are read-only."""
+        return WriteResult(error=f"Cannot write to {file_path}: the snapshot is read-only.")
+
+    def edit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:  # noqa: ARG002
+        """Reject the edit: snapshots are read-only."""
+        return EditResult(error=f"Error: Cannot edit {file_path}: the snapshot is read-only.")
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Reject the edits: snapshots are read-only."""
+        paths = ", ".join(dict.fromkeys(edit["file_path"] for edit in edits))
+        return MultiEditResult(error=f"Error: Cannot edit {paths}: the snapshot is read-only.")
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Reject every upload with `permission_denied`: snapshots are read-only."""
+        return [FileUploadResponse(path=path, error="permission_denied") for path, _ in files]
@@ -0,0 +1,512 @@
+"""SqliteBackend: Store files in a local SQLite database (durable, indexed, no server)."""
+
+import asyncio
+import functools
+import logging
+import queue
+import sqlite3
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from types import TracebackType
+from typing import Any, ParamSpec, Self, TypeVar
+
+from deepagents.backends.protocol import (
+    BackendProtocol,
+    EditResult,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    MultiEditResult,
+    WriteResult,
+)
+from deepagents.backends.utils import (
+    _glob_search_files,
+    _required_literals,
+    _validate_path,
+    format_read_response,
+    grep_matches_from_files,
+    paginate,
+    perform_string_replacement,
+    plan_multi_edit,
+    tail_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+MAX_QUERY_PARAMS = 500
+"""Paths looked up per `IN (...)` query; larger batches are split."""
+
+MIN_TRIGRAM_LENGTH = 3
+"""The FTS5 trigram tokenizer cannot match literals shorter than this."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    modified_at TEXT NOT NULL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(content, content='files', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS files_fts_insert AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS files_fts_delete AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS files_fts_update AFTER UPDATE OF content ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO files_fts(rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+_UPSERT = (
+    "INSERT INTO files (path, content, size, created_at, modified_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(path) DO UPDATE SET content = excluded.content, size = excluded.size, modified_at = excluded.modified_at"
+)
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+def _like_prefix(prefix: str) -> str:
+    r"""Build a `LIKE ... ESCAPE '\\'` pattern matching every path under `prefix`."""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+class SqliteBackend(BackendProtocol):
+    """Backend that stores files in a local SQLite database.
+
+    Gives agents durable, indexed scratch storage without running a database
+    server. Files live in a single `files` table with a unique index on `path`,
+    so directory listings and glob/grep scopes are `LIKE 'prefix%'` range scans
+    instead of full scans. An FTS5 trigram index over file contents prefilters
+    `grep_raw`: literal substrings that every match must contain are looked up
+    in the index, and only the candidate files are searched with the regex.
+    If the SQLite build lacks FTS5, grep falls back to scanning every file in scope.
+
+    Connections come from a fixed-size pool, and the async methods run on a
+    dedicated thread pool of the same size, so async callers never block the
+    event loop or the default executor on database I/O.
+
+    Usable directly or as a `CompositeBackend` route, e.g. for `/scratch/`.
+    """
+
+    def __init__(self, database: str | Path = ":memory:", *, pool_size: int = 4, timeout: float = 30.0) -> None:
+        """Initialize the backend and create the schema if needed.
+
+        Args:
+            database: Path of the SQLite database file, created if missing.
+                `":memory:"` keeps files in memory for the lifetime of the backend,
+                on a single connection.
+            pool_size: Number of pooled connections (and async worker threads).
+            timeout: Seconds to wait for a lock held by another connection.
+        """
+        self.database = str(database)
+        in_memory = self.database == ":memory:"
+        self.pool_size = 1 if in_memory else max(pool_size, 1)
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._connections: list[sqlite3.Connection] = []
+        for _ in range(self.pool_size):
+            conn = sqlite3.connect(self.database, timeout=timeout, isolation_level=None, check_same_thread=False)
+            if not in_memory:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            # Lets `LIKE 'prefix%'` use the (binary) path index
+            conn.execute("PRAGMA case_sensitive_like=ON")
+            self._connections.append(conn)
+            self._pool.put(conn)
+        self.fts_enabled = self._create_schema(self._connections[0])
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="deepagents-sqlite")
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> bool:
+        """Create the tables, returning whether the FTS5 index is available."""
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            logger.warning("SQLite FTS5 trigram tokenizer unavailable; grep will scan every file", exc_info=True)
+            return False
+        return True
+
+    def close(self) -> None:
+        """Close the pooled connections and stop the async worker threads."""
+        self._executor.shutdown(wait=True)
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection inside a write transaction, taking the write lock up front."""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    async def _run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run a sync method on the backend's dedicated thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    @staticmethod
+    def _fetch_many(conn: sqlite3.Connection, columns: str, paths: list[str]) -> dict[str, tuple[Any, ...]]:
+        """Fetch rows for several paths with as few `IN (...)` queries as possible, keyed by path."""
+        rows: dict[str, tuple[Any, ...]] = {}
+        unique = list(dict.fromkeys(paths))
+        for start in range(0, len(unique), MAX_QUERY_PARAMS):
+            chunk = unique[start : start + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT path, {columns} FROM files WHERE path IN ({placeholders})", chunk):  # noqa: S608
+                rows[row[0]] = row[1:]
+        return rows
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List files and directories in the specified directory (non-recursive).
+
+        Args:
+            path: Absolute path to directory.
+
+        Returns:
+            List of FileInfo-like dicts for files and directories directly in the directory.
+            Directories have a trailing / in their path and is_dir=True.
+        """
+        prefix = path if path.endswith("/") else path + "/"
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT path, size, modified_at FROM files WHERE path LIKE ? ESCAPE '\\' ORDER BY path",
+                (_like_prefix(prefix),),
+            ).fetchall()
+
+        infos: list[FileInfo] = []
+        subdirs: set[str] = set()
+        for file_path, size, modified_at in rows:
+            relative = file_path[len(prefix) :]
+            if "/" in relative:
+                subdirs.add(prefix + relative.split("/")[0] + "/")
+                continue
+            infos.append({"path": file_path, "is_dir": False, "size": size, "modified_at": modified_at})
+        infos.extend({"path": subdir, "is_dir": True, "size": 0, "modified_at": ""} for subdir in subdirs)
+        infos.sort(key=lambda x: x.get("path", ""))
+        return infos
+
+    def read(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Read file content with line numbers.
+
+        Args:
+            file_path: Absolute file path.
+            offset: Line offset to start reading from (0-indexed).
+            limit: Maximum number of lines to read.
+
+        Returns:
+            Formatted file content with line numbers, or error message.
+        """
+        with self._connection() as conn:
+            row = conn.execute("SELECT content, created_at, modified_at FROM files WHERE path = ?", (file_path,)).fetchone()
+        if row is None:
+            return f"Error: File '{file_path}' not found"
+        content, created_at, modified_at = row
+        return format_read_response({"content": content.split("\n"), "created_at": created_at, "modified_at": modified_at}, offset, limit)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset of a stored file, slicing inside SQLite.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+        with self._connection() as conn:
+            if length is None:
+                row = conn.execute("SELECT substr(CAST(content AS BLOB), ?) FROM files WHERE path = ?", (start_byte + 1, file_path)).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT substr(CAST(content AS BLOB), ?, ?) FROM files WHERE path = ?", (start_byte + 1, max(length, 0), file_path)
+                ).fetchone()
+        if row is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        return FileDownloadResponse(path=file_path, content=bytes(row[0] or b""), error=None)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a stored file.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+        with self._connection() as conn:
+            row = conn.execute("SELECT content FROM files WHERE path = ?", (file_path,)).fetchone()
+        if row is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        return FileDownloadResponse(path=file_path, content=tail_bytes(row[0].encode("utf-8"), n_lines), error=None)
+
+    def write(
+        self,
+        file_path: str,
+        content: str,
+    ) -> WriteResult:
+        """Create a new file with content.
+        Returns WriteResult. External storage sets files_update=None.
+        """
+        now = _now()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO files (path, content, size, created_at, modified_at) VALUES (?, ?, ?, ?, ?) ON CONFLICT(path) DO NOTHING",
+                (file_path, content, len(content.encode("utf-8")), now, now),
+            )
+        if cursor.rowcount == 0:
+            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+        return WriteResult(path=file_path, files_update=None)
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Edit a file by replacing string occurrences.
+        Returns EditResult. External storage sets files_update=None.
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT content FROM files WHERE path = ?", (file_path,)).fetchone()
+            if row is None:
+                return EditResult(error=f"Error: File '{file_path}' not found")
+            result = perform_string_replacement(row[0], old_string, new_string, replace_all)
+            if isinstance(result, str):
+                return EditResult(error=result)
+            new_content, occurrences = result
+            conn.execute(
+                "UPDATE files SET content = ?, size = ?, modified_at = ? WHERE path = ?",
+                (new_content, len(new_content.encode("utf-8")), _now(), file_path),
+            )
+        return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
+
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files in one transaction.
+        Returns MultiEditResult. External storage sets files_update=None.
+        """
+        paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+        with self._transaction() as conn:
+            rows = self._fetch_many(conn, "content", paths)
+            plan = plan_multi_edit(edits, {path: rows[path][0] if path in rows else None for path in paths})
+            if isinstance(plan, str):
+                return MultiEditResult(error=plan)
+            now = _now()
+            conn.executemany(
+                "UPDATE files SET content = ?, size = ?, modified_at = ? WHERE path = ?",
+                [(new_content, len(new_content.encode("utf-8")), now, path) for path, (new_content, _) in plan.items()],
+            )
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=None,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
+    def _iter_candidate_files(self, conn: sqlite3.Connection, prefix: str, literals: list[str]) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yield `(path, file_data)` for files under `prefix` whose content contains every literal."""
+        query = "SELECT path, content FROM files WHERE path LIKE ? ESCAPE '\\'"
+        params: list[str] = [_like_prefix(prefix)]
+        if literals and self.fts_enabled:
+            query += " AND id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)"
+            params.append(" AND ".join('"' + literal.replace('"', '""') + '"' for literal in literals))
+        for file_path, content in conn.execute(query + " ORDER BY path", params):
+            yield file_path, {"content": content.split("\n")}
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str = "/",
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        try:
+            prefix = _validate_path(path)
+        except ValueError:
+            return paginate((), max_results, cursor)
+        with self._connection() as conn:
+            files = self._iter_candidate_files(
+                conn, prefix, [literal for literal in _required_literals(pattern) if len(literal) >= MIN_TRIGRAM_LENGTH]
+            )
+            return grep_matches_from_files(files, pattern, prefix, glob, max_results, cursor)
+
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
+        try:
+            prefix = _validate_path(path)
+        except ValueError:
+            return paginate((), max_results, cursor)
+        with self._connection() as conn:
+            rows = conn.execute("SELECT path, size, modified_at FROM files WHERE path LIKE ? ESCAPE '\\'", (_like_prefix(prefix),)).fetchall()
+        sizes = {file_path: size for file_path, size, _ in rows}
+        files = {file_path: {"modified_at": modified_at} for file_path, _, modified_at in rows}
+        result = _glob_search_files(files, pattern, prefix)
+        if result == "No files found":
+            return []
+        infos: list[FileInfo] = [{"path": p, "is_dir": False, "size": sizes[p], "modified_at": files[p]["modified_at"]} for p in result.split("\n")]
+        return paginate(infos, max_results, cursor)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload multiple files in one transaction, overwriting existing ones.
+
+        Args:
+            files: List of (path, content) tuples where content is bytes.
+
+        Returns:
+            List of FileUploadResponse objects, one per input file.
+            Response order matches input order. Content that is not valid UTF-8
+            is rejected with `invalid_path`.
+        """
+        now = _now()
+        responses: list[FileUploadResponse] = []
+        rows: list[tuple[str, str, int, str, str]] = []
+        for path, content in files:
+            try:
+                text = content.decode("utf-8")
+            except UnicodeDecodeError:
+                responses.append(FileUploadResponse(path=path, error="invalid_path"))
+                continue
+            rows.append((path, text, len(content), now, now))
+            responses.append(FileUploadResponse(path=path, error=None))
+        if rows:
+            with self._transaction() as conn:
+                conn.executemany(_UPSERT, rows)
+        return responses
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download multiple files with batched `IN (...)` queries.
+
+        Args:
+            paths: List of file paths to download.
+
+        Returns:
+            List of FileDownloadResponse objects, one per input path.
+            Response order matches input order.
+        """
+        with self._connection() as conn:
+            rows = self._fetch_many(conn, "content", paths)
+        return [
+            FileDownloadResponse(path=path, content=rows[path][0].encode("utf-8"), error=None)
+            if path in rows
+            else FileDownloadResponse(path=path, content=None, error="file_not_found")
+            for path in paths
+        ]
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up file metadata without reading contents.
+
+        Args:
+            paths: List of file paths to look up.
+
+        Returns:
+            One FileInfo (or None if the file does not exist) per input path.
+            Sizes are in bytes of UTF-8 encoded content.
+        """
+        with self._connection() as conn:
+            rows = self._fetch_many(conn, "size, modified_at", paths)
+        return [{"path": path, "is_dir": False, "size": rows[path][0], "modified_at": rows[path][1]} if path in rows else None for path in paths]
+
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """Async version of ls_info, run on the backend's connection pool."""
+        return await self._run(self.ls_info, path)
+
+    async def aread(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """Async version of read, run on the backend's connection pool."""
+        return await self._run(self.read, file_path, offset, limit)
+
+    async def aread_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Async version of read_range, run on the backend's connection pool."""
+        return await self._run(self.read_range, file_path, start_byte, length)
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Async version of tail, run on the backend's connection pool."""
+        return await self._run(self.tail, file_path, n_lines)
+
+    async def awrite(self, file_path: str, content: str) -> WriteResult:
+        """Async version of write, run on the backend's connection pool."""
+        return await self._run(self.write, file_path, content)
+
+    async def aedit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:
+        """Async version of edit, run on the backend's connection pool."""
+        return await self._run(self.edit, file_path, old_string, new_string, replace_all)
+
+    async def amulti_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Async version of multi_edit, run on the backend's connection pool."""
+        return await self._run(self.multi_edit, edits)
+
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str = "/",
+        glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Async version of grep_raw, run on the backend's connection pool."""
+        return await self._run(self.grep_raw, pattern, path, glob, max_results, cursor)
+
+    async def aglob_info(self, pattern: str, path: str = "/", max_results: int | None = None, cursor: str | None = None) -> list[FileInfo]:
+        """Async version of glob_info, run on the backend's connection pool."""
+        return await self._run(self.glob_info, pattern, path, max_results, cursor)
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Async version of upload_files, run on the backend's connection pool."""
+        return await self._run(self.upload_files, files)
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Async version of download_files, run on the backend's connection pool."""
+        return await self._run(self.download_files, paths)
+
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Async version of stat_many, run on the backend's connection pool."""
+        return await self._run(self.stat_many, paths)
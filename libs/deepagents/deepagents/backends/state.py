@@ -6,18 +6,24 @@ from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    MultiEditResult,
     WriteResult,
 )
 from deepagents.backends.utils import (
     _glob_search_files,
     create_file_data,
+    file_data_byte_range,
+    file_data_tail,
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
+    paginate,
     perform_string_replacement,
+    plan_multi_edit,
     update_file_data,
 )
 
@@ -122,6 +128,37 @@ class StateBackend(BackendProtocol):
 
         return format_read_response(file_data, offset, limit)
 
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset of a file in state.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+        file_data = self.runtime.state.get("files", {}).get(file_path)
+        if file_data is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        return FileDownloadResponse(path=file_path, content=file_data_byte_range(file_data, start_byte, length), error=None)
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file in state, without joining the whole file.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+        file_data = self.runtime.state.get("files", {}).get(file_path)
+        if file_data is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        return FileDownloadResponse(path=file_path, content=file_data_tail(file_data, n_lines), error=None)
+
     def write(
         self,
         file_path: str,
@@ -164,16 +201,41 @@ class StateBackend(BackendProtocol):
         new_file_data = update_file_data(file_data, new_content)
         return EditResult(path=file_path, files_update={file_path: new_file_data}, occurrences=int(occurrences))
 
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files at once.
+        Returns MultiEditResult with one files_update entry per edited file.
+        """
+        files = self.runtime.state.get("files", {})
+        paths = dict.fromkeys(edit["file_path"] for edit in edits)
+        plan = plan_multi_edit(edits, {path: file_data_to_string(files[path]) if path in files else None for path in paths})
+        if isinstance(plan, str):
+            return MultiEditResult(error=plan)
+
+        files_update = {path: update_file_data(files[path], new_content) for path, (new_content, _) in plan.items()}
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=files_update,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
     def grep_raw(
         self,
         pattern: str,
         path: str = "/",
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
         files = self.runtime.state.get("files", {})
-        return grep_matches_from_files(files, pattern, path, glob)
+        return grep_matches_from_files(files, pattern, path, glob, max_results, cursor)
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
         """Get FileInfo for files matching glob pattern."""
         files = self.runtime.state.get("files", {})
         result = _glob_search_files(files, pattern, path)
@@ -192,7 +254,7 @@ class StateBackend(BackendProtocol):
                     "modified_at": fd.get("modified_at", "") if fd else "",
                 }
             )
-        return infos
+        return paginate(infos, max_results, cursor)
 
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to state.
@@ -208,6 +270,32 @@ class StateBackend(BackendProtocol):
             "directly by passing them in invoke if you're storing files in the memory."
         )
 
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up file metadata in state without converting file contents.
+
+        Args:
+            paths: List of file paths to look up
+
+        Returns:
+            One FileInfo (or None if the file is not in state) per input path
+        """
+        state_files = self.runtime.state.get("files", {})
+        infos: list[FileInfo | None] = []
+        for path in paths:
+            fd = state_files.get(path)
+            if fd is None:
+                infos.append(None)
+                continue
+            infos.append(
+                {
+                    "path": path,
+                    "is_dir": False,
+                    "size": len("\n".join(fd.get("content", []))),
+                    "modified_at": fd.get("modified_at", ""),
+                }
+            )
+        return infos
+
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files from state.
 
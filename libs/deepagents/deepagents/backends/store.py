@@ -1,26 +1,36 @@
 """StoreBackend: Adapter for LangGraph's BaseStore (persistent, cross-thread)."""
 
+from collections.abc import Callable, Iterator
 from typing import Any
 
 from langgraph.config import get_config
-from langgraph.store.base import BaseStore, Item
+from langgraph.store.base import BaseStore, GetOp, Item, PutOp
 
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
     FileDownloadResponse,
+    FileEdit,
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    MultiEditResult,
     WriteResult,
 )
 from deepagents.backends.utils import (
+    CompressionCodec,
     _glob_search_files,
+    compress_text,
     create_file_data,
+    decompress_text,
+    file_data_byte_range,
+    file_data_tail,
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
+    paginate,
     perform_string_replacement,
+    plan_multi_edit,
     update_file_data,
 )
 
@@ -32,15 +42,23 @@ class StoreBackend(BackendProtocol):
     Files are organized via namespaces and persist across all threads.
 
     The namespace can include an optional assistant_id for multi-agent isolation.
+
+    File contents can optionally be stored compressed (gzip or zstd), which is
+    useful for routes holding large, highly repetitive payloads such as evicted
+    tool results. Compressed and uncompressed items are both readable regardless
+    of the configured codec, so compression can be enabled on an existing store.
     """
 
-    def __init__(self, runtime: "ToolRuntime"):
+    def __init__(self, runtime: "ToolRuntime", *, compression: CompressionCodec | None = None):
         """Initialize StoreBackend with runtime.
 
         Args:
             runtime: The ToolRuntime instance providing store access and configuration.
+            compression: Optional codec (`"gzip"` or `"zstd"`) used for file contents
+                written by this backend. Defaults to storing plain line lists.
         """
         self.runtime = runtime
+        self.compression = compression
 
     def _get_store(self) -> BaseStore:
         """Get the store instance.
@@ -106,6 +124,8 @@ class StoreBackend(BackendProtocol):
         Raises:
             ValueError: If required fields are missing or have incorrect types.
         """
+        if "compression" in store_item.value:
+            return self._convert_compressed_value_to_file_data(store_item.value)
         if "content" not in store_item.value or not isinstance(store_item.value["content"], list):
             msg = f"Store item does not contain valid content field. Got: {store_item.value.keys()}"
             raise ValueError(msg)
@@ -128,14 +148,47 @@ class StoreBackend(BackendProtocol):
             file_data: The FileData to convert.
 
         Returns:
-            Dictionary with content, created_at, and modified_at fields.
+            Dictionary with content, created_at, and modified_at fields. When
+            compression is enabled, content is replaced by a base64-encoded
+            `content_compressed` payload and the codec name under `compression`.
         """
+        if self.compression is not None:
+            return {
+                "content_compressed": compress_text(file_data_to_string(file_data), self.compression),
+                "compression": self.compression,
+                "created_at": file_data["created_at"],
+                "modified_at": file_data["modified_at"],
+            }
         return {
             "content": file_data["content"],
             "created_at": file_data["created_at"],
             "modified_at": file_data["modified_at"],
         }
 
+    def _convert_compressed_value_to_file_data(self, value: dict[str, Any]) -> dict[str, Any]:
+        """Convert a compressed store value back to FileData format.
+
+        Args:
+            value: Store value written with compression enabled.
+
+        Returns:
+            FileData dict with content, created_at, and modified_at fields.
+
+        Raises:
+            ValueError: If required fields are missing or have incorrect types.
+        """
+        required = ("content_compressed", "compression", "created_at", "modified_at")
+        missing = [key for key in required if not isinstance(value.get(key), str)]
+        if missing:
+            msg = f"Store item does not contain valid {', '.join(missing)} field(s). Got: {value.keys()}"
+            raise ValueError(msg)
+        content = decompress_text(value["content_compressed"], value["compression"])
+        return {
+            "content": content.split("\n"),
+            "created_at": value["created_at"],
+            "modified_at": value["modified_at"],
+        }
+
     def _search_store_paginated(
         self,
         store: BaseStore,
@@ -164,7 +217,23 @@ class StoreBackend(BackendProtocol):
             all_items = _search_store_paginated(store, namespace)
             ```
         """
-        all_items: list[Item] = []
+        return list(StoreBackend._iter_store_items(store, namespace, query=query, filter=filter, page_size=page_size))
+
+    @staticmethod
+    def _iter_store_items(
+        store: BaseStore,
+        namespace: tuple[str, ...],
+        *,
+        query: str | None = None,
+        filter: dict[str, Any] | None = None,
+        page_size: int = 100,
+    ) -> Iterator[Item]:
+        """Lazily yield every item matching the search, fetching one page at a time.
+
+        Unlike `_search_store_paginated`, the next page is only requested once the
+        caller has consumed the previous one, so callers that stop early (such as
+        paginated `grep_raw`) avoid loading the whole namespace.
+        """
         offset = 0
         while True:
             page_items = store.search(
@@ -175,13 +244,19 @@ class StoreBackend(BackendProtocol):
                 offset=offset,
             )
             if not page_items:
-                break
-            all_items.extend(page_items)
+                return
+            yield from page_items
             if len(page_items) < page_size:
-                break
+                return
             offset += page_size
 
-        return all_items
+    def _iter_store_files(self, store: BaseStore, namespace: tuple[str, ...]) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Lazily yield `(path, file_data)` for every valid file item in the namespace."""
+        for item in self._iter_store_items(store, namespace):
+            try:
+                yield item.key, self._convert_store_item_to_file_data(item)
+            except ValueError:
+                continue
 
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
@@ -279,6 +354,56 @@ class StoreBackend(BackendProtocol):
 
         return format_read_response(file_data, offset, limit)
 
+    def _partial_read(self, file_path: str, item: Item | None, read: Callable[[dict[str, Any]], bytes]) -> FileDownloadResponse:
+        """Apply `read` to the FileData of a store item, mapping a missing or invalid item to an error."""
+        if item is None:
+            return FileDownloadResponse(path=file_path, content=None, error="file_not_found")
+        try:
+            file_data = self._convert_store_item_to_file_data(item)
+        except ValueError:
+            return FileDownloadResponse(path=file_path, content=None, error="invalid_path")
+        return FileDownloadResponse(path=file_path, content=read(file_data), error=None)
+
+    def read_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset of a stored file.
+
+        Uncompressed items are read line by line, stopping once the range is filled;
+        compressed items have to be decompressed first.
+
+        Args:
+            file_path: Absolute file path.
+            start_byte: Offset of the first byte to read.
+            length: Maximum number of bytes to read, or None to read to the end of the file.
+
+        Returns:
+            FileDownloadResponse with the requested bytes or an error.
+        """
+        item = self._get_store().get(self._get_namespace(), file_path)
+        return self._partial_read(file_path, item, lambda file_data: file_data_byte_range(file_data, start_byte, length))
+
+    async def aread_range(self, file_path: str, start_byte: int = 0, length: int | None = None) -> FileDownloadResponse:
+        """Async version of read_range, using the store's native async get."""
+        item = await self._get_store().aget(self._get_namespace(), file_path)
+        return self._partial_read(file_path, item, lambda file_data: file_data_byte_range(file_data, start_byte, length))
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a stored file straight from its stored line list.
+
+        Args:
+            file_path: Absolute file path.
+            n_lines: Number of lines to return.
+
+        Returns:
+            FileDownloadResponse with the bytes of the last `n_lines` lines or an error.
+        """
+        item = self._get_store().get(self._get_namespace(), file_path)
+        return self._partial_read(file_path, item, lambda file_data: file_data_tail(file_data, n_lines))
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Async version of tail, using the store's native async get."""
+        item = await self._get_store().aget(self._get_namespace(), file_path)
+        return self._partial_read(file_path, item, lambda file_data: file_data_tail(file_data, n_lines))
+
     def write(
         self,
         file_path: str,
@@ -338,6 +463,39 @@ class StoreBackend(BackendProtocol):
         store.put(namespace, file_path, store_value)
         return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
 
+    def multi_edit(self, edits: list[FileEdit]) -> MultiEditResult:
+        """Apply several edits across files with one batched read and one batched write.
+        Returns MultiEditResult. External storage sets files_update=None.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+        paths = list(dict.fromkeys(edit["file_path"] for edit in edits))
+
+        file_datas: dict[str, dict[str, Any]] = {}
+        for path, item in zip(paths, store.batch([GetOp(namespace, path) for path in paths]) if paths else [], strict=True):
+            if item is None:
+                continue
+            try:
+                file_datas[path] = self._convert_store_item_to_file_data(item)
+            except ValueError as e:
+                return MultiEditResult(error=f"Error: {e}")
+
+        plan = plan_multi_edit(edits, {path: file_data_to_string(file_datas[path]) if path in file_datas else None for path in paths})
+        if isinstance(plan, str):
+            return MultiEditResult(error=plan)
+
+        store.batch(
+            [
+                PutOp(namespace, path, self._convert_file_data_to_store_value(update_file_data(file_datas[path], new_content)))
+                for path, (new_content, _) in plan.items()
+            ]
+        )
+        return MultiEditResult(
+            paths=list(plan),
+            files_update=None,
+            occurrences={path: occurrences for path, (_, occurrences) in plan.items()},
+        )
+
     # Removed legacy grep() convenience to keep lean surface
 
     def grep_raw(
@@ -345,19 +503,21 @@ class StoreBackend(BackendProtocol):
         pattern: str,
         path: str = "/",
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
         store = self._get_store()
         namespace = self._get_namespace()
-        items = self._search_store_paginated(store, namespace)
-        files: dict[str, Any] = {}
-        for item in items:
-            try:
-                files[item.key] = self._convert_store_item_to_file_data(item)
-            except ValueError:
-                continue
-        return grep_matches_from_files(files, pattern, path, glob)
+        files = self._iter_store_files(store, namespace)
+        return grep_matches_from_files(files, pattern, path, glob, max_results, cursor)
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
         store = self._get_store()
         namespace = self._get_namespace()
         items = self._search_store_paginated(store, namespace)
@@ -383,7 +543,7 @@ class StoreBackend(BackendProtocol):
                     "modified_at": fd.get("modified_at", "") if fd else "",
                 }
             )
-        return infos
+        return paginate(infos, max_results, cursor)
 
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the store.
@@ -411,6 +571,47 @@ class StoreBackend(BackendProtocol):
 
         return responses
 
+    def _stat_items(self, paths: list[str], items: list[Item | None]) -> list[FileInfo | None]:
+        infos: list[FileInfo | None] = []
+        for path, item in zip(paths, items, strict=True):
+            try:
+                fd = self._convert_store_item_to_file_data(item) if item is not None else None
+            except ValueError:
+                fd = None
+            if fd is None:
+                infos.append(None)
+                continue
+            infos.append(
+                {
+                    "path": path,
+                    "is_dir": False,
+                    "size": len("\n".join(fd.get("content", []))),
+                    "modified_at": fd.get("modified_at", ""),
+                }
+            )
+        return infos
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up file metadata in one store round trip.
+
+        Args:
+            paths: List of file paths to look up.
+
+        Returns:
+            One FileInfo (or None if the file is not in the store) per input path.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+        items = store.batch([GetOp(namespace, path) for path in paths]) if paths else []
+        return self._stat_items(paths, items)
+
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Async version of stat_many, using the store's native async batch."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        items = await store.abatch([GetOp(namespace, path) for path in paths]) if paths else []
+        return self._stat_items(paths, items)
+
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files from the store.
 
@@ -425,9 +626,10 @@ class StoreBackend(BackendProtocol):
         namespace = self._get_namespace()
         responses: list[FileDownloadResponse] = []
 
-        for path in paths:
-            item = store.get(namespace, path)
+        # Fetch every path in one store round trip
+        items = store.batch([GetOp(namespace, path) for path in paths]) if paths else []
 
+        for path, item in zip(paths, items, strict=True):
             if item is None:
                 responses.append(FileDownloadResponse(path=path, content=None, error="file_not_found"))
                 continue
@@ -5,15 +5,22 @@ helpers used by backends and the composite router. Structured helpers
 enable composition without fragile string parsing.
 """
 
+import base64
+import gzip
 import re
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from datetime import UTC, datetime
+from itertools import islice
 from pathlib import Path
+from types import ModuleType
 from typing import Any, Literal
 
 import wcmatch.glob as wcglob
 
+from deepagents.backends.protocol import FileEdit as _FileEdit
 from deepagents.backends.protocol import FileInfo as _FileInfo
 from deepagents.backends.protocol import GrepMatch as _GrepMatch
+from deepagents.backends.protocol import ResultPage
 
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
 MAX_LINE_LENGTH = 10000
@@ -25,6 +32,9 @@ TRUNCATION_GUIDANCE = "... [results truncated, try being more specific with your
 FileInfo = _FileInfo
 GrepMatch = _GrepMatch
 
+CompressionCodec = Literal["gzip", "zstd"]
+"""Codecs supported by `compress_text`/`decompress_text`."""
+
 
 def sanitize_tool_call_id(tool_call_id: str) -> str:
     r"""Sanitize tool_call_id to prevent path traversal and separator issues.
@@ -147,6 +157,73 @@ def update_file_data(file_data: dict[str, Any], content: str) -> dict[str, Any]:
     }
 
 
+def _zstd_module() -> ModuleType:
+    """Return a module exposing `compress`/`decompress` for zstd.
+
+    Uses the standard library `compression.zstd` (Python 3.14+) when available
+    and falls back to the optional `zstandard` package.
+    """
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+    except ImportError:
+        try:
+            import zstandard as zstd  # type: ignore[import-not-found]
+        except ImportError as e:
+            msg = "zstd compression requires Python 3.14+ or the `zstandard` package. Install it with `pip install zstandard`, or use compression='gzip'."
+            raise ImportError(msg) from e
+    return zstd
+
+
+def compress_text(text: str, codec: CompressionCodec) -> str:
+    """Compress text and encode it as base64 so it can be stored as JSON.
+
+    Args:
+        text: Text to compress.
+        codec: Compression codec, `"gzip"` or `"zstd"`.
+
+    Returns:
+        Base64-encoded compressed payload.
+
+    Raises:
+        ValueError: If the codec is unknown.
+        ImportError: If zstd is requested but no zstd implementation is available.
+    """
+    data = text.encode("utf-8")
+    if codec == "gzip":
+        compressed = gzip.compress(data, mtime=0)
+    elif codec == "zstd":
+        compressed = _zstd_module().compress(data)
+    else:
+        msg = f"Unsupported compression codec: {codec!r}"
+        raise ValueError(msg)
+    return base64.b64encode(compressed).decode("ascii")
+
+
+def decompress_text(payload: str, codec: CompressionCodec) -> str:
+    """Decode a payload produced by `compress_text`.
+
+    Args:
+        payload: Base64-encoded compressed payload.
+        codec: Codec the payload was compressed with.
+
+    Returns:
+        The original text.
+
+    Raises:
+        ValueError: If the codec is unknown.
+        ImportError: If the payload is zstd and no zstd implementation is available.
+    """
+    compressed = base64.b64decode(payload)
+    if codec == "gzip":
+        data = gzip.decompress(compressed)
+    elif codec == "zstd":
+        data = _zstd_module().decompress(compressed)
+    else:
+        msg = f"Unsupported compression codec: {codec!r}"
+        raise ValueError(msg)
+    return data.decode("utf-8")
+
+
 def format_read_response(
     file_data: dict[str, Any],
     offset: int,
@@ -178,6 +255,78 @@ def format_read_response(
     return format_content_with_line_numbers(selected_lines, start_line=start_idx + 1)
 
 
+def tail_bytes(data: bytes, n_lines: int) -> bytes:
+    """Return the last `n_lines` lines of `data`, like `tail -n`.
+
+    A trailing newline ends the last line rather than starting an empty one, and
+    is kept in the result.
+
+    Args:
+        data: Raw file content (or a suffix of it that ends at end of file).
+        n_lines: Number of lines to keep.
+
+    Returns:
+        The bytes of the last `n_lines` lines.
+    """
+    if n_lines <= 0:
+        return b""
+    pos = len(data) - 1 if data.endswith(b"\n") else len(data)
+    for _ in range(n_lines):
+        pos = data.rfind(b"\n", 0, pos)
+        if pos == -1:
+            return data
+    return data[pos + 1 :]
+
+
+def file_data_tail(file_data: dict[str, Any], n_lines: int) -> bytes:
+    """Return the last `n_lines` lines of FileData, taken directly from its line list.
+
+    Args:
+        file_data: FileData dict with 'content' key
+        n_lines: Number of lines to keep
+
+    Returns:
+        UTF-8 bytes of the last lines, as `tail_bytes` would return them for the full content
+    """
+    lines = file_data["content"]
+    # A final empty element means the content ends with a newline
+    end = len(lines) - 1 if lines and lines[-1] == "" else len(lines)
+    if n_lines <= 0 or end == 0:
+        return b""
+    text = "\n".join(lines[max(0, end - n_lines) : end])
+    return (text + "\n" if end < len(lines) else text).encode("utf-8")
+
+
+def file_data_byte_range(file_data: dict[str, Any], start_byte: int, length: int | None) -> bytes:
+    """Return a byte range of the UTF-8 encoded FileData content without joining the whole file.
+
+    Lines before the range are only measured, and iteration stops once the range is filled.
+
+    Args:
+        file_data: FileData dict with 'content' key
+        start_byte: Offset of the first byte to return
+        length: Maximum number of bytes to return, or None to read to the end
+
+    Returns:
+        The requested bytes (empty if `start_byte` is past the end)
+    """
+    lines = file_data["content"]
+    end_byte = None if length is None else start_byte + length
+    chunks: list[bytes] = []
+    pos = 0
+    last = len(lines) - 1
+    for i, line in enumerate(lines):
+        separator = 1 if i < last else 0
+        size = (len(line) if line.isascii() else len(line.encode("utf-8"))) + separator
+        if pos + size > start_byte:
+            encoded = line.encode("utf-8") + (b"\n" if separator else b"")
+            chunks.append(encoded[max(0, start_byte - pos) : None if end_byte is None else end_byte - pos])
+        pos += size
+        if end_byte is not None and pos >= end_byte:
+            break
+    return b"".join(chunks)
+
+
 def perform_string_replacement(
     content: str,
     old_string: str,
@@ -207,6 +356,45 @@ def perform_string_replacement(
     return new_content, occurrences
 
 
+def plan_multi_edit(
+    edits: Sequence[_FileEdit],
+    contents: Mapping[str, str | None],
+) -> dict[str, tuple[str, int]] | str:
+    """Apply an ordered list of edits to in-memory file contents.
+
+    Used by backends to validate a whole `multi_edit` before writing anything.
+
+    Args:
+        edits: Edits to apply, in order. Later edits see the result of earlier ones.
+        contents: Current content of every edited file, None for files that don't exist.
+
+    Returns:
+        Dict mapping each edited path (in first-edit order) to (new_content, occurrences)
+        on success, or an error message naming the first failing edit.
+    """
+    if not edits:
+        return "Error: No edits provided"
+
+    plan: dict[str, tuple[str, int]] = {}
+    for index, edit in enumerate(edits, start=1):
+        file_path = edit["file_path"]
+        if file_path in plan:
+            content, total = plan[file_path]
+        else:
+            content, total = contents.get(file_path), 0
+        if content is None:
+            reason = f"File '{file_path}' not found"
+        else:
+            result = perform_string_replacement(content, edit["old_string"], edit["new_string"], edit.get("replace_all", False))
+            if not isinstance(result, str):
+                new_content, occurrences = result
+                plan[file_path] = (new_content, total + occurrences)
+                continue
+            reason = result.removeprefix("Error: ")
+        return f"Error: Edit {index} of {len(edits)} failed for '{file_path}': {reason}\nNo files were changed."
+    return plan
+
+
 def truncate_if_too_long(result: list[str] | str) -> list[str] | str:
     """Truncate list or string result if it exceeds token limit (rough estimate: 4 chars/token)."""
     if isinstance(result, list):
@@ -383,17 +571,172 @@ def _grep_search_files(
 # -------- Structured helpers for composition --------
 
 
+def parse_cursor(cursor: str | None) -> int:
+    """Decode an offset cursor produced by `paginate`.
+
+    Args:
+        cursor: Cursor string, or None for the first page.
+
+    Returns:
+        Number of results to skip. Malformed cursors restart from the beginning.
+    """
+    if not cursor:
+        return 0
+    try:
+        return max(int(cursor), 0)
+    except ValueError:
+        return 0
+
+
+def paginate(items: Iterable[Any], max_results: int | None, cursor: str | None) -> list[Any]:
+    """Cut one page out of a lazily produced result stream.
+
+    Consumes at most `skip + max_results + 1` items from `items`, so backends
+    that produce results lazily stop working once the page is full.
+
+    Args:
+        items: Results in a deterministic order.
+        max_results: Page size. If None, every remaining result is returned.
+        cursor: Offset cursor from a previous page, or None for the first page.
+
+    Returns:
+        A plain list when neither `max_results` nor `cursor` is given, otherwise
+        a `ResultPage` whose `cursor` is None on the last page.
+    """
+    if max_results is None and cursor is None:
+        return list(items)
+    skip = parse_cursor(cursor)
+    iterator = iter(items)
+    if max_results is None:
+        return ResultPage(islice(iterator, skip, None))
+    page = ResultPage(islice(iterator, skip, skip + max_results))
+    if len(page) == max_results and any(True for _ in islice(iterator, 1)):
+        page.cursor = str(skip + max_results)
+    return page
+
+
+def page_from_window(items: list[Any], skip: int, max_results: int | None) -> ResultPage:
+    """Build a page from results fetched after skipping `skip`, with one extra item past `max_results`.
+
+    For backends that cut the page remotely (e.g. `tail`/`head` in a sandbox)
+    and fetch one extra result to learn whether a next page exists.
+    """
+    if max_results is None or len(items) <= max_results:
+        return ResultPage(items)
+    return ResultPage(items[:max_results], cursor=str(skip + max_results))
+
+
+def _iter_grep_matches(
+    files: Iterable[tuple[str, Any]],
+    regex: re.Pattern[str],
+    normalized_path: str,
+    glob: str | None,
+) -> Iterator[GrepMatch]:
+    for file_path, file_data in files:
+        if not file_path.startswith(normalized_path):
+            continue
+        if glob and not wcglob.globmatch(Path(file_path).name, glob, flags=wcglob.BRACE):
+            continue
+        for line_num, line in enumerate(file_data["content"], 1):
+            if regex.search(line):
+                yield {"path": file_path, "line": int(line_num), "text": line}
+
+
+_REGEX_ESCAPE = re.compile(r"\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|0[0-7]{0,2}|[0-7]{3}|[1-9][0-9]?|.)", re.DOTALL)
+"""One escape sequence of a regex, including all the digits or name it consumes."""
+
+
+def _required_literals(pattern: str) -> list[str]:  # noqa: PLR0912, PLR0915
+    """Return literal substrings that every line matching the regex `pattern` contains.
+
+    The extraction is conservative: only literal characters outside groups and
+    character classes that are not made optional by a quantifier are kept, and
+    patterns with alternation or case-insensitive/verbose flags yield nothing.
+    Backends use the result to skip files (or lines) that cannot match before
+    running the regex; it never decides a match on its own.
+    """
+    try:
+        flags = re.compile(pattern).flags
+    except re.error:
+        return []
+    if "|" in pattern or flags & (re.IGNORECASE | re.VERBOSE):
+        return []
+
+    literals: list[str] = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            escape = _REGEX_ESCAPE.match(pattern, i)
+            end = escape.end() if escape is not None else i + 2
+            escaped = pattern[i + 1 : end]
+            if depth == 0 and len(escaped) == 1 and not escaped.isalnum():
+                run.append(escaped)
+            else:
+                # Class escapes (\d, \w, \b, ...), code points (\x41, \u00e9, \N{...}, \101) and
+                # backreferences (\1) match something other than their own text
+                flush()
+            i = end
+            continue
+        if ch == "[":
+            # Skip the whole character class, including a leading ']' or '^]'
+            flush()
+            i += 1
+            if pattern[i : i + 1] == "^":
+                i += 1
+            if pattern[i : i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        if ch in "*?{":
+            # The previous atom may be absent from a match
+            if run:
+                run.pop()
+            flush()
+            if ch == "{":
+                i = pattern.find("}", i) + 1 or len(pattern)
+                continue
+        elif ch == "(":
+            flush()
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        elif ch in ".^$+":
+            flush()
+        elif depth == 0:
+            run.append(ch)
+        i += 1
+    flush()
+    return literals
+
+
 def grep_matches_from_files(
-    files: dict[str, Any],
+    files: Mapping[str, Any] | Iterable[tuple[str, Any]],
     pattern: str,
     path: str | None = None,
     glob: str | None = None,
+    max_results: int | None = None,
+    cursor: str | None = None,
 ) -> list[GrepMatch] | str:
     """Return structured grep matches from an in-memory files mapping.
 
     Returns a list of GrepMatch on success, or a string for invalid inputs
     (e.g., invalid regex). We deliberately do not raise here to keep backends
     non-throwing in tool contexts and preserve user-facing error messages.
+
+    `files` may also be a lazy iterable of `(path, file_data)` pairs. With
+    `max_results` or `cursor`, files are scanned in iteration order and the scan
+    stops once the page is full; the result is then a `ResultPage`.
     """
     try:
         regex = re.compile(pattern)
@@ -403,19 +746,10 @@ def grep_matches_from_files(
     try:
         normalized_path = _validate_path(path)
     except ValueError:
-        return []
-
-    filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
+        return paginate((), max_results, cursor)
 
-    if glob:
-        filtered = {fp: fd for fp, fd in filtered.items() if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)}
-
-    matches: list[GrepMatch] = []
-    for file_path, file_data in filtered.items():
-        for line_num, line in enumerate(file_data["content"], 1):
-            if regex.search(line):
-                matches.append({"path": file_path, "line": int(line_num), "text": line})
-    return matches
+    items = files.items() if isinstance(files, Mapping) else files
+    return paginate(_iter_grep_matches(items, regex, normalized_path, glob), max_results, cursor)
 
 
 def build_grep_results_dict(matches: list[GrepMatch]) -> dict[str, list[tuple[int, str]]]:
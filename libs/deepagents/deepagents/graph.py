@@ -19,12 +19,16 @@ from langgraph.store.base import BaseStore
 from langgraph.types import Checkpointer
 
 from deepagents.backends import StateBackend
+from deepagents.backends.instrumented import BackendCallbackHandler, instrument_backend
 from deepagents.backends.protocol import BackendFactory, BackendProtocol
+from deepagents.graph_cache import AgentGraphCache
 from deepagents.middleware.filesystem import FilesystemMiddleware
 from deepagents.middleware.memory import MemoryMiddleware
 from deepagents.middleware.patch_tool_calls import PatchToolCallsMiddleware
 from deepagents.middleware.skills import SkillsMiddleware
+from deepagents.middleware.subagent_cache import SubAgentResultCache
 from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
+from deepagents.middleware.tool_metrics import ToolMetricsMiddleware
 
 BASE_AGENT_PROMPT = "In order to complete the objective that the user asks of you, you have access to a number of standard tools."
 
@@ -41,7 +45,7 @@ def get_default_model() -> ChatAnthropic:
     )
 
 
-def create_deep_agent(
+def create_deep_agent(  # noqa: PLR0912
     model: str | BaseChatModel | None = None,
     tools: Sequence[BaseTool | Callable | dict[str, Any]] | None = None,
     *,
@@ -59,6 +63,11 @@ def create_deep_agent(
     debug: bool = False,
     name: str | None = None,
     cache: BaseCache | None = None,
+    backend_callbacks: Sequence[BackendCallbackHandler] | None = None,
+    tool_metrics: ToolMetricsMiddleware | None = None,
+    task_batch_concurrency: int | None = None,
+    subagent_result_cache: SubAgentResultCache | None = None,
+    graph_cache: AgentGraphCache | None = None,
 ) -> CompiledStateGraph:
     """Create a deep agent.
 
@@ -107,10 +116,30 @@ def create_deep_agent(
         debug: Whether to enable debug mode. Passed through to `create_agent`.
         name: The name of the agent. Passed through to `create_agent`.
         cache: The cache to use for the agent. Passed through to `create_agent`.
+        backend_callbacks: Optional handlers notified of every backend operation (op name,
+            path, duration, bytes in/out, error), e.g. a `BackendStatsCollector`. The backend
+            is wrapped with `instrument_backend`.
+        tool_metrics: Optional `ToolMetricsMiddleware` recording per-tool-call latency and result
+            sizes. It is installed as the outermost middleware of the agent and its subagents, so
+            its timings include large result eviction.
+        task_batch_concurrency: When set, the agent also gets a `task_batch` tool that runs a
+            list of subagent tasks concurrently, at most this many at a time.
+        subagent_result_cache: Optional `SubAgentResultCache`. Repeated `task` calls against
+            an unchanged workspace, in the same thread and on the same backend, are answered from
+            it instead of running the subagent again; a write by the agent or its subagents
+            invalidates the entries of its thread and, for storage shared across threads,
+            of its workspace.
+        graph_cache: Optional `AgentGraphCache`. A call whose arguments equal those of an
+            earlier call with the same cache returns the graph built then, instead of
+            compiling a new one; sessions sharing it are told apart by `thread_id`.
 
     Returns:
         A configured deep agent.
     """
+    if graph_cache is not None:
+        arguments = {name: value for name, value in locals().items() if name != "graph_cache"}
+        return graph_cache.get_or_build(arguments, lambda: create_deep_agent(**arguments))
+
     if model is None:
         model = get_default_model()
     elif isinstance(model, str):
@@ -132,8 +161,12 @@ def create_deep_agent(
     subagent_middleware: list[AgentMiddleware] = [
         TodoListMiddleware(),
     ]
+    if tool_metrics is not None:
+        subagent_middleware.insert(0, tool_metrics)
 
     backend = backend if backend is not None else (lambda rt: StateBackend(rt))
+    if backend_callbacks:
+        backend = instrument_backend(backend, backend_callbacks)
 
     if skills is not None:
         subagent_middleware.append(SkillsMiddleware(backend=backend, sources=skills))
@@ -155,6 +188,8 @@ def create_deep_agent(
     deepagent_middleware: list[AgentMiddleware] = [
         TodoListMiddleware(),
     ]
+    if tool_metrics is not None:
+        deepagent_middleware.insert(0, tool_metrics)
     if memory is not None:
         deepagent_middleware.append(MemoryMiddleware(backend=backend, sources=memory))
     if skills is not None:
@@ -169,6 +204,9 @@ def create_deep_agent(
                 default_middleware=subagent_middleware,
                 default_interrupt_on=interrupt_on,
                 general_purpose_agent=True,
+                task_batch_concurrency=task_batch_concurrency,
+                result_cache=subagent_result_cache,
+                backend=backend,
             ),
             SummarizationMiddleware(
                 model=model,
@@ -180,6 +218,9 @@ def create_deep_agent(
             PatchToolCallsMiddleware(),
         ]
     )
+    if subagent_result_cache is not None:
+        # Watch the main agent's tool calls too, so its writes invalidate the cache
+        deepagent_middleware.append(subagent_result_cache.watch(backend))
     if middleware:
         deepagent_middleware.extend(middleware)
     if interrupt_on is not None:
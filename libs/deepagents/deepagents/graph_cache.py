@@ -0,0 +1,200 @@
+"""Reuse of compiled agent graphs across sessions with the same configuration.
+
+Compiling a deep agent builds its whole middleware stack, tool set and
+`create_agent` graph. A server that opens a session per connection can instead
+build the graph once per configuration and run every session on it, each with
+its own `thread_id`; the graph keeps no per-session state outside the
+checkpointer, which stores it by thread.
+"""
+
+import asyncio
+import dataclasses
+import enum
+import hashlib
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from pathlib import PurePath
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, SecretStr
+
+T = TypeVar("T")
+
+
+def _fingerprint(value: Any, pins: list[Any]) -> Any:  # noqa: ANN401, PLR0911
+    """Reduce a configuration value to JSON data that compares equal exactly when the values do.
+
+    Plain data, paths, enums, dataclasses and pydantic models (which covers chat
+    models and tools) are compared by value. Functions and classes are compared by
+    qualified name when that name is unique (see `_named`). Anything else,
+    including lambdas, `functools.partial` objects and bound methods, is compared
+    by identity and appended to `pins`, which the caller keeps alive so the id
+    cannot be reused by another object.
+    """
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, PurePath):
+        return ["path", str(value)]
+    if isinstance(value, enum.Enum):
+        return ["enum", type(value).__qualname__, _fingerprint(value.value, pins)]
+    if isinstance(value, SecretStr):
+        return ["secret", hashlib.sha256(value.get_secret_value().encode("utf-8")).hexdigest()]
+    if isinstance(value, Mapping):
+        return ["map", sorted((str(k), _fingerprint(v, pins)) for k, v in value.items())]
+    if isinstance(value, list | tuple):
+        return ["seq", [_fingerprint(item, pins) for item in value]]
+    if isinstance(value, set | frozenset):
+        return ["set", sorted(json.dumps(_fingerprint(item, pins)) for item in value)]
+    if _named(value):
+        return ["name", value.__module__, value.__qualname__]
+    if dataclasses.is_dataclass(value):
+        return ["dataclass", type(value).__qualname__, _fingerprint({f.name: getattr(value, f.name) for f in dataclasses.fields(value)}, pins)]
+    if isinstance(value, BaseModel):
+        fields = {name: getattr(value, name) for name in type(value).model_fields}
+        return ["model", type(value).__module__, type(value).__qualname__, _fingerprint(fields, pins)]
+    pins.append(value)
+    return ["object", type(value).__qualname__, id(value)]
+
+
+def _named(value: object) -> bool:
+    """Whether `value` is a class or plain function that its module and qualified name identify.
+
+    Lambdas and local definitions share names such as `<lambda>` or `f.<locals>.g`;
+    partials and other callable objects have no name of their own, and bound
+    methods share the name of their function across instances.
+    """
+    if not (isinstance(value, type) or inspect.isfunction(value)):
+        return False
+    return "<" not in value.__qualname__
+
+
+def config_key(config: Mapping[str, Any]) -> tuple[str, list[Any]]:
+    """Return the cache key of an agent configuration and the objects it refers to by identity."""
+    pins: list[Any] = []
+    payload = json.dumps(_fingerprint(config, pins), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest(), pins
+
+
+@dataclasses.dataclass
+class _Entry:
+    graph: Any
+    pins: list[Any]
+
+
+class AgentGraphCache:
+    """LRU cache of compiled agent graphs keyed on their configuration.
+
+    Pass one instance to every `create_deep_agent(graph_cache=...)` call (or
+    `create_cli_agent` in the CLI) that should share graphs. Calls with an
+    equal configuration return the same graph, which is built once even when
+    the calls race. Sessions on a shared graph must use distinct `thread_id`s.
+
+    Configuration values are compared by value where that is well defined:
+    strings, numbers, paths, dataclasses and pydantic models such as chat models
+    and tools. Middleware, backends, checkpointers and other objects are compared
+    by identity, so pass the same instances (or a backend factory) to share a
+    graph between calls that use them.
+
+    Example:
+        ```python
+        from deepagents import create_deep_agent
+        from deepagents.graph_cache import AgentGraphCache
+
+        graphs = AgentGraphCache()
+
+        # Both sessions run on the same compiled graph
+        agent = create_deep_agent(model="anthropic:claude-sonnet-4-5-20250929", graph_cache=graphs)
+        same = create_deep_agent(model="anthropic:claude-sonnet-4-5-20250929", graph_cache=graphs)
+        ```
+    """
+
+    def __init__(self, max_size: int = 32) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of graphs kept; the least recently used is dropped first.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._build_locks: dict[str, threading.Lock] = {}
+        self._pending: dict[str, asyncio.Future[None]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached graphs."""
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every cached graph."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: str) -> Any:  # noqa: ANN401
+        """Return the cached graph for `key` and count a hit, or None; call with the lock held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.graph
+
+    def _put(self, key: str, graph: object, pins: list[Any]) -> None:
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = _Entry(graph, pins)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, config: Mapping[str, Any], build: Callable[[], T]) -> T:
+        """Return the graph cached for `config`, calling `build` to create it on a miss."""
+        key, pins = config_key(config)
+        with self._lock:
+            graph = self._get(key)
+            if graph is not None:
+                return graph
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._lock:
+                graph = self._get(key)
+            if graph is not None:
+                return graph
+            try:
+                graph = build()
+                self._put(key, graph, pins)
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+            return graph
+
+    async def aget_or_build(self, config: Mapping[str, Any], build: Callable[[], Awaitable[T]]) -> T:
+        """(async) Return the graph cached for `config`, awaiting `build` to create it on a miss."""
+        key, pins = config_key(config)
+        while True:
+            with self._lock:
+                graph = self._get(key)
+                if graph is not None:
+                    return graph
+                pending = self._pending.get(key)
+                if pending is None:
+                    done = asyncio.get_running_loop().create_future()
+                    self._pending[key] = done
+                    break
+            # Another task is building this graph; wait for it and look again
+            await asyncio.shield(pending)
+        try:
+            graph = await build()
+            self._put(key, graph, pins)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            done.set_result(None)
+        return graph
+
+
+__all__ = ["AgentGraphCache", "config_key"]
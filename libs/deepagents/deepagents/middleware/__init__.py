@@ -1,15 +1,23 @@
 """Middleware for the DeepAgent."""
 
+from deepagents.middleware.file_changes import FileChangesMiddleware
 from deepagents.middleware.filesystem import FilesystemMiddleware
 from deepagents.middleware.memory import MemoryMiddleware
 from deepagents.middleware.skills import SkillsMiddleware
+from deepagents.middleware.stale_reads import StaleReadsMiddleware
+from deepagents.middleware.subagent_cache import SubAgentResultCache
 from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
+from deepagents.middleware.tool_metrics import ToolMetricsMiddleware
 
 __all__ = [
     "CompiledSubAgent",
+    "FileChangesMiddleware",
     "FilesystemMiddleware",
     "MemoryMiddleware",
     "SkillsMiddleware",
+    "StaleReadsMiddleware",
     "SubAgent",
     "SubAgentMiddleware",
+    "SubAgentResultCache",
+    "ToolMetricsMiddleware",
 ]
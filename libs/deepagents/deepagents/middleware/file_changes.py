@@ -0,0 +1,101 @@
+"""Middleware that tells the agent about files changed outside its own tool calls."""
+
+from typing import Annotated, Any, NotRequired
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import PrivateStateAttr
+from langchain_core.messages import HumanMessage
+from langgraph.runtime import Runtime
+
+from deepagents.backends.change_feed import FileChange, FileChangeFeed
+from deepagents.middleware.filesystem import FilesystemState
+
+FILE_CHANGES_NOTICE = (
+    "System reminder: these files were changed outside of your tool calls since your last step:\n"
+    "{changes}\n"
+    "Re-read any of them you rely on before editing. Files not listed are unchanged since you last read them."
+)
+"""Message injected before a model call when watched files changed."""
+
+
+class FileChangesState(FilesystemState):
+    """State for the file changes middleware."""
+
+    file_changes_cursor: NotRequired[Annotated[int, PrivateStateAttr]]
+    """Feed cursor up to which changes have been reported in this thread."""
+
+
+class FileChangesMiddleware(AgentMiddleware):
+    """Inject a compact "files changed since your last step" notice before model calls.
+
+    Reads changes from a `FileChangeFeed` (see `FilesystemBackend.watch`), so
+    edits the user makes in their editor while the agent runs are reported
+    once, instead of the agent working from stale reads or re-reading every
+    file defensively. Writes made through the watched backend are not reported.
+    Cached `read_file` results for changed files are dropped, so the next read
+    returns the full content.
+
+    The first model call of a thread only records the feed position; later
+    calls report what changed since the previous one.
+
+    Args:
+        feed: Change feed of the backend the agent's file tools use.
+        max_paths: Maximum number of paths listed in one notice; the rest are counted.
+
+    Example:
+        ```python
+        from deepagents import create_deep_agent
+        from deepagents.backends import FilesystemBackend
+        from deepagents.middleware.file_changes import FileChangesMiddleware
+
+        backend = FilesystemBackend(root_dir=".", virtual_mode=True)
+        agent = create_deep_agent(backend=backend, middleware=[FileChangesMiddleware(backend.watch())])
+        ```
+    """
+
+    state_schema = FileChangesState
+
+    def __init__(self, feed: FileChangeFeed, *, max_paths: int = 20) -> None:
+        """Initialize the middleware.
+
+        Args:
+            feed: Change feed of the backend the agent's file tools use.
+            max_paths: Maximum number of paths listed in one notice.
+        """
+        super().__init__()
+        self.feed = feed
+        self.max_paths = max_paths
+
+    def before_model(self, state: FileChangesState, runtime: Runtime[Any]) -> dict[str, Any] | None:  # noqa: ARG002
+        """Report files changed since the previous model call."""
+        cursor = state.get("file_changes_cursor")
+        if cursor is None:
+            # Changes made before the thread started are not news to the agent
+            self.feed.poll()
+            return {"file_changes_cursor": self.feed.cursor}
+        changes, new_cursor = self.feed.changes_since(cursor)
+        if not changes:
+            return {"file_changes_cursor": new_cursor} if new_cursor != cursor else None
+
+        changed_paths = {change.path for change in changes}
+        stale_reads = {key: None for key in state.get("read_file_cache") or {} if key.rsplit(":", 2)[0] in changed_paths}
+        update: dict[str, Any] = {
+            "file_changes_cursor": new_cursor,
+            "messages": [HumanMessage(content=self._format_notice(changes))],
+        }
+        if stale_reads:
+            update["read_file_cache"] = stale_reads
+        return update
+
+    async def abefore_model(self, state: FileChangesState, runtime: Runtime[Any]) -> dict[str, Any] | None:
+        """(async) Report files changed since the previous model call."""
+        return self.before_model(state, runtime)
+
+    def _format_notice(self, changes: list[FileChange]) -> str:
+        lines = [f"- {change.kind}: {change.path}" for change in changes[: self.max_paths]]
+        if len(changes) > self.max_paths:
+            lines.append(f"- ... and {len(changes) - self.max_paths} more")
+        return FILE_CHANGES_NOTICE.format(changes="\n".join(lines))
+
+
+__all__ = ["FILE_CHANGES_NOTICE", "FileChangesMiddleware", "FileChangesState"]
@@ -1,16 +1,19 @@
 """Middleware for providing filesystem tools to an agent."""
 # ruff: noqa: E501
 
+import hashlib
 import os
 import re
+import time
 from collections.abc import Awaitable, Callable, Sequence
-from typing import Annotated, Literal, NotRequired
+from typing import Annotated, Literal, NotRequired, TypeVar
 
 from langchain.agents.middleware.types import (
     AgentMiddleware,
     AgentState,
     ModelRequest,
     ModelResponse,
+    PrivateStateAttr,
 )
 from langchain.tools import ToolRuntime
 from langchain.tools.tool_node import ToolCallRequest
@@ -26,13 +29,17 @@ from deepagents.backends.protocol import BACKEND_TYPES as BACKEND_TYPES
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
+    FileDownloadResponse,
+    FileEdit,
+    FileInfo,
+    GrepMatch,
+    MultiEditResult,
     SandboxBackendProtocol,
     WriteResult,
 )
 from deepagents.backends.utils import (
     format_content_with_line_numbers,
     format_grep_matches,
-    sanitize_tool_call_id,
     truncate_if_too_long,
 )
 
@@ -41,6 +48,33 @@ MAX_LINE_LENGTH = 2000
 LINE_NUMBER_WIDTH = 6
 DEFAULT_READ_OFFSET = 0
 DEFAULT_READ_LIMIT = 500
+DEFAULT_BYTE_READ_LENGTH = 4096
+"""Bytes returned by `read_file(start_byte=...)` when no `length` is given."""
+HEXDUMP_WIDTH = 16
+READ_FILES_TOKEN_BUDGET = 20000
+"""Token budget shared by all files returned from one `read_files` call (same threshold as eviction)."""
+GREP_FETCH_SIZE = 500
+"""Matches fetched per backend call when `grep` pages by file (`files_with_matches` and `count` modes)."""
+MORE_RESULTS_NOTICE = "[Showing results {start}-{end}. More results available: use offset={end} to see the next page.]"
+LARGE_TOOL_RESULTS_DIR = "/large_tool_results"
+UNCHANGED_READ_NOTICE = "File unchanged since message {message_number} (read_file call {tool_call_id}): the content of {file_path} for offset={offset}, limit={limit} shown there is still current."
+MAX_CACHED_READS = 256
+"""Default bound on the `read_file_cache` entries kept per thread by `dedupe_reads`."""
+FILE_MUTATING_TOOLS = frozenset({"write_file", "edit_file", "multi_edit"})
+"""Tools whose calls invalidate cached `read_file` results for the path they touch."""
+
+
+class ReadFilesItem(TypedDict):
+    """One file requested from the `read_files` tool."""
+
+    file_path: str
+    """Absolute path of the file to read."""
+
+    offset: NotRequired[int]
+    """Line offset to start reading from (0-indexed). Defaults to 0."""
+
+    limit: NotRequired[int]
+    """Maximum number of lines to read. Defaults to 500."""
 
 
 class FileData(TypedDict):
@@ -56,12 +90,17 @@ class FileData(TypedDict):
     """ISO 8601 timestamp of last modification."""
 
 
-def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileData | None]) -> dict[str, FileData]:
+_Value = TypeVar("_Value")
+
+
+def _file_data_reducer(left: dict[str, _Value] | None, right: dict[str, _Value | None]) -> dict[str, _Value]:
     """Merge file updates with support for deletions.
 
     This reducer enables file deletion by treating `None` values in the right
     dictionary as deletion markers. It's designed to work with LangGraph's
     state management where annotated reducers control how state updates merge.
+    It also merges the private bookkeeping dicts (`evicted_tool_results` and
+    `read_file_cache`), which delete entries the same way.
 
     Args:
         left: Existing files dictionary. May be `None` during initialization.
@@ -92,6 +131,77 @@ def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileDa
     return result
 
 
+class EvictedToolResult(TypedDict):
+    """Bookkeeping for a large tool result evicted into agent state."""
+
+    size: int
+    """Size of the evicted content in characters."""
+
+    last_used: float
+    """Unix timestamp of the last time this payload was evicted."""
+
+
+class ReadCacheEntry(TypedDict):
+    """A `read_file` result whose full content is already in the message history."""
+
+    content_hash: str
+    """SHA-256 of the formatted `read_file` output."""
+
+    tool_call_id: str
+    """ID of the `read_file` call whose ToolMessage holds the content."""
+
+
+def _content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of `content`."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _live_evictions(
+    evicted: dict[str, EvictedToolResult],
+    updates: dict[str, EvictedToolResult | None],
+) -> dict[str, EvictedToolResult]:
+    """Apply pending bookkeeping updates to the evictions in state, dropping deleted entries."""
+    return {path: entry for path, entry in {**evicted, **updates}.items() if entry is not None}
+
+
+def _read_cache_key(file_path: str, offset: int, limit: int) -> str:
+    """Return the `read_file_cache` key for a read of `file_path`."""
+    return f"{file_path}:{offset}:{limit}"
+
+
+def mutated_file_paths(args: dict) -> list[str]:
+    """Return the normalized paths a file-mutating tool call touches.
+
+    Handles both single-file tools (`file_path`) and `multi_edit` (`edits`).
+    Paths that fail validation are skipped.
+    """
+    raw_paths = [edit.get("file_path") for edit in args.get("edits") or [] if isinstance(edit, dict)]
+    if "file_path" in args:
+        raw_paths.append(args["file_path"])
+    file_paths = []
+    for raw_path in raw_paths:
+        try:
+            file_paths.append(_validate_path(raw_path))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(file_paths))
+
+
+def large_tool_result_path(content: str) -> str:
+    """Return the content-addressed path a large tool result is evicted to.
+
+    Identical payloads map to the same path, so evicting the same output twice
+    (for example the same failing test log) stores it only once.
+
+    Args:
+        content: The stringified tool result.
+
+    Returns:
+        Path of the form `/large_tool_results/<sha256 prefix>`.
+    """
+    return f"{LARGE_TOOL_RESULTS_DIR}/{_content_hash(content)[:32]}"
+
+
 def _validate_path(path: str, *, allowed_prefixes: Sequence[str] | None = None) -> str:
     r"""Validate and normalize file path for security.
 
@@ -156,6 +266,12 @@ class FilesystemState(AgentState):
     files: Annotated[NotRequired[dict[str, FileData]], _file_data_reducer]
     """Files in the filesystem."""
 
+    evicted_tool_results: Annotated[NotRequired[dict[str, EvictedToolResult]], PrivateStateAttr, _file_data_reducer]
+    """LRU bookkeeping for large tool results evicted into the `files` state, keyed by path."""
+
+    read_file_cache: Annotated[NotRequired[dict[str, ReadCacheEntry]], PrivateStateAttr, _file_data_reducer]
+    """`read_file` results already shown in this thread, keyed by `path:offset:limit`."""
+
 
 LIST_FILES_TOOL_DESCRIPTION = """Lists all files in the filesystem, filtering by directory.
 
@@ -180,8 +296,20 @@ Usage:
 - Results are returned using cat -n format, with line numbers starting at 1
 - You have the capability to call multiple tools in a single response. It is always better to speculatively read multiple files as a batch that are potentially useful.
 - If you read a file that exists but has empty contents you will receive a system reminder warning in place of file contents.
+- To check the end of a file (e.g. a growing build log), pass tail=N to get its last N lines without reading the rest of the file. These lines are shown without line numbers
+- To sample raw bytes (e.g. of a binary file), pass start_byte and optionally length (default 4096). Binary content is shown as a hex dump
+- tail and start_byte cannot be combined; offset and limit are ignored when either is given
 - You should ALWAYS make sure a file has been read before editing it."""
 
+READ_FILES_TOOL_DESCRIPTION = """Reads several files from the filesystem in a single call.
+
+Usage:
+- The files parameter is a list of objects with a `file_path` and optional `offset` and `limit`, with the same meaning as in read_file
+- Prefer this tool over several read_file calls when you already know which files you need, e.g. when exploring a module
+- Each file is returned under a `==> /path <==` header, in the order requested, formatted like read_file output
+- All files share one output budget of about 20000 tokens. Files that do not fit are cut off or skipped, with a note telling you the offset to continue from using read_file
+- Errors for individual files (e.g. a file that does not exist) are reported under that file's header and do not affect the other files"""
+
 EDIT_FILE_TOOL_DESCRIPTION = """Performs exact string replacements in files.
 
 Usage:
@@ -193,6 +321,16 @@ Usage:
 - Use `replace_all` for replacing and renaming strings across the file. This parameter is useful if you want to rename a variable for instance."""
 
 
+MULTI_EDIT_TOOL_DESCRIPTION = """Performs several exact string replacements across one or more files in a single call.
+
+Usage:
+- The edits parameter is an ordered list of objects with `file_path`, `old_string`, `new_string` and optional `replace_all`, with the same meaning as in edit_file
+- Prefer this tool over several edit_file calls for refactors, renames and any change that touches several places
+- Edits are applied in order, so a later edit sees the result of earlier edits to the same file
+- The call is all-or-nothing: if any edit fails (file not found, `old_string` not found, or `old_string` not unique without `replace_all`), no file is changed and the error names the failing edit
+- The same rules as edit_file apply: read each file before editing it and preserve the exact indentation shown after the line number prefix"""
+
+
 WRITE_FILE_TOOL_DESCRIPTION = """Writes to a new file in the filesystem.
 
 Usage:
@@ -209,6 +347,7 @@ Usage:
 - Supports standard glob patterns: `*` (any characters), `**` (any directories), `?` (single character)
 - Patterns can be absolute (starting with `/`) or relative
 - Returns a list of absolute file paths that match the pattern
+- Use `head_limit` to return at most that many paths and `offset` to skip paths already seen; the search stops as soon as the page is full
 
 Examples:
 - `**/*.py` - Find all Python files
@@ -226,11 +365,13 @@ Usage:
   - `files_with_matches`: List only file paths containing matches (default)
   - `content`: Show matching lines with file path and line numbers
   - `count`: Show count of matches per file
+- The head_limit parameter caps the number of results (files, or matching lines in `content` mode) and the offset parameter skips results already seen. The search stops once the page is full, so prefer a head_limit for broad patterns
 
 Examples:
 - Search all files: `grep(pattern="TODO")`
 - Search Python files only: `grep(pattern="import", glob="*.py")`
-- Show matching lines: `grep(pattern="error", output_mode="content")`"""
+- Show matching lines: `grep(pattern="error", output_mode="content")`
+- Page through matching lines: `grep(pattern="error", output_mode="content", head_limit=50, offset=50)`"""
 
 EXECUTE_TOOL_DESCRIPTION = """Executes a given command in the sandbox environment with proper handling and security measures.
 
@@ -276,15 +417,17 @@ Examples:
 Note: This tool is only available if the backend supports execution (SandboxBackendProtocol).
 If execution is not supported, the tool will return an error message."""
 
-FILESYSTEM_SYSTEM_PROMPT = """## Filesystem Tools `ls`, `read_file`, `write_file`, `edit_file`, `glob`, `grep`
+FILESYSTEM_SYSTEM_PROMPT = """## Filesystem Tools `ls`, `read_file`, `read_files`, `write_file`, `edit_file`, `multi_edit`, `glob`, `grep`
 
 You have access to a filesystem which you can interact with using these tools.
 All file paths must start with a /.
 
 - ls: list files in a directory (requires absolute path)
 - read_file: read a file from the filesystem
+- read_files: read several files in one call
 - write_file: write to a file in the filesystem
 - edit_file: edit a file in the filesystem
+- multi_edit: apply several edits across one or more files at once
 - glob: find files matching a pattern (e.g., "**/*.py")
 - grep: search for text within files"""
 
@@ -372,22 +515,42 @@ def _read_file_tool_generator(
         runtime: ToolRuntime[None, FilesystemState],
         offset: int = DEFAULT_READ_OFFSET,
         limit: int = DEFAULT_READ_LIMIT,
+        tail: int | None = None,
+        start_byte: int | None = None,
+        length: int | None = None,
     ) -> str:
         """Synchronous wrapper for read_file tool."""
         resolved_backend = _get_backend(backend, runtime)
         file_path = _validate_path(file_path)
-        return resolved_backend.read(file_path, offset=offset, limit=limit)
+        if tail is None and start_byte is None:
+            return resolved_backend.read(file_path, offset=offset, limit=limit)
+        if error := _partial_read_error(tail, start_byte, length):
+            return error
+        if tail is not None:
+            return _format_tail(resolved_backend.tail(file_path, tail))
+        length = DEFAULT_BYTE_READ_LENGTH if length is None else length
+        return _format_byte_range(resolved_backend.read_range(file_path, start_byte, length), start_byte, length)
 
     async def async_read_file(
         file_path: str,
         runtime: ToolRuntime[None, FilesystemState],
         offset: int = DEFAULT_READ_OFFSET,
         limit: int = DEFAULT_READ_LIMIT,
+        tail: int | None = None,
+        start_byte: int | None = None,
+        length: int | None = None,
     ) -> str:
         """Asynchronous wrapper for read_file tool."""
         resolved_backend = _get_backend(backend, runtime)
         file_path = _validate_path(file_path)
-        return await resolved_backend.aread(file_path, offset=offset, limit=limit)
+        if tail is None and start_byte is None:
+            return await resolved_backend.aread(file_path, offset=offset, limit=limit)
+        if error := _partial_read_error(tail, start_byte, length):
+            return error
+        if tail is not None:
+            return _format_tail(await resolved_backend.atail(file_path, tail))
+        length = DEFAULT_BYTE_READ_LENGTH if length is None else length
+        return _format_byte_range(await resolved_backend.aread_range(file_path, start_byte, length), start_byte, length)
 
     return StructuredTool.from_function(
         name="read_file",
@@ -397,6 +560,199 @@ def _read_file_tool_generator(
     )
 
 
+def _partial_read_error(tail: int | None, start_byte: int | None, length: int | None) -> str | None:
+    """Validate the `tail`/`start_byte`/`length` arguments of `read_file`, returning an error string if invalid."""
+    if tail is not None and start_byte is not None:
+        return "Error: tail and start_byte cannot be combined"
+    if tail is not None and tail < 1:
+        return "Error: tail must be a positive number of lines"
+    if start_byte is not None and start_byte < 0:
+        return "Error: start_byte must not be negative"
+    if length is not None and length < 1:
+        return "Error: length must be a positive number of bytes"
+    return None
+
+
+def _download_error_message(response: FileDownloadResponse) -> str:
+    """Render a failed download the way `read_file` reports errors."""
+    error = response.error or "file_not_found"
+    if error == "file_not_found":
+        return f"Error: File '{response.path}' not found"
+    return f"Error reading file '{response.path}': {error}"
+
+
+def _format_tail(response: FileDownloadResponse) -> str:
+    """Render a `tail` response for the read_file tool."""
+    if response.error is not None or response.content is None:
+        return _download_error_message(response)
+    content = response.content.decode("utf-8", errors="replace")
+    if not content or content.strip() == "":
+        return EMPTY_CONTENT_WARNING
+    lines = content.splitlines()
+    return f"[Last {len(lines)} lines of {response.path}]\n" + "\n".join(lines)
+
+
+def _hexdump(content: bytes, start_byte: int) -> str:
+    """Format bytes as `offset  hex  ascii` rows, like `xxd`."""
+    rows = []
+    for i in range(0, len(content), HEXDUMP_WIDTH):
+        chunk = content[i : i + HEXDUMP_WIDTH]
+        hex_part = " ".join(f"{byte:02x}" for byte in chunk)
+        text_part = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)  # noqa: PLR2004
+        rows.append(f"{start_byte + i:08x}  {hex_part:<{HEXDUMP_WIDTH * 3 - 1}}  {text_part}")
+    return "\n".join(rows)
+
+
+def _format_byte_range(response: FileDownloadResponse, start_byte: int, length: int) -> str:
+    """Render a `read_range` response for the read_file tool, as text or as a hex dump for binary content."""
+    if response.error is not None or response.content is None:
+        return _download_error_message(response)
+    content = response.content
+    if not content:
+        return f"Error: Byte offset {start_byte} is at or past the end of '{response.path}'"
+    end = start_byte + len(content)
+    binary = b"\x00" in content
+    header = f"[Bytes {start_byte}-{end - 1} of {response.path}{', binary, shown as hex dump' if binary else ''}]"
+    body = _hexdump(content, start_byte) if binary else content.decode("utf-8", errors="replace")
+    footer = f"\n[More bytes may follow: use start_byte={end} to continue.]" if len(content) == length else ""
+    return f"{header}\n{body}{footer}"
+
+
+def _read_files_requests(files: list[ReadFilesItem]) -> list[tuple[str, int, int] | str]:
+    """Normalize `read_files` arguments into `(path, offset, limit)` tuples, or an error string per invalid entry."""
+    requests: list[tuple[str, int, int] | str] = []
+    for item in files:
+        try:
+            file_path = _validate_path(item["file_path"])
+        except ValueError as e:
+            requests.append(f"Error: {e}")
+            continue
+        requests.append((file_path, item.get("offset", DEFAULT_READ_OFFSET), item.get("limit", DEFAULT_READ_LIMIT)))
+    return requests
+
+
+def _unique_paths(requests: list[tuple[str, int, int] | str]) -> list[str]:
+    """Paths to download, each once, in request order."""
+    return list(dict.fromkeys(request[0] for request in requests if not isinstance(request, str)))
+
+
+def _format_read_files(
+    files: list[ReadFilesItem],
+    requests: list[tuple[str, int, int] | str],
+    responses: list[FileDownloadResponse],
+    token_budget: int = READ_FILES_TOKEN_BUDGET,
+) -> str:
+    """Format downloaded files like `read_file` output under one shared token budget.
+
+    Args:
+        files: The original `read_files` arguments, used for the section headers.
+        requests: Normalized requests from `_read_files_requests`.
+        responses: Download responses for `_unique_paths(requests)`, in the same order.
+        token_budget: Approximate number of tokens (4 characters each) all sections may use together.
+
+    Returns:
+        One `==> path <==` section per requested file, in request order.
+    """
+    by_path = {response.path: response for response in responses}
+    remaining = token_budget * 4
+    sections = []
+    for item, request in zip(files, requests, strict=True):
+        header = f"==> {item['file_path']} <=="
+        if isinstance(request, str):
+            sections.append(f"{header}\n{request}")
+            continue
+        file_path, offset, limit = request
+        if remaining <= 0:
+            sections.append(f"{header}\n[Not read: output budget exhausted. Use read_file(file_path='{file_path}', offset={offset}) to read it.]")
+            continue
+
+        response = by_path.get(file_path)
+        if response is None or response.error is not None or response.content is None:
+            error = response.error if response is not None else "file_not_found"
+            body = f"Error: File '{file_path}' not found" if error == "file_not_found" else f"Error reading file '{file_path}': {error}"
+            sections.append(f"{header}\n{body}")
+            continue
+        try:
+            content = response.content.decode("utf-8")
+        except UnicodeDecodeError as e:
+            sections.append(f"{header}\nError reading file '{file_path}': {e}")
+            continue
+        if not content or content.strip() == "":
+            sections.append(f"{header}\n{EMPTY_CONTENT_WARNING}")
+            continue
+        lines = content.splitlines()
+        if offset >= len(lines):
+            sections.append(f"{header}\nError: Line offset {offset} exceeds file length ({len(lines)} lines)")
+            continue
+
+        selected = lines[offset : min(offset + limit, len(lines))]
+        shown: list[str] = []
+        used = len(header) + 1
+        # Budget whole source lines, so a long line is never cut between its continuation chunks.
+        for line_number, line in enumerate(selected, start=offset + 1):
+            block = format_content_with_line_numbers([line], start_line=line_number)
+            if used + len(block) + 1 > remaining:
+                break
+            shown.append(block)
+            used += len(block) + 1
+
+        if len(shown) == len(selected):
+            remaining -= used
+            sections.append(f"{header}\n" + "\n".join(shown))
+            continue
+        # The budget is spent: stop here rather than squeezing fragments of later files in.
+        remaining = 0
+        if not shown:
+            sections.append(f"{header}\n[Not read: output budget exhausted. Use read_file(file_path='{file_path}', offset={offset}) to read it.]")
+            continue
+        note = f"[Truncated: output budget exhausted. Use read_file(file_path='{file_path}', offset={offset + len(shown)}) to continue.]"
+        sections.append(f"{header}\n" + "\n".join(shown) + f"\n{note}")
+    return "\n\n".join(sections)
+
+
+def _read_files_tool_generator(
+    backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
+    custom_description: str | None = None,
+) -> BaseTool:
+    """Generate the read_files tool.
+
+    Every requested file is fetched with a single `download_files` call on the
+    resolved backend. `CompositeBackend` groups those paths by route, so each
+    underlying backend is called once per tool call.
+
+    Args:
+        backend: Backend to use for file storage, or a factory function that takes runtime and returns a backend.
+        custom_description: Optional custom description for the tool.
+
+    Returns:
+        Configured read_files tool that reads several files using the backend.
+    """
+    tool_description = custom_description or READ_FILES_TOOL_DESCRIPTION
+
+    def sync_read_files(files: list[ReadFilesItem], runtime: ToolRuntime[None, FilesystemState]) -> str:
+        """Synchronous wrapper for read_files tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        requests = _read_files_requests(files)
+        paths = _unique_paths(requests)
+        responses = resolved_backend.download_files(paths) if paths else []
+        return _format_read_files(files, requests, responses)
+
+    async def async_read_files(files: list[ReadFilesItem], runtime: ToolRuntime[None, FilesystemState]) -> str:
+        """Asynchronous wrapper for read_files tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        requests = _read_files_requests(files)
+        paths = _unique_paths(requests)
+        responses = await resolved_backend.adownload_files(paths) if paths else []
+        return _format_read_files(files, requests, responses)
+
+    return StructuredTool.from_function(
+        name="read_files",
+        description=tool_description,
+        func=sync_read_files,
+        coroutine=async_read_files,
+    )
+
+
 def _write_file_tool_generator(
     backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
     custom_description: str | None = None,
@@ -551,6 +907,137 @@ def _edit_file_tool_generator(
     )
 
 
+def _multi_edit_message(res: MultiEditResult) -> str:
+    """Summarize a successful multi_edit for the model."""
+    occurrences = res.occurrences or {}
+    summary = ", ".join(f"'{path}' ({occurrences.get(path, 0)} replacement(s))" for path in res.paths or [])
+    return f"Successfully applied {sum(occurrences.values())} replacement(s) across {len(res.paths or [])} file(s): {summary}"
+
+
+def _multi_edit_tool_generator(
+    backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
+    custom_description: str | None = None,
+) -> BaseTool:
+    """Generate the multi_edit tool.
+
+    Args:
+        backend: Backend to use for file storage, or a factory function that takes runtime and returns a backend.
+        custom_description: Optional custom description for the tool.
+
+    Returns:
+        Configured multi_edit tool that applies several string replacements atomically using the backend.
+    """
+    tool_description = custom_description or MULTI_EDIT_TOOL_DESCRIPTION
+
+    def sync_multi_edit(edits: list[FileEdit], runtime: ToolRuntime[None, FilesystemState]) -> Command | str:
+        """Synchronous wrapper for multi_edit tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        edits = [{**edit, "file_path": _validate_path(edit["file_path"])} for edit in edits]
+        res: MultiEditResult = resolved_backend.multi_edit(edits)
+        if res.error:
+            return res.error
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [ToolMessage(content=_multi_edit_message(res), tool_call_id=runtime.tool_call_id)],
+                }
+            )
+        return _multi_edit_message(res)
+
+    async def async_multi_edit(edits: list[FileEdit], runtime: ToolRuntime[None, FilesystemState]) -> Command | str:
+        """Asynchronous wrapper for multi_edit tool."""
+        resolved_backend = _get_backend(backend, runtime)
+        edits = [{**edit, "file_path": _validate_path(edit["file_path"])} for edit in edits]
+        res: MultiEditResult = await resolved_backend.amulti_edit(edits)
+        if res.error:
+            return res.error
+        if res.files_update is not None:
+            return Command(
+                update={
+                    "files": res.files_update,
+                    "messages": [ToolMessage(content=_multi_edit_message(res), tool_call_id=runtime.tool_call_id)],
+                }
+            )
+        return _multi_edit_message(res)
+
+    return StructuredTool.from_function(
+        name="multi_edit",
+        description=tool_description,
+        func=sync_multi_edit,
+        coroutine=async_multi_edit,
+    )
+
+
+def _check_page_args(offset: int, head_limit: int | None) -> str | None:
+    """Validate the `offset`/`head_limit` arguments of the search tools."""
+    if offset < 0:
+        return "Error: offset must be 0 or greater"
+    if head_limit is not None and head_limit < 1:
+        return "Error: head_limit must be 1 or greater"
+    return None
+
+
+def _with_more_notice(result: str, offset: int, shown: int, *, has_more: bool) -> str:
+    """Append a note pointing at the next page when results were cut off by `head_limit`."""
+    if not has_more:
+        return result
+    return f"{result}\n\n{MORE_RESULTS_NOTICE.format(start=offset + 1, end=offset + shown)}"
+
+
+def _format_glob_page(infos: list[FileInfo], offset: int) -> str:
+    """Format a glob result, dropping the first `offset` paths of a page fetched from the start."""
+    paths = [fi.get("path", "") for fi in infos][offset:]
+    result = str(truncate_if_too_long(paths))
+    return _with_more_notice(result, offset, len(paths), has_more=getattr(infos, "cursor", None) is not None)
+
+
+def _grep_entries(matches: list[GrepMatch], output_mode: str) -> list[GrepMatch] | list[str]:
+    """The units `offset`/`head_limit` count: matching lines in content mode, otherwise files in first-seen order."""
+    if output_mode == "content":
+        return matches
+    return list(dict.fromkeys(m["path"] for m in matches))
+
+
+def _grep_page_full(matches: list[GrepMatch], output_mode: str, needed: int) -> bool:
+    """Whether enough matches were fetched to fill the page.
+
+    In file modes one file past the page is required, because a file's matches
+    are only known to be complete once the backend has moved on to the next file.
+    """
+    entries = _grep_entries(matches, output_mode)
+    return len(entries) >= needed if output_mode == "content" else len(entries) > needed
+
+
+def _grep_fetch_size(matches: list[GrepMatch], output_mode: str, needed: int) -> int:
+    """Number of matches to request from the backend in the next call."""
+    if output_mode == "content":
+        return needed - len(matches)
+    return GREP_FETCH_SIZE
+
+
+def _format_grep_page(
+    matches: list[GrepMatch],
+    output_mode: Literal["files_with_matches", "content", "count"],
+    offset: int,
+    head_limit: int | None,
+    *,
+    has_more: bool,
+) -> str:
+    """Format the `[offset, offset + head_limit)` window of grep results."""
+    entries = _grep_entries(matches, output_mode)
+    end = None if head_limit is None else offset + head_limit
+    window = entries[offset:end]
+    has_more = has_more or (end is not None and len(entries) > end)
+    if output_mode == "content":
+        selected = window
+    else:
+        selected_paths = set(window)
+        selected = [m for m in matches if m["path"] in selected_paths]
+    result = truncate_if_too_long(format_grep_matches(selected, output_mode))
+    return _with_more_notice(str(result), offset, len(window), has_more=has_more)
+
+
 def _glob_tool_generator(
     backend: BackendProtocol | Callable[[ToolRuntime], BackendProtocol],
     custom_description: str | None = None,
@@ -566,21 +1053,39 @@ def _glob_tool_generator(
     """
     tool_description = custom_description or GLOB_TOOL_DESCRIPTION
 
-    def sync_glob(pattern: str, runtime: ToolRuntime[None, FilesystemState], path: str = "/") -> str:
+    def sync_glob(
+        pattern: str,
+        runtime: ToolRuntime[None, FilesystemState],
+        path: str = "/",
+        offset: int = 0,
+        head_limit: int | None = None,
+    ) -> str:
         """Synchronous wrapper for glob tool."""
+        if error := _check_page_args(offset, head_limit):
+            return error
         resolved_backend = _get_backend(backend, runtime)
-        infos = resolved_backend.glob_info(pattern, path=path)
-        paths = [fi.get("path", "") for fi in infos]
-        result = truncate_if_too_long(paths)
-        return str(result)
+        if head_limit is None:
+            infos = resolved_backend.glob_info(pattern, path=path)
+        else:
+            infos = resolved_backend.glob_info(pattern, path=path, max_results=offset + head_limit)
+        return _format_glob_page(infos, offset)
 
-    async def async_glob(pattern: str, runtime: ToolRuntime[None, FilesystemState], path: str = "/") -> str:
+    async def async_glob(
+        pattern: str,
+        runtime: ToolRuntime[None, FilesystemState],
+        path: str = "/",
+        offset: int = 0,
+        head_limit: int | None = None,
+    ) -> str:
         """Asynchronous wrapper for glob tool."""
+        if error := _check_page_args(offset, head_limit):
+            return error
         resolved_backend = _get_backend(backend, runtime)
-        infos = await resolved_backend.aglob_info(pattern, path=path)
-        paths = [fi.get("path", "") for fi in infos]
-        result = truncate_if_too_long(paths)
-        return str(result)
+        if head_limit is None:
+            infos = await resolved_backend.aglob_info(pattern, path=path)
+        else:
+            infos = await resolved_backend.aglob_info(pattern, path=path, max_results=offset + head_limit)
+        return _format_glob_page(infos, offset)
 
     return StructuredTool.from_function(
         name="glob",
@@ -611,14 +1116,29 @@ def _grep_tool_generator(
         path: str | None = None,
         glob: str | None = None,
         output_mode: Literal["files_with_matches", "content", "count"] = "files_with_matches",
+        offset: int = 0,
+        head_limit: int | None = None,
     ) -> str:
         """Synchronous wrapper for grep tool."""
+        if error := _check_page_args(offset, head_limit):
+            return error
         resolved_backend = _get_backend(backend, runtime)
-        raw = resolved_backend.grep_raw(pattern, path=path, glob=glob)
-        if isinstance(raw, str):
-            return raw
-        formatted = format_grep_matches(raw, output_mode)
-        return truncate_if_too_long(formatted)  # type: ignore[arg-type]
+        if head_limit is None:
+            raw = resolved_backend.grep_raw(pattern, path=path, glob=glob)
+            return raw if isinstance(raw, str) else _format_grep_page(raw, output_mode, offset, None, has_more=False)
+
+        matches: list[GrepMatch] = []
+        cursor = None
+        while True:
+            fetch_size = _grep_fetch_size(matches, output_mode, offset + head_limit)
+            raw = resolved_backend.grep_raw(pattern, path=path, glob=glob, max_results=fetch_size, cursor=cursor)
+            if isinstance(raw, str):
+                return raw
+            matches.extend(raw)
+            cursor = getattr(raw, "cursor", None)
+            if cursor is None or _grep_page_full(matches, output_mode, offset + head_limit):
+                break
+        return _format_grep_page(matches, output_mode, offset, head_limit, has_more=cursor is not None)
 
     async def async_grep(
         pattern: str,
@@ -626,14 +1146,29 @@ def _grep_tool_generator(
         path: str | None = None,
         glob: str | None = None,
         output_mode: Literal["files_with_matches", "content", "count"] = "files_with_matches",
+        offset: int = 0,
+        head_limit: int | None = None,
     ) -> str:
         """Asynchronous wrapper for grep tool."""
+        if error := _check_page_args(offset, head_limit):
+            return error
         resolved_backend = _get_backend(backend, runtime)
-        raw = await resolved_backend.agrep_raw(pattern, path=path, glob=glob)
-        if isinstance(raw, str):
-            return raw
-        formatted = format_grep_matches(raw, output_mode)
-        return truncate_if_too_long(formatted)  # type: ignore[arg-type]
+        if head_limit is None:
+            raw = await resolved_backend.agrep_raw(pattern, path=path, glob=glob)
+            return raw if isinstance(raw, str) else _format_grep_page(raw, output_mode, offset, None, has_more=False)
+
+        matches: list[GrepMatch] = []
+        cursor = None
+        while True:
+            fetch_size = _grep_fetch_size(matches, output_mode, offset + head_limit)
+            raw = await resolved_backend.agrep_raw(pattern, path=path, glob=glob, max_results=fetch_size, cursor=cursor)
+            if isinstance(raw, str):
+                return raw
+            matches.extend(raw)
+            cursor = getattr(raw, "cursor", None)
+            if cursor is None or _grep_page_full(matches, output_mode, offset + head_limit):
+                break
+        return _format_grep_page(matches, output_mode, offset, head_limit, has_more=cursor is not None)
 
     return StructuredTool.from_function(
         name="grep",
@@ -758,8 +1293,10 @@ def _execute_tool_generator(
 TOOL_GENERATORS = {
     "ls": _ls_tool_generator,
     "read_file": _read_file_tool_generator,
+    "read_files": _read_files_tool_generator,
     "write_file": _write_file_tool_generator,
     "edit_file": _edit_file_tool_generator,
+    "multi_edit": _multi_edit_tool_generator,
     "glob": _glob_tool_generator,
     "grep": _grep_tool_generator,
     "execute": _execute_tool_generator,
@@ -777,7 +1314,7 @@ def _get_filesystem_tools(
         custom_tool_descriptions: Optional custom descriptions for tools.
 
     Returns:
-        List of configured tools: ls, read_file, write_file, edit_file, glob, grep, execute.
+        List of configured tools: ls, read_file, read_files, write_file, edit_file, multi_edit, glob, grep, execute.
     """
     if custom_tool_descriptions is None:
         custom_tool_descriptions = {}
@@ -817,6 +1354,9 @@ class FilesystemMiddleware(AgentMiddleware):
         system_prompt: Optional custom system prompt override.
         custom_tool_descriptions: Optional custom tool descriptions override.
         tool_token_limit_before_evict: Optional token limit before evicting a tool result to the filesystem.
+        max_evicted_results_size: Optional bound, in characters, on evicted tool results kept in agent state.
+        dedupe_reads: Whether identical re-reads return an "unchanged" notice instead of the full content.
+        max_cached_reads: Maximum number of `read_file` results remembered for `dedupe_reads`.
 
     Example:
         ```python
@@ -848,6 +1388,9 @@ class FilesystemMiddleware(AgentMiddleware):
         system_prompt: str | None = None,
         custom_tool_descriptions: dict[str, str] | None = None,
         tool_token_limit_before_evict: int | None = 20000,
+        max_evicted_results_size: int | None = None,
+        dedupe_reads: bool = False,
+        max_cached_reads: int = MAX_CACHED_READS,
     ) -> None:
         """Initialize the filesystem middleware.
 
@@ -857,8 +1400,26 @@ class FilesystemMiddleware(AgentMiddleware):
             system_prompt: Optional custom system prompt override.
             custom_tool_descriptions: Optional custom tool descriptions override.
             tool_token_limit_before_evict: Optional token limit before evicting a tool result to the filesystem.
+            max_evicted_results_size: Optional bound, in characters, on the evicted tool results kept in
+                agent state under `/large_tool_results/`. When exceeded, the least recently evicted
+                payloads are deleted. Results written to external backends (store, disk, sandbox) are
+                not pruned since `BackendProtocol` has no delete operation; use a compressed
+                `StoreBackend` route for those instead.
+            dedupe_reads: Whether to keep a per-thread cache of `read_file` results keyed by
+                `(path, offset, limit, content hash)`. When the same range is read again and its
+                content is unchanged, the tool returns a short notice pointing at the earlier
+                message instead of resending the full content. Entries are invalidated by
+                `write_file`/`edit_file` on the path, and any change to the file on the backend
+                (e.g. a newer mtime with different content) changes the hash and yields a full read.
+                The earlier message must still be present and unmodified in the history (it may have
+                been summarized away), otherwise the full content is returned. Defaults to False.
+            max_cached_reads: Maximum number of reads kept in that cache; recording a read beyond it
+                drops the oldest recorded entries.
         """
         self.tool_token_limit_before_evict = tool_token_limit_before_evict
+        self.max_evicted_results_size = max_evicted_results_size
+        self.dedupe_reads = dedupe_reads
+        self.max_cached_reads = max_cached_reads
 
         # Use provided backend or default to StateBackend factory
         self.backend = backend if backend is not None else (lambda rt: StateBackend(rt))
@@ -975,34 +1536,18 @@ class FilesystemMiddleware(AgentMiddleware):
 
         return await handler(request)
 
-    def _process_large_message(
-        self,
-        message: ToolMessage,
-        resolved_backend: BackendProtocol,
-    ) -> tuple[ToolMessage, dict[str, FileData] | None]:
-        """Process a large ToolMessage by evicting its content to filesystem.
+    def _evictable_content(self, message: ToolMessage) -> str | None:
+        """Return the stringified content of `message` if it is large enough to evict.
 
         Args:
-            message: The ToolMessage with large content to evict.
-            resolved_backend: The filesystem backend to write the content to.
+            message: The ToolMessage to check.
 
         Returns:
-            A tuple of (processed_message, files_update):
-            - processed_message: New ToolMessage with truncated content and file reference
-            - files_update: Dict of file updates to apply to state, or None if eviction failed
-
-        Note:
-            The entire content is converted to string, written to /large_tool_results/{tool_call_id},
-            and replaced with a truncated preview plus file reference. The replacement is always
-            returned as a plain string for consistency, regardless of original content type.
-
-            ToolMessage supports multimodal content blocks (images, audio, etc.), but these are
-            uncommon in tool results. For simplicity, all content is stringified and evicted.
-            The model can recover by reading the offloaded file from the backend.
+            The content as a string, or None if eviction is disabled or the content is small.
         """
         # Early exit if eviction not configured
         if not self.tool_token_limit_before_evict:
-            return message, None
+            return None
 
         # Convert content to string once for both size check and eviction
         # Special case: single text block - extract text directly for readability
@@ -1024,15 +1569,11 @@ class FilesystemMiddleware(AgentMiddleware):
         # Using 4 chars per token as a conservative approximation (actual ratio varies by content)
         # This errs on the high side to avoid premature eviction of content that might fit
         if len(content_str) <= 4 * self.tool_token_limit_before_evict:
-            return message, None
-
-        # Write content to filesystem
-        sanitized_id = sanitize_tool_call_id(message.tool_call_id)
-        file_path = f"/large_tool_results/{sanitized_id}"
-        result = resolved_backend.write(file_path, content_str)
-        if result.error:
-            return message, None
+            return None
+        return content_str
 
+    def _evicted_message(self, message: ToolMessage, content_str: str, file_path: str) -> ToolMessage:
+        """Build the replacement message that points at the evicted content."""
         # Create truncated preview for the replacement message
         content_sample = format_content_with_line_numbers([line[:1000] for line in content_str.splitlines()[:10]], start_line=1)
         replacement_text = TOO_LARGE_TOOL_MSG.format(
@@ -1042,11 +1583,171 @@ class FilesystemMiddleware(AgentMiddleware):
         )
 
         # Always return as plain string after eviction
-        processed_message = ToolMessage(
+        return ToolMessage(
             content=replacement_text,
             tool_call_id=message.tool_call_id,
         )
-        return processed_message, result.files_update
+
+    def _eviction_bookkeeping(
+        self,
+        file_path: str,
+        size: int,
+        evicted: dict[str, EvictedToolResult],
+    ) -> tuple[dict[str, FileData | None], dict[str, EvictedToolResult | None]]:
+        """Record a state-held eviction and apply LRU cleanup.
+
+        Args:
+            file_path: Path of the payload that was just stored or reused.
+            size: Size of the payload in characters.
+            evicted: Current eviction bookkeeping from state.
+
+        Returns:
+            A tuple of (file deletions, bookkeeping updates) to merge into the state update.
+        """
+        index_update: dict[str, EvictedToolResult | None] = {file_path: EvictedToolResult(size=size, last_used=time.time())}
+        deletions: dict[str, FileData | None] = {}
+        if self.max_evicted_results_size is None:
+            return deletions, index_update
+
+        entries = {**evicted, **index_update}
+        total = sum(entry["size"] for entry in entries.values() if entry is not None)
+        # Least recently used first; never drop the payload we are about to reference.
+        for path, entry in sorted(evicted.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_evicted_results_size:
+                break
+            if path == file_path:
+                continue
+            total -= entry["size"]
+            deletions[path] = None
+            index_update[path] = None
+        return deletions, index_update
+
+    def _process_large_message(
+        self,
+        message: ToolMessage,
+        resolved_backend: BackendProtocol,
+        evicted: dict[str, EvictedToolResult] | None = None,
+    ) -> tuple[ToolMessage, dict[str, FileData | None] | None, dict[str, EvictedToolResult | None] | None]:
+        """Process a large ToolMessage by evicting its content to filesystem.
+
+        Args:
+            message: The ToolMessage with large content to evict.
+            resolved_backend: The filesystem backend to write the content to.
+            evicted: Eviction bookkeeping from state, used for dedup and LRU cleanup.
+
+        Returns:
+            A tuple of (processed_message, files_update, evicted_update):
+            - processed_message: New ToolMessage with truncated content and file reference
+            - files_update: Dict of file updates to apply to state, or None if nothing changed in state
+            - evicted_update: Bookkeeping updates for state-held evictions, or None
+
+        Note:
+            The entire content is converted to string and written to a content-addressed path,
+            `/large_tool_results/<sha256 prefix>`, then replaced with a truncated preview plus file
+            reference. A payload that is already stored (the backend's `stat_many` finds the path)
+            is referenced instead of being written again. The replacement is always returned as a
+            plain string for consistency, regardless of original content type.
+
+            ToolMessage supports multimodal content blocks (images, audio, etc.), but these are
+            uncommon in tool results. For simplicity, all content is stringified and evicted.
+            The model can recover by reading the offloaded file from the backend.
+        """
+        content_str = self._evictable_content(message)
+        if content_str is None:
+            return message, None, None
+
+        evicted = evicted or {}
+        file_path = large_tool_result_path(content_str)
+        if file_path in evicted:
+            files_update: dict[str, FileData | None] | None = {}
+        elif resolved_backend.stat_many([file_path])[0] is not None:
+            # Stored by an earlier run but not tracked in this thread's bookkeeping
+            files_update = None
+        else:
+            result = resolved_backend.write(file_path, content_str)
+            if result.error:
+                return message, None, None
+            files_update = result.files_update
+
+        return self._finish_eviction(message, content_str, file_path, files_update, evicted)
+
+    async def _aprocess_large_message(
+        self,
+        message: ToolMessage,
+        resolved_backend: BackendProtocol,
+        evicted: dict[str, EvictedToolResult] | None = None,
+    ) -> tuple[ToolMessage, dict[str, FileData | None] | None, dict[str, EvictedToolResult | None] | None]:
+        """(async) Process a large ToolMessage by evicting its content to filesystem.
+
+        See `_process_large_message`; this variant uses `astat_many` and `awrite`.
+        """
+        content_str = self._evictable_content(message)
+        if content_str is None:
+            return message, None, None
+
+        evicted = evicted or {}
+        file_path = large_tool_result_path(content_str)
+        if file_path in evicted:
+            files_update: dict[str, FileData | None] | None = {}
+        elif (await resolved_backend.astat_many([file_path]))[0] is not None:
+            # Stored by an earlier run but not tracked in this thread's bookkeeping
+            files_update = None
+        else:
+            result = await resolved_backend.awrite(file_path, content_str)
+            if result.error:
+                return message, None, None
+            files_update = result.files_update
+
+        return self._finish_eviction(message, content_str, file_path, files_update, evicted)
+
+    def _finish_eviction(
+        self,
+        message: ToolMessage,
+        content_str: str,
+        file_path: str,
+        files_update: dict[str, FileData | None] | None,
+        evicted: dict[str, EvictedToolResult],
+    ) -> tuple[ToolMessage, dict[str, FileData | None] | None, dict[str, EvictedToolResult | None] | None]:
+        """Build the replacement message and state updates for a stored payload."""
+        processed_message = self._evicted_message(message, content_str, file_path)
+        if files_update is None:
+            # Stored outside of agent state (or an untracked duplicate); nothing to record.
+            return processed_message, None, None
+        deletions, evicted_update = self._eviction_bookkeeping(file_path, len(content_str), evicted)
+        return processed_message, {**files_update, **deletions}, evicted_update
+
+    def _wrap_processed_message(
+        self,
+        processed_message: ToolMessage,
+        files_update: dict[str, FileData | None] | None,
+        evicted_update: dict[str, EvictedToolResult | None] | None,
+    ) -> ToolMessage | Command:
+        """Wrap a processed ToolMessage in a Command when state needs updating."""
+        if files_update is None:
+            return processed_message
+        update: dict = {
+            "files": files_update,
+            "messages": [processed_message],
+        }
+        if evicted_update:
+            update["evicted_tool_results"] = evicted_update
+        return Command(update=update)
+
+    @staticmethod
+    def _merge_command_update(
+        update: dict,
+        processed_messages: list,
+        files_update: dict,
+        evicted_update: dict,
+    ) -> Command:
+        """Rebuild a Command update with processed messages and accumulated state updates."""
+        new_update = {**update, "messages": processed_messages}
+        # An empty files update would still bump the channel and re-checkpoint every file
+        if files_update:
+            new_update["files"] = files_update
+        if evicted_update:
+            new_update["evicted_tool_results"] = {**update.get("evicted_tool_results", {}), **evicted_update}
+        return Command(update=new_update)
 
     def _intercept_large_tool_result(self, tool_result: ToolMessage | Command, runtime: ToolRuntime) -> ToolMessage | Command:
         """Intercept and process large tool results before they're added to state.
@@ -1064,22 +1765,57 @@ class FilesystemMiddleware(AgentMiddleware):
             multiple messages. Large content is automatically offloaded to filesystem
             to prevent context window overflow.
         """
+        evicted = dict((runtime.state or {}).get("evicted_tool_results") or {})
         if isinstance(tool_result, ToolMessage):
             resolved_backend = self._get_backend(runtime)
-            processed_message, files_update = self._process_large_message(
+            processed_message, files_update, evicted_update = self._process_large_message(
                 tool_result,
                 resolved_backend,
+                evicted,
             )
-            return (
-                Command(
-                    update={
-                        "files": files_update,
-                        "messages": [processed_message],
-                    }
+            return self._wrap_processed_message(processed_message, files_update, evicted_update)
+
+        if isinstance(tool_result, Command):
+            update = tool_result.update
+            if update is None:
+                return tool_result
+            command_messages = update.get("messages", [])
+            accumulated_file_updates = dict(update.get("files", {}))
+            accumulated_evicted_updates: dict[str, EvictedToolResult | None] = {}
+            resolved_backend = self._get_backend(runtime)
+            processed_messages = []
+            for message in command_messages:
+                if not isinstance(message, ToolMessage):
+                    processed_messages.append(message)
+                    continue
+
+                processed_message, files_update, evicted_update = self._process_large_message(
+                    message,
+                    resolved_backend,
+                    _live_evictions(evicted, accumulated_evicted_updates),
                 )
-                if files_update is not None
-                else processed_message
+                processed_messages.append(processed_message)
+                if files_update is not None:
+                    accumulated_file_updates.update(files_update)
+                if evicted_update:
+                    accumulated_evicted_updates.update(evicted_update)
+            return self._merge_command_update(update, processed_messages, accumulated_file_updates, accumulated_evicted_updates)
+        raise AssertionError(f"Unreachable code reached in _intercept_large_tool_result: for tool_result of type {type(tool_result)}")
+
+    async def _aintercept_large_tool_result(self, tool_result: ToolMessage | Command, runtime: ToolRuntime) -> ToolMessage | Command:
+        """(async) Intercept and process large tool results before they're added to state.
+
+        See `_intercept_large_tool_result`; this variant writes evicted content with `awrite`.
+        """
+        evicted = dict((runtime.state or {}).get("evicted_tool_results") or {})
+        if isinstance(tool_result, ToolMessage):
+            resolved_backend = self._get_backend(runtime)
+            processed_message, files_update, evicted_update = await self._aprocess_large_message(
+                tool_result,
+                resolved_backend,
+                evicted,
             )
+            return self._wrap_processed_message(processed_message, files_update, evicted_update)
 
         if isinstance(tool_result, Command):
             update = tool_result.update
@@ -1087,6 +1823,7 @@ class FilesystemMiddleware(AgentMiddleware):
                 return tool_result
             command_messages = update.get("messages", [])
             accumulated_file_updates = dict(update.get("files", {}))
+            accumulated_evicted_updates: dict[str, EvictedToolResult | None] = {}
             resolved_backend = self._get_backend(runtime)
             processed_messages = []
             for message in command_messages:
@@ -1094,15 +1831,113 @@ class FilesystemMiddleware(AgentMiddleware):
                     processed_messages.append(message)
                     continue
 
-                processed_message, files_update = self._process_large_message(
+                processed_message, files_update, evicted_update = await self._aprocess_large_message(
                     message,
                     resolved_backend,
+                    _live_evictions(evicted, accumulated_evicted_updates),
                 )
                 processed_messages.append(processed_message)
                 if files_update is not None:
                     accumulated_file_updates.update(files_update)
-            return Command(update={**update, "messages": processed_messages, "files": accumulated_file_updates})
-        raise AssertionError(f"Unreachable code reached in _intercept_large_tool_result: for tool_result of type {type(tool_result)}")
+                if evicted_update:
+                    accumulated_evicted_updates.update(evicted_update)
+            return self._merge_command_update(update, processed_messages, accumulated_file_updates, accumulated_evicted_updates)
+        raise AssertionError(f"Unreachable code reached in _aintercept_large_tool_result: for tool_result of type {type(tool_result)}")
+
+    def _dedupe_read(self, request: ToolCallRequest, tool_result: ToolMessage | Command) -> ToolMessage | Command:
+        """Replace an unchanged re-read with a notice, or record a fresh read in the cache.
+
+        Args:
+            request: The `read_file` tool call request.
+            tool_result: The result returned by the `read_file` tool.
+
+        Returns:
+            A notice ToolMessage for unchanged re-reads, a Command recording the read in
+            `read_file_cache`, or the original result if it cannot be cached.
+        """
+        if not isinstance(tool_result, ToolMessage) or not isinstance(tool_result.content, str) or tool_result.status == "error":
+            return tool_result
+        if tool_result.content.startswith("Error"):
+            return tool_result
+
+        args = request.tool_call["args"]
+        if args.get("tail") is not None or args.get("start_byte") is not None:
+            # Partial reads are not keyed by offset/limit, and a tail is expected to change
+            return tool_result
+        try:
+            file_path = _validate_path(args["file_path"])
+        except (KeyError, TypeError, ValueError):
+            return tool_result
+        offset = args.get("offset", DEFAULT_READ_OFFSET)
+        limit = args.get("limit", DEFAULT_READ_LIMIT)
+        cache_key = _read_cache_key(file_path, offset, limit)
+        content_hash = _content_hash(tool_result.content)
+
+        state = request.runtime.state or {}
+        cache = state.get("read_file_cache") or {}
+        entry = cache.get(cache_key)
+        if entry is not None and entry["content_hash"] == content_hash:
+            message_number = self._find_unchanged_read(state.get("messages", []), entry)
+            if message_number is not None:
+                return ToolMessage(
+                    content=UNCHANGED_READ_NOTICE.format(
+                        message_number=message_number,
+                        tool_call_id=entry["tool_call_id"],
+                        file_path=file_path,
+                        offset=offset,
+                        limit=limit,
+                    ),
+                    tool_call_id=tool_result.tool_call_id,
+                    name=tool_result.name,
+                )
+
+        # Keep the cache bounded by dropping the oldest recorded reads (dicts keep insertion order)
+        others = [key for key in cache if key != cache_key]
+        updates: dict[str, ReadCacheEntry | None] = dict.fromkeys(others[: max(len(others) + 1 - self.max_cached_reads, 0)])
+        updates[cache_key] = ReadCacheEntry(content_hash=content_hash, tool_call_id=tool_result.tool_call_id)
+        return Command(update={"messages": [tool_result], "read_file_cache": updates})
+
+    @staticmethod
+    def _find_unchanged_read(messages: Sequence, entry: ReadCacheEntry) -> int | None:
+        """Return the 1-based position of the cached read's ToolMessage if it still holds the content.
+
+        The message may have been summarized away or rewritten since it was cached, in
+        which case the model no longer has the content and the cache entry is unusable.
+        """
+        for index in range(len(messages) - 1, -1, -1):
+            message = messages[index]
+            if isinstance(message, ToolMessage) and message.tool_call_id == entry["tool_call_id"]:
+                if isinstance(message.content, str) and _content_hash(message.content) == entry["content_hash"]:
+                    return index + 1
+                return None
+        return None
+
+    def _invalidate_reads(self, request: ToolCallRequest, tool_result: ToolMessage | Command) -> ToolMessage | Command:
+        """Drop cached reads of the paths touched by a file-mutating tool call.
+
+        Args:
+            request: The file-mutating tool call request.
+            tool_result: The result returned by the tool.
+
+        Returns:
+            The result, extended with `read_file_cache` deletions when any entry is stale.
+        """
+        cache = (request.runtime.state or {}).get("read_file_cache") or {}
+        file_paths = mutated_file_paths(request.tool_call["args"])
+        stale = {key: None for key in cache if key.rsplit(":", 2)[0] in file_paths}
+        if not stale:
+            return tool_result
+
+        if isinstance(tool_result, ToolMessage):
+            return Command(update={"messages": [tool_result], "read_file_cache": stale})
+        if isinstance(tool_result, Command) and isinstance(tool_result.update, dict):
+            return Command(
+                graph=tool_result.graph,
+                update={**tool_result.update, "read_file_cache": {**tool_result.update.get("read_file_cache", {}), **stale}},
+                resume=tool_result.resume,
+                goto=tool_result.goto,
+            )
+        return tool_result
 
     def wrap_tool_call(
         self,
@@ -1111,6 +1946,8 @@ class FilesystemMiddleware(AgentMiddleware):
     ) -> ToolMessage | Command:
         """Check the size of the tool call result and evict to filesystem if too large.
 
+        Also deduplicates unchanged `read_file` results and invalidates cached reads on writes.
+
         Args:
             request: The tool call request being processed.
             handler: The handler function to call with the modified request.
@@ -1118,7 +1955,12 @@ class FilesystemMiddleware(AgentMiddleware):
         Returns:
             The raw ToolMessage, or a pseudo tool message with the ToolResult in state.
         """
-        if self.tool_token_limit_before_evict is None or request.tool_call["name"] in TOOL_GENERATORS:
+        tool_name = request.tool_call["name"]
+        if self.dedupe_reads and tool_name == "read_file":
+            return self._dedupe_read(request, handler(request))
+        if self.dedupe_reads and tool_name in FILE_MUTATING_TOOLS:
+            return self._invalidate_reads(request, handler(request))
+        if self.tool_token_limit_before_evict is None or tool_name in TOOL_GENERATORS:
             return handler(request)
 
         tool_result = handler(request)
@@ -1131,6 +1973,8 @@ class FilesystemMiddleware(AgentMiddleware):
     ) -> ToolMessage | Command:
         """(async)Check the size of the tool call result and evict to filesystem if too large.
 
+        Also deduplicates unchanged `read_file` results and invalidates cached reads on writes.
+
         Args:
             request: The tool call request being processed.
             handler: The handler function to call with the modified request.
@@ -1138,8 +1982,13 @@ class FilesystemMiddleware(AgentMiddleware):
         Returns:
             The raw ToolMessage, or a pseudo tool message with the ToolResult in state.
         """
-        if self.tool_token_limit_before_evict is None or request.tool_call["name"] in TOOL_GENERATORS:
+        tool_name = request.tool_call["name"]
+        if self.dedupe_reads and tool_name == "read_file":
+            return self._dedupe_read(request, await handler(request))
+        if self.dedupe_reads and tool_name in FILE_MUTATING_TOOLS:
+            return self._invalidate_reads(request, await handler(request))
+        if self.tool_token_limit_before_evict is None or tool_name in TOOL_GENERATORS:
             return await handler(request)
 
         tool_result = await handler(request)
-        return self._intercept_large_tool_result(tool_result, request.runtime)
+        return await self._aintercept_large_tool_result(tool_result, request.runtime)
@@ -50,14 +50,20 @@ Common sections include:
 from __future__ import annotations
 
 import logging
-from collections.abc import Awaitable, Callable
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
 from typing import TYPE_CHECKING, Annotated, NotRequired, TypedDict
 
 from langchain.messages import SystemMessage
 from langchain_core.runnables import RunnableConfig
 
+from deepagents.backends.protocol import SandboxBackendProtocol
+from deepagents.backends.state import StateBackend
+from deepagents.backends.store import StoreBackend
+
 if TYPE_CHECKING:
-    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol
+    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, FileDownloadResponse, FileInfo
 
 from langchain.agents.middleware.types import (
     AgentMiddleware,
@@ -151,15 +157,98 @@ MEMORY_SYSTEM_PROMPT = """<agent_memory>
 """
 
 
+class MemorySourceCache:
+    """Contents of memory files, shared by every `MemoryMiddleware` that uses it.
+
+    Entries are keyed by (backend id, path) and checked against the size and
+    modification time reported by the backend's `stat_many`, so a source is only
+    downloaded again after it changed. Sources on backends that report no
+    modification time are not cached.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached files; the least recently used is dropped first.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (backend id, path) -> (validator, content, object the backend id refers to)
+        self._entries: OrderedDict[tuple[Hashable, str], tuple[tuple[int | None, str], str, object]] = OrderedDict()
+
+    @staticmethod
+    def _validator(info: FileInfo) -> tuple[int | None, str] | None:
+        modified_at = info.get("modified_at")
+        return (info.get("size"), modified_at) if modified_at else None
+
+    def get(self, backend_id: Hashable, path: str, info: FileInfo) -> str | None:
+        """Return the cached content of `path` if it is still current, else None."""
+        validator = self._validator(info)
+        with self._lock:
+            entry = self._entries.get((backend_id, path))
+            if validator is None or entry is None or entry[0] != validator:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((backend_id, path))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, backend_id: Hashable, path: str, info: FileInfo, content: str, owner: object) -> None:
+        """Cache the content of `path` as of `info`; `owner` is kept alive while the entry exists."""
+        validator = self._validator(info)
+        if validator is None:
+            return
+        with self._lock:
+            self._entries[backend_id, path] = (validator, content, owner)
+            self._entries.move_to_end((backend_id, path))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached file."""
+        with self._lock:
+            self._entries.clear()
+
+
+_SHARED_CACHE = MemorySourceCache()
+
+
+def _backend_cache_id(backend: BackendProtocol, *, from_factory: bool) -> tuple[Hashable, object] | None:
+    """Identify the storage behind a backend, or return None if its files should not be cached.
+
+    Returns:
+        The backend id and the object it was derived from, which the cache keeps
+        alive so the id cannot be reused.
+    """
+    if isinstance(backend, SandboxBackendProtocol):
+        return ("sandbox", backend.id), None
+    if isinstance(backend, StoreBackend):
+        store = backend._get_store()
+        return (type(backend).__qualname__, id(store), backend._get_namespace()), store
+    # State lives in the thread, and a backend built per call has no lasting identity
+    if from_factory or isinstance(backend, StateBackend):
+        return None
+    return (type(backend).__qualname__, id(backend)), backend
+
+
 class MemoryMiddleware(AgentMiddleware):
     """Middleware for loading agent memory from AGENTS.md files.
 
     Loads memory content from configured sources and injects into the system prompt.
     Supports multiple sources that are combined together.
 
+    Sources are fetched with one batched `stat_many` and one batched `download_files`
+    call, and their contents are shared through a `MemorySourceCache`, so a source
+    that has not changed since any agent last loaded it is not downloaded again.
+
     Args:
         backend: Backend instance or factory function for file operations.
         sources: List of MemorySource configurations specifying paths and names.
+        refresh: Recheck the sources on every invocation instead of only the first one of a thread.
+        cache: Cache to share loaded sources through. Defaults to one shared by the whole process.
     """
 
     state_schema = MemoryState
@@ -169,6 +258,8 @@ class MemoryMiddleware(AgentMiddleware):
         *,
         backend: BACKEND_TYPES,
         sources: list[str],
+        refresh: bool = False,
+        cache: MemorySourceCache | None = None,
     ) -> None:
         """Initialize the memory middleware.
 
@@ -178,9 +269,17 @@ class MemoryMiddleware(AgentMiddleware):
             sources: List of memory file paths to load (e.g., ["~/.deepagents/AGENTS.md",
                      "./.deepagents/AGENTS.md"]). Display names are automatically derived
                      from the paths. Sources are loaded in order.
+            refresh: If True, recheck the sources at the start of every invocation, so
+                     edits (e.g. the agent updating its own AGENTS.md) reach the next turn.
+                     The state, and so the system prompt, is only updated when a source
+                     changed. If False (default), sources are loaded once per thread.
+            cache: Cache to share loaded sources through. Defaults to a cache shared by
+                   every MemoryMiddleware in the process.
         """
         self._backend = backend
         self.sources = sources
+        self.refresh = refresh
+        self.cache = cache if cache is not None else _SHARED_CACHE
 
     def _get_backend(self, state: MemoryState, runtime: Runtime, config: RunnableConfig) -> BackendProtocol:
         """Resolve backend from instance or factory.
@@ -229,77 +328,99 @@ class MemoryMiddleware(AgentMiddleware):
         memory_body = "\n\n".join(sections)
         return MEMORY_SYSTEM_PROMPT.format(agent_memory=memory_body)
 
-    async def _load_memory_from_backend(
-        self,
-        backend: BackendProtocol,
-        path: str,
-    ) -> str | None:
-        """Load memory content from a backend path.
+    @staticmethod
+    def _read_downloads(paths: list[str], responses: list[FileDownloadResponse]) -> dict[str, str]:
+        """Decode downloaded memory files, skipping missing ones.
 
         Args:
-            backend: Backend to load from.
-            path: Path to the AGENTS.md file.
+            paths: Paths that were downloaded.
+            responses: The backend's responses, one per path.
 
         Returns:
-            File content if found, None otherwise.
+            Dict mapping each path that was found to its content.
         """
-        results = await backend.adownload_files([path])
-        # Should get exactly one response for one path
-        if len(results) != 1:
-            raise AssertionError(f"Expected 1 response for path {path}, got {len(results)}")
-        response = results[0]
-
-        if response.error is not None:
-            # For now, memory files are treated as optional. file_not_found is expected
-            # and we skip silently to allow graceful degradation.
-            if response.error == "file_not_found":
-                return None
-            # Other errors should be raised
-            raise ValueError(f"Failed to download {path}: {response.error}")
+        if len(responses) != len(paths):
+            raise AssertionError(f"Expected {len(paths)} responses, got {len(responses)}")
+        contents: dict[str, str] = {}
+        for path, response in zip(paths, responses, strict=True):
+            if response.error is not None:
+                # For now, memory files are treated as optional. file_not_found is expected
+                # and we skip silently to allow graceful degradation.
+                if response.error == "file_not_found":
+                    continue
+                # Other errors should be raised
+                raise ValueError(f"Failed to download {path}: {response.error}")
+            if response.content is not None:
+                contents[path] = response.content.decode("utf-8")
+        return contents
+
+    def _from_cache(self, cache_id: Hashable, infos: list[FileInfo | None]) -> tuple[dict[str, str], list[str]]:
+        """Split the sources into cached contents and paths that must be downloaded."""
+        contents: dict[str, str] = {}
+        stale: list[str] = []
+        for path, info in zip(self.sources, infos, strict=True):
+            if info is None or info.get("is_dir") or path in contents or path in stale:
+                continue
+            content = self.cache.get(cache_id, path, info)
+            if content is None:
+                stale.append(path)
+            else:
+                contents[path] = content
+        return contents, stale
 
-        if response.content is not None:
-            return response.content.decode("utf-8")
+    def _remember(self, cache_id: tuple[Hashable, object], infos: list[FileInfo | None], downloaded: dict[str, str]) -> None:
+        for path, info in zip(self.sources, infos, strict=True):
+            if info is not None and path in downloaded:
+                self.cache.put(cache_id[0], path, info, downloaded[path], cache_id[1])
 
-        return None
+    def _ordered(self, contents: dict[str, str]) -> dict[str, str]:
+        return {path: contents[path] for path in self.sources if contents.get(path)}
 
-    def _load_memory_from_backend_sync(
-        self,
-        backend: BackendProtocol,
-        path: str,
-    ) -> str | None:
-        """Load memory content from a backend path synchronously.
+    def _load_memory(self, backend: BackendProtocol) -> dict[str, str]:
+        """Load all sources, downloading only those not cached or changed since.
 
         Args:
             backend: Backend to load from.
-            path: Path to the AGENTS.md file.
 
         Returns:
-            File content if found, None otherwise.
+            Dict mapping source paths with content to that content, in source order.
         """
-        results = backend.download_files([path])
-        # Should get exactly one response for one path
-        if len(results) != 1:
-            raise AssertionError(f"Expected 1 response for path {path}, got {len(results)}")
-        response = results[0]
-
-        if response.error is not None:
-            # For now, memory files are treated as optional. file_not_found is expected
-            # and we skip silently to allow graceful degradation.
-            if response.error == "file_not_found":
-                return None
-            # Other errors should be raised
-            raise ValueError(f"Failed to download {path}: {response.error}")
+        cache_id = _backend_cache_id(backend, from_factory=callable(self._backend))
+        if cache_id is None:
+            return self._ordered(self._read_downloads(self.sources, backend.download_files(list(self.sources))))
+        infos = backend.stat_many(list(self.sources))
+        contents, stale = self._from_cache(cache_id[0], infos)
+        if stale:
+            downloaded = self._read_downloads(stale, backend.download_files(stale))
+            self._remember(cache_id, infos, downloaded)
+            contents.update(downloaded)
+        return self._ordered(contents)
+
+    async def _aload_memory(self, backend: BackendProtocol) -> dict[str, str]:
+        """Load all sources, downloading only those not cached or changed since (async version).
 
-        if response.content is not None:
-            return response.content.decode("utf-8")
+        Args:
+            backend: Backend to load from.
 
-        return None
+        Returns:
+            Dict mapping source paths with content to that content, in source order.
+        """
+        cache_id = _backend_cache_id(backend, from_factory=callable(self._backend))
+        if cache_id is None:
+            return self._ordered(self._read_downloads(self.sources, await backend.adownload_files(list(self.sources))))
+        infos = await backend.astat_many(list(self.sources))
+        contents, stale = self._from_cache(cache_id[0], infos)
+        if stale:
+            downloaded = self._read_downloads(stale, await backend.adownload_files(stale))
+            self._remember(cache_id, infos, downloaded)
+            contents.update(downloaded)
+        return self._ordered(contents)
 
     def before_agent(self, state: MemoryState, runtime: Runtime, config: RunnableConfig) -> MemoryStateUpdate | None:
         """Load memory content before agent execution (synchronous).
 
         Loads memory from all configured sources and stores in state.
-        Only loads if not already present in state.
+        Only loads if not already present in state, unless `refresh` is set.
 
         Args:
             state: Current agent state.
@@ -307,28 +428,27 @@ class MemoryMiddleware(AgentMiddleware):
             config: Runnable config.
 
         Returns:
-            State update with memory_contents populated.
+            State update with memory_contents populated, or None if it is unchanged.
         """
         # Skip if already loaded
-        if "memory_contents" in state:
+        if "memory_contents" in state and not self.refresh:
             return None
 
         backend = self._get_backend(state, runtime, config)
-        contents: dict[str, str] = {}
-
-        for path in self.sources:
-            content = self._load_memory_from_backend_sync(backend, path)
-            if content:
-                contents[path] = content
-                logger.debug(f"Loaded memory from: {path}")
+        contents = self._load_memory(backend)
+        for path in contents:
+            logger.debug(f"Loaded memory from: {path}")
 
+        # An unchanged memory keeps the system prompt, and so the prompt cache prefix, byte-identical
+        if contents == state.get("memory_contents"):
+            return None
         return MemoryStateUpdate(memory_contents=contents)
 
     async def abefore_agent(self, state: MemoryState, runtime: Runtime, config: RunnableConfig) -> MemoryStateUpdate | None:
         """Load memory content before agent execution.
 
         Loads memory from all configured sources and stores in state.
-        Only loads if not already present in state.
+        Only loads if not already present in state, unless `refresh` is set.
 
         Args:
             state: Current agent state.
@@ -336,21 +456,20 @@ class MemoryMiddleware(AgentMiddleware):
             config: Runnable config.
 
         Returns:
-            State update with memory_contents populated.
+            State update with memory_contents populated, or None if it is unchanged.
         """
         # Skip if already loaded
-        if "memory_contents" in state:
+        if "memory_contents" in state and not self.refresh:
             return None
 
         backend = self._get_backend(state, runtime, config)
-        contents: dict[str, str] = {}
-
-        for path in self.sources:
-            content = await self._load_memory_from_backend(backend, path)
-            if content:
-                contents[path] = content
-                logger.debug(f"Loaded memory from: {path}")
+        contents = await self._aload_memory(backend)
+        for path in contents:
+            logger.debug(f"Loaded memory from: {path}")
 
+        # An unchanged memory keeps the system prompt, and so the prompt cache prefix, byte-identical
+        if contents == state.get("memory_contents"):
+            return None
         return MemoryStateUpdate(memory_contents=contents)
 
     def modify_request(self, request: ModelRequest) -> ModelRequest:
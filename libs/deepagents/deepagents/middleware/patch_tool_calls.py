@@ -3,42 +3,63 @@
 from typing import Any
 
 from langchain.agents.middleware import AgentMiddleware, AgentState
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AnyMessage, ToolMessage
 from langgraph.runtime import Runtime
 from langgraph.types import Overwrite
 
 
+def _dangling_tool_calls(messages: list[AnyMessage]) -> dict[int, list[dict[str, Any]]]:
+    """Find tool calls with no ToolMessage after the AIMessage that made them.
+
+    Args:
+        messages: The message history.
+
+    Returns:
+        Mapping of AIMessage index to its dangling tool calls, empty if there are none.
+    """
+    # Walk backwards so `answered` holds exactly the ids of ToolMessages after the current message
+    answered: set[str | None] = set()
+    dangling: dict[int, list[dict[str, Any]]] = {}
+    for i in range(len(messages) - 1, -1, -1):
+        msg = messages[i]
+        if msg.type == "tool":
+            answered.add(msg.tool_call_id)
+        elif msg.type == "ai" and msg.tool_calls:
+            missing = [tool_call for tool_call in msg.tool_calls if tool_call["id"] not in answered]
+            if missing:
+                dangling[i] = missing
+    return dangling
+
+
 class PatchToolCallsMiddleware(AgentMiddleware):
     """Middleware to patch dangling tool calls in the messages history."""
 
     def before_agent(self, state: AgentState, runtime: Runtime[Any]) -> dict[str, Any] | None:  # noqa: ARG002
-        """Before the agent runs, handle dangling tool calls from any AIMessage."""
+        """Before the agent runs, handle dangling tool calls from any AIMessage.
+
+        Returns None, leaving the history untouched, when every tool call already has a ToolMessage.
+        """
         messages = state["messages"]
-        if not messages or len(messages) == 0:
+        if not messages:
+            return None
+        dangling = _dangling_tool_calls(messages)
+        if not dangling:
             return None
 
         patched_messages = []
-        # Iterate over the messages and add any dangling tool calls
         for i, msg in enumerate(messages):
             patched_messages.append(msg)
-            if msg.type == "ai" and msg.tool_calls:
-                for tool_call in msg.tool_calls:
-                    corresponding_tool_msg = next(
-                        (msg for msg in messages[i:] if msg.type == "tool" and msg.tool_call_id == tool_call["id"]),
-                        None,
+            for tool_call in dangling.get(i, []):
+                # We have a dangling tool call which needs a ToolMessage
+                tool_msg = (
+                    f"Tool call {tool_call['name']} with id {tool_call['id']} was cancelled - another message came in before it could be completed."
+                )
+                patched_messages.append(
+                    ToolMessage(
+                        content=tool_msg,
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
                     )
-                    if corresponding_tool_msg is None:
-                        # We have a dangling tool call which needs a ToolMessage
-                        tool_msg = (
-                            f"Tool call {tool_call['name']} with id {tool_call['id']} was "
-                            "cancelled - another message came in before it could be completed."
-                        )
-                        patched_messages.append(
-                            ToolMessage(
-                                content=tool_msg,
-                                name=tool_call["name"],
-                                tool_call_id=tool_call["id"],
-                            )
-                        )
+                )
 
         return {"messages": Overwrite(patched_messages)}
@@ -99,7 +99,7 @@ import yaml
 from langchain.agents.middleware.types import PrivateStateAttr
 
 if TYPE_CHECKING:
-    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol
+    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, FileInfo
 
 from collections.abc import Awaitable, Callable
 from typing import NotRequired, TypedDict
@@ -279,6 +279,22 @@ def _parse_skill_metadata(
     )
 
 
+def _downloadable_skill_files(
+    skill_md_paths: list[tuple[str, str]],
+    infos: list[FileInfo | None],
+) -> list[tuple[str, str]]:
+    """Keep the `(skill_dir, SKILL.md path)` pairs whose SKILL.md exists and is within the size limit."""
+    downloadable = []
+    for (skill_dir_path, skill_md_path), info in zip(skill_md_paths, infos, strict=True):
+        if info is None or info.get("is_dir"):
+            continue
+        if info.get("size", 0) > MAX_SKILL_FILE_SIZE:
+            logger.warning("Skipping %s: exceeds max size (%d bytes)", skill_md_path, MAX_SKILL_FILE_SIZE)
+            continue
+        downloadable.append((skill_dir_path, skill_md_path))
+    return downloadable
+
+
 def _list_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetadata]:
     """List all skills from a backend source.
 
@@ -320,6 +336,11 @@ def _list_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetada
         skill_md_path = str(skill_dir / "SKILL.md")
         skill_md_paths.append((skill_dir_path, skill_md_path))
 
+    # Check which SKILL.md files exist (and are small enough) before downloading any content
+    infos = backend.stat_many([skill_md_path for _, skill_md_path in skill_md_paths])
+    skill_md_paths = _downloadable_skill_files(skill_md_paths, infos)
+    if not skill_md_paths:
+        return []
     paths_to_download = [skill_md_path for _, skill_md_path in skill_md_paths]
     responses = backend.download_files(paths_to_download)
 
@@ -395,6 +416,11 @@ async def _alist_skills(backend: BackendProtocol, source_path: str) -> list[Skil
         skill_md_path = str(skill_dir / "SKILL.md")
         skill_md_paths.append((skill_dir_path, skill_md_path))
 
+    # Check which SKILL.md files exist (and are small enough) before downloading any content
+    infos = await backend.astat_many([skill_md_path for _, skill_md_path in skill_md_paths])
+    skill_md_paths = _downloadable_skill_files(skill_md_paths, infos)
+    if not skill_md_paths:
+        return []
     paths_to_download = [skill_md_path for _, skill_md_path in skill_md_paths]
     responses = await backend.adownload_files(paths_to_download)
 
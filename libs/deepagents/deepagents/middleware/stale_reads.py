@@ -0,0 +1,208 @@
+"""Middleware that stubs out superseded `read_file` results in the message history."""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+from langgraph.runtime import Runtime
+
+from deepagents.middleware.filesystem import (
+    DEFAULT_READ_LIMIT,
+    DEFAULT_READ_OFFSET,
+    FILE_MUTATING_TOOLS,
+    UNCHANGED_READ_NOTICE,
+    _validate_path,
+    mutated_file_paths,
+)
+
+logger = logging.getLogger(__name__)
+
+STALE_READ_STUB = (
+    "[Stale read_file result for {file_path} removed to save context: superseded by {tool_name} call {tool_call_id}. "
+    "Read the file again if you need its current content.]"
+)
+"""Replacement content for a superseded `read_file` ToolMessage."""
+
+_STUB_PREFIX = STALE_READ_STUB.split("{", 1)[0]
+_UNCHANGED_PREFIX = UNCHANGED_READ_NOTICE.split("{", 1)[0]
+
+
+@dataclass
+class _Read:
+    """A `read_file` ToolMessage found in the history."""
+
+    position: int
+    message: ToolMessage
+    file_path: str
+    offset: int
+    limit: int
+
+    def covered_by(self, other: "_Read") -> bool:
+        """Whether `other` re-read at least the line range of this read."""
+        return other.offset <= self.offset and other.offset + other.limit >= self.offset + self.limit
+
+
+class StaleReadsMiddleware(AgentMiddleware):
+    """Replace `read_file` results that have been superseded with short stubs.
+
+    After an agent reads a file, edits it and reads it again, the history holds
+    several full copies of the file and every later model call resends them.
+    Before each model call this middleware rewrites older `read_file`
+    ToolMessages into one-line stubs when the same file was later re-read over
+    the same or a wider range, or successfully changed with `write_file`,
+    `edit_file` or `multi_edit`.
+
+    The ToolMessages themselves are kept (only their content changes), so every
+    tool call still has its matching tool result. Rewrites are applied to the
+    state by message ID, so a stub is written once and stays byte-identical on
+    later calls.
+
+    Each rewrite invalidates the provider's prompt cache from the first rewritten
+    message onwards. To keep as much of the cached prefix stable as possible,
+    rewrites are batched: nothing changes until the pending savings reach
+    `min_tokens_saved`, and then every superseded read is stubbed at once so the
+    cache is broken once instead of on every turn.
+
+    Args:
+        min_tokens_saved: Minimum estimated tokens a batch of rewrites must save
+            before any message is rewritten.
+        on_tokens_saved: Optional callback invoked with the estimated number of
+            tokens saved whenever a batch of rewrites is applied.
+
+    Example:
+        ```python
+        from deepagents import create_deep_agent
+        from deepagents.middleware.stale_reads import StaleReadsMiddleware
+
+        agent = create_deep_agent(middleware=[StaleReadsMiddleware(min_tokens_saved=2000)])
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        min_tokens_saved: int = 1000,
+        on_tokens_saved: Callable[[int], None] | None = None,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            min_tokens_saved: Minimum estimated tokens a batch of rewrites must save
+                before any message is rewritten. Defaults to 1000.
+            on_tokens_saved: Optional callback invoked with the estimated number of
+                tokens saved each time a batch of rewrites is applied.
+        """
+        super().__init__()
+        self.min_tokens_saved = min_tokens_saved
+        self.on_tokens_saved = on_tokens_saved
+
+    def before_model(self, state: AgentState, runtime: Runtime[Any]) -> dict[str, Any] | None:  # noqa: ARG002
+        """Stub out superseded `read_file` results before the model is called."""
+        stubs = find_stale_reads(state["messages"])
+        if not stubs:
+            return None
+
+        tokens_saved = sum(_estimate_tokens(original) - _estimate_tokens(stub) for original, stub in stubs)
+        if tokens_saved < self.min_tokens_saved:
+            return None
+
+        logger.info("Stubbed %d stale read_file results, saving ~%d tokens", len(stubs), tokens_saved)
+        if self.on_tokens_saved is not None:
+            self.on_tokens_saved(tokens_saved)
+        return {"messages": [stub for _, stub in stubs]}
+
+    async def abefore_model(self, state: AgentState, runtime: Runtime[Any]) -> dict[str, Any] | None:
+        """(async) Stub out superseded `read_file` results before the model is called."""
+        return self.before_model(state, runtime)
+
+
+def find_stale_reads(messages: list[AnyMessage]) -> list[tuple[ToolMessage, ToolMessage]]:
+    """Find `read_file` results that have been superseded later in the history.
+
+    Args:
+        messages: The message history.
+
+    Returns:
+        List of `(original, stub)` pairs. Each stub has the same ID, tool call ID and
+        name as the original so that it replaces it in place.
+    """
+    tool_calls: dict[str, dict[str, Any]] = {}
+    reads_by_path: dict[str, list[_Read]] = {}
+    superseded: dict[int, tuple[_Read, str, str]] = {}
+
+    for position, message in enumerate(messages):
+        if isinstance(message, AIMessage):
+            tool_calls.update({tool_call["id"]: tool_call for tool_call in message.tool_calls if tool_call.get("id")})
+            continue
+        tool_call = _file_tool_call(message, tool_calls)
+        if tool_call is None:
+            continue
+
+        if tool_call["name"] in FILE_MUTATING_TOOLS:
+            for file_path in mutated_file_paths(tool_call["args"]):
+                for read in reads_by_path.pop(file_path, []):
+                    superseded.setdefault(read.position, (read, tool_call["name"], message.tool_call_id))
+        elif (read := _read_from_tool_call(position, message, tool_call)) is not None:
+            earlier = reads_by_path.setdefault(read.file_path, [])
+            for older in earlier:
+                if older.covered_by(read):
+                    superseded.setdefault(older.position, (older, "read_file", message.tool_call_id))
+            earlier[:] = [older for older in earlier if older.position not in superseded]
+            earlier.append(read)
+
+    stubs = []
+    for position in sorted(superseded):
+        read, tool_name, tool_call_id = superseded[position]
+        if read.message.id is None:
+            continue
+        stub = ToolMessage(
+            content=STALE_READ_STUB.format(file_path=read.file_path, tool_name=tool_name, tool_call_id=tool_call_id),
+            tool_call_id=read.message.tool_call_id,
+            name=read.message.name,
+            id=read.message.id,
+        )
+        stubs.append((read.message, stub))
+    return stubs
+
+
+def _file_tool_call(message: AnyMessage, tool_calls: dict[str, dict[str, Any]]) -> dict[str, Any] | None:
+    """Return the tool call behind a successful, unstubbed tool result, or None for anything else."""
+    if not isinstance(message, ToolMessage) or message.status == "error":
+        return None
+    if not isinstance(message.content, str) or message.content.startswith(("Error", _STUB_PREFIX)):
+        return None
+    return tool_calls.get(message.tool_call_id)
+
+
+def _read_from_tool_call(position: int, message: ToolMessage, tool_call: dict[str, Any]) -> _Read | None:
+    """Describe a `read_file` result that carries file content, or return None.
+
+    Tail and byte-range reads return None: their coverage is not a line range,
+    so they neither supersede nor get superseded by line reads.
+    """
+    if tool_call["name"] != "read_file" or message.content.startswith(_UNCHANGED_PREFIX):
+        return None
+    if tool_call["args"].get("tail") is not None or tool_call["args"].get("start_byte") is not None:
+        return None
+    try:
+        file_path = _validate_path(tool_call["args"]["file_path"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return _Read(
+        position=position,
+        message=message,
+        file_path=file_path,
+        offset=tool_call["args"].get("offset", DEFAULT_READ_OFFSET),
+        limit=tool_call["args"].get("limit", DEFAULT_READ_LIMIT),
+    )
+
+
+def _estimate_tokens(message: ToolMessage) -> int:
+    """Estimate tokens using the same 4-characters-per-token heuristic as eviction."""
+    return len(str(message.content)) // 4
+
+
+__all__ = ["StaleReadsMiddleware", "find_stale_reads"]
@@ -0,0 +1,421 @@
+"""Memoization of subagent results for repeated `task` calls.
+
+A `task` call with the same subagent type and description, against a workspace
+that has not changed, returns the cached final message of the earlier run
+instead of running the subagent loop again. Entries are scoped to the thread,
+assistant and backend of the call. The workspace is identified by a fingerprint
+of the `files` in agent state and by write generations that every tool call
+outside `READ_ONLY_TOOLS` advances, in the main agent or any subagent. Generations
+are kept per scope: a write advances the generation of its thread and, for
+storage shared across threads, of its workspace, leaving other sessions cached.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ToolCallRequest
+from langchain.tools import ToolRuntime
+from langchain_core.messages import ToolMessage
+from langgraph.store.base import BaseStore
+from langgraph.types import Command
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, SandboxBackendProtocol
+from deepagents.backends.state import StateBackend
+from deepagents.backends.store import StoreBackend
+
+READ_ONLY_TOOLS = frozenset({"ls", "read_file", "read_files", "glob", "grep", "write_todos", "task", "task_batch"})
+"""Tools that never change the workspace. `task` and `task_batch` are included because the
+subagents they run report their own writes."""
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """Outcome of looking up one `task` call in a `SubAgentResultCache`."""
+
+    key: str
+    """Cache key of the call."""
+
+    generation: int
+    """Workspace write generation at lookup time."""
+
+    result: str | None
+    """The cached final message, or None on a miss."""
+
+    scopes: tuple[str, ...] = ()
+    """Scopes whose writes invalidate the call: its thread, and its workspace if shared across threads."""
+
+
+class SubAgentResultCache(AgentMiddleware):
+    """Opt-in cache of subagent results, keyed by (scope, subagent type, description, workspace fingerprint).
+
+    The scope is the `thread_id` and `assistant_id` in the run's config plus the
+    identity of the agent's backend, so sessions and workspaces never share an entry.
+
+    Only runs that left the workspace untouched are cached: no tool call outside
+    `read_only_tools` happened while they ran and they returned no state update.
+    Entries expire after `ttl_seconds`; at most `max_entries` are kept, dropping
+    the least recently used (in a store: the oldest) first.
+
+    Entries live in process memory by default, so one cache can serve every
+    session of a server. With `store_namespace`, they are kept in the LangGraph
+    store of the agent (`runtime.store`) instead, together with the write
+    generation, so they are shared by every process using that store.
+
+    Writes are seen through the tool calls of agents the cache watches:
+    `SubAgentMiddleware(result_cache=...)` installs `watch(backend)` in its subagents,
+    and `create_deep_agent` also adds it to the main agent. A write invalidates only
+    entries of its own thread and, when the backend's storage outlives the thread
+    (a filesystem, sandbox or store), entries of every thread on that storage.
+    Installed directly as middleware, the cache does not know the backend and
+    invalidates the thread of each write only. Changes made outside those agents
+    (or inside pre-compiled subagents) are only picked up for files in agent
+    state; call `invalidate()` after changing the workspace by other means, or
+    rely on the TTL.
+
+    Example:
+        ```python
+        from deepagents import create_deep_agent
+        from deepagents.middleware.subagent_cache import SubAgentResultCache
+
+        agent = create_deep_agent(subagent_result_cache=SubAgentResultCache(ttl_seconds=600))
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 256,
+        store_namespace: tuple[str, ...] | None = None,
+        read_only_tools: Iterable[str] = READ_ONLY_TOOLS,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: Seconds after which an entry is no longer used.
+            max_entries: Maximum number of cached results.
+            store_namespace: Keep entries in the LangGraph store under this namespace
+                instead of in process memory.
+            read_only_tools: Names of tools that do not change the workspace; any
+                other tool call invalidates the cache.
+        """
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store_namespace = store_namespace
+        self.read_only_tools = frozenset(read_only_tools)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str, tuple[str, ...]]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        # Advanced by `invalidate()` without a runtime, which drops every scope
+        self._epoch = 0
+        # Backends and stores identified by id in keys, kept alive so their ids are not reused
+        self._pins: dict[int, object] = {}
+
+    # Keys and generations
+
+    def _store(self, runtime: ToolRuntime | None) -> BaseStore | None:
+        if self.store_namespace is None:
+            return None
+        store = runtime.store if runtime is not None else None
+        if store is None:
+            msg = "SubAgentResultCache with store_namespace needs an agent with a store"
+            raise ValueError(msg)
+        return store
+
+    def _pin(self, value: object) -> int:
+        with self._lock:
+            self._pins[id(value)] = value
+        return id(value)
+
+    def _storage(self, backend: BackendProtocol) -> list[Any] | None:  # noqa: PLR0911
+        """Identify the storage behind a backend instance, or return None if it has no known identity."""
+        if isinstance(backend, SandboxBackendProtocol):
+            return ["sandbox", backend.id]
+        if isinstance(backend, StoreBackend):
+            return ["store", self._pin(backend._get_store()), list(backend._get_namespace())]
+        # State lives in the thread, which is already part of the key
+        if isinstance(backend, StateBackend):
+            return ["state"]
+        if isinstance(backend, FilesystemBackend):
+            return ["filesystem", str(backend.cwd), backend.virtual_mode]
+        if isinstance(backend, CompositeBackend):
+            parts = [self._storage(backend.default), *(self._storage(route) for _, route in backend.sorted_routes)]
+            if any(part is None for part in parts):
+                return None
+            return ["composite", [prefix for prefix, _ in backend.sorted_routes], parts]
+        return None
+
+    def _workspace(self, backend: BACKEND_TYPES | None, runtime: ToolRuntime) -> list[Any] | None:
+        """Identify the workspace of the agent's backend, resolving factories with `runtime`."""
+        if backend is None:
+            return None
+        storage = self._storage(backend(runtime) if callable(backend) else backend)
+        # Otherwise fall back to the identity of the backend (or factory) the agent was given
+        return storage if storage is not None else ["object", self._pin(backend)]
+
+    def _scopes(self, runtime: ToolRuntime, backend: BACKEND_TYPES | None) -> tuple[str, ...]:
+        """Scopes whose writes a call depends on: its thread, plus its workspace when that is shared across threads."""
+        configurable = (runtime.config or {}).get("configurable") or {}
+        scopes = [json.dumps(["thread", configurable.get("thread_id"), configurable.get("assistant_id")], default=str)]
+        workspace = self._workspace(backend, runtime)
+        # State lives in the thread, so only the thread's writes can change it
+        if workspace is not None and workspace != ["state"]:
+            scopes.append(json.dumps(["workspace", workspace], default=str))
+        return tuple(scopes)
+
+    def _key(self, subagent_type: str, description: str, runtime: ToolRuntime, generation: int, scopes: tuple[str, ...]) -> str:
+        files = runtime.state.get("files") or {}
+        fingerprint = sorted((path, data.get("modified_at") if data else None) for path, data in files.items())
+        payload = json.dumps([scopes, subagent_type, description, fingerprint, generation], default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _meta_key(scope: str) -> str:
+        return hashlib.sha256(scope.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _stored_generation(item: Any) -> int:  # noqa: ANN401
+        return int(item.value["generation"]) if item is not None else 0
+
+    def _scope_generation(self, scopes: tuple[str, ...], store: BaseStore | None) -> int:
+        # Generations only grow, so their sum changes whenever any of them does
+        if store is None:
+            with self._lock:
+                return self._epoch + sum(self._generations.get(scope, 0) for scope in scopes)
+        namespace = (*self.store_namespace, "meta")  # type: ignore[misc]
+        return sum(self._stored_generation(store.get(namespace, self._meta_key(scope))) for scope in scopes)
+
+    async def _ascope_generation(self, scopes: tuple[str, ...], store: BaseStore | None) -> int:
+        if store is None:
+            return self._scope_generation(scopes, None)
+        namespace = (*self.store_namespace, "meta")  # type: ignore[misc]
+        return sum([self._stored_generation(await store.aget(namespace, self._meta_key(scope))) for scope in scopes])
+
+    def generation(self, runtime: ToolRuntime | None = None, backend: BACKEND_TYPES | None = None) -> int:
+        """Return the write generation of the scopes of `runtime` and `backend`."""
+        store = self._store(runtime)
+        if runtime is None:
+            return self._epoch
+        return self._scope_generation(self._scopes(runtime, backend), store)
+
+    async def ageneration(self, runtime: ToolRuntime | None = None, backend: BACKEND_TYPES | None = None) -> int:
+        """(async) Return the write generation of the scopes of `runtime` and `backend`."""
+        store = self._store(runtime)
+        if runtime is None:
+            return self._epoch
+        return await self._ascope_generation(self._scopes(runtime, backend), store)
+
+    def _forget(self, scopes: tuple[str, ...]) -> None:
+        """Advance the in-memory generation of `scopes` and drop their entries."""
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            for key in [key for key, entry in self._entries.items() if set(entry[2]) & set(scopes)]:
+                del self._entries[key]
+
+    def _forget_all(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def invalidate(self, runtime: ToolRuntime | None = None, backend: BACKEND_TYPES | None = None) -> None:
+        """Mark the scopes of `runtime` and `backend` as changed, so their cached entries are not used again.
+
+        Without a runtime, every entry of the in-memory cache is dropped.
+        """
+        store = self._store(runtime)
+        if runtime is None:
+            self._forget_all()
+            return
+        scopes = self._scopes(runtime, backend)
+        self._forget(scopes)
+        if store is not None:
+            namespace = (*self.store_namespace, "meta")  # type: ignore[misc]
+            for scope in scopes:
+                key = self._meta_key(scope)
+                store.put(namespace, key, {"generation": self._stored_generation(store.get(namespace, key)) + 1}, index=False)
+
+    async def ainvalidate(self, runtime: ToolRuntime | None = None, backend: BACKEND_TYPES | None = None) -> None:
+        """(async) Mark the scopes of `runtime` and `backend` as changed, so their cached entries are not used again.
+
+        Without a runtime, every entry of the in-memory cache is dropped.
+        """
+        store = self._store(runtime)
+        if runtime is None:
+            self._forget_all()
+            return
+        scopes = self._scopes(runtime, backend)
+        self._forget(scopes)
+        if store is not None:
+            namespace = (*self.store_namespace, "meta")  # type: ignore[misc]
+            for scope in scopes:
+                key = self._meta_key(scope)
+                generation = self._stored_generation(await store.aget(namespace, key)) + 1
+                await store.aput(namespace, key, {"generation": generation}, index=False)
+
+    def watch(self, backend: BACKEND_TYPES | None) -> AgentMiddleware:
+        """Return middleware that invalidates this cache after writes by an agent on `backend`."""
+        return _CacheInvalidator(self, backend)
+
+    # Lookups and inserts
+
+    def _fresh(self, created_at: float) -> bool:
+        return time.time() - created_at < self.ttl_seconds
+
+    def _memory_get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._fresh(entry[0]):
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _memory_put(self, key: str, result: str, scopes: tuple[str, ...]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), result, scopes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _stored_result(self, item: Any) -> str | None:  # noqa: ANN401
+        return item.value["result"] if item is not None and self._fresh(item.value["created_at"]) else None
+
+    def _tally(self, result: str | None) -> str | None:
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def _overflow(self, items: list[Any]) -> list[str]:
+        """Keys of the oldest stored entries beyond `max_entries`."""
+        items = sorted(items, key=lambda item: item.value["created_at"])
+        return [item.key for item in items[: max(len(items) - self.max_entries, 0)]]
+
+    def lookup(self, subagent_type: str, description: str, runtime: ToolRuntime, backend: BACKEND_TYPES | None = None) -> CacheLookup:
+        """Look up a `task` call; pass the returned lookup to `save` after running it on a miss.
+
+        `backend` is the backend (or backend factory) of the calling agent; entries are
+        only shared between calls on the same storage.
+        """
+        store = self._store(runtime)
+        scopes = self._scopes(runtime, backend)
+        generation = self._scope_generation(scopes, store)
+        key = self._key(subagent_type, description, runtime, generation, scopes)
+        if store is None:
+            return CacheLookup(key, generation, self._tally(self._memory_get(key)), scopes)
+        item = store.get((*self.store_namespace, "results"), key)  # type: ignore[misc]
+        return CacheLookup(key, generation, self._tally(self._stored_result(item)), scopes)
+
+    async def alookup(self, subagent_type: str, description: str, runtime: ToolRuntime, backend: BACKEND_TYPES | None = None) -> CacheLookup:
+        """(async) Look up a `task` call; pass the returned lookup to `asave` after running it on a miss."""
+        store = self._store(runtime)
+        scopes = self._scopes(runtime, backend)
+        generation = await self._ascope_generation(scopes, store)
+        key = self._key(subagent_type, description, runtime, generation, scopes)
+        if store is None:
+            return CacheLookup(key, generation, self._tally(self._memory_get(key)), scopes)
+        item = await store.aget((*self.store_namespace, "results"), key)  # type: ignore[misc]
+        return CacheLookup(key, generation, self._tally(self._stored_result(item)), scopes)
+
+    def save(self, lookup: CacheLookup, result: str, runtime: ToolRuntime) -> None:
+        """Cache the result of a run, unless the workspace changed while it ran."""
+        store = self._store(runtime)
+        if self._scope_generation(lookup.scopes, store) != lookup.generation:
+            return
+        if store is None:
+            self._memory_put(lookup.key, result, lookup.scopes)
+            return
+        namespace = (*self.store_namespace, "results")  # type: ignore[misc]
+        store.put(namespace, lookup.key, {"result": result, "created_at": time.time()}, index=False)
+        for key in self._overflow(store.search(namespace, limit=self.max_entries + 100)):
+            store.delete(namespace, key)
+
+    async def asave(self, lookup: CacheLookup, result: str, runtime: ToolRuntime) -> None:
+        """(async) Cache the result of a run, unless the workspace changed while it ran."""
+        store = self._store(runtime)
+        if await self._ascope_generation(lookup.scopes, store) != lookup.generation:
+            return
+        if store is None:
+            self._memory_put(lookup.key, result, lookup.scopes)
+            return
+        namespace = (*self.store_namespace, "results")  # type: ignore[misc]
+        await store.aput(namespace, lookup.key, {"result": result, "created_at": time.time()}, index=False)
+        for key in self._overflow(await store.asearch(namespace, limit=self.max_entries + 100)):
+            await store.adelete(namespace, key)
+
+    # Write tracking
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Invalidate the cache after any tool call that may have changed the workspace."""
+        try:
+            return handler(request)
+        finally:
+            if request.tool_call["name"] not in self.read_only_tools:
+                self.invalidate(request.runtime)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """(async) Invalidate the cache after any tool call that may have changed the workspace."""
+        try:
+            return await handler(request)
+        finally:
+            if request.tool_call["name"] not in self.read_only_tools:
+                await self.ainvalidate(request.runtime)
+
+
+class _CacheInvalidator(AgentMiddleware):
+    """Invalidates a `SubAgentResultCache` after tool calls that may have changed the agent's workspace."""
+
+    def __init__(self, cache: SubAgentResultCache, backend: BACKEND_TYPES | None) -> None:
+        super().__init__()
+        self.cache = cache
+        self.backend = backend
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Invalidate the scopes of the call after any tool call that may have changed the workspace."""
+        try:
+            return handler(request)
+        finally:
+            if request.tool_call["name"] not in self.cache.read_only_tools:
+                self.cache.invalidate(request.runtime, self.backend)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """(async) Invalidate the scopes of the call after any tool call that may have changed the workspace."""
+        try:
+            return await handler(request)
+        finally:
+            if request.tool_call["name"] not in self.cache.read_only_tools:
+                await self.cache.ainvalidate(request.runtime, self.backend)
+
+
+__all__ = ["READ_ONLY_TOOLS", "CacheLookup", "SubAgentResultCache"]
@@ -1,7 +1,12 @@
 """Middleware for providing subagents to an agent via a `task` tool."""
 
-from collections.abc import Awaitable, Callable, Sequence
-from typing import Any, NotRequired, TypedDict, cast
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, NotRequired, cast
 
 from langchain.agents import create_agent
 from langchain.agents.middleware import HumanInTheLoopMiddleware, InterruptOnConfig
@@ -10,8 +15,14 @@ from langchain.tools import BaseTool, ToolRuntime
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, ToolMessage
 from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langchain_core.tools import StructuredTool
+from langgraph.errors import GraphBubbleUp
 from langgraph.types import Command
+from typing_extensions import TypedDict
+
+from deepagents.backends.protocol import BACKEND_TYPES
+from deepagents.middleware.subagent_cache import SubAgentResultCache
 
 
 class SubAgent(TypedDict):
@@ -66,7 +77,13 @@ DEFAULT_SUBAGENT_PROMPT = "In order to complete the objective that the user asks
 # 1. The messages key is handled explicitly to ensure only the final message is included
 # 2. The todos and structured_response keys are excluded as they do not have a defined reducer
 #    and no clear meaning for returning them from a subagent to the main agent.
-_EXCLUDED_STATE_KEYS = {"messages", "todos", "structured_response"}
+# 3. The read_file_cache key points at messages in one agent's history, which the other
+#    agent does not have.
+_EXCLUDED_STATE_KEYS = {"messages", "todos", "structured_response", "read_file_cache"}
+
+# State keys whose reducer merges dict updates entry by entry (None deletes an entry), so a
+# subagent only needs to send back the entries it changed. Any other key is sent back whole.
+_ENTRY_MERGED_STATE_KEYS = {"files"}
 
 TASK_TOOL_DESCRIPTION = """Launch an ephemeral subagent to handle complex, multi-step independent tasks with isolated context windows.
 
@@ -207,9 +224,51 @@ When NOT to use the task tool:
 - You should use the `task` tool whenever you have a complex task that will take multiple steps, and is independent from other tasks that the agent needs to complete. These agents are highly competent and efficient."""  # noqa: E501
 
 
+TASK_BATCH_TOOL_DESCRIPTION = """Launch several ephemeral subagents at once and wait for all of them. Use this instead of many separate `task` calls when you have a set of independent tasks to delegate, e.g. researching several topics or analyzing several files.
+
+Available agent types:
+{available_agents}
+
+Pass `tasks`, a list of objects with a `subagent_type` and a `description`, each exactly as you would pass them to the `task` tool. At most {max_concurrency} tasks run at the same time; the rest wait for a free slot. The result contains one section per task, in the order given, with the time each task took. A task that fails reports its error without affecting the others. If several tasks change the same file, the change from the task listed last is kept."""  # noqa: E501
+
 DEFAULT_GENERAL_PURPOSE_DESCRIPTION = "General-purpose agent for researching complex questions, searching for files and content, and executing multi-step tasks. When you are searching for a keyword or file and are not confident that you will find the right match in the first few tries use this agent to perform the search for you. This agent has access to all tools as the main agent."  # noqa: E501
 
 
+class _LazySubAgentGraphs(Mapping[str, Runnable]):
+    """Subagent runnables by name, each compiled on first lookup and then reused.
+
+    Compiling a subagent builds its whole middleware stack, so agents with many
+    subagents defer that work until a `task` call actually needs one.
+    """
+
+    def __init__(self, builders: dict[str, Runnable | Callable[[], Runnable]]) -> None:
+        self._builders = builders
+        # Pre-compiled subagents need no building
+        self._graphs: dict[str, Runnable] = {name: builder for name, builder in builders.items() if isinstance(builder, Runnable)}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Runnable:
+        graph = self._graphs.get(name)
+        if graph is None:
+            builder = cast("Callable[[], Runnable]", self._builders[name])
+            with self._lock:
+                graph = self._graphs.get(name)
+                if graph is None:
+                    graph = self._graphs[name] = builder()
+        return graph
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+    @property
+    def compiled(self) -> list[str]:
+        """Names of the subagents compiled so far, including pre-compiled ones."""
+        return list(self._graphs)
+
+
 def _get_subagents(
     *,
     default_model: str | BaseChatModel,
@@ -218,9 +277,12 @@ def _get_subagents(
     default_interrupt_on: dict[str, bool | InterruptOnConfig] | None,
     subagents: list[SubAgent | CompiledSubAgent],
     general_purpose_agent: bool,
-) -> tuple[dict[str, Any], list[str]]:
+) -> tuple[_LazySubAgentGraphs, list[str]]:
     """Create subagent instances from specifications.
 
+    Subagent graphs are compiled lazily, the first time each one is looked up;
+    the descriptions are built immediately.
+
     Args:
         default_model: Default model for subagents that don't specify one.
         default_tools: Default tools for subagents that don't specify tools.
@@ -232,13 +294,13 @@ def _get_subagents(
         general_purpose_agent: Whether to include a general-purpose subagent.
 
     Returns:
-        Tuple of (agent_dict, description_list) where agent_dict maps agent names
+        Tuple of (agent_mapping, description_list) where agent_mapping maps agent names
         to runnable instances and description_list contains formatted descriptions.
     """
     # Use empty list if None (no default middleware)
     default_subagent_middleware = default_middleware or []
 
-    agents: dict[str, Any] = {}
+    builders: dict[str, Runnable | Callable[[], Runnable]] = {}
     subagent_descriptions = []
 
     # Create general-purpose agent if enabled
@@ -246,13 +308,13 @@ def _get_subagents(
         general_purpose_middleware = [*default_subagent_middleware]
         if default_interrupt_on:
             general_purpose_middleware.append(HumanInTheLoopMiddleware(interrupt_on=default_interrupt_on))
-        general_purpose_subagent = create_agent(
+        builders["general-purpose"] = partial(
+            create_agent,
             default_model,
             system_prompt=DEFAULT_SUBAGENT_PROMPT,
             tools=default_tools,
             middleware=general_purpose_middleware,
         )
-        agents["general-purpose"] = general_purpose_subagent
         subagent_descriptions.append(f"- general-purpose: {DEFAULT_GENERAL_PURPOSE_DESCRIPTION}")
 
     # Process custom subagents
@@ -260,7 +322,7 @@ def _get_subagents(
         subagent_descriptions.append(f"- {agent_['name']}: {agent_['description']}")
         if "runnable" in agent_:
             custom_agent = cast("CompiledSubAgent", agent_)
-            agents[custom_agent["name"]] = custom_agent["runnable"]
+            builders[custom_agent["name"]] = custom_agent["runnable"]
             continue
         _tools = agent_.get("tools", list(default_tools))
 
@@ -272,69 +334,122 @@ def _get_subagents(
         if interrupt_on:
             _middleware.append(HumanInTheLoopMiddleware(interrupt_on=interrupt_on))
 
-        agents[agent_["name"]] = create_agent(
+        builders[agent_["name"]] = partial(
+            create_agent,
             subagent_model,
             system_prompt=agent_["system_prompt"],
             tools=_tools,
             middleware=_middleware,
         )
-    return agents, subagent_descriptions
+    return _LazySubAgentGraphs(builders), subagent_descriptions
+
+
+def _input_keys(subagent: Runnable) -> set[str] | None:
+    """Return the keys in the input schema of a subagent graph, or None for runnables that are not state graphs."""
+    builder = getattr(subagent, "builder", None)
+    schemas = getattr(builder, "schemas", None)
+    if isinstance(schemas, dict) and schemas.get(builder.input_schema):
+        return set(schemas[builder.input_schema])
+    return None
+
+
+def _returns_full_state(subagent: Runnable) -> bool:
+    """Whether the subagent is handed the parent's whole `files` map and returns its whole `files` map.
+
+    State graphs with a `files` channel start from the parent's map and return the
+    merged result, so a path missing from their result was deleted. Any other
+    runnable may return only what it wrote.
+    """
+    keys = _input_keys(subagent)
+    return keys is not None and "files" in keys
+
+
+def _prepare_subagent_state(subagent: Runnable, description: str, state: Mapping[str, Any]) -> dict[str, Any]:
+    """Build the input state of a subagent from the parent's state and the task description.
+
+    Only keys in the input schema of a subagent graph are handed over; the graph
+    would drop the others anyway, after they were copied into its input. Runnables
+    that are not state graphs get every key.
+    """
+    accepted = _input_keys(subagent)
+    # Create a new state dict to avoid mutating the original
+    subagent_state = {k: v for k, v in state.items() if k not in _EXCLUDED_STATE_KEYS and (accepted is None or k in accepted)}
+    subagent_state["messages"] = [HumanMessage(content=description)]
+    return subagent_state
+
+
+def _subagent_state_update(result: dict, parent_state: Mapping[str, Any], *, full_state: bool = False) -> dict[str, Any]:
+    """Return what a subagent changed, as an update for the parent's state.
+
+    Subagents return their whole final state, including everything they were
+    handed, so only keys whose value differs from the parent's are sent back, and
+    for `_ENTRY_MERGED_STATE_KEYS` only the changed entries. This keeps large,
+    mostly unchanged file maps out of the parent's checkpoint.
+
+    Entries missing from the result are sent back as deleted (None) only when
+    `full_state` is set, i.e. the subagent returns the whole map it was handed
+    (see `_returns_full_state`); otherwise they are left to the reducer.
+    """
+    update: dict[str, Any] = {}
+    for key, value in result.items():
+        if key in _EXCLUDED_STATE_KEYS:
+            continue
+        before = parent_state.get(key)
+        if key in _ENTRY_MERGED_STATE_KEYS and isinstance(value, dict) and isinstance(before, dict | None):
+            before = before or {}
+            changed = {entry: entry_value for entry, entry_value in value.items() if before.get(entry) != entry_value}
+            if full_state:
+                changed.update(dict.fromkeys(before.keys() - value.keys()))
+            if changed:
+                update[key] = changed
+        elif value != before:
+            update[key] = value
+    return update
+
+
+def _subagent_final_message(result: dict) -> str:
+    # Strip trailing whitespace to prevent API errors with Anthropic
+    return result["messages"][-1].text.rstrip() if result["messages"][-1].text else ""
+
+
+def _unknown_subagent_message(subagent_type: str, subagent_graphs: Mapping[str, Runnable]) -> str:
+    allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
+    return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
 
 
 def _create_task_tool(
     *,
-    default_model: str | BaseChatModel,
-    default_tools: Sequence[BaseTool | Callable | dict[str, Any]],
-    default_middleware: list[AgentMiddleware] | None,
-    default_interrupt_on: dict[str, bool | InterruptOnConfig] | None,
-    subagents: list[SubAgent | CompiledSubAgent],
-    general_purpose_agent: bool,
+    subagent_graphs: Mapping[str, Runnable],
+    subagent_descriptions: list[str],
     task_description: str | None = None,
+    result_cache: SubAgentResultCache | None = None,
+    backend: BACKEND_TYPES | None = None,
 ) -> BaseTool:
     """Create a task tool for invoking subagents.
 
     Args:
-        default_model: Default model for subagents.
-        default_tools: Default tools for subagents.
-        default_middleware: Middleware to apply to all subagents.
-        default_interrupt_on: The tool configs to use for the default general-purpose subagent. These
-            are also the fallback for any subagents that don't specify their own tool configs.
-        subagents: List of subagent specifications.
-        general_purpose_agent: Whether to include general-purpose agent.
+        subagent_graphs: Subagent runnables by name, as returned by `_get_subagents`.
+        subagent_descriptions: Formatted subagent descriptions, as returned by `_get_subagents`.
         task_description: Custom description for the task tool. If `None`,
             uses default template. Supports `{available_agents}` placeholder.
+        result_cache: Cache to answer repeated tasks from, if any.
+        backend: Backend of the calling agent, which scopes the cache entries.
 
     Returns:
         A StructuredTool that can invoke subagents by type.
     """
-    subagent_graphs, subagent_descriptions = _get_subagents(
-        default_model=default_model,
-        default_tools=default_tools,
-        default_middleware=default_middleware,
-        default_interrupt_on=default_interrupt_on,
-        subagents=subagents,
-        general_purpose_agent=general_purpose_agent,
-    )
     subagent_description_str = "\n".join(subagent_descriptions)
 
-    def _return_command_with_state_update(result: dict, tool_call_id: str) -> Command:
-        state_update = {k: v for k, v in result.items() if k not in _EXCLUDED_STATE_KEYS}
-        # Strip trailing whitespace to prevent API errors with Anthropic
-        message_text = result["messages"][-1].text.rstrip() if result["messages"][-1].text else ""
-        return Command(
-            update={
-                **state_update,
-                "messages": [ToolMessage(message_text, tool_call_id=tool_call_id)],
-            }
-        )
+    def _return_command_with_state_update(
+        result: dict, subagent: Runnable, runtime_state: Mapping[str, Any], tool_call_id: str
+    ) -> tuple[Command, bool]:
+        """Build the tool's Command; the flag tells whether the subagent left the parent state unchanged."""
+        update = _subagent_state_update(result, runtime_state, full_state=_returns_full_state(subagent))
+        message = ToolMessage(_subagent_final_message(result), tool_call_id=tool_call_id)
+        return Command(update={**update, "messages": [message]}), not update
 
-    def _validate_and_prepare_state(subagent_type: str, description: str, runtime: ToolRuntime) -> tuple[Runnable, dict]:
-        """Prepare state for invocation."""
-        subagent = subagent_graphs[subagent_type]
-        # Create a new state dict to avoid mutating the original
-        subagent_state = {k: v for k, v in runtime.state.items() if k not in _EXCLUDED_STATE_KEYS}
-        subagent_state["messages"] = [HumanMessage(content=description)]
-        return subagent, subagent_state
+    def _cached_command(result: str, tool_call_id: str) -> Command:
+        return Command(update={"messages": [ToolMessage(result, tool_call_id=tool_call_id)]})
 
     # Use custom description if provided, otherwise use default template
     if task_description is None:
@@ -349,14 +464,19 @@ def _create_task_tool(
         runtime: ToolRuntime,
     ) -> str | Command:
         if subagent_type not in subagent_graphs:
-            allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
-            return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
-        subagent, subagent_state = _validate_and_prepare_state(subagent_type, description, runtime)
-        result = subagent.invoke(subagent_state, runtime.config)
+            return _unknown_subagent_message(subagent_type, subagent_graphs)
+        lookup = result_cache.lookup(subagent_type, description, runtime, backend) if result_cache is not None else None
+        if lookup is not None and lookup.result is not None and runtime.tool_call_id:
+            return _cached_command(lookup.result, runtime.tool_call_id)
+        subagent = subagent_graphs[subagent_type]
+        result = subagent.invoke(_prepare_subagent_state(subagent, description, runtime.state), runtime.config)
         if not runtime.tool_call_id:
             value_error_msg = "Tool call ID is required for subagent invocation"
             raise ValueError(value_error_msg)
-        return _return_command_with_state_update(result, runtime.tool_call_id)
+        command, unchanged = _return_command_with_state_update(result, subagent, runtime.state, runtime.tool_call_id)
+        if lookup is not None and unchanged:
+            result_cache.save(lookup, _subagent_final_message(result), runtime)  # type: ignore[union-attr]
+        return command
 
     async def atask(
         description: str,
@@ -364,14 +484,19 @@ def _create_task_tool(
         runtime: ToolRuntime,
     ) -> str | Command:
         if subagent_type not in subagent_graphs:
-            allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
-            return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
-        subagent, subagent_state = _validate_and_prepare_state(subagent_type, description, runtime)
-        result = await subagent.ainvoke(subagent_state, runtime.config)
+            return _unknown_subagent_message(subagent_type, subagent_graphs)
+        lookup = await result_cache.alookup(subagent_type, description, runtime, backend) if result_cache is not None else None
+        if lookup is not None and lookup.result is not None and runtime.tool_call_id:
+            return _cached_command(lookup.result, runtime.tool_call_id)
+        subagent = subagent_graphs[subagent_type]
+        result = await subagent.ainvoke(_prepare_subagent_state(subagent, description, runtime.state), runtime.config)
         if not runtime.tool_call_id:
             value_error_msg = "Tool call ID is required for subagent invocation"
             raise ValueError(value_error_msg)
-        return _return_command_with_state_update(result, runtime.tool_call_id)
+        command, unchanged = _return_command_with_state_update(result, subagent, runtime.state, runtime.tool_call_id)
+        if lookup is not None and unchanged:
+            await result_cache.asave(lookup, _subagent_final_message(result), runtime)  # type: ignore[union-attr]
+        return command
 
     return StructuredTool.from_function(
         name="task",
@@ -381,6 +506,175 @@ def _create_task_tool(
     )
 
 
+class BatchTask(TypedDict):
+    """One subtask of a `task_batch` call."""
+
+    subagent_type: str
+    """The subagent to run."""
+
+    description: str
+    """The task for the subagent, as it would be passed to the `task` tool."""
+
+
+@dataclass
+class _BatchOutcome:
+    """Result of one `task_batch` subtask."""
+
+    subagent_type: str
+    latency_s: float
+    text: str = ""
+    state_update: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def _merge_batch_updates(outcomes: list[_BatchOutcome]) -> tuple[dict[str, Any], list[str]]:
+    """Merge the state updates of a batch's subtasks in input order.
+
+    Each update already holds only what its subtask changed (see `_subagent_state_update`).
+    `_ENTRY_MERGED_STATE_KEYS` such as `files` are merged entry by entry; for other keys
+    and for entries that several subtasks changed differently, the later subtask wins.
+
+    Returns:
+        The merged update and a note for each conflicting change.
+    """
+    merged: dict[str, Any] = {}
+    changed_by: dict[tuple[str, Any], int] = {}
+    conflicts: list[str] = []
+    for index, outcome in enumerate(outcomes):
+        for key, value in outcome.state_update.items():
+            if key in _ENTRY_MERGED_STATE_KEYS:
+                target = merged.setdefault(key, {})
+                changes = list(value.items())
+            else:
+                target = merged
+                changes = [(key, value)]
+            for entry, entry_value in changes:
+                previous = changed_by.get((key, entry))
+                if previous is not None and target[entry] != entry_value:
+                    label = f"`{entry}`" if target is not merged else f"state key `{key}`"
+                    conflicts.append(f"Tasks {previous + 1} and {index + 1} both changed {label}; kept the result of task {index + 1}.")
+                changed_by[key, entry] = index
+                target[entry] = entry_value
+    return merged, conflicts
+
+
+def _format_batch_result(outcomes: list[_BatchOutcome], conflicts: list[str]) -> str:
+    sections = []
+    for index, outcome in enumerate(outcomes, start=1):
+        header = f"## Task {index}: {outcome.subagent_type} ({outcome.latency_s:.2f}s)"
+        body = f"Error: {outcome.error}" if outcome.error is not None else outcome.text
+        sections.append(f"{header}\n{body}")
+    if conflicts:
+        sections.append("\n".join(conflicts))
+    return "\n\n".join(sections)
+
+
+def _create_task_batch_tool(
+    *,
+    subagent_graphs: Mapping[str, Runnable],
+    subagent_descriptions: list[str],
+    max_concurrency: int,
+    result_cache: SubAgentResultCache | None = None,
+    backend: BACKEND_TYPES | None = None,
+) -> BaseTool:
+    """Create a tool that runs several subagent tasks concurrently.
+
+    Args:
+        subagent_graphs: Subagent runnables by name, as returned by `_get_subagents`.
+        subagent_descriptions: Formatted subagent descriptions, as returned by `_get_subagents`.
+        max_concurrency: Maximum number of subtasks of one call running at once.
+        result_cache: Cache to answer repeated subtasks from, if any.
+        backend: Backend of the calling agent, which scopes the cache entries.
+
+    Returns:
+        A StructuredTool that fans a list of tasks out to subagents.
+    """
+    description = TASK_BATCH_TOOL_DESCRIPTION.format(available_agents="\n".join(subagent_descriptions), max_concurrency=max_concurrency)
+
+    def _validate(tasks: list[BatchTask], runtime: ToolRuntime) -> str | None:
+        if not runtime.tool_call_id:
+            value_error_msg = "Tool call ID is required for subagent invocation"
+            raise ValueError(value_error_msg)
+        if not tasks:
+            return "task_batch needs at least one task"
+        unknown = next((item["subagent_type"] for item in tasks if item["subagent_type"] not in subagent_graphs), None)
+        return _unknown_subagent_message(unknown, subagent_graphs) if unknown is not None else None
+
+    def _outcome(item: BatchTask, start: float, result: dict | BaseException, runtime_state: Mapping[str, Any]) -> _BatchOutcome:
+        latency_s = time.perf_counter() - start
+        if isinstance(result, BaseException):
+            # Interrupts (e.g. human-in-the-loop approvals) must reach the graph
+            if isinstance(result, GraphBubbleUp):
+                raise result
+            return _BatchOutcome(item["subagent_type"], latency_s, error=f"{type(result).__name__}: {result}")
+        update = _subagent_state_update(result, runtime_state, full_state=_returns_full_state(subagent_graphs[item["subagent_type"]]))
+        return _BatchOutcome(item["subagent_type"], latency_s, text=_subagent_final_message(result), state_update=update)
+
+    def _command(outcomes: list[_BatchOutcome], runtime: ToolRuntime) -> Command:
+        update, conflicts = _merge_batch_updates(outcomes)
+        latencies = [{"subagent_type": o.subagent_type, "latency_s": round(o.latency_s, 3), "error": o.error} for o in outcomes]
+        message = ToolMessage(_format_batch_result(outcomes, conflicts), tool_call_id=runtime.tool_call_id, artifact={"tasks": latencies})
+        return Command(update={**update, "messages": [message]})
+
+    def task_batch(tasks: list[BatchTask], runtime: ToolRuntime) -> str | Command:
+        error = _validate(tasks, runtime)
+        if error is not None:
+            return error
+
+        def run(item: BatchTask) -> _BatchOutcome:
+            subagent = subagent_graphs[item["subagent_type"]]
+            start = time.perf_counter()
+            lookup = result_cache.lookup(item["subagent_type"], item["description"], runtime, backend) if result_cache is not None else None
+            if lookup is not None and lookup.result is not None:
+                return _BatchOutcome(item["subagent_type"], time.perf_counter() - start, text=lookup.result)
+            try:
+                result = subagent.invoke(_prepare_subagent_state(subagent, item["description"], runtime.state), runtime.config)
+            except Exception as e:  # noqa: BLE001
+                return _outcome(item, start, e, runtime.state)
+            outcome = _outcome(item, start, result, runtime.state)
+            if lookup is not None and not outcome.state_update:
+                result_cache.save(lookup, outcome.text, runtime)  # type: ignore[union-attr]
+            return outcome
+
+        # Copy the caller's context (callbacks, tracing) into each worker thread
+        with ContextThreadPoolExecutor(max_workers=min(max_concurrency, len(tasks)), thread_name_prefix="deepagents-task-batch") as pool:
+            outcomes = list(pool.map(run, tasks))
+        return _command(outcomes, runtime)
+
+    async def atask_batch(tasks: list[BatchTask], runtime: ToolRuntime) -> str | Command:
+        error = _validate(tasks, runtime)
+        if error is not None:
+            return error
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(item: BatchTask) -> _BatchOutcome:
+            subagent = subagent_graphs[item["subagent_type"]]
+            async with semaphore:
+                start = time.perf_counter()
+                lookup = (
+                    await result_cache.alookup(item["subagent_type"], item["description"], runtime, backend) if result_cache is not None else None
+                )
+                if lookup is not None and lookup.result is not None:
+                    return _BatchOutcome(item["subagent_type"], time.perf_counter() - start, text=lookup.result)
+                try:
+                    result = await subagent.ainvoke(_prepare_subagent_state(subagent, item["description"], runtime.state), runtime.config)
+                except Exception as e:  # noqa: BLE001
+                    return _outcome(item, start, e, runtime.state)
+                outcome = _outcome(item, start, result, runtime.state)
+                if lookup is not None and not outcome.state_update:
+                    await result_cache.asave(lookup, outcome.text, runtime)  # type: ignore[union-attr]
+                return outcome
+
+        return _command(list(await asyncio.gather(*(run(item) for item in tasks))), runtime)
+
+    return StructuredTool.from_function(
+        name="task_batch",
+        func=task_batch,
+        coroutine=atask_batch,
+        description=description,
+    )
+
+
 class SubAgentMiddleware(AgentMiddleware):
     """Middleware for providing subagents to an agent via a `task` tool.
 
@@ -411,6 +705,16 @@ class SubAgentMiddleware(AgentMiddleware):
         general_purpose_agent: Whether to include the general-purpose agent. Defaults to `True`.
         task_description: Custom description for the task tool. If `None`, uses the
             default description template.
+        task_batch_concurrency: When set, also add a `task_batch` tool that runs a list of
+            subagent tasks concurrently, at most this many at a time, and returns all their
+            results (with per-task latency) in one message. `None` (default) disables it.
+        result_cache: Opt-in cache of subagent results. A `task` (or `task_batch` subtask)
+            repeating an earlier one in the same thread against an unchanged workspace gets
+            the earlier answer without running the subagent again. `result_cache.watch(backend)`
+            is installed in the subagents; add it to this agent's middleware as well
+            (`create_deep_agent` does) so that this agent's writes invalidate it.
+        backend: Backend (or factory) of this agent. Only used to keep result cache entries
+            and write generations of different workspaces apart.
 
     Example:
         ```python
@@ -453,20 +757,44 @@ class SubAgentMiddleware(AgentMiddleware):
         system_prompt: str | None = TASK_SYSTEM_PROMPT,
         general_purpose_agent: bool = True,
         task_description: str | None = None,
+        task_batch_concurrency: int | None = None,
+        result_cache: SubAgentResultCache | None = None,
+        backend: BACKEND_TYPES | None = None,
     ) -> None:
         """Initialize the SubAgentMiddleware."""
         super().__init__()
         self.system_prompt = system_prompt
-        task_tool = _create_task_tool(
+        if result_cache is not None:
+            default_middleware = [*(default_middleware or []), result_cache.watch(backend)]
+        subagent_graphs, subagent_descriptions = _get_subagents(
             default_model=default_model,
             default_tools=default_tools or [],
             default_middleware=default_middleware,
             default_interrupt_on=default_interrupt_on,
             subagents=subagents or [],
             general_purpose_agent=general_purpose_agent,
+        )
+        task_tool = _create_task_tool(
+            subagent_graphs=subagent_graphs,
+            subagent_descriptions=subagent_descriptions,
             task_description=task_description,
+            result_cache=result_cache,
+            backend=backend,
         )
         self.tools = [task_tool]
+        if task_batch_concurrency is not None:
+            if task_batch_concurrency < 1:
+                msg = f"task_batch_concurrency must be at least 1, got {task_batch_concurrency}"
+                raise ValueError(msg)
+            self.tools.append(
+                _create_task_batch_tool(
+                    subagent_graphs=subagent_graphs,
+                    subagent_descriptions=subagent_descriptions,
+                    max_concurrency=task_batch_concurrency,
+                    result_cache=result_cache,
+                    backend=backend,
+                )
+            )
 
     def wrap_model_call(
         self,
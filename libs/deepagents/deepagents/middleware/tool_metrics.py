@@ -0,0 +1,308 @@
+"""Middleware that records per-tool-call latency and payload metrics.
+
+Each tool call produces one `ToolCallRecord` that is appended to a JSONL file
+and/or passed to a callback. Summarize JSONL files with `load_tool_metrics`,
+`summarize_tool_metrics` and `format_tool_metrics`, or with
+`scripts/tool_metrics_report.py`.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from pathlib import Path
+from typing import IO, Any, TypedDict
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain.agents.middleware.types import ToolCallRequest
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.runtime import Runtime
+from langgraph.types import Command
+
+from deepagents.middleware.filesystem import TOO_LARGE_TOOL_MSG
+
+logger = logging.getLogger(__name__)
+
+_EVICTED_PREFIX = TOO_LARGE_TOOL_MSG.split("{", 1)[0]
+
+MAX_PENDING_DISPATCHES = 10_000
+"""Bound on tool calls waiting to execute (e.g. rejected by human-in-the-loop) before the oldest are dropped."""
+
+
+class ToolCallRecord(TypedDict):
+    """Metrics for one tool call."""
+
+    ts: float
+    """Unix timestamp at which the tool call finished."""
+
+    tool: str
+    """Name of the tool."""
+
+    tool_call_id: str | None
+    """ID of the tool call."""
+
+    namespace: str
+    """Checkpoint namespace of the agent that ran the tool: empty for the main agent, non-empty inside subagents."""
+
+    dispatch_ms: float | None
+    """Time from the end of the model call that requested the tool to the start of its execution, if known."""
+
+    duration_ms: float
+    """Wall time of the tool call, including the middleware it wraps (e.g. large result eviction)."""
+
+    result_chars: int
+    """Characters of tool output added to the message history."""
+
+    result_tokens: int
+    """Estimated tokens of tool output (4 characters per token)."""
+
+    evicted: bool
+    """Whether the result was evicted to the filesystem because it was too large."""
+
+    status: str
+    """"success", or "error" when the tool raised or returned an error ToolMessage or an "Error..." result."""
+
+
+class ToolMetricsMiddleware(AgentMiddleware):
+    """Record latency and result size metrics for every tool call.
+
+    Records are written as one JSON object per line to `path` and/or passed to
+    `callback`. To see the effect of large result eviction, this middleware has to
+    wrap `FilesystemMiddleware`, which `create_deep_agent(tool_metrics=...)` takes
+    care of; when passed through `middleware=` it only times the tool itself.
+
+    Args:
+        path: Optional JSONL file that records are appended to.
+        callback: Optional callable invoked with each `ToolCallRecord`.
+
+    Example:
+        ```python
+        from deepagents import create_deep_agent
+        from deepagents.middleware.tool_metrics import ToolMetricsMiddleware
+
+        agent = create_deep_agent(tool_metrics=ToolMetricsMiddleware(path="tool_metrics.jsonl"))
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str | Path | None = None,
+        callback: Callable[[ToolCallRecord], None] | None = None,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            path: Optional JSONL file that records are appended to. The file is
+                opened on the first record.
+            callback: Optional callable invoked with each `ToolCallRecord`.
+        """
+        super().__init__()
+        self.path = Path(path) if path is not None else None
+        self.callback = callback
+        self._file: IO[str] | None = None
+        self._lock = threading.Lock()
+        self._dispatched_at: dict[str, float] = {}
+
+    def after_model(self, state: AgentState, runtime: Runtime[Any]) -> dict[str, Any] | None:  # noqa: ARG002
+        """Remember when the model requested each tool call."""
+        last = state["messages"][-1] if state["messages"] else None
+        if isinstance(last, AIMessage) and last.tool_calls:
+            now = time.perf_counter()
+            with self._lock:
+                for tool_call in last.tool_calls:
+                    if tool_call.get("id"):
+                        self._dispatched_at[tool_call["id"]] = now
+                while len(self._dispatched_at) > MAX_PENDING_DISPATCHES:
+                    del self._dispatched_at[next(iter(self._dispatched_at))]
+        return None
+
+    async def aafter_model(self, state: AgentState, runtime: Runtime[Any]) -> dict[str, Any] | None:
+        """(async) Remember when the model requested each tool call."""
+        return self.after_model(state, runtime)
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Time the tool call and record its result size."""
+        start = time.perf_counter()
+        try:
+            result = handler(request)
+        except Exception:
+            self._record(request, start, None)
+            raise
+        self._record(request, start, result)
+        return result
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """(async) Time the tool call and record its result size."""
+        start = time.perf_counter()
+        try:
+            result = await handler(request)
+        except Exception:
+            self._record(request, start, None)
+            raise
+        self._record(request, start, result)
+        return result
+
+    def close(self) -> None:
+        """Close the JSONL file, if one was opened."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _record(self, request: ToolCallRequest, start: float, result: ToolMessage | Command | None) -> None:
+        end = time.perf_counter()
+        tool_call_id = request.tool_call.get("id")
+        with self._lock:
+            dispatched_at = self._dispatched_at.pop(tool_call_id, None) if tool_call_id else None
+
+        messages = _result_messages(result)
+        result_chars = sum(len(str(message.content)) for message in messages)
+        record: ToolCallRecord = {
+            "ts": time.time(),
+            "tool": request.tool_call["name"],
+            "tool_call_id": tool_call_id,
+            "namespace": _namespace(request),
+            "dispatch_ms": (start - dispatched_at) * 1000 if dispatched_at is not None else None,
+            "duration_ms": (end - start) * 1000,
+            "result_chars": result_chars,
+            "result_tokens": result_chars // 4,
+            "evicted": any(isinstance(message.content, str) and message.content.startswith(_EVICTED_PREFIX) for message in messages),
+            "status": "error" if result is None or any(_is_error(message) for message in messages) else "success",
+        }
+        self._emit(record)
+
+    def _emit(self, record: ToolCallRecord) -> None:
+        if self.callback is not None:
+            try:
+                self.callback(record)
+            except Exception:  # noqa: BLE001
+                logger.warning("Tool metrics callback failed", exc_info=True)
+        if self.path is not None:
+            line = json.dumps(record) + "\n"
+            with self._lock:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = self.path.open("a", encoding="utf-8", buffering=1)
+                self._file.write(line)
+
+
+def _result_messages(result: ToolMessage | Command | None) -> list[ToolMessage]:
+    """The ToolMessages a tool call adds to the history."""
+    if isinstance(result, ToolMessage):
+        return [result]
+    if isinstance(result, Command) and isinstance(result.update, dict):
+        return [message for message in result.update.get("messages", []) if isinstance(message, ToolMessage)]
+    return []
+
+
+def _is_error(message: ToolMessage) -> bool:
+    """Whether a tool result reports a failure (filesystem tools return errors as plain "Error: ..." strings)."""
+    return message.status == "error" or (isinstance(message.content, str) and message.content.startswith("Error"))
+
+
+def _namespace(request: ToolCallRequest) -> str:
+    """Namespace of the agent running the tool, without the tool node's own segment."""
+    config = getattr(request.runtime, "config", None) or {}
+    checkpoint_ns = config.get("metadata", {}).get("langgraph_checkpoint_ns", "")
+    return checkpoint_ns.rpartition("|")[0]
+
+
+def load_tool_metrics(path: str | Path) -> list[ToolCallRecord]:
+    """Read the records of a JSONL file written by `ToolMetricsMiddleware`, skipping malformed lines."""
+    records = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * q / 100))
+    return sorted_values[rank - 1]
+
+
+def summarize_tool_metrics(records: Iterable[ToolCallRecord]) -> dict[str, dict[str, float]]:
+    """Compute per-tool latency percentiles and payload statistics.
+
+    Args:
+        records: Records written by `ToolMetricsMiddleware`.
+
+    Returns:
+        Mapping of tool name to `count`, `errors`, `evicted`, `p50_ms`, `p99_ms`,
+        `max_ms`, `dispatch_p50_ms`, `dispatch_p99_ms`, `mean_result_tokens` and
+        `max_result_tokens`, sorted by descending p99 latency.
+    """
+    by_tool: dict[str, list[ToolCallRecord]] = {}
+    for record in records:
+        by_tool.setdefault(record["tool"], []).append(record)
+
+    summary = {}
+    for tool, tool_records in by_tool.items():
+        durations = sorted(r["duration_ms"] for r in tool_records)
+        dispatches = sorted(r["dispatch_ms"] for r in tool_records if r.get("dispatch_ms") is not None)
+        tokens = [r["result_tokens"] for r in tool_records]
+        summary[tool] = {
+            "count": len(tool_records),
+            "errors": sum(r["status"] == "error" for r in tool_records),
+            "evicted": sum(bool(r["evicted"]) for r in tool_records),
+            "p50_ms": _percentile(durations, 50),
+            "p99_ms": _percentile(durations, 99),
+            "max_ms": durations[-1],
+            "dispatch_p50_ms": _percentile(dispatches, 50),
+            "dispatch_p99_ms": _percentile(dispatches, 99),
+            "mean_result_tokens": sum(tokens) / len(tokens),
+            "max_result_tokens": max(tokens),
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]["p99_ms"], reverse=True))
+
+
+def format_tool_metrics(summary: dict[str, dict[str, float]]) -> str:
+    """Render the output of `summarize_tool_metrics` as a plain-text table."""
+    if not summary:
+        return "No tool calls recorded."
+    header = ("tool", "count", "errors", "evicted", "p50 ms", "p99 ms", "max ms", "dispatch p50", "dispatch p99", "mean tokens", "max tokens")
+    rows = [header]
+    for tool, s in summary.items():
+        rows.append(
+            (
+                tool,
+                str(s["count"]),
+                str(s["errors"]),
+                str(s["evicted"]),
+                f"{s['p50_ms']:.1f}",
+                f"{s['p99_ms']:.1f}",
+                f"{s['max_ms']:.1f}",
+                f"{s['dispatch_p50_ms']:.1f}",
+                f"{s['dispatch_p99_ms']:.1f}",
+                f"{s['mean_result_tokens']:.0f}",
+                str(s["max_result_tokens"]),
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join([row[0].ljust(widths[0]), *(cell.rjust(w) for cell, w in zip(row[1:], widths[1:], strict=True))]) for row in rows)
+
+
+__all__ = [
+    "ToolCallRecord",
+    "ToolMetricsMiddleware",
+    "format_tool_metrics",
+    "load_tool_metrics",
+    "summarize_tool_metrics",
+]
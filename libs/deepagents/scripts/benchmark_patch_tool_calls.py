@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark PatchToolCallsMiddleware.before_agent on long message histories.
+
+Compares the middleware against the previous implementation, which searched
+the rest of the history for every tool call and always rewrote the message
+list, on histories where nothing is dangling and where the last tool call is.
+
+Usage:
+    uv run python scripts/benchmark_patch_tool_calls.py --messages 5000 --repeat 10
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+from langgraph.types import Overwrite
+
+from deepagents.middleware.patch_tool_calls import PatchToolCallsMiddleware
+
+
+def previous_before_agent(state: dict[str, Any]) -> dict[str, Any] | None:
+    """The quadratic implementation PatchToolCallsMiddleware used to have."""
+    messages = state["messages"]
+    if not messages:
+        return None
+    patched_messages = []
+    for i, msg in enumerate(messages):
+        patched_messages.append(msg)
+        if msg.type == "ai" and msg.tool_calls:
+            for tool_call in msg.tool_calls:
+                corresponding_tool_msg = next(
+                    (msg for msg in messages[i:] if msg.type == "tool" and msg.tool_call_id == tool_call["id"]),
+                    None,
+                )
+                if corresponding_tool_msg is None:
+                    patched_messages.append(ToolMessage(content="cancelled", name=tool_call["name"], tool_call_id=tool_call["id"]))
+    return {"messages": Overwrite(patched_messages)}
+
+
+def make_history(count: int, *, dangling: bool) -> list[AnyMessage]:
+    """Build `count` messages of human turns followed by tool-calling rounds."""
+    messages: list[AnyMessage] = []
+    turn = 0
+    while len(messages) < count:
+        messages.append(HumanMessage(content=f"step {turn}"))
+        ids = [f"call_{turn}_{k}" for k in range(2)]
+        messages.append(AIMessage(content="", tool_calls=[{"id": call_id, "name": "read_file", "args": {"path": f"/f{turn}"}} for call_id in ids]))
+        messages.extend(ToolMessage(content="ok", tool_call_id=call_id) for call_id in ids)
+        turn += 1
+    messages = messages[:count]
+    if dangling:
+        messages.append(AIMessage(content="", tool_calls=[{"id": "last", "name": "ls", "args": {}}]))
+        messages.append(HumanMessage(content="interrupting"))
+    return messages
+
+
+def time_op(op: Callable[[], object], repeat: int) -> float:
+    """Return the median wall time of `op` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        op()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000, help="Messages in the history")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    args = parser.parse_args()
+
+    middleware = PatchToolCallsMiddleware()
+    print(f"{args.messages} messages, median of {args.repeat} runs (ms)")
+    print(f"{'history':<16}{'previous':>12}{'current':>12}{'speedup':>10}{'update':>9}")
+    for name, dangling in (("clean", False), ("one dangling", True)):
+        state = {"messages": make_history(args.messages, dangling=dangling)}
+        previous_ms = time_op(lambda state=state: previous_before_agent(state), args.repeat)
+        current_ms = time_op(lambda state=state: middleware.before_agent(state, None), args.repeat)  # type: ignore[arg-type]
+        update = "yes" if middleware.before_agent(state, None) is not None else "no"  # type: ignore[arg-type]
+        print(f"{name:<16}{previous_ms:>12.2f}{current_ms:>12.2f}{previous_ms / current_ms:>9.0f}x{update:>9}")
+
+
+if __name__ == "__main__":
+    main()
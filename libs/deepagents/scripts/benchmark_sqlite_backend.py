@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark SqliteBackend against StoreBackend on an InMemoryStore.
+
+Populates both backends with the same synthetic source tree and times the
+operations agents use most: reads, directory listings, glob and grep.
+
+Usage:
+    uv run python scripts/benchmark_sqlite_backend.py --files 5000 --repeat 20
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from langchain.tools import ToolRuntime
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.protocol import BackendProtocol
+from deepagents.backends.sqlite import SqliteBackend
+from deepagents.backends.store import StoreBackend
+
+
+def make_files(count: int, lines: int) -> dict[str, str]:
+    """Build a synthetic tree of `count` Python files spread over 50 packages."""
+    files: dict[str, str] = {}
+    for i in range(count):
+        body = "\n".join(f"    value_{j} = compute({i}, {j})  # line {j}" for j in range(lines))
+        marker = "\n# TODO(rare-marker): revisit" if i % 500 == 0 else ""
+        files[f"/src/pkg{i % 50:02}/module_{i:05}.py"] = f"import os\n\n\ndef func_{i}():\n{body}\n    return value_0{marker}\n"
+    return files
+
+
+def time_op(op: Callable[[], object], repeat: int) -> float:
+    """Return the median wall time of `op` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        op()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(backend: BackendProtocol, files: dict[str, str], repeat: int) -> dict[str, float]:
+    """Populate `backend` with `files` and time each benchmarked operation."""
+    start = time.perf_counter()
+    backend.upload_files([(path, content.encode()) for path, content in files.items()])
+    results = {"upload (all files)": (time.perf_counter() - start) * 1000}
+    some_file = next(iter(files))
+    ops: dict[str, Callable[[], object]] = {
+        "read": lambda: backend.read(some_file),
+        "ls_info /src/pkg07/": lambda: backend.ls_info("/src/pkg07/"),
+        "glob **/module_000*.py": lambda: backend.glob_info("**/module_000*.py"),
+        "grep rare literal": lambda: backend.grep_raw("rare-marker"),
+        "grep rare regex": lambda: backend.grep_raw(r"TODO\(rare-\w+\)"),
+        "grep common (first 100)": lambda: backend.grep_raw("import os", max_results=100),
+    }
+    for name, op in ops.items():
+        results[name] = time_op(op, repeat)
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="Number of files to create")
+    parser.add_argument("--lines", type=int, default=40, help="Lines per file")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per operation")
+    args = parser.parse_args()
+
+    files = make_files(args.files, args.lines)
+    runtime = ToolRuntime(state={"messages": []}, context=None, tool_call_id="bench", store=InMemoryStore(), stream_writer=lambda _: None, config={})
+    store_results = run(StoreBackend(runtime), files, args.repeat)
+    with tempfile.TemporaryDirectory() as tmp, SqliteBackend(Path(tmp) / "bench.db") as sqlite_backend:
+        sqlite_results = run(sqlite_backend, files, args.repeat)
+
+    print(f"{args.files} files x {args.lines} lines, median of {args.repeat} runs (ms)")
+    print(f"{'operation':<26}{'StoreBackend':>14}{'SqliteBackend':>15}{'speedup':>10}")
+    for name, store_ms in store_results.items():
+        sqlite_ms = sqlite_results[name]
+        print(f"{name:<26}{store_ms:>14.2f}{sqlite_ms:>15.2f}{store_ms / sqlite_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Measure checkpoint bytes written by one `task` call with large file state.
+
+A deep agent with `--files` files in its `files` state (StateBackend) delegates
+one task to a subagent that either edits a single file or only reads one. The checkpointer is an
+InMemorySaver, so the bytes it holds after the run are the serialized
+checkpoints, channel blobs and pending writes of the parent and the subagent.
+The run is repeated with the previous handoff, which passed every state key to
+the subagent and sent every key (the whole `files` map) back.
+
+Usage:
+    uv run python scripts/benchmark_subagent_handoff.py --files 500 --file-kb 4
+"""
+
+import argparse
+from collections.abc import Mapping
+from typing import Any
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from deepagents.backends.utils import create_file_data
+from deepagents.graph import create_deep_agent
+from deepagents.middleware import subagents
+
+
+class ScriptedModel(GenericFakeChatModel):
+    """Fake chat model that replays scripted messages and accepts tool binding."""
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedModel":  # noqa: ANN401, ARG002
+        """Ignore the tools; the scripted messages already contain the tool calls."""
+        return self
+
+
+def previous_prepare_subagent_state(subagent: Any, description: str, state: Mapping[str, Any]) -> dict[str, Any]:  # noqa: ANN401, ARG001
+    """The handoff before minimal-state passing: every non-excluded key."""
+    subagent_state = {k: v for k, v in state.items() if k not in subagents._EXCLUDED_STATE_KEYS}
+    subagent_state["messages"] = [HumanMessage(content=description)]
+    return subagent_state
+
+
+def previous_subagent_state_update(result: dict, parent_state: Mapping[str, Any], *, full_state: bool = False) -> dict[str, Any]:  # noqa: ARG001
+    """The update before minimal-state passing: every non-excluded key of the final state."""
+    return {k: v for k, v in result.items() if k not in subagents._EXCLUDED_STATE_KEYS}
+
+
+def saver_bytes(saver: InMemorySaver) -> dict[str, int]:
+    """Sum the serialized bytes held by an InMemorySaver."""
+    checkpoints = sum(
+        len(checkpoint[1]) + len(metadata[1])
+        for namespaces in saver.storage.values()
+        for by_id in namespaces.values()
+        for checkpoint, metadata, _ in by_id.values()
+    )
+    blobs = sum(len(value[1]) for value in saver.blobs.values())
+    writes = sum(len(write[2][1]) for task_writes in saver.writes.values() for write in task_writes.values())
+    return {"checkpoints": checkpoints, "blobs": blobs, "writes": writes, "total": checkpoints + blobs + writes}
+
+
+def run_task_call(files: dict[str, Any], *, edit: bool) -> dict[str, int]:
+    """Run one parent turn that delegates a task to a subagent and return the saver's byte counts."""
+    parent_model = ScriptedModel(
+        messages=iter(
+            [
+                AIMessage(
+                    content="",
+                    tool_calls=[{"name": "task", "args": {"description": "Fix the typo", "subagent_type": "general-purpose"}, "id": "call_task"}],
+                ),
+                AIMessage(content="Done."),
+            ]
+        )
+    )
+    edit_call = {"name": "edit_file", "args": {"file_path": "/src/file_0000.py", "old_string": "valeu", "new_string": "value"}, "id": "call_edit"}
+    subagent_model = ScriptedModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[{"name": "read_file", "args": {"file_path": "/src/file_0000.py"}, "id": "call_read"}]),
+                *([AIMessage(content="", tool_calls=[edit_call])] if edit else []),
+                AIMessage(content="Done."),
+            ]
+        )
+    )
+    saver = InMemorySaver()
+    agent = create_deep_agent(
+        model=parent_model,
+        checkpointer=saver,
+        subagents=[{"name": "general-purpose", "description": "Edits files.", "system_prompt": "Edit files.", "model": subagent_model}],
+    )
+    config = {"configurable": {"thread_id": "bench"}}
+    result = agent.invoke({"messages": [HumanMessage(content="Fix the typo")], "files": files}, config=config)
+    edited = "value = 1" in "\n".join(result["files"]["/src/file_0000.py"]["content"])
+    assert edited == edit, "the subagent's edit did not reach the parent"  # noqa: S101
+    return saver_bytes(saver)
+
+
+def main() -> None:
+    """Run the measurement and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500, help="Files in the parent's state")
+    parser.add_argument("--file-kb", type=int, default=4, help="Approximate size of each file in KiB")
+    args = parser.parse_args()
+
+    line = "# padding " + "x" * 60
+    body = "\n".join([line] * (args.file_kb * 1024 // (len(line) + 1)))
+    files = {f"/src/file_{i:04}.py": create_file_data(f"valeu = 1\n{body}\n") for i in range(args.files)}
+
+    print(f"one task call, {args.files} files of ~{args.file_kb} KiB in state (checkpoint KiB)")
+    for scenario, edit in (("subagent edits one file", True), ("subagent only reads", False)):
+        current = run_task_call(files, edit=edit)
+        prepare, update = subagents._prepare_subagent_state, subagents._subagent_state_update
+        subagents._prepare_subagent_state, subagents._subagent_state_update = previous_prepare_subagent_state, previous_subagent_state_update
+        try:
+            previous = run_task_call(files, edit=edit)
+        finally:
+            subagents._prepare_subagent_state, subagents._subagent_state_update = prepare, update
+
+        print(f"\n{scenario:<26}{'previous':>12}{'current':>12}{'reduction':>11}")
+        for key in ("checkpoints", "blobs", "writes", "total"):
+            reduction = 1 - current[key] / previous[key] if previous[key] else 0.0
+            print(f"  {key:<24}{previous[key] / 1024:>12.1f}{current[key] / 1024:>12.1f}{reduction:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Pack a directory into a single read-only snapshot file for SnapshotBackend.
+
+Usage:
+    uv run python scripts/pack_snapshot.py path/to/corpus corpus.pack --exclude .git node_modules
+"""
+
+import argparse
+import time
+
+from deepagents.backends.snapshot import DEFAULT_EXCLUDED_DIRS, pack_directory
+
+
+def main() -> None:
+    """Pack the directory given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Directory to pack")
+    parser.add_argument("output", help="Pack file to create or replace")
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=sorted(DEFAULT_EXCLUDED_DIRS),
+        help="Directory names to skip anywhere in the tree (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = pack_directory(args.root, args.output, exclude_dirs=args.exclude)
+    elapsed = time.perf_counter() - start
+    print(f"Packed {stats.files} files ({stats.bytes / 1e6:.1f} MB) into {args.output} in {elapsed:.2f}s; skipped {stats.skipped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Print per-tool p50/p99 latencies from JSONL files written by ToolMetricsMiddleware.
+
+Usage:
+    uv run python scripts/tool_metrics_report.py tool_metrics.jsonl --json
+"""
+
+import argparse
+import json
+
+from deepagents.middleware.tool_metrics import format_tool_metrics, load_tool_metrics, summarize_tool_metrics
+
+
+def main() -> None:
+    """Summarize the metrics files given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="JSONL files to summarize")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON instead of a table")
+    args = parser.parse_args()
+
+    records = [record for path in args.paths for record in load_tool_metrics(path)]
+    summary = summarize_tool_metrics(records)
+    print(json.dumps(summary, indent=2) if args.json else format_tool_metrics(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.change_feed import FileChange, FileChangeFeed
+from deepagents.backends.filesystem import FilesystemBackend
+
+MODES = [pytest.param(True, id="inotify"), pytest.param(False, id="polling")]
+
+
+def wait_for_changes(feed: FileChangeFeed, cursor: int, expected: int) -> tuple[list[FileChange], int]:
+    """Poll until at least `expected` net changes are reported (polling mode rescans in a thread)."""
+    deadline = time.monotonic() + 5
+    while True:
+        changes, new_cursor = feed.changes_since(cursor)
+        if len(changes) >= expected or time.monotonic() > deadline:
+            return changes, new_cursor
+        time.sleep(0.02)
+
+
+@pytest.fixture(params=MODES)
+def backend(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[FilesystemBackend]:
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    try:
+        feed = be.watch(use_inotify=request.param, poll_interval=0.02)
+    except OSError:
+        pytest.skip("inotify is not available")
+    yield be
+    feed.close()
+
+
+def test_reports_external_changes_but_not_backend_writes(backend: FilesystemBackend, tmp_path: Path) -> None:
+    feed = backend.change_feed
+    cursor = feed.cursor
+    (tmp_path / "edited.py").write_text("old")
+    backend.write("/own.txt", "one")
+    backend.edit("/own.txt", "one", "two")
+    backend.upload_files([("/uploaded.bin", b"\x00")])
+
+    changes, cursor = wait_for_changes(feed, cursor, 1)
+    assert [(c.path, c.kind) for c in changes] == [("/edited.py", "created")]
+
+    (tmp_path / "edited.py").write_text("new content")
+    (tmp_path / "own.txt").write_text("changed by the user")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "new.md").write_text("hi")
+
+    changes, cursor = wait_for_changes(feed, cursor, 3)
+    assert sorted((c.path, c.kind) for c in changes) == [
+        ("/edited.py", "modified"),
+        ("/own.txt", "modified"),
+        ("/sub/new.md", "created"),
+    ]
+
+    (tmp_path / "edited.py").unlink()
+    changes, _ = wait_for_changes(feed, cursor, 1)
+    assert [(c.path, c.kind) for c in changes] == [("/edited.py", "deleted")]
+
+
+def test_ignored_directories_and_subscribers(backend: FilesystemBackend, tmp_path: Path) -> None:
+    feed = backend.change_feed
+    seen: list[FileChange] = []
+    unsubscribe = feed.subscribe(seen.append)
+    cursor = feed.cursor
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "index").write_text("x")
+    (tmp_path / "a.txt").write_text("x")
+
+    changes, cursor = wait_for_changes(feed, cursor, 1)
+    assert [c.path for c in changes] == ["/a.txt"]
+    assert [c.path for c in seen] == ["/a.txt"]
+
+    unsubscribe()
+    (tmp_path / "b.txt").write_text("x")
+    wait_for_changes(feed, cursor, 1)
+    assert [c.path for c in seen] == ["/a.txt"]
+
+
+def test_created_then_deleted_files_cancel_out(tmp_path: Path) -> None:
+    with FileChangeFeed(tmp_path, use_inotify=False, poll_interval=60) as feed:
+        feed._watcher._pending.extend([(str(tmp_path / "tmp"), "created"), (str(tmp_path / "tmp"), "deleted"), (str(tmp_path / "x"), "deleted")])
+        changes, cursor = feed.changes_since(0)
+        assert [(c.path, c.kind) for c in changes] == [(str(tmp_path / "x"), "deleted")]
+        assert cursor == feed.cursor == 1
+
+
+def test_watch_returns_the_running_feed(tmp_path: Path) -> None:
+    backend = FilesystemBackend(root_dir=str(tmp_path))
+    with backend.watch(use_inotify=False, poll_interval=60) as feed:
+        assert backend.watch() is feed
+        assert feed.mode == "polling"
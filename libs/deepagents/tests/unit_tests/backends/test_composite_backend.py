@@ -383,7 +383,7 @@ def test_composite_backend_intercept_large_tool_result():
     from langchain_core.messages import ToolMessage
     from langgraph.types import Command
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     rt = make_runtime("t10")
 
@@ -395,8 +395,8 @@ def test_composite_backend_intercept_large_tool_result():
     result = middleware._intercept_large_tool_result(tool_message, rt)
 
     assert isinstance(result, Command)
-    assert "/large_tool_results/test_789" in result.update["files"]
-    assert result.update["files"]["/large_tool_results/test_789"]["content"] == [large_content]
+    assert large_tool_result_path(large_content) in result.update["files"]
+    assert result.update["files"][large_tool_result_path(large_content)]["content"] == [large_content]
     assert "Tool result too large" in result.update["messages"][0].content
 
 
@@ -404,7 +404,7 @@ def test_composite_backend_intercept_large_tool_result_routed_to_store():
     """Test that large tool results can be routed to a specific backend like StoreBackend."""
     from langchain_core.messages import ToolMessage
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     rt = make_runtime("t11")
 
@@ -419,13 +419,46 @@ def test_composite_backend_intercept_large_tool_result_routed_to_store():
 
     assert isinstance(result, ToolMessage)
     assert "Tool result too large" in result.content
-    assert "/large_tool_results/test_routed_123" in result.content
+    assert large_tool_result_path(large_content) in result.content
 
-    stored_item = rt.store.get(("filesystem",), "/test_routed_123")
+    stored_key = large_tool_result_path(large_content).removeprefix("/large_tool_results")
+    stored_item = rt.store.get(("filesystem",), stored_key)
     assert stored_item is not None
     assert stored_item.value["content"] == [large_content]
 
 
+def test_composite_backend_evicted_results_compressed_and_deduplicated():
+    """Test that identical large results are stored once in a compressed store route."""
+    from langchain_core.messages import ToolMessage
+
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
+
+    rt = make_runtime("t12")
+
+    middleware = FilesystemMiddleware(
+        backend=lambda r: build_composite_state_backend(r, routes={"/large_tool_results/": (lambda x: StoreBackend(x, compression="gzip"))}),
+        tool_token_limit_before_evict=1000,
+    )
+
+    large_content = "failing test log line\n" * 500
+    first = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_1"), rt)
+    second = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_2"), rt)
+
+    file_path = large_tool_result_path(large_content)
+    assert isinstance(first, ToolMessage)
+    assert isinstance(second, ToolMessage)
+    assert file_path in first.content
+    assert file_path in second.content
+
+    items = rt.store.search(("filesystem",))
+    assert len(items) == 1
+    assert items[0].value["compression"] == "gzip"
+    assert len(items[0].value["content_compressed"]) < len(large_content) / 10
+
+    backend = build_composite_state_backend(rt, routes={"/large_tool_results/": (lambda x: StoreBackend(x, compression="gzip"))})
+    assert "failing test log line" in backend.read(file_path, limit=1)
+
+
 # Mock sandbox backend for testing execute functionality
 class MockSandboxBackend(SandboxBackendProtocol, StateBackend):
     """Mock sandbox backend that implements SandboxBackendProtocol."""
@@ -1113,3 +1146,134 @@ def test_composite_glob_info_nested_path_in_route() -> None:
     result_paths = sorted([fi["path"] for fi in results])
 
     assert result_paths == ["/archive/2024/feb.log", "/archive/2024/jan.log"]
+
+
+def test_composite_backend_multi_edit_across_routes_is_all_or_nothing(tmp_path: Path):
+    rt = make_runtime("t-multi")
+    (tmp_path / "app.py").write_text("name = 'old'\n")
+    comp = CompositeBackend(
+        default=StateBackend(rt),
+        routes={"/memories/": StoreBackend(rt), "/workspace/": FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)},
+    )
+    rt.state["files"].update(comp.write("/notes.md", "old notes").files_update)
+    comp.write("/memories/prefs.md", "likes old things")
+
+    failed = comp.multi_edit(
+        [
+            {"file_path": "/workspace/app.py", "old_string": "old", "new_string": "new"},
+            {"file_path": "/memories/prefs.md", "old_string": "missing", "new_string": "x"},
+        ]
+    )
+    assert "Edit 2 of 2 failed for '/memories/prefs.md'" in failed.error
+    assert (tmp_path / "app.py").read_text() == "name = 'old'\n"
+
+    res = comp.multi_edit(
+        [
+            {"file_path": "/workspace/app.py", "old_string": "old", "new_string": "new"},
+            {"file_path": "/notes.md", "old_string": "old", "new_string": "new"},
+            {"file_path": "/memories/prefs.md", "old_string": "old", "new_string": "new"},
+        ]
+    )
+    assert res.error is None
+    assert res.paths == ["/workspace/app.py", "/notes.md", "/memories/prefs.md"]
+    assert res.occurrences == {"/workspace/app.py": 1, "/notes.md": 1, "/memories/prefs.md": 1}
+    assert res.files_update["/notes.md"]["content"] == ["new notes"]
+    assert (tmp_path / "app.py").read_text() == "name = 'new'\n"
+    assert "likes new things" in comp.read("/memories/prefs.md")
+
+
+def test_composite_grep_and_glob_merged_view_pages_backend_by_backend(tmp_path: Path) -> None:
+    """Test that the merged view stops at the page size and resumes across backends."""
+    (tmp_path / "a.txt").write_text("hit")
+    (tmp_path / "b.txt").write_text("hit")
+    queried: list[str] = []
+
+    class RecordingStore(StoreBackend):
+        def grep_raw(self, pattern, path=None, glob=None, max_results=None, cursor=None):
+            queried.append("memories")
+            return super().grep_raw(pattern, path, glob, max_results, cursor)
+
+    class UnpagedStore(StoreBackend):
+        """A backend that ignores pagination and always returns every match."""
+
+        def grep_raw(self, pattern, path=None, glob=None, max_results=None, cursor=None):
+            queried.append("archive")
+            return list(super().grep_raw(pattern, path, glob))
+
+    memories = RecordingStore(make_runtime("t_page_mem"))
+    archive = UnpagedStore(make_runtime("t_page_arch"))
+    fs = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    comp = CompositeBackend(default=fs, routes={"/memories/": memories, "/archive/": archive})
+    for i in range(3):
+        comp.write(f"/memories/m{i}.txt", "hit")
+        comp.write(f"/archive/x{i}.txt", "hit")
+
+    first = comp.grep_raw("hit", path="/", max_results=2)
+    assert [m["path"] for m in first] == ["/a.txt", "/b.txt"]
+    assert first.cursor is not None
+    assert queried == []
+
+    pages = [first]
+    while pages[-1].cursor is not None:
+        pages.append(comp.grep_raw("hit", path="/", max_results=2, cursor=pages[-1].cursor))
+
+    paged = [m["path"] for page in pages for m in page]
+    assert paged[:2] == ["/a.txt", "/b.txt"]
+    assert paged[2:] == ["/memories/m0.txt", "/memories/m1.txt", "/memories/m2.txt", "/archive/x0.txt", "/archive/x1.txt", "/archive/x2.txt"]
+    assert sorted(paged) == sorted(m["path"] for m in comp.grep_raw("hit", path="/"))
+    assert all(len(page) <= 2 for page in pages)
+
+    globbed = comp.glob_info("*.txt", "/", max_results=4)
+    rest = comp.glob_info("*.txt", "/", max_results=10, cursor=globbed.cursor)
+    globbed_paths = [fi["path"] for fi in globbed + rest]
+    assert globbed_paths[:2] == ["/a.txt", "/b.txt"]
+    assert sorted(globbed_paths[2:5]) == ["/memories/m0.txt", "/memories/m1.txt", "/memories/m2.txt"]
+    assert sorted(globbed_paths[5:]) == ["/archive/x0.txt", "/archive/x1.txt", "/archive/x2.txt"]
+    assert len(globbed) == 4
+    assert rest.cursor is None
+
+    routed = comp.glob_info("*.txt", "/archive/", max_results=2)
+    assert len(routed) == 2
+    assert all(fi["path"].startswith("/archive/x") for fi in routed)
+    assert routed.cursor is not None
+
+
+def test_composite_stat_many_routes_and_restores_paths(tmp_path: Path):
+    rt = make_runtime("t_stat")
+    fs = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    store = StoreBackend(rt)
+    comp = CompositeBackend(default=fs, routes={"/memories/": store})
+    comp.write("/a.txt", "disk")
+    comp.write("/memories/b.txt", "store!")
+
+    infos = comp.stat_many(["/memories/b.txt", "/a.txt", "/memories/missing.txt"])
+
+    assert infos[0]["path"] == "/memories/b.txt"
+    assert infos[0]["size"] == len("store!")
+    assert infos[1]["path"] == "/a.txt"
+    assert infos[1]["size"] == len("disk")
+    assert infos[2] is None
+
+
+async def test_composite_astat_many(tmp_path: Path):
+    rt = make_runtime("t_astat")
+    comp = CompositeBackend(default=FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), routes={"/memories/": StoreBackend(rt)})
+    await comp.awrite("/memories/b.txt", "x")
+
+    infos = await comp.astat_many(["/missing.txt", "/memories/b.txt"])
+
+    assert infos[0] is None
+    assert infos[1]["path"] == "/memories/b.txt"
+
+
+def test_composite_tail_and_read_range_route_and_restore_paths(tmp_path: Path):
+    rt = make_runtime("t_tail")
+    comp = CompositeBackend(default=FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), routes={"/memories/": StoreBackend(rt)})
+    comp.write("/memories/log.txt", "a\nb\nc\n")
+    comp.write("/disk.txt", "0123456789")
+
+    tail = comp.tail("/memories/log.txt", 2)
+    assert tail.path == "/memories/log.txt"
+    assert tail.content == b"b\nc\n"
+    assert comp.read_range("/disk.txt", 3, 4).content == b"3456"
+    assert comp.read_range("/memories/missing.txt").path == "/memories/missing.txt"
@@ -994,3 +994,47 @@ async def test_composite_aglob_info_nested_path_in_route_async() -> None:
     result_paths = sorted([fi["path"] for fi in results])
 
     assert result_paths == ["/archive/2024/feb.log", "/archive/2024/jan.log"]
+
+
+async def test_composite_amulti_edit_across_routes(tmp_path: Path):
+    rt = make_runtime("t-amulti")
+    (tmp_path / "app.py").write_text("x = 'old'\n")
+    comp = CompositeBackend(
+        default=StoreBackend(rt),
+        routes={"/workspace/": FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)},
+    )
+    await comp.awrite("/notes.md", "old notes")
+
+    failed = await comp.amulti_edit(
+        [
+            {"file_path": "/notes.md", "old_string": "old", "new_string": "new"},
+            {"file_path": "/workspace/missing.py", "old_string": "old", "new_string": "new"},
+        ]
+    )
+    assert "File '/workspace/missing.py' not found" in failed.error
+    assert "old notes" in await comp.aread("/notes.md")
+
+    res = await comp.amulti_edit(
+        [
+            {"file_path": "/notes.md", "old_string": "old", "new_string": "new"},
+            {"file_path": "/workspace/app.py", "old_string": "old", "new_string": "new"},
+        ]
+    )
+    assert res.error is None
+    assert res.paths == ["/notes.md", "/workspace/app.py"]
+    assert (tmp_path / "app.py").read_text() == "x = 'new'\n"
+
+
+async def test_composite_agrep_merged_view_pages(tmp_path: Path) -> None:
+    """Test async paging of the merged grep view across the default backend and a route."""
+    (tmp_path / "a.txt").write_text("hit\nhit")
+    rt = make_runtime("t_apage")
+    comp = CompositeBackend(default=FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), routes={"/memories/": StoreBackend(rt)})
+    await comp.awrite("/memories/m.txt", "hit\nhit")
+
+    first = await comp.agrep_raw("hit", path="/", max_results=3)
+    rest = await comp.agrep_raw("hit", path="/", max_results=3, cursor=first.cursor)
+
+    assert [(m["path"], m["line"]) for m in first] == [("/a.txt", 1), ("/a.txt", 2), ("/memories/m.txt", 1)]
+    assert [(m["path"], m["line"]) for m in rest] == [("/memories/m.txt", 2)]
+    assert rest.cursor is None
@@ -0,0 +1,146 @@
+from langchain.tools import ToolRuntime
+from langgraph.store.base import BaseStore
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.content_addressed import DEFAULT_BLOB_NAMESPACE, ContentAddressedBackend, content_hash
+from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.store import StoreBackend
+
+
+def make_runtime(store: BaseStore | None = None, assistant_id: str | None = None) -> ToolRuntime:
+    return ToolRuntime(
+        state={"messages": []},
+        context=None,
+        tool_call_id="t1",
+        store=store if store is not None else InMemoryStore(),
+        stream_writer=lambda _: None,
+        config={"metadata": {"assistant_id": assistant_id}} if assistant_id else {},
+    )
+
+
+def blob_refcounts(store: BaseStore) -> dict[str, int]:
+    return {item.key: item.value["refcount"] for item in store.search(DEFAULT_BLOB_NAMESPACE, limit=1000)}
+
+
+def test_content_addressed_backend_crud_and_search() -> None:
+    be = ContentAddressedBackend(make_runtime())
+
+    msg = be.write("/docs/readme.md", "hello store")
+    assert isinstance(msg, WriteResult)
+    assert msg.error is None
+    assert "already exists" in be.write("/docs/readme.md", "again").error
+    assert "hello store" in be.read("/docs/readme.md")
+
+    msg2 = be.edit("/docs/readme.md", "hello", "hi")
+    assert isinstance(msg2, EditResult)
+    assert msg2.occurrences == 1
+
+    assert [i["path"] for i in be.ls_info("/")] == ["/docs/"]
+    assert [i["path"] for i in be.ls_info("/docs")] == ["/docs/readme.md"]
+    assert [m["text"] for m in be.grep_raw("hi", path="/")] == ["hi store"]
+    assert be.glob_info("*.md", path="/") == []
+    assert [i["path"] for i in be.glob_info("**/*.md", path="/")] == ["/docs/readme.md"]
+    assert be.stat_many(["/docs/readme.md", "/nope"])[0]["size"] == len("hi store")
+    assert be.tail("/docs/readme.md", 1).content == b"hi store"
+    assert be.read_range("/docs/readme.md", 3).content == b"store"
+
+
+def test_identical_files_across_namespaces_share_one_blob() -> None:
+    store = InMemoryStore()
+    first = ContentAddressedBackend(make_runtime(store, assistant_id="a"))
+    second = ContentAddressedBackend(make_runtime(store, assistant_id="b"))
+    template = "# Shared template\n" * 100
+
+    first.write("/template.md", template)
+    first.write("/copy.md", template)
+    second.upload_files([("/template.md", template.encode())])
+
+    assert blob_refcounts(store) == {content_hash(template): 3}
+    stats = first.dedup_stats()
+    assert stats.files == 3
+    assert stats.blobs == 1
+    assert stats.logical_bytes == 3 * len(template)
+    assert stats.ratio == 3.0
+    assert second.read("/template.md") == first.read("/copy.md")
+
+
+def test_refcounts_follow_edits_and_unreferenced_blobs_are_deleted() -> None:
+    store = InMemoryStore()
+    be = ContentAddressedBackend(make_runtime(store))
+    be.write("/a.txt", "same")
+    be.write("/b.txt", "same")
+
+    be.edit("/a.txt", "same", "changed")
+    assert blob_refcounts(store) == {content_hash("same"): 1, content_hash("changed"): 1}
+
+    be.upload_files([("/b.txt", b"changed")])
+    assert blob_refcounts(store) == {content_hash("changed"): 2}
+
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.txt", "old_string": "changed", "new_string": "final"},
+            {"file_path": "/b.txt", "old_string": "changed", "new_string": "final"},
+        ]
+    )
+    assert res.error is None
+    assert blob_refcounts(store) == {content_hash("final"): 2}
+
+    failed = be.multi_edit([{"file_path": "/a.txt", "old_string": "missing", "new_string": "x"}])
+    assert "Edit 1 of 1 failed" in failed.error
+    assert blob_refcounts(store) == {content_hash("final"): 2}
+
+
+def test_collect_garbage_repairs_refcounts() -> None:
+    store = InMemoryStore()
+    be = ContentAddressedBackend(make_runtime(store))
+    be.write("/kept.txt", "kept")
+    be.write("/dropped.txt", "dropped")
+    # References removed behind the backend's back leave stale counts
+    store.delete(("filesystem",), "/dropped.txt")
+    store.put(DEFAULT_BLOB_NAMESPACE, content_hash("kept"), {**store.get(DEFAULT_BLOB_NAMESPACE, content_hash("kept")).value, "refcount": 5})
+
+    assert be.collect_garbage() == 1
+    assert blob_refcounts(store) == {content_hash("kept"): 1}
+    assert be.collect_garbage() == 0
+
+
+def test_plain_store_items_stay_readable() -> None:
+    rt = make_runtime()
+    StoreBackend(rt).write("/legacy.txt", "written by StoreBackend")
+    be = ContentAddressedBackend(rt, compression="gzip")
+
+    assert "written by StoreBackend" in be.read("/legacy.txt")
+    assert be.download_files(["/legacy.txt"])[0].content == b"written by StoreBackend"
+    assert be.edit("/legacy.txt", "StoreBackend", "hand").error is None
+    assert "written by hand" in be.read("/legacy.txt")
+    assert blob_refcounts(rt.store) == {content_hash("written by hand"): 1}
+
+
+def test_grep_fetches_each_distinct_blob_once() -> None:
+    gets: list[int] = []
+
+    class CountingStore(InMemoryStore):
+        def batch(self, ops: list) -> list:
+            ops = list(ops)
+            gets.append(sum(1 for op in ops if getattr(op, "namespace", None) == DEFAULT_BLOB_NAMESPACE))
+            return super().batch(ops)
+
+    be = ContentAddressedBackend(make_runtime(CountingStore()))
+    be.upload_files([(f"/f{i}.txt", b"needle") for i in range(10)])
+    gets.clear()
+
+    assert len(be.grep_raw("needle")) == 10
+    assert sum(gets) == 1
+
+
+def test_upload_rejects_binary_files_one_by_one() -> None:
+    store = InMemoryStore()
+    be = ContentAddressedBackend(make_runtime(store))
+
+    responses = be.upload_files([("/bin.dat", b"\xff\xfe"), ("/ok.txt", b"text")])
+
+    assert [(r.path, r.error) for r in responses] == [("/bin.dat", "invalid_content"), ("/ok.txt", None)]
+    assert be.stat_many(["/bin.dat", "/ok.txt"])[0] is None
+    assert be.download_files(["/ok.txt"])[0].content == b"text"
+    assert blob_refcounts(store) == {content_hash("text"): 1}
+    assert [r.error for r in be.upload_files([("/bad.dat", b"\x80")])] == ["invalid_content"]
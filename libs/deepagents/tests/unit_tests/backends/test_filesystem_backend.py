@@ -1,7 +1,9 @@
 from pathlib import Path
 
+import pytest
+
 from deepagents.backends.filesystem import FilesystemBackend
-from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.protocol import EditResult, MultiEditResult, WriteResult
 
 
 def write_file(p: Path, content: str):
@@ -194,7 +196,7 @@ def test_filesystem_backend_intercept_large_tool_result(tmp_path: Path):
     from langchain.tools import ToolRuntime
     from langchain_core.messages import ToolMessage
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     root = tmp_path
     rt = ToolRuntime(
@@ -214,8 +216,8 @@ def test_filesystem_backend_intercept_large_tool_result(tmp_path: Path):
 
     assert isinstance(result, ToolMessage)
     assert "Tool result too large" in result.content
-    assert "/large_tool_results/test_fs_123" in result.content
-    saved_file = root / "large_tool_results" / "test_fs_123"
+    assert large_tool_result_path(large_content) in result.content
+    saved_file = root / large_tool_result_path(large_content).lstrip("/")
     assert saved_file.exists()
     assert saved_file.read_text() == large_content
 
@@ -489,3 +491,137 @@ def test_filesystem_download_directory_as_file(tmp_path: Path):
     assert responses[0].path == "/mydir"
     assert responses[0].content is None
     assert responses[0].error == "is_directory"
+
+
+def test_filesystem_backend_multi_edit(tmp_path: Path):
+    write_file(tmp_path / "a.py", "foo = 1\nprint(foo)\n")
+    write_file(tmp_path / "pkg" / "b.py", "from a import foo\n")
+    (tmp_path / "a.py").chmod(0o755)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.py", "old_string": "foo", "new_string": "bar", "replace_all": True},
+            {"file_path": "/pkg/b.py", "old_string": "foo", "new_string": "bar"},
+        ]
+    )
+
+    assert isinstance(res, MultiEditResult) and res.error is None and res.files_update is None
+    assert res.occurrences == {"/a.py": 2, "/pkg/b.py": 1}
+    assert (tmp_path / "a.py").read_text() == "bar = 1\nprint(bar)\n"
+    assert (tmp_path / "pkg" / "b.py").read_text() == "from a import bar\n"
+    assert (tmp_path / "a.py").stat().st_mode & 0o777 == 0o755
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "pkg"]
+
+
+def test_filesystem_backend_multi_edit_failure_leaves_files_untouched(tmp_path: Path):
+    write_file(tmp_path / "a.py", "foo = 1\n")
+    write_file(tmp_path / "b.py", "nothing here\n")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.py", "old_string": "foo", "new_string": "bar"},
+            {"file_path": "/b.py", "old_string": "foo", "new_string": "bar"},
+        ]
+    )
+
+    assert res.error is not None and "Edit 2 of 2 failed for '/b.py'" in res.error
+    assert (tmp_path / "a.py").read_text() == "foo = 1\n"
+    assert (tmp_path / "b.py").read_text() == "nothing here\n"
+
+
+def test_filesystem_backend_multi_edit_rolls_back_when_a_move_fails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    write_file(tmp_path / "a.py", "foo = 1\n")
+    write_file(tmp_path / "b.py", "foo = 2\n")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    replace = Path.replace
+
+    def failing_replace(self: Path, target: Path) -> Path:
+        if Path(target).name == "b.py" and str(self).endswith(".tmp"):
+            msg = "denied"
+            raise PermissionError(msg)
+        return replace(self, target)
+
+    monkeypatch.setattr(Path, "replace", failing_replace)
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.py", "old_string": "foo", "new_string": "bar"},
+            {"file_path": "/b.py", "old_string": "foo", "new_string": "bar"},
+        ]
+    )
+
+    assert res.error == "Error editing file '/b.py': denied"
+    assert (tmp_path / "a.py").read_text() == "foo = 1\n"
+    assert (tmp_path / "b.py").read_text() == "foo = 2\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "b.py"]
+
+
+def test_filesystem_backend_grep_and_glob_pages_in_path_order(tmp_path: Path):
+    for name in ["c.txt", "a.txt", "sub/b.txt", "sub/d.txt"]:
+        write_file(tmp_path / name, "hit one\nmiss\nhit two\n")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+
+    first = be.grep_raw("hit", "/", max_results=3)
+    second = be.grep_raw("hit", "/", max_results=3, cursor=first.cursor)
+    rest = be.grep_raw("hit", "/", cursor=second.cursor)
+
+    assert [(m["path"], m["line"]) for m in first] == [("/a.txt", 1), ("/a.txt", 3), ("/c.txt", 1)]
+    assert [(m["path"], m["line"]) for m in second] == [("/c.txt", 3), ("/sub/b.txt", 1), ("/sub/b.txt", 3)]
+    assert [(m["path"], m["line"]) for m in rest] == [("/sub/d.txt", 1), ("/sub/d.txt", 3)]
+    assert rest.cursor is None
+
+    page = be.glob_info("**/*.txt", "/", max_results=3)
+    assert [fi["path"] for fi in page] == ["/a.txt", "/c.txt", "/sub/b.txt"]
+    assert all("size" in fi for fi in page)
+    last = be.glob_info("**/*.txt", "/", max_results=3, cursor=page.cursor)
+    assert [fi["path"] for fi in last] == ["/sub/d.txt"] and last.cursor is None
+
+
+def test_filesystem_backend_stat_many(tmp_path: Path):
+    write_file(tmp_path / "sub" / "a.txt", "hello")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+
+    a, sub, missing = be.stat_many(["/sub/a.txt", "/sub", "/missing.txt"])
+
+    assert a["path"] == "/sub/a.txt"
+    assert a["is_dir"] is False
+    assert a["size"] == len("hello")
+    assert sub["is_dir"] is True
+    assert missing is None
+    # Paths escaping the root are reported as missing rather than raising
+    assert be.stat_many(["/../outside"]) == [None]
+
+
+def test_filesystem_backend_write_refuses_existing_file(tmp_path: Path):
+    write_file(tmp_path / "a.txt", "original")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+
+    res = be.write("/a.txt", "new")
+
+    assert res.error is not None and "already exists" in res.error
+    assert (tmp_path / "a.txt").read_text() == "original"
+
+
+def test_filesystem_backend_tail_reads_backwards_in_blocks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    log = "".join(f"line {i}\n" for i in range(1, 101))
+    write_file(tmp_path / "build.log", log)
+    (tmp_path / "dir").mkdir()
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    # Force several backwards block reads
+    monkeypatch.setattr("deepagents.backends.filesystem.TAIL_BLOCK_SIZE", 7)
+
+    assert be.tail("/build.log", 3).content == b"line 98\nline 99\nline 100\n"
+    assert be.tail("/build.log", 500).content == log.encode()
+    assert be.tail("/missing.log", 3).error == "file_not_found"
+    assert be.tail("/dir", 3).error == "is_directory"
+
+
+def test_filesystem_backend_read_range(tmp_path: Path):
+    (tmp_path / "blob.bin").write_bytes(bytes(range(256)))
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+
+    assert be.read_range("/blob.bin", 250).content == bytes(range(250, 256))
+    assert be.read_range("/blob.bin", 16, 4).content == bytes([16, 17, 18, 19])
+    assert be.read_range("/blob.bin", 1000, 4).content == b""
+    assert be.read_range("/missing.bin").error == "file_not_found"
@@ -198,7 +198,7 @@ async def test_filesystem_backend_intercept_large_tool_result_async(tmp_path: Pa
     from langchain.tools import ToolRuntime
     from langchain_core.messages import ToolMessage
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     root = tmp_path
     rt = ToolRuntime(
@@ -218,8 +218,8 @@ async def test_filesystem_backend_intercept_large_tool_result_async(tmp_path: Pa
 
     assert isinstance(result, ToolMessage)
     assert "Tool result too large" in result.content
-    assert "/large_tool_results/test_fs_123" in result.content
-    saved_file = root / "large_tool_results" / "test_fs_123"
+    assert large_tool_result_path(large_content) in result.content
+    saved_file = root / large_tool_result_path(large_content).lstrip("/")
     assert saved_file.exists()
     assert saved_file.read_text() == large_content
 
@@ -0,0 +1,195 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import (
+    BackendCallbackHandler,
+    BackendOpEvent,
+    BackendStatsCollector,
+    InstrumentedBackend,
+    InstrumentedSandboxBackend,
+    OpStats,
+    instrument_backend,
+)
+from deepagents.backends.protocol import ExecuteResponse, FileDownloadResponse, FileUploadResponse
+from deepagents.backends.sandbox import BaseSandbox
+from deepagents.backends.state import StateBackend
+from deepagents.graph import create_deep_agent
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+class RecordingHandler(BackendCallbackHandler):
+    def __init__(self) -> None:
+        self.started: list[BackendOpEvent] = []
+        self.ended: list[BackendOpEvent] = []
+
+    def on_op_start(self, event: BackendOpEvent) -> None:
+        self.started.append(event)
+
+    def on_op_end(self, event: BackendOpEvent) -> None:
+        self.ended.append(event)
+
+
+class EchoSandbox(BaseSandbox):
+    def execute(self, command: str) -> ExecuteResponse:
+        return ExecuteResponse(output=f"ran {command}", exit_code=0 if command != "false" else 1)
+
+    @property
+    def id(self) -> str:
+        return "echo"
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        raise NotImplementedError
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        return [FileDownloadResponse(path=p, error="file_not_found") for p in paths]
+
+
+def test_reports_paths_bytes_and_errors(tmp_path) -> None:
+    handler = RecordingHandler()
+    backend = InstrumentedBackend(FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), [handler])
+
+    assert backend.write("/a.txt", "héllo").error is None
+    assert "héllo" in backend.read("/a.txt")
+    assert backend.edit("/a.txt", "missing", "x").error is not None
+    assert backend.read("/nope.txt").startswith("Error")
+
+    assert [e.op for e in handler.started] == ["write", "read", "edit", "read"]
+    write, read, edit, missing = handler.ended
+    assert write.backend == "FilesystemBackend"
+    assert write.path == "/a.txt"
+    assert write.bytes_in == len("héllo".encode())
+    assert write.error is None
+    assert read.bytes_out > 0
+    assert edit.bytes_in == len("missing") + len("x")
+    assert edit.error is not None
+    assert missing.error is not None
+    assert all(e.duration_s >= 0 for e in handler.ended)
+    # Non-protocol attributes come from the wrapped backend
+    assert backend.virtual_mode is True
+
+
+def test_exceptions_are_reported_and_reraised() -> None:
+    handler = RecordingHandler()
+    backend = instrument_backend(EchoSandbox(), [handler])
+    assert isinstance(backend, InstrumentedSandboxBackend)
+
+    with pytest.raises(NotImplementedError):
+        backend.upload_files([("/a", b"abc")])
+
+    (event,) = handler.ended
+    assert event.op == "upload_files"
+    assert event.path == "/a"
+    assert event.bytes_in == len(b"abc")
+    assert event.error.startswith("NotImplementedError")
+
+
+def test_sandbox_execute_and_failing_handler() -> None:
+    class BrokenHandler(BackendCallbackHandler):
+        def on_op_end(self, event: BackendOpEvent) -> None:
+            raise RuntimeError(event.op)
+
+    handler = RecordingHandler()
+    backend = instrument_backend(EchoSandbox(), [BrokenHandler(), handler])
+
+    assert backend.execute("true").output == "ran true"
+    assert backend.execute("false").exit_code == 1
+    assert backend.id == "echo"
+
+    ok, failed = handler.ended
+    assert ok.op == "execute"
+    assert ok.bytes_out == len("ran true")
+    assert ok.error is None
+    assert failed.error == "exit code 1"
+
+
+async def test_async_ops_use_sync_op_names(tmp_path) -> None:
+    handler = RecordingHandler()
+    backend = instrument_backend(FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), [handler])
+
+    await backend.awrite("/a.txt", "one\ntwo\n")
+    await backend.agrep_raw("two", "/")
+    await backend.aglob_info("*.txt", "/")
+    await backend.adownload_files(["/a.txt"])
+
+    assert [e.op for e in handler.ended] == ["write", "grep_raw", "glob_info", "download_files"]
+    assert handler.ended[-1].bytes_out == len(b"one\ntwo\n")
+
+
+def test_composite_children_are_instrumented_separately(tmp_path) -> None:
+    collector = BackendStatsCollector()
+    composite = CompositeBackend(
+        default=StateBackend(None),
+        routes={"/disk/": FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)},
+    )
+    backend = instrument_backend(composite, [collector])
+
+    assert isinstance(backend, CompositeBackend)
+    backend.write("/disk/a.txt", "x")
+    backend.read("/disk/a.txt")
+    backend.read("/disk/a.txt")
+
+    stats = collector.stats
+    assert set(stats) == {("FilesystemBackend", "write"), ("FilesystemBackend", "read")}
+    assert stats["FilesystemBackend", "read"].count == 2
+
+
+def test_factories_are_wrapped_lazily() -> None:
+    handler = RecordingHandler()
+    factory = instrument_backend(lambda rt: StateBackend(rt), [handler])
+
+    assert callable(factory)
+    assert not isinstance(factory, InstrumentedBackend)
+    assert isinstance(factory(None), InstrumentedBackend)
+
+
+def test_op_stats_histogram_and_percentiles() -> None:
+    stats = OpStats()
+    for duration_ms in [0.5] * 98 + [40, 3000]:
+        stats.record(BackendOpEvent(op="read", backend="B", duration_s=duration_ms / 1000, bytes_out=10))
+
+    assert stats.count == 100
+    assert stats.bytes_out == 1000
+    assert stats.percentile(50) == 1
+    assert stats.percentile(99) == 50
+    assert stats.percentile(100) == pytest.approx(3000)
+    summary = stats.to_dict()
+    assert summary["histogram"]["<=1ms"] == 98
+    assert summary["histogram"]["<=5000ms"] == 1
+
+
+def test_collector_summary_and_reset() -> None:
+    collector = BackendStatsCollector()
+    assert collector.summary() == "No backend operations recorded."
+
+    collector.on_op_end(BackendOpEvent(op="read", backend="StateBackend", duration_s=0.002))
+    collector.on_op_end(BackendOpEvent(op="write", backend="StateBackend", duration_s=0.010, error="boom"))
+
+    lines = collector.summary().splitlines()
+    assert lines[0].split()[:2] == ["backend", "op"]
+    assert lines[1].split()[:4] == ["StateBackend", "write", "1", "1"]
+    assert collector.to_dict()["StateBackend"]["read"]["count"] == 1
+
+    collector.reset()
+    assert collector.stats == {}
+
+
+def test_create_deep_agent_backend_callbacks() -> None:
+    collector = BackendStatsCollector()
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[{"name": "write_file", "args": {"file_path": "/a.txt", "content": "hi"}, "id": "w1"}]),
+                AIMessage(content="", tool_calls=[{"name": "read_file", "args": {"file_path": "/a.txt"}, "id": "r1"}]),
+                AIMessage(content="done"),
+            ]
+        )
+    )
+    agent = create_deep_agent(model=model, backend_callbacks=[collector])
+
+    agent.invoke({"messages": [HumanMessage(content="write then read")]})
+
+    stats = collector.stats
+    assert stats["StateBackend", "write"].count == 1
+    assert stats["StateBackend", "read"].count == 1
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.limiter import ConcurrencyLimiter, LimitedBackend, LimitedSandboxBackend, limit_backend
+from deepagents.backends.protocol import ExecuteResponse, FileDownloadResponse, FileInfo, FileUploadResponse
+from deepagents.backends.sandbox import BaseSandbox
+
+
+class SlowBackend(FilesystemBackend):
+    """FilesystemBackend whose async listing and reads take a while and count concurrency."""
+
+    def __init__(self, root_dir: str) -> None:
+        super().__init__(root_dir=root_dir, virtual_mode=True)
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+
+    async def _slow(self) -> None:
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.02)
+        self.running -= 1
+
+    async def als_info(self, path: str) -> list[FileInfo]:
+        await self._slow()
+        return self.ls_info(path)
+
+    async def aread(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        await self._slow()
+        return self.read(file_path, offset, limit)
+
+
+class EchoSandbox(BaseSandbox):
+    def execute(self, command: str) -> ExecuteResponse:
+        return ExecuteResponse(output=f"ran {command}", exit_code=0)
+
+    @property
+    def id(self) -> str:
+        return "echo"
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        raise NotImplementedError
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        return [FileDownloadResponse(path=p, error="file_not_found") for p in paths]
+
+
+async def test_per_backend_limit_caps_concurrency(tmp_path) -> None:
+    slow = SlowBackend(str(tmp_path))
+    for i in range(6):
+        slow.write(f"/f{i}.txt", f"file {i}")
+    backend = LimitedBackend(slow, max_concurrency=2)
+
+    results = await asyncio.gather(*(backend.aread(f"/f{i}.txt") for i in range(6)))
+
+    assert [f"file {i}" in result for i, result in enumerate(results)] == [True] * 6
+    assert slow.peak == 2
+    metrics = backend.metrics()
+    assert metrics["backend"]["wait"]["count"] == 6
+    assert metrics["backend"]["wait"]["max_ms"] > 0
+    assert metrics["backend"]["in_flight"] == 0
+    assert metrics["backend"]["waiting"] == 0
+    assert metrics["global"] is None
+
+
+async def test_global_limiter_is_shared_between_backends(tmp_path) -> None:
+    shared = ConcurrencyLimiter(1, name="server")
+    first = SlowBackend(str(tmp_path))
+    second = SlowBackend(str(tmp_path))
+    backends = [LimitedBackend(first, max_concurrency=4, global_limiter=shared), LimitedBackend(second, max_concurrency=4, global_limiter=shared)]
+
+    await asyncio.gather(*(backend.als_info(f"/dir{i}/") for backend in backends for i in range(3)))
+
+    assert first.peak == 1
+    assert second.peak == 1
+    assert shared.to_dict()["wait"]["count"] == 6
+    assert shared.to_dict()["name"] == "server"
+
+
+async def test_identical_inflight_reads_are_coalesced(tmp_path) -> None:
+    slow = SlowBackend(str(tmp_path))
+    slow.write("/a.txt", "hello")
+    backend = LimitedBackend(slow)
+
+    results = await asyncio.gather(*(backend.als_info("/") for _ in range(5)), backend.aread("/a.txt"), backend.aread("/a.txt"))
+
+    assert slow.calls == 2
+    assert backend.coalesced == 4 + 1
+    assert all(listing == results[0] for listing in results[:5])
+    # Waiters get their own copy of the shared result
+    assert results[1] is not results[0]
+
+    # Once the call finished, the next identical read goes to the backend again
+    await backend.als_info("/")
+    assert slow.calls == 3
+
+
+async def test_reads_after_a_write_do_not_join_earlier_reads(tmp_path) -> None:
+    slow = SlowBackend(str(tmp_path))
+    backend = LimitedBackend(slow)
+
+    before = asyncio.ensure_future(backend.als_info("/"))
+    await asyncio.sleep(0)
+    await backend.awrite("/new.txt", "x")
+    after = await backend.als_info("/")
+
+    assert "/new.txt" in [info["path"] for info in after]
+    await before
+    assert backend.coalesced == 0
+
+
+async def test_coalescing_can_be_disabled(tmp_path) -> None:
+    slow = SlowBackend(str(tmp_path))
+    backend = LimitedBackend(slow, coalesce=False)
+
+    await asyncio.gather(*(backend.als_info("/") for _ in range(3)))
+
+    assert slow.calls == 3
+    assert backend.coalesced == 0
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_call(tmp_path) -> None:
+    slow = SlowBackend(str(tmp_path))
+    backend = LimitedBackend(slow)
+
+    leader = asyncio.ensure_future(backend.als_info("/"))
+    follower = asyncio.ensure_future(backend.als_info("/"))
+    await asyncio.sleep(0)
+    follower.cancel()
+
+    assert await leader == []
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+
+def test_sync_calls_are_limited(tmp_path) -> None:
+    backend = LimitedBackend(FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), max_concurrency=1)
+    assert backend.write("/a.txt", "hi").error is None
+    threads = [threading.Thread(target=backend.read, args=("/a.txt",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.metrics()["backend"]["wait"]["count"] == 5
+    # Non-protocol attributes come from the wrapped backend
+    assert backend.virtual_mode is True
+
+
+def test_limit_backend_wraps_sandboxes_composites_and_factories(tmp_path) -> None:
+    shared = ConcurrencyLimiter(4)
+    sandbox = limit_backend(EchoSandbox(), global_limiter=shared)
+    assert isinstance(sandbox, LimitedSandboxBackend)
+    assert sandbox.execute("ls").output == "ran ls"
+    assert sandbox.id == "echo"
+
+    composite = limit_backend(
+        CompositeBackend(default=FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), routes={"/sandbox/": EchoSandbox()}),
+        max_concurrency=2,
+        global_limiter=shared,
+    )
+    assert isinstance(composite, CompositeBackend)
+    assert isinstance(composite.default, LimitedBackend)
+    assert isinstance(composite.routes["/sandbox/"], LimitedSandboxBackend)
+    assert composite.default.global_limiter is shared
+
+    factory = limit_backend(lambda _rt: FilesystemBackend(root_dir=str(tmp_path)), max_concurrency=None)
+    wrapped = factory(None)
+    assert isinstance(wrapped, LimitedBackend)
+    assert wrapped.limiter is None
+
+
+async def test_factory_backends_share_one_limit_and_inflight_table(tmp_path) -> None:
+    slow = SlowBackend(str(tmp_path))
+    runtime = SimpleNamespace(state={"files": {}})
+    factory = limit_backend(lambda _rt: slow, max_concurrency=1)
+
+    await asyncio.gather(*(factory(runtime).als_info("/") for _ in range(5)))
+    assert slow.calls == 1
+    assert factory(runtime).coalesced == 4
+
+    await asyncio.gather(*(factory(runtime).als_info(f"/dir{i}/") for i in range(5)))
+    assert slow.peak == 1
+    assert factory(runtime).metrics()["backend"]["wait"]["count"] == 6
+
+    # Backends built for another agent state never join these reads
+    other = SimpleNamespace(state={"files": {}})
+    await asyncio.gather(factory(runtime).als_info("/"), factory(other).als_info("/"))
+    assert slow.calls == 8
+
+
+def test_limiter_rejects_non_positive_concurrency() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        ConcurrencyLimiter(0)
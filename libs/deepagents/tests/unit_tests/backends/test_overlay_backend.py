@@ -0,0 +1,189 @@
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.overlay import OverlayBackend
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("def main():\n    return 1\n")
+    (tmp_path / "src" / "util.py").write_text("VALUE = 1\n")
+    (tmp_path / "README.md").write_text("# Demo\n")
+    return tmp_path
+
+
+def make_overlay(repo: Path) -> OverlayBackend:
+    return OverlayBackend(FilesystemBackend(root_dir=str(repo), virtual_mode=True))
+
+
+def test_overlay_edits_never_touch_the_base(repo: Path) -> None:
+    overlay = make_overlay(repo)
+
+    assert overlay.edit("/src/app.py", "return 1", "return 2").error is None
+    assert overlay.write("/src/new.py", "NEW = True\n").error is None
+
+    assert "return 2" in overlay.read("/src/app.py")
+    assert "return 1" in overlay.base.read("/src/app.py")
+    assert not (repo / "src" / "new.py").exists()
+    assert "already exists" in overlay.write("/README.md", "x").error
+    assert "already exists" in overlay.write("/src/new.py", "x").error
+    assert "not found" in overlay.edit("/missing.py", "a", "b").error
+
+
+def test_overlay_merges_listings_glob_and_grep(repo: Path) -> None:
+    overlay = make_overlay(repo)
+    overlay.edit("/src/util.py", "VALUE = 1", "VALUE = 2")
+    overlay.write("/src/new.py", "VALUE = 3\n")
+    overlay.write("/docs/guide.md", "guide\n")
+
+    assert [i["path"] for i in overlay.ls_info("/")] == ["/README.md", "/docs/", "/src/"]
+    src = {i["path"]: i for i in overlay.ls_info("/src")}
+    assert sorted(src) == ["/src/app.py", "/src/new.py", "/src/util.py"]
+    assert src["/src/util.py"]["size"] == len("VALUE = 2\n")
+
+    assert sorted(i["path"] for i in overlay.glob_info("**/*.py")) == ["/src/app.py", "/src/new.py", "/src/util.py"]
+    matches = sorted((m["path"], m["text"]) for m in overlay.grep_raw("VALUE"))
+    assert matches == [("/src/new.py", "VALUE = 3"), ("/src/util.py", "VALUE = 2")]
+
+    page = overlay.grep_raw("VALUE", max_results=1)
+    assert len(page) == 1
+    assert page.cursor == "1"
+
+
+def test_overlay_grep_and_glob_merge_layers_in_path_order(tmp_path: Path) -> None:
+    for name in ("a", "b", "c", "d"):
+        (tmp_path / f"{name}.txt").write_text(f"hit {name}\nhit again\n")
+    overlay = make_overlay(tmp_path)
+    overlay.edit("/a.txt", "hit again", "changed")
+    overlay.write("/bb.txt", "hit bb\n")
+
+    assert [(m["path"], m["line"]) for m in overlay.grep_raw("hit")] == [
+        ("/a.txt", 1),
+        ("/b.txt", 1),
+        ("/b.txt", 2),
+        ("/bb.txt", 1),
+        ("/c.txt", 1),
+        ("/c.txt", 2),
+        ("/d.txt", 1),
+        ("/d.txt", 2),
+    ]
+    assert [i["path"] for i in overlay.glob_info("*.txt")] == ["/a.txt", "/b.txt", "/bb.txt", "/c.txt", "/d.txt"]
+
+    paged, sizes, cursor = [], [], None
+    while True:
+        page = overlay.grep_raw("hit", max_results=3, cursor=cursor)
+        paged.extend((m["path"], m["line"]) for m in page)
+        sizes.append(len(page))
+        if page.cursor is None:
+            break
+        cursor = page.cursor
+    assert paged == [(m["path"], m["line"]) for m in overlay.grep_raw("hit")]
+    assert sizes == [3, 3, 2]
+    glob_page = overlay.glob_info("*.txt", max_results=2, cursor="2")
+    assert [i["path"] for i in glob_page] == ["/bb.txt", "/c.txt"]
+    assert glob_page.cursor == "4"
+
+
+def test_overlay_rejects_content_that_is_not_utf8(repo: Path) -> None:
+    (repo / "blob.bin").write_bytes(b"\xff\xfe binary")
+    overlay = make_overlay(repo)
+
+    responses = overlay.upload_files([("/bad.bin", b"\xff\xfe"), ("/good.txt", b"fine\n")])
+    assert [(r.path, r.error) for r in responses] == [("/bad.bin", "invalid_content"), ("/good.txt", None)]
+    assert sorted(overlay.files) == ["/good.txt"]
+
+    assert "not UTF-8" in overlay.edit("/blob.bin", "binary", "text").error
+    assert "not UTF-8" in overlay.multi_edit([{"file_path": "/blob.bin", "old_string": "binary", "new_string": "text"}]).error
+    assert overlay.files.keys() == {"/good.txt"}
+
+
+def test_overlay_reads_and_stats_prefer_the_overlay(repo: Path) -> None:
+    overlay = make_overlay(repo)
+    overlay.upload_files([("/src/util.py", b"VALUE = 10\nOTHER = 2\n")])
+
+    downloads = overlay.download_files(["/src/util.py", "/README.md", "/missing"])
+    assert [d.content for d in downloads] == [b"VALUE = 10\nOTHER = 2\n", b"# Demo\n", None]
+    assert downloads[2].error == "file_not_found"
+
+    infos = overlay.stat_many(["/src/util.py", "/README.md", "/missing"])
+    assert infos[0]["size"] == len(b"VALUE = 10\nOTHER = 2\n")
+    assert infos[1]["path"] == "/README.md"
+    assert infos[2] is None
+
+    assert overlay.tail("/src/util.py", 1).content == b"OTHER = 2\n"
+    assert overlay.read_range("/src/util.py", 0, 5).content == b"VALUE"
+    assert overlay.read_range("/README.md", 2).content == b"Demo\n"
+
+
+def test_overlay_multi_edit_is_all_or_nothing(repo: Path) -> None:
+    overlay = make_overlay(repo)
+
+    failed = overlay.multi_edit(
+        [
+            {"file_path": "/src/app.py", "old_string": "return 1", "new_string": "return 2"},
+            {"file_path": "/src/util.py", "old_string": "missing", "new_string": "x"},
+        ]
+    )
+    assert "Edit 2 of 2 failed" in failed.error
+    assert dict(overlay.files) == {}
+
+    res = overlay.multi_edit(
+        [
+            {"file_path": "/src/app.py", "old_string": "return 1", "new_string": "return 2"},
+            {"file_path": "/src/util.py", "old_string": "VALUE = 1", "new_string": "VALUE = 2"},
+        ]
+    )
+    assert res.error is None
+    assert sorted(overlay.files) == ["/src/app.py", "/src/util.py"]
+
+
+def test_diff_commit_and_discard(repo: Path) -> None:
+    winner = make_overlay(repo)
+    loser = make_overlay(repo)
+    winner.edit("/src/app.py", "return 1", "return 2")
+    winner.write("/src/new.py", "NEW = True\n")
+    winner.upload_files([("/README.md", b"# Demo\n")])
+    loser.edit("/src/app.py", "return 1", "return 3")
+
+    diff = winner.diff()
+    assert "--- a/src/app.py\n+++ b/src/app.py\n" in diff
+    assert "-    return 1\n+    return 2\n" in diff
+    assert "--- /dev/null\n+++ b/src/new.py\n" in diff
+    assert "README" not in diff  # rewritten with identical content
+
+    loser.discard()
+    assert loser.files == {}
+    assert "return 1" in loser.read("/src/app.py")
+
+    responses = winner.commit()
+    assert [r.error for r in responses] == [None, None, None]
+    assert winner.files == {}
+    assert (repo / "src" / "app.py").read_text() == "def main():\n    return 2\n"
+    assert (repo / "src" / "new.py").read_text() == "NEW = True\n"
+    assert winner.diff() == ""
+
+
+def test_diff_marks_each_side_missing_a_final_newline(repo: Path) -> None:
+    (repo / "notes.txt").write_text("first\nlast")
+    overlay = make_overlay(repo)
+    overlay.edit("/notes.txt", "last", "last\n")
+
+    diff = overlay.diff()
+    assert diff.endswith("-last\n\\ No newline at end of file\n+last\n")
+
+    overlay.edit("/notes.txt", "last\n", "end")
+    assert overlay.diff().endswith("-last\n\\ No newline at end of file\n+end\n\\ No newline at end of file\n")
+
+
+def test_overlay_can_keep_files_in_a_caller_mapping(repo: Path) -> None:
+    files: dict = {}
+    overlay = OverlayBackend(FilesystemBackend(root_dir=str(repo), virtual_mode=True), files)
+    overlay.edit("/src/util.py", "1", "2")
+
+    resumed = OverlayBackend(FilesystemBackend(root_dir=str(repo), virtual_mode=True), files)
+    assert "VALUE = 2" in resumed.read("/src/util.py")
+    resumed.commit(["/src/util.py"])
+    assert (repo / "src" / "util.py").read_text() == "VALUE = 2\n"
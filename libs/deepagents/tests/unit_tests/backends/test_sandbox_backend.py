@@ -0,0 +1,123 @@
+import subprocess
+from pathlib import Path
+
+from deepagents.backends.protocol import ExecuteResponse, FileDownloadResponse, FileUploadResponse
+from deepagents.backends.sandbox import BaseSandbox
+
+
+class LocalSandbox(BaseSandbox):
+    """BaseSandbox that runs its shell commands on the local machine."""
+
+    def __init__(self) -> None:
+        self.commands: list[str] = []
+
+    def execute(self, command: str) -> ExecuteResponse:
+        self.commands.append(command)
+        result = subprocess.run(command, shell=True, capture_output=True, text=True, check=False)  # noqa: S602
+        return ExecuteResponse(output=result.stdout + result.stderr, exit_code=result.returncode)
+
+    @property
+    def id(self) -> str:
+        return "local"
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        raise NotImplementedError
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        raise NotImplementedError
+
+
+def test_sandbox_multi_edit_runs_one_command(tmp_path: Path) -> None:
+    a, b = tmp_path / "a.py", tmp_path / "b.py"
+    a.write_text("foo = 'it''s $HOME'\nprint(foo)\n")
+    b.write_text('from a import foo  # "quoted"\n')
+    sandbox = LocalSandbox()
+
+    res = sandbox.multi_edit(
+        [
+            {"file_path": str(a), "old_string": "foo", "new_string": "bar", "replace_all": True},
+            {"file_path": str(b), "old_string": 'foo  # "quoted"', "new_string": "bar"},
+        ]
+    )
+
+    assert res.error is None
+    assert res.files_update is None
+    assert res.paths == [str(a), str(b)]
+    assert res.occurrences == {str(a): 2, str(b): 1}
+    assert a.read_text() == "bar = 'it''s $HOME'\nprint(bar)\n"
+    assert b.read_text() == "from a import bar\n"
+    assert len(sandbox.commands) == 1
+
+
+def test_sandbox_multi_edit_failure_leaves_files_untouched(tmp_path: Path) -> None:
+    a = tmp_path / "a.py"
+    a.write_text("x = 1\nx = 1\n")
+    sandbox = LocalSandbox()
+
+    ambiguous = sandbox.multi_edit(
+        [
+            {"file_path": str(a), "old_string": "x", "new_string": "y", "replace_all": True},
+            {"file_path": str(a), "old_string": "y = 1", "new_string": "z = 1"},
+        ]
+    )
+    missing = sandbox.multi_edit([{"file_path": str(tmp_path / "missing.py"), "old_string": "a", "new_string": "b"}])
+
+    assert ambiguous.error.startswith(f"Error: Edit 2 of 2 failed for '{a}': String 'y = 1' appears 2 times")
+    assert a.read_text() == "x = 1\nx = 1\n"
+    assert "not found" in missing.error
+
+
+def test_sandbox_grep_and_glob_cut_pages_remotely(tmp_path: Path) -> None:
+    for i in range(4):
+        (tmp_path / f"f{i}.txt").write_text("hit\nhit\n")
+    sandbox = LocalSandbox()
+
+    everything = sandbox.grep_raw("hit", str(tmp_path))
+    first = sandbox.grep_raw("hit", str(tmp_path), max_results=5)
+    rest = sandbox.grep_raw("hit", str(tmp_path), max_results=5, cursor=first.cursor)
+
+    assert sorted(m["path"] for m in everything) == sorted(str(tmp_path / f"f{i}.txt") for i in range(4) for _ in range(2))
+    assert first + rest == everything
+    assert len(first) == len(everything) - len(rest)
+    assert first.cursor is not None
+    assert rest.cursor is None
+    assert "| head -n 6" in sandbox.commands[1]
+
+    globbed = sandbox.glob_info("*.txt", str(tmp_path), max_results=3)
+    assert [fi["path"] for fi in globbed] == ["f0.txt", "f1.txt", "f2.txt"]
+    tail = sandbox.glob_info("*.txt", str(tmp_path), max_results=3, cursor=globbed.cursor)
+    assert [fi["path"] for fi in tail] == ["f3.txt"]
+    assert tail.cursor is None
+
+
+def test_sandbox_stat_many_runs_one_command(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("hello")
+    (tmp_path / "sub").mkdir()
+    sandbox = LocalSandbox()
+
+    a, sub, missing = sandbox.stat_many([str(tmp_path / "a.txt"), str(tmp_path / "sub"), str(tmp_path / "it's missing")])
+
+    assert len(sandbox.commands) == 1
+    assert a["path"] == str(tmp_path / "a.txt")
+    assert a["size"] == len("hello")
+    assert a["is_dir"] is False
+    assert sub["is_dir"] is True
+    assert missing is None
+    assert sandbox.stat_many([]) == []
+    assert len(sandbox.commands) == 1
+
+
+def test_sandbox_tail_and_read_range_transfer_only_what_is_asked(tmp_path: Path) -> None:
+    log = tmp_path / "it's a log"
+    log.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(bytes(range(256)))
+    sandbox = LocalSandbox()
+
+    assert sandbox.tail(str(log), 2).content == b"line 99\nline 100\n"
+    assert sandbox.read_range(str(blob), 10, 3).content == bytes([10, 11, 12])
+    assert sandbox.read_range(str(blob), 250).content == bytes(range(250, 256))
+    assert sandbox.tail(str(tmp_path / "missing"), 2).error == "file_not_found"
+    assert sandbox.read_range(str(tmp_path)).error == "is_directory"
+    assert len(sandbox.commands) == 5  # noqa: PLR2004
+    assert all("tail -n" in command or "tail -c" in command for command in sandbox.commands)
@@ -0,0 +1,105 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.snapshot import SnapshotBackend, pack_directory
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> Path:
+    root = tmp_path / "corpus"
+    (root / "docs" / "api").mkdir(parents=True)
+    (root / "src").mkdir()
+    (root / ".git").mkdir()
+    (root / "docs" / "guide.md").write_text("# Guide\nInstall with pip.\nThen import deepagents.\n")
+    (root / "docs" / "api" / "reference.md").write_text("## Reference\r\nimport os\r\n")
+    (root / "src" / "main.py").write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    (root / "src" / "unicode.txt").write_text("héllo wörld\nnaïve café\n")
+    (root / "src" / "blank.txt").write_text("  \n\n")
+    (root / "src" / "data.bin").write_bytes(b"\xff\xfe\x00import")
+    (root / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (root / "README.md").write_text("Corpus readme")
+    return root
+
+
+@pytest.fixture
+def snapshot(corpus: Path, tmp_path: Path) -> Iterator[SnapshotBackend]:
+    stats = pack_directory(corpus, tmp_path / "corpus.pack")
+    assert stats.files == 7
+    with SnapshotBackend(tmp_path / "corpus.pack") as backend:
+        yield backend
+
+
+def test_snapshot_matches_filesystem_reads(corpus: Path, snapshot: SnapshotBackend) -> None:
+    fs = FilesystemBackend(root_dir=str(corpus), virtual_mode=True)
+
+    for path in ["/docs/guide.md", "/docs/api/reference.md", "/src/unicode.txt", "/src/blank.txt", "/README.md"]:
+        assert snapshot.read(path) == fs.read(path), path
+    assert snapshot.read("/src/main.py", offset=40, limit=5) == fs.read("/src/main.py", offset=40, limit=5)
+    assert snapshot.read("/src/main.py", offset=98) == fs.read("/src/main.py", offset=98)
+    assert snapshot.read("/src/main.py", offset=100) == fs.read("/src/main.py", offset=100)
+    assert "not found" in snapshot.read("/missing.md")
+    assert "not valid UTF-8" in snapshot.read("/src/data.bin")
+
+
+def test_snapshot_listing(snapshot: SnapshotBackend) -> None:
+    assert [(i["path"], i["is_dir"]) for i in snapshot.ls_info("/")] == [("/README.md", False), ("/docs/", True), ("/src/", True)]
+    assert [i["path"] for i in snapshot.ls_info("/docs")] == ["/docs/api/", "/docs/guide.md"]
+    assert snapshot.ls_info("/nope/") == []
+    info = snapshot.stat_many(["/README.md", "/nope"])
+    assert info[0]["size"] == len("Corpus readme")
+    assert info[1] is None
+
+
+def test_snapshot_glob(snapshot: SnapshotBackend) -> None:
+    assert sorted(i["path"] for i in snapshot.glob_info("**/*.md")) == ["/README.md", "/docs/api/reference.md", "/docs/guide.md"]
+    assert [i["path"] for i in snapshot.glob_info("*.md", "/docs")] == ["/docs/guide.md"]
+    page = snapshot.glob_info("**/*", max_results=2)
+    assert len(page) == 2
+    assert page.cursor == "2"
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["import", r"import\s+\w+", r"^line 9\d$", "wörld", "caf.", "(Install|Then)", "missing literal", r"\x49nstall", r"caf\u00e9", r"\151mport"],
+)
+def test_snapshot_grep_matches_filesystem(corpus: Path, snapshot: SnapshotBackend, pattern: str) -> None:
+    fs = FilesystemBackend(root_dir=str(corpus), virtual_mode=True)
+    expected = sorted((m["path"], m["line"], m["text"]) for m in fs.grep_raw(pattern, "/") if not m["path"].startswith("/.git"))
+    expected = [m for m in expected if m[0] != "/src/data.bin"]
+
+    assert sorted((m["path"], m["line"], m["text"]) for m in snapshot.grep_raw(pattern, "/")) == expected
+
+
+def test_snapshot_grep_scoping_and_errors(snapshot: SnapshotBackend) -> None:
+    assert [m["path"] for m in snapshot.grep_raw("import", "/docs", glob="*.md")] == ["/docs/api/reference.md", "/docs/guide.md"]
+    page = snapshot.grep_raw("line", "/src", max_results=3)
+    assert [m["line"] for m in page] == [1, 2, 3]
+    assert page.cursor == "3"
+    assert "Invalid regex" in snapshot.grep_raw("(", "/")
+
+
+def test_snapshot_byte_reads_and_downloads(snapshot: SnapshotBackend) -> None:
+    assert snapshot.tail("/src/main.py", 2).content == b"line 99\nline 100\n"
+    assert snapshot.tail("/src/main.py", 500).content.startswith(b"line 1\n")
+    assert snapshot.read_range("/src/unicode.txt", 0, 6).content == "héllo".encode()
+    assert snapshot.read_range("/src/data.bin", 3).content == b"import"
+    downloads = snapshot.download_files(["/README.md", "/nope"])
+    assert downloads[0].content == b"Corpus readme"
+    assert downloads[1].error == "file_not_found"
+
+
+def test_snapshot_is_read_only(snapshot: SnapshotBackend) -> None:
+    assert "read-only" in snapshot.write("/new.md", "x").error
+    assert "read-only" in snapshot.edit("/README.md", "Corpus", "x").error
+    assert "read-only" in snapshot.multi_edit([{"file_path": "/README.md", "old_string": "a", "new_string": "b"}]).error
+    assert snapshot.upload_files([("/README.md", b"x")])[0].error == "permission_denied"
+
+
+def test_snapshot_rejects_other_files(tmp_path: Path) -> None:
+    bogus = tmp_path / "bogus.pack"
+    bogus.write_bytes(b"not a pack at all, just some bytes")
+    with pytest.raises(ValueError, match="not a snapshot pack"):
+        SnapshotBackend(bogus)
@@ -0,0 +1,202 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from langchain.tools import ToolRuntime
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.sqlite import SqliteBackend
+from deepagents.backends.state import StateBackend
+from deepagents.backends.utils import _required_literals
+
+
+@pytest.fixture
+def be(tmp_path: Path) -> Iterator[SqliteBackend]:
+    backend = SqliteBackend(tmp_path / "files.db")
+    yield backend
+    backend.close()
+
+
+def test_sqlite_backend_crud_and_search(be: SqliteBackend) -> None:
+    msg = be.write("/docs/readme.md", "hello sqlite")
+    assert isinstance(msg, WriteResult) and msg.error is None and msg.path == "/docs/readme.md"
+    assert "already exists" in be.write("/docs/readme.md", "again").error
+
+    assert "hello sqlite" in be.read("/docs/readme.md")
+    assert "not found" in be.read("/docs/missing.md")
+
+    msg2 = be.edit("/docs/readme.md", "hello", "hi", replace_all=False)
+    assert isinstance(msg2, EditResult) and msg2.error is None and msg2.occurrences == 1
+
+    assert any(i["path"] == "/docs/readme.md" for i in be.ls_info("/docs/"))
+    assert [m["path"] for m in be.grep_raw("hi", path="/")] == ["/docs/readme.md"]
+    assert be.glob_info("*.md", path="/") == []
+    assert [i["path"] for i in be.glob_info("**/*.md", path="/")] == ["/docs/readme.md"]
+
+
+def test_sqlite_backend_ls_nested_directories(be: SqliteBackend) -> None:
+    for path in ["/src/main.py", "/src/utils/helper.py", "/src/utils/common.py", "/docs/readme.md", "/config.json", "/src_other/x.py"]:
+        assert be.write(path, "content").error is None
+
+    assert [fi["path"] for fi in be.ls_info("/")] == ["/config.json", "/docs/", "/src/", "/src_other/"]
+    assert [fi["path"] for fi in be.ls_info("/src")] == ["/src/main.py", "/src/utils/"]
+    assert [fi["path"] for fi in be.ls_info("/src/utils/")] == ["/src/utils/common.py", "/src/utils/helper.py"]
+    assert be.ls_info("/nonexistent/") == []
+
+
+def test_sqlite_backend_listing_escapes_like_wildcards(be: SqliteBackend) -> None:
+    be.write("/a_b/one.txt", "1")
+    be.write("/axb/two.txt", "2")
+    be.write("/100%/three.txt", "3")
+
+    assert [fi["path"] for fi in be.ls_info("/a_b/")] == ["/a_b/one.txt"]
+    assert [fi["path"] for fi in be.ls_info("/100%/")] == ["/100%/three.txt"]
+
+
+def test_sqlite_backend_listing_uses_path_index(be: SqliteBackend) -> None:
+    with be._connection() as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT path FROM files WHERE path LIKE ? ESCAPE '\\'", ("/src/%",)).fetchall()
+    assert "INDEX" in plan[0][-1]
+
+
+def test_sqlite_backend_persists_across_instances(tmp_path: Path) -> None:
+    with SqliteBackend(tmp_path / "files.db") as first:
+        first.write("/notes.txt", "remember me")
+    with SqliteBackend(tmp_path / "files.db") as second:
+        assert "remember me" in second.read("/notes.txt")
+        assert [m["line"] for m in second.grep_raw("remember")] == [1]
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        ("def foo", ["def foo"]),
+        (r"import\s+os", ["import", "os"]),
+        ("ab*cdef", ["a", "cdef"]),
+        (r"class \w+Error", ["class ", "Error"]),
+        (r"a\.b\.c", ["a.b.c"]),
+        ("(foo|bar)baz", []),
+        ("(?i)needle", []),
+        ("[abc]xy", ["xy"]),
+        ("(", []),
+        (r"\x41BC", ["BC"]),
+        (r"\u00e9t\U0001F600e", ["t", "e"]),
+        (r"\N{LATIN SMALL LETTER A}bc", ["bc"]),
+        (r"\101BC\0123x", ["BC", "3x"]),
+        (r"(ab)\1cd", ["cd"]),
+    ],
+)
+def test_required_literals(pattern: str, expected: list[str]) -> None:
+    assert _required_literals(pattern) == expected
+
+
+def test_sqlite_backend_grep_matches_full_scan(be: SqliteBackend) -> None:
+    files = {
+        "/src/app.py": "import os\nclass ValueError2(Exception):\n    pass\n",
+        "/src/util.py": "def foo():\n    return 'ab*cdef'\n",
+        "/docs/guide.md": "Import guide\nfoo bar baz\n",
+        "/docs/quotes.md": 'say "hello" twice\n',
+    }
+    for path, content in files.items():
+        be.write(path, content)
+    state = StateBackend(
+        ToolRuntime(state={"messages": [], "files": {}}, context=None, tool_call_id="t", store=None, stream_writer=lambda _: None, config={})
+    )
+    state.runtime.state["files"] = {path: {"content": content.split("\n"), "created_at": "", "modified_at": ""} for path, content in files.items()}
+
+    patterns = ["import", r"import\s+os", r"class \w+Error", "def foo", "(foo|Import)", "cdef", '"hello"', "o", "missing text"]
+    # Escapes that stand for other characters must not become required literals
+    patterns += [r"\x69mport", r"\151mport os", r"\N{LATIN SMALL LETTER I}mport", r"(o)\1 bar"]
+    for pattern in patterns:
+        got = sorted((m["path"], m["line"]) for m in be.grep_raw(pattern, "/"))
+        expected = sorted((m["path"], m["line"]) for m in state.grep_raw(pattern, "/"))
+        assert got == expected, pattern
+
+    assert [m["path"] for m in be.grep_raw("foo", "/docs", glob="*.md")] == ["/docs/guide.md"]
+    assert "Invalid regex" in be.grep_raw("(", "/")
+
+
+def test_sqlite_backend_grep_index_tracks_edits(be: SqliteBackend) -> None:
+    be.write("/a.txt", "old needle")
+    be.edit("/a.txt", "needle", "thread")
+    be.upload_files([("/b.txt", b"needle again")])
+
+    assert [m["path"] for m in be.grep_raw("needle")] == ["/b.txt"]
+    assert [m["path"] for m in be.grep_raw("thread")] == ["/a.txt"]
+
+
+def test_sqlite_backend_paginated_grep_and_glob(be: SqliteBackend) -> None:
+    for i in range(12):
+        be.write(f"/f{i:02}.txt", f"needle {i}")
+
+    page = be.grep_raw("needle", "/", max_results=5)
+    assert [m["path"] for m in page] == [f"/f{i:02}.txt" for i in range(5)]
+    rest = be.grep_raw("needle", "/", max_results=10, cursor=page.cursor)
+    assert len(rest) == 7 and rest.cursor is None
+
+    globbed = be.glob_info("*.txt", "/", max_results=10)
+    assert len(globbed) == 10 and globbed.cursor == "10"
+
+
+def test_sqlite_backend_multi_edit_is_atomic(be: SqliteBackend) -> None:
+    be.write("/a.md", "alpha beta")
+    be.write("/b.md", "beta gamma")
+
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.md", "old_string": "beta", "new_string": "delta"},
+            {"file_path": "/b.md", "old_string": "beta", "new_string": "delta"},
+            {"file_path": "/a.md", "old_string": "alpha", "new_string": "omega"},
+        ]
+    )
+    assert res.error is None and res.occurrences == {"/a.md": 2, "/b.md": 1}
+    assert "omega delta" in be.read("/a.md")
+
+    failed = be.multi_edit(
+        [
+            {"file_path": "/a.md", "old_string": "omega", "new_string": "alpha"},
+            {"file_path": "/b.md", "old_string": "missing", "new_string": "x"},
+        ]
+    )
+    assert "Edit 2 of 2 failed" in failed.error
+    assert "omega delta" in be.read("/a.md")
+
+
+def test_sqlite_backend_upload_download_and_stat(be: SqliteBackend) -> None:
+    responses = be.upload_files([("/a.txt", "héllo".encode()), ("/bin.dat", b"\xff\xfe"), ("/a.txt", b"replaced")])
+    assert [r.error for r in responses] == [None, "invalid_path", None]
+
+    downloads = be.download_files(["/a.txt", "/missing.txt"])
+    assert downloads[0].content == b"replaced"
+    assert downloads[1].error == "file_not_found"
+
+    infos = be.stat_many(["/a.txt", "/missing.txt", "/a.txt"])
+    assert infos[0]["size"] == len(b"replaced")
+    assert infos[1] is None
+    assert infos[2] == infos[0]
+
+
+def test_sqlite_backend_tail_and_read_range(be: SqliteBackend) -> None:
+    be.write("/build.log", "".join(f"step {i}\n" for i in range(1, 1001)))
+    be.write("/utf8.txt", "héllo")
+
+    assert be.tail("/build.log", 2).content == b"step 999\nstep 1000\n"
+    assert be.read_range("/build.log", 7, 6).content == b"step 2"
+    assert be.read_range("/utf8.txt", 1, 2).content == "é".encode()
+    assert be.read_range("/utf8.txt", 3).content == b"llo"
+    assert be.tail("/missing.log").error == "file_not_found"
+    assert be.read_range("/missing.log").error == "file_not_found"
+
+
+def test_sqlite_backend_as_composite_route(be: SqliteBackend) -> None:
+    rt = ToolRuntime(
+        state={"messages": [], "files": {}}, context=None, tool_call_id="t", store=InMemoryStore(), stream_writer=lambda _: None, config={}
+    )
+    comp = CompositeBackend(default=StateBackend(rt), routes={"/scratch/": be})
+
+    assert comp.write("/scratch/notes.txt", "scratch needle").error is None
+    assert "scratch needle" in be.read("/notes.txt")
+    assert [m["path"] for m in comp.grep_raw("needle", "/")] == ["/scratch/notes.txt"]
+    assert [fi["path"] for fi in comp.ls_info("/scratch/")] == ["/scratch/notes.txt"]
@@ -0,0 +1,38 @@
+"""Async tests for SqliteBackend."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+from deepagents.backends.sqlite import SqliteBackend
+
+
+async def test_sqlite_backend_async_crud_and_search(tmp_path: Path) -> None:
+    with SqliteBackend(tmp_path / "files.db") as be:
+        assert (await be.awrite("/docs/readme.md", "hello sqlite")).error is None
+        assert "hello sqlite" in await be.aread("/docs/readme.md")
+        assert (await be.aedit("/docs/readme.md", "hello", "hi")).occurrences == 1
+        assert [i["path"] for i in await be.als_info("/docs")] == ["/docs/readme.md"]
+        assert [m["text"] for m in await be.agrep_raw("hi")] == ["hi sqlite"]
+        assert [i["path"] for i in await be.aglob_info("**/*.md")] == ["/docs/readme.md"]
+        assert (await be.astat_many(["/docs/readme.md"]))[0]["size"] == len("hi sqlite")
+        assert (await be.atail("/docs/readme.md", 1)).content == b"hi sqlite"
+        assert (await be.aread_range("/docs/readme.md", 3, 6)).content == b"sqlite"
+
+
+async def test_sqlite_backend_async_runs_on_dedicated_pool(tmp_path: Path) -> None:
+    seen: set[str] = set()
+
+    class RecordingBackend(SqliteBackend):
+        def write(self, file_path: str, content: str):  # noqa: ANN202
+            seen.add(threading.current_thread().name)
+            return super().write(file_path, content)
+
+    with RecordingBackend(tmp_path / "files.db", pool_size=3) as be:
+        results = await asyncio.gather(*(be.awrite(f"/f{i}.txt", f"file {i}") for i in range(20)))
+
+        assert all(r.error is None for r in results)
+        assert seen and all(name.startswith("deepagents-sqlite") for name in seen)
+        assert len(await be.als_info("/")) == 20
+        downloads = await be.adownload_files([f"/f{i}.txt" for i in range(20)])
+        assert [d.content for d in downloads] == [f"file {i}".encode() for i in range(20)]
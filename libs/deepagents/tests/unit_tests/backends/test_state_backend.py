@@ -1,7 +1,7 @@
 from langchain.tools import ToolRuntime
 from langchain_core.messages import ToolMessage
 
-from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.protocol import EditResult, MultiEditResult, ResultPage, WriteResult
 from deepagents.backends.state import StateBackend
 
 
@@ -146,7 +146,7 @@ def test_state_backend_intercept_large_tool_result():
     """Test that StateBackend properly handles large tool result interception."""
     from langgraph.types import Command
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     rt = make_runtime()
     middleware = FilesystemMiddleware(backend=lambda r: StateBackend(r), tool_token_limit_before_evict=1000)
@@ -156,6 +156,102 @@ def test_state_backend_intercept_large_tool_result():
     result = middleware._intercept_large_tool_result(tool_message, rt)
 
     assert isinstance(result, Command)
-    assert "/large_tool_results/test_123" in result.update["files"]
-    assert result.update["files"]["/large_tool_results/test_123"]["content"] == [large_content]
+    assert large_tool_result_path(large_content) in result.update["files"]
+    assert result.update["files"][large_tool_result_path(large_content)]["content"] == [large_content]
     assert "Tool result too large" in result.update["messages"][0].content
+
+
+def test_state_backend_multi_edit_applies_in_order_across_files():
+    rt = make_runtime()
+    be = StateBackend(rt)
+    for path, content in {"/a.py": "foo = 1\nprint(foo)", "/b.py": "from a import foo"}.items():
+        rt.state["files"].update(be.write(path, content).files_update)
+
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.py", "old_string": "foo", "new_string": "bar", "replace_all": True},
+            {"file_path": "/b.py", "old_string": "import foo", "new_string": "import bar"},
+            {"file_path": "/a.py", "old_string": "bar = 1", "new_string": "bar = 2"},
+        ]
+    )
+
+    assert isinstance(res, MultiEditResult) and res.error is None
+    assert res.paths == ["/a.py", "/b.py"]
+    assert res.occurrences == {"/a.py": 3, "/b.py": 1}
+    assert res.files_update["/a.py"]["content"] == ["bar = 2", "print(bar)"]
+    assert res.files_update["/b.py"]["content"] == ["from a import bar"]
+
+
+def test_state_backend_multi_edit_is_all_or_nothing():
+    rt = make_runtime()
+    be = StateBackend(rt)
+    rt.state["files"].update(be.write("/a.py", "x = 1\nx = 1").files_update)
+
+    ambiguous = be.multi_edit(
+        [
+            {"file_path": "/a.py", "old_string": "x", "new_string": "y", "replace_all": True},
+            {"file_path": "/a.py", "old_string": "y = 1", "new_string": "z = 1"},
+        ]
+    )
+    missing = be.multi_edit([{"file_path": "/missing.py", "old_string": "a", "new_string": "b"}])
+
+    assert ambiguous.files_update is None
+    assert ambiguous.error.startswith("Error: Edit 2 of 2 failed for '/a.py': String 'y = 1' appears 2 times")
+    assert ambiguous.error.endswith("No files were changed.")
+    assert "File '/missing.py' not found" in missing.error
+    assert be.multi_edit([]).error == "Error: No edits provided"
+
+
+def test_state_backend_grep_and_glob_pages():
+    rt = make_runtime()
+    be = StateBackend(rt)
+    for i in range(5):
+        rt.state["files"].update(be.write(f"/f{i}.txt", "hit\nmiss\nhit").files_update)
+
+    seen = []
+    cursor = None
+    while True:
+        page = be.grep_raw("hit", "/", max_results=3, cursor=cursor)
+        assert isinstance(page, ResultPage) and len(page) <= 3
+        seen.extend((m["path"], m["line"]) for m in page)
+        cursor = page.cursor
+        if cursor is None:
+            break
+
+    assert seen == [(m["path"], m["line"]) for m in be.grep_raw("hit", "/")]
+    assert len(seen) == 10
+
+    first = be.glob_info("*.txt", "/", max_results=4)
+    rest = be.glob_info("*.txt", "/", max_results=4, cursor=first.cursor)
+    assert len(first) == 4 and first.cursor is not None
+    assert len(rest) == 1 and rest.cursor is None
+    assert [fi["path"] for fi in first + rest] == [fi["path"] for fi in be.glob_info("*.txt", "/")]
+
+
+def test_state_backend_stat_many():
+    rt = make_runtime()
+    be = StateBackend(rt)
+    rt.state["files"].update(be.write("/dir/a.txt", "one\ntwo").files_update)
+
+    a, missing, directory = be.stat_many(["/dir/a.txt", "/missing.txt", "/dir"])
+
+    assert a["path"] == "/dir/a.txt"
+    assert a["is_dir"] is False
+    assert a["size"] == len("one\ntwo")
+    assert a["modified_at"]
+    # State has no real directories
+    assert missing is None and directory is None
+    assert be.stat_many([]) == []
+
+
+def test_state_backend_tail_and_read_range():
+    rt = make_runtime()
+    be = StateBackend(rt)
+    rt.state["files"].update(be.write("/log.txt", "héllo\nworld\nbye\n").files_update)
+
+    assert be.tail("/log.txt", 2).content == b"world\nbye\n"
+    assert be.tail("/log.txt", 10).content == "héllo\nworld\nbye\n".encode()
+    assert be.read_range("/log.txt", 1, 2).content == "é".encode()
+    assert be.read_range("/log.txt", 7).content == b"world\nbye\n"
+    assert be.tail("/missing.txt").error == "file_not_found"
+    assert be.read_range("/missing.txt").error == "file_not_found"
@@ -259,7 +259,7 @@ async def test_state_backend_intercept_large_tool_result_async():
     """Test that StateBackend properly handles large tool result interception in async context."""
     from langgraph.types import Command
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     rt = make_runtime()
     middleware = FilesystemMiddleware(backend=lambda r: StateBackend(r), tool_token_limit_before_evict=1000)
@@ -269,6 +269,6 @@ async def test_state_backend_intercept_large_tool_result_async():
     result = middleware._intercept_large_tool_result(tool_message, rt)
 
     assert isinstance(result, Command)
-    assert "/large_tool_results/test_123" in result.update["files"]
-    assert result.update["files"]["/large_tool_results/test_123"]["content"] == [large_content]
+    assert large_tool_result_path(large_content) in result.update["files"]
+    assert result.update["files"][large_tool_result_path(large_content)]["content"] == [large_content]
     assert "Tool result too large" in result.update["messages"][0].content
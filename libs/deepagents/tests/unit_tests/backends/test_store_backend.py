@@ -1,4 +1,8 @@
+from collections.abc import Iterable
+
+import pytest
 from langchain.tools import ToolRuntime
+from langgraph.store.base import Op, Result
 from langgraph.store.memory import InMemoryStore
 
 from deepagents.backends.protocol import EditResult, WriteResult
@@ -117,7 +121,7 @@ def test_store_backend_intercept_large_tool_result():
     """Test that StoreBackend properly handles large tool result interception."""
     from langchain_core.messages import ToolMessage
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     rt = make_runtime()
     middleware = FilesystemMiddleware(backend=lambda r: StoreBackend(r), tool_token_limit_before_evict=1000)
@@ -128,8 +132,146 @@ def test_store_backend_intercept_large_tool_result():
 
     assert isinstance(result, ToolMessage)
     assert "Tool result too large" in result.content
-    assert "/large_tool_results/test_456" in result.content
+    assert large_tool_result_path(large_content) in result.content
 
-    stored_content = rt.store.get(("filesystem",), "/large_tool_results/test_456")
+    stored_content = rt.store.get(("filesystem",), large_tool_result_path(large_content))
     assert stored_content is not None
     assert stored_content.value["content"] == [large_content]
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_store_backend_compression_roundtrip(codec: str) -> None:
+    rt = make_runtime()
+    be = StoreBackend(rt, compression=codec)
+
+    content = "\n".join(f"line {i}: repeated payload" for i in range(200))
+    assert be.write("/logs/out.txt", content).error is None
+
+    item = rt.store.get(("filesystem",), "/logs/out.txt")
+    assert item.value["compression"] == codec
+    assert "content" not in item.value
+
+    assert "line 199: repeated payload" in be.read("/logs/out.txt", offset=199, limit=1)
+    assert be.edit("/logs/out.txt", "line 0:", "first:").error is None
+    assert be.download_files(["/logs/out.txt"])[0].content.decode().startswith("first: repeated payload")
+    assert [m["line"] for m in be.grep_raw("first:", "/logs")] == [1]
+
+    # Uncompressed items written earlier stay readable after enabling compression.
+    StoreBackend(rt).write("/plain.txt", "plain")
+    assert "plain" in be.read("/plain.txt")
+
+
+def test_store_backend_multi_edit_uses_one_batch_read_and_write() -> None:
+    batches: list[list[str]] = []
+
+    class CountingStore(InMemoryStore):
+        def batch(self, ops: Iterable[Op]) -> list[Result]:
+            ops = list(ops)
+            batches.append([type(op).__name__ for op in ops])
+            return super().batch(ops)
+
+    rt = make_runtime()
+    rt.store = CountingStore()
+    be = StoreBackend(rt, compression="gzip")
+    be.write("/a.md", "alpha beta")
+    be.write("/b.md", "beta gamma")
+    batches.clear()
+
+    res = be.multi_edit(
+        [
+            {"file_path": "/a.md", "old_string": "beta", "new_string": "delta"},
+            {"file_path": "/b.md", "old_string": "beta", "new_string": "delta"},
+            {"file_path": "/a.md", "old_string": "alpha", "new_string": "omega"},
+        ]
+    )
+
+    assert res.error is None and res.files_update is None
+    assert res.occurrences == {"/a.md": 2, "/b.md": 1}
+    assert batches == [["GetOp", "GetOp"], ["PutOp", "PutOp"]]
+    assert "omega delta" in be.read("/a.md")
+    assert "delta gamma" in be.read("/b.md")
+
+    failed = be.multi_edit(
+        [
+            {"file_path": "/a.md", "old_string": "omega", "new_string": "alpha"},
+            {"file_path": "/b.md", "old_string": "missing", "new_string": "x"},
+        ]
+    )
+    assert "Edit 2 of 2 failed" in failed.error
+    assert "omega delta" in be.read("/a.md")
+
+
+def test_store_backend_paginated_grep_stops_listing_early() -> None:
+    searches: list[int] = []
+
+    class CountingStore(InMemoryStore):
+        def search(self, *args: object, **kwargs: object) -> list:
+            searches.append(kwargs.get("offset", 0))
+            return super().search(*args, **kwargs)
+
+    rt = make_runtime()
+    rt.store = CountingStore()
+    be = StoreBackend(rt)
+    for i in range(250):
+        be.write(f"/f{i:03}.txt", f"needle {i}")
+
+    searches.clear()
+    page = be.grep_raw("needle", "/", max_results=5)
+
+    assert [m["text"] for m in page] == [f"needle {i}" for i in range(5)]
+    assert page.cursor is not None
+    assert searches == [0]
+
+    searches.clear()
+    everything = be.grep_raw("needle", "/")
+    assert len(everything) == 250
+    assert searches == [0, 100, 200]
+
+    last = be.grep_raw("needle", "/", max_results=100, cursor="200")
+    assert len(last) == 50 and last.cursor is None
+
+
+def test_store_backend_stat_many_uses_one_batch() -> None:
+    batches: list[list[str]] = []
+
+    class CountingStore(InMemoryStore):
+        def batch(self, ops: Iterable[Op]) -> list[Result]:
+            ops = list(ops)
+            batches.append([type(op).__name__ for op in ops])
+            return super().batch(ops)
+
+    rt = make_runtime()
+    rt.store = CountingStore()
+    be = StoreBackend(rt)
+    be.write("/a.txt", "hello")
+    batches.clear()
+
+    infos = be.stat_many(["/a.txt", "/missing.txt", "/a.txt"])
+
+    assert batches == [["GetOp", "GetOp", "GetOp"]]
+    assert infos[0]["path"] == "/a.txt"
+    assert infos[0]["size"] == len("hello")
+    assert infos[1] is None
+    assert infos[2] == infos[0]
+
+
+async def test_store_backend_astat_many() -> None:
+    rt = make_runtime()
+    be = StoreBackend(rt)
+    await be.awrite("/a.txt", "hi")
+
+    infos = await be.astat_many(["/a.txt", "/nope.txt"])
+
+    assert infos[0]["size"] == len("hi")
+    assert infos[1] is None
+
+
+@pytest.mark.parametrize("codec", [None, "gzip"])
+def test_store_backend_tail_and_read_range(codec: str | None) -> None:
+    be = StoreBackend(make_runtime(), compression=codec)
+    be.write("/build.log", "".join(f"step {i}\n" for i in range(1, 1001)))
+
+    assert be.tail("/build.log", 2).content == b"step 999\nstep 1000\n"
+    assert be.read_range("/build.log", 7, 6).content == b"step 2"
+    assert be.tail("/missing.log").error == "file_not_found"
+    assert be.read_range("/missing.log").error == "file_not_found"
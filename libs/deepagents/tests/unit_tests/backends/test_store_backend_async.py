@@ -278,7 +278,7 @@ async def test_store_backend_intercept_large_tool_result_async():
     """Test that StoreBackend properly handles large tool result interception in async context."""
     from langchain_core.messages import ToolMessage
 
-    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.filesystem import FilesystemMiddleware, large_tool_result_path
 
     rt = make_runtime()
     middleware = FilesystemMiddleware(backend=lambda r: StoreBackend(r), tool_token_limit_before_evict=1000)
@@ -289,8 +289,18 @@ async def test_store_backend_intercept_large_tool_result_async():
 
     assert isinstance(result, ToolMessage)
     assert "Tool result too large" in result.content
-    assert "/large_tool_results/test_456" in result.content
+    assert large_tool_result_path(large_content) in result.content
 
-    stored_content = rt.store.get(("filesystem",), "/large_tool_results/test_456")
+    stored_content = rt.store.get(("filesystem",), large_tool_result_path(large_content))
     assert stored_content is not None
     assert stored_content.value["content"] == [large_content]
+
+
+async def test_store_backend_async_tail_and_read_range():
+    """Test async tail and byte-range reads."""
+    be = StoreBackend(make_runtime())
+    await be.awrite("/log.txt", "one\ntwo\nthree")
+
+    assert (await be.atail("/log.txt", 2)).content == b"two\nthree"
+    assert (await be.aread_range("/log.txt", 4, 3)).content == b"two"
+    assert (await be.atail("/missing.txt")).error == "file_not_found"
@@ -0,0 +1,77 @@
+"""Unit tests for FileChangesMiddleware."""
+
+import time
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.file_changes import FileChangesMiddleware
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+def _call(name: str, call_id: str, **args: object) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+def test_notice_lists_only_files_changed_outside_the_agent(tmp_path: Path) -> None:
+    """Test that external edits are reported once and the agent's own writes are not."""
+
+    @tool
+    def user_edits() -> str:
+        """Simulate the user editing files in their editor."""
+        (tmp_path / "notes.md").write_text("edited by the user")
+        (tmp_path / "new.py").write_text("print('hi')")
+        time.sleep(0.1)
+        return "done"
+
+    (tmp_path / "notes.md").write_text("original")
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    feed = backend.watch(use_inotify=False, poll_interval=0.02)
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                _call("read_file", "r1", file_path="/notes.md"),
+                _call("write_file", "w1", file_path="/agent.txt", content="mine"),
+                _call("user_edits", "u1"),
+                _call("ls", "l1", path="/"),
+                AIMessage(content="done"),
+            ]
+        )
+    )
+    agent = create_deep_agent(model=model, backend=backend, tools=[user_edits], middleware=[FileChangesMiddleware(feed, max_paths=1)])
+
+    try:
+        result = agent.invoke({"messages": [HumanMessage(content="go")]})
+    finally:
+        feed.close()
+
+    notices = [m.content for m in result["messages"] if isinstance(m, HumanMessage) and m.content.startswith("System reminder")]
+    assert len(notices) == 1
+    assert "- modified: /notes.md" in notices[0]
+    assert "- ... and 1 more" in notices[0]
+    assert "/agent.txt" not in notices[0]
+
+
+def test_first_call_records_cursor_and_changes_drop_cached_reads(tmp_path: Path) -> None:
+    """Test that the first call only records the cursor and later changes invalidate cached reads."""
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    with backend.watch(use_inotify=False, poll_interval=60) as feed:
+        middleware = FileChangesMiddleware(feed)
+        (tmp_path / "a.py").write_text("x")
+        feed._watcher.scan()
+
+        assert middleware.before_model({"messages": []}, None) == {"file_changes_cursor": feed.cursor}
+        cursor = feed.cursor
+        assert middleware.before_model({"messages": [], "file_changes_cursor": cursor}, None) is None
+
+        (tmp_path / "a.py").write_text("changed")
+        feed._watcher.scan()
+        cache = {"/a.py:0:500": {"content_hash": "h", "tool_call_id": "r1"}, "/b.py:0:500": {"content_hash": "h", "tool_call_id": "r2"}}
+        update = middleware.before_model({"messages": [], "file_changes_cursor": cursor, "read_file_cache": cache}, None)
+
+        assert update["file_changes_cursor"] == feed.cursor
+        assert update["read_file_cache"] == {"/a.py:0:500": None}
+        assert update["messages"][0].content.splitlines()[1] == "- modified: /a.py"
@@ -15,10 +15,11 @@ from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.store.memory import InMemoryStore
 
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import BackendCallbackHandler, BackendOpEvent, InstrumentedBackend
 from deepagents.backends.state import StateBackend
 from deepagents.backends.store import StoreBackend
 from deepagents.graph import create_deep_agent
-from deepagents.middleware.memory import MemoryMiddleware
+from deepagents.middleware.memory import MemoryMiddleware, MemorySourceCache
 from tests.unit_tests.chat_model import GenericFakeChatModel
 
 
@@ -846,3 +847,60 @@ def test_memory_middleware_order_matters(tmp_path: Path) -> None:
     assert first_pos > 0
     assert second_pos > 0
     assert first_pos < second_pos
+
+
+class _OpRecorder(BackendCallbackHandler):
+    """Records the backend operations a middleware performs."""
+
+    def __init__(self) -> None:
+        self.ops: list[str] = []
+
+    def on_op_end(self, event: BackendOpEvent) -> None:
+        self.ops.append(event.op)
+
+
+def test_memory_sources_are_batched_and_cached_across_threads(tmp_path: Path) -> None:
+    """Test that sources are fetched in one batch and only re-downloaded after they change."""
+    recorder = _OpRecorder()
+    backend = InstrumentedBackend(FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False), [recorder])
+    user_path = str(tmp_path / "user" / "AGENTS.md")
+    project_path = str(tmp_path / "project" / "AGENTS.md")
+    backend.upload_files([(user_path, b"user memory"), (project_path, b"project memory")])
+    cache = MemorySourceCache()
+    sources = [user_path, project_path, str(tmp_path / "missing" / "AGENTS.md")]
+    recorder.ops.clear()
+
+    first = MemoryMiddleware(backend=backend, sources=sources, cache=cache).before_agent({}, None, {})  # type: ignore
+    assert first == {"memory_contents": {user_path: "user memory", project_path: "project memory"}}
+    assert recorder.ops == ["stat_many", "download_files"]
+
+    # A new thread (or another agent sharing the cache) only revalidates
+    recorder.ops.clear()
+    second = MemoryMiddleware(backend=backend, sources=sources, cache=cache).before_agent({}, None, {})  # type: ignore
+    assert second == first
+    assert recorder.ops == ["stat_many"]
+    assert cache.hits == 2
+
+    Path(project_path).write_text("project memory, edited")
+    recorder.ops.clear()
+    third = MemoryMiddleware(backend=backend, sources=sources, cache=cache).before_agent({}, None, {})  # type: ignore
+    assert third["memory_contents"][project_path] == "project memory, edited"
+    assert recorder.ops == ["stat_many", "download_files"]
+
+
+def test_refresh_updates_state_only_when_memory_changed(tmp_path: Path) -> None:
+    """Test that refresh rechecks every invocation but returns no update when nothing changed."""
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
+    user_path = str(tmp_path / "AGENTS.md")
+    backend.upload_files([(user_path, b"remember this")])
+    middleware = MemoryMiddleware(backend=backend, sources=[user_path], refresh=True, cache=MemorySourceCache())
+
+    state = dict(middleware.before_agent({}, None, {}))  # type: ignore
+    assert middleware.before_agent(state, None, {}) is None  # type: ignore
+
+    Path(user_path).write_text("remember this and that")
+    update = middleware.before_agent(state, None, {})  # type: ignore
+    assert update == {"memory_contents": {user_path: "remember this and that"}}
+
+    # Without refresh, the memory loaded for a thread is kept
+    assert MemoryMiddleware(backend=backend, sources=[user_path]).before_agent(state, None, {}) is None  # type: ignore
@@ -3,13 +3,17 @@
 This module contains async versions of memory middleware tests.
 """
 
+from datetime import UTC, datetime
 from pathlib import Path
+from types import SimpleNamespace
 
 from langchain.agents import create_agent
 from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.store.memory import InMemoryStore
 
 from deepagents.backends.filesystem import FilesystemBackend
-from deepagents.middleware.memory import MemoryMiddleware
+from deepagents.backends.store import StoreBackend
+from deepagents.middleware.memory import MemoryMiddleware, MemorySourceCache
 from tests.unit_tests.chat_model import GenericFakeChatModel
 
 
@@ -363,3 +367,22 @@ async def test_memory_middleware_order_matters_async(tmp_path: Path) -> None:
     assert first_pos > 0
     assert second_pos > 0
     assert first_pos < second_pos
+
+
+async def test_store_memory_is_shared_across_threads_async() -> None:
+    """Test that a store-backed source is cached by store and namespace, even with a backend factory."""
+    store = InMemoryStore()
+    timestamp = datetime.now(UTC).isoformat()
+    await store.aput(("filesystem",), "/memory/AGENTS.md", {"content": ["Be brief."], "created_at": timestamp, "modified_at": timestamp})
+    cache = MemorySourceCache()
+    runtime = SimpleNamespace(context=None, store=store, stream_writer=lambda _: None)
+
+    async def load_in_new_thread() -> dict | None:
+        middleware = MemoryMiddleware(backend=lambda rt: StoreBackend(rt), sources=["/memory/AGENTS.md"], cache=cache)
+        return await middleware.abefore_agent({"messages": []}, runtime, {})  # type: ignore
+
+    first = await load_in_new_thread()
+    second = await load_in_new_thread()
+
+    assert first == second == {"memory_contents": {"/memory/AGENTS.md": "Be brief."}}
+    assert (cache.hits, cache.misses) == (1, 1)
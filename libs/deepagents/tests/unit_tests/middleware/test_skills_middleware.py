@@ -382,6 +382,31 @@ def test_list_skills_from_backend_missing_skill_md(tmp_path: Path) -> None:
     ]
 
 
+def test_list_skills_only_downloads_existing_skill_files(tmp_path: Path) -> None:
+    """Test that SKILL.md files are stat'ed first so missing ones are never downloaded."""
+    downloaded: list[str] = []
+
+    class CountingBackend(FilesystemBackend):
+        def download_files(self, paths: list[str]):  # noqa: ANN202
+            downloaded.extend(paths)
+            return super().download_files(paths)
+
+    backend = CountingBackend(root_dir=str(tmp_path), virtual_mode=False)
+    skills_dir = tmp_path / "skills"
+    valid_skill_path = str(skills_dir / "valid-skill" / "SKILL.md")
+    backend.upload_files(
+        [
+            (valid_skill_path, make_skill_content("valid-skill", "Valid skill").encode("utf-8")),
+            (str(skills_dir / "not-a-skill" / "readme.txt"), b"Not a skill file"),
+        ]
+    )
+
+    skills = _list_skills(backend, str(skills_dir))
+
+    assert [skill["name"] for skill in skills] == ["valid-skill"]
+    assert downloaded == [valid_skill_path]
+
+
 def test_list_skills_from_backend_invalid_frontmatter(tmp_path: Path) -> None:
     """Test that skills with invalid YAML frontmatter are skipped."""
     backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
@@ -0,0 +1,174 @@
+"""Unit tests for StaleReadsMiddleware."""
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from deepagents.backends.utils import create_file_data
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.stale_reads import StaleReadsMiddleware, find_stale_reads
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+BIG_FILE = "\n".join(f"line {i} of a fairly long source file" for i in range(400))
+
+
+def _call(name: str, call_id: str, **args: object) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+def _result(call_id: str, content: str, name: str = "read_file") -> ToolMessage:
+    return ToolMessage(content=content, tool_call_id=call_id, name=name, id=f"msg-{call_id}")
+
+
+def test_read_superseded_by_covering_reread() -> None:
+    """Test that an older read is stubbed when a later read covers its range."""
+    messages = [
+        HumanMessage(content="hi"),
+        _call("read_file", "r1", file_path="/a.py", offset=10, limit=20),
+        _result("r1", "old content"),
+        _call("read_file", "r2", file_path="a.py"),
+        _result("r2", "new content"),
+    ]
+
+    stubs = find_stale_reads(messages)
+
+    assert len(stubs) == 1
+    original, stub = stubs[0]
+    assert original.tool_call_id == "r1"
+    assert stub.id == "msg-r1"
+    assert stub.tool_call_id == "r1"
+    assert stub.name == "read_file"
+    assert "superseded by read_file call r2" in stub.content
+
+
+def test_partial_reread_does_not_supersede() -> None:
+    """Test that a later read of a narrower range keeps the earlier content."""
+    messages = [
+        _call("read_file", "r1", file_path="/a.py"),
+        _result("r1", "full content"),
+        _call("read_file", "r2", file_path="/a.py", offset=0, limit=10),
+        _result("r2", "first lines"),
+    ]
+
+    assert find_stale_reads(messages) == []
+
+
+def test_tail_and_byte_range_reads_do_not_supersede() -> None:
+    """Test that tail and byte-range reads are not treated as full reads of the file."""
+    messages = [
+        _call("read_file", "r1", file_path="/a.log"),
+        _result("r1", "head of the log"),
+        _call("read_file", "r2", file_path="/a.log", tail=20),
+        _result("r2", "last lines"),
+        _call("read_file", "r3", file_path="/a.log", start_byte=100, length=64),
+        _result("r3", "some bytes"),
+        _call("read_file", "r4", file_path="/a.log", offset=0, limit=10, start_byte=0),
+        _result("r4", "first bytes"),
+    ]
+
+    assert find_stale_reads(messages) == []
+
+
+def test_successful_edit_supersedes_and_failed_edit_does_not() -> None:
+    """Test that only successful file mutations make earlier reads stale."""
+    messages = [
+        _call("read_file", "r1", file_path="/a.py"),
+        _result("r1", "content"),
+        _call("edit_file", "e1", file_path="/a.py", old_string="x", new_string="y"),
+        _result("e1", "Error: String not found in file: 'x'", name="edit_file"),
+    ]
+    assert find_stale_reads(messages) == []
+
+    messages += [
+        _call("edit_file", "e2", file_path="/a.py", old_string="c", new_string="d"),
+        _result("e2", "Successfully replaced 1 instance(s)", name="edit_file"),
+        _call("read_file", "r3", file_path="/b.py"),
+        _result("r3", "other file"),
+    ]
+    stubs = find_stale_reads(messages)
+    assert [original.tool_call_id for original, _ in stubs] == ["r1"]
+    assert "superseded by edit_file call e2" in stubs[0][1].content
+
+
+def test_multi_edit_supersedes_reads_of_every_edited_file() -> None:
+    """Test that a multi_edit makes earlier reads of all the files it touched stale."""
+    messages = [
+        _call("read_file", "r1", file_path="/a.py"),
+        _result("r1", "a"),
+        _call("read_file", "r2", file_path="/b.py"),
+        _result("r2", "b"),
+        _call("read_file", "r3", file_path="/c.py"),
+        _result("r3", "c"),
+        _call(
+            "multi_edit",
+            "m1",
+            edits=[{"file_path": "/a.py", "old_string": "a", "new_string": "x"}, {"file_path": "b.py", "old_string": "b", "new_string": "y"}],
+        ),
+        _result("m1", "Successfully applied 2 replacement(s) across 2 file(s)", name="multi_edit"),
+    ]
+
+    stubs = find_stale_reads(messages)
+
+    assert [original.tool_call_id for original, _ in stubs] == ["r1", "r2"]
+    assert all("superseded by multi_edit call m1" in stub.content for _, stub in stubs)
+
+
+def test_stubs_are_not_stubbed_again() -> None:
+    """Test that already-stubbed messages are left alone, so stubs stay byte-identical."""
+    messages = [
+        _call("read_file", "r1", file_path="/a.py"),
+        _result("r1", "content"),
+        _call("read_file", "r2", file_path="/a.py"),
+        _result("r2", "content"),
+    ]
+    (_, stub) = find_stale_reads(messages)[0]
+    messages[1] = stub
+
+    assert find_stale_reads(messages) == []
+
+
+def test_middleware_waits_for_min_tokens_saved() -> None:
+    """Test that rewrites are batched until they save enough tokens."""
+    saved: list[int] = []
+    middleware = StaleReadsMiddleware(min_tokens_saved=1000, on_tokens_saved=saved.append)
+    messages = [
+        _call("read_file", "r1", file_path="/a.py"),
+        _result("r1", "small"),
+        _call("read_file", "r2", file_path="/a.py"),
+        _result("r2", "small"),
+    ]
+    assert middleware.before_model({"messages": messages}, None) is None
+
+    messages[1] = _result("r1", BIG_FILE)
+    update = middleware.before_model({"messages": messages}, None)
+
+    assert update is not None
+    assert [m.id for m in update["messages"]] == ["msg-r1"]
+    assert len(saved) == 1
+    assert saved[0] >= middleware.min_tokens_saved
+
+
+def test_end_to_end_keeps_tool_pairing_and_stubs_old_read() -> None:
+    """Test that the rewrite replaces the old read in place in the agent state."""
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                _call("read_file", "r1", file_path="/a.py"),
+                _call("edit_file", "e1", file_path="/a.py", old_string="line 0 of", new_string="line zero of"),
+                _call("read_file", "r2", file_path="/a.py"),
+                AIMessage(content="done"),
+            ]
+        )
+    )
+    agent = create_deep_agent(model=model, middleware=[StaleReadsMiddleware(min_tokens_saved=100)], checkpointer=InMemorySaver())
+
+    result = agent.invoke(
+        {"messages": [HumanMessage(content="edit a.py")], "files": {"/a.py": create_file_data(BIG_FILE)}},
+        {"configurable": {"thread_id": "1"}},
+    )
+
+    tool_messages = {m.tool_call_id: m for m in result["messages"] if isinstance(m, ToolMessage)}
+    assert set(tool_messages) == {"r1", "e1", "r2"}
+    assert tool_messages["r1"].content.startswith("[Stale read_file result for /a.py")
+    assert "line zero of" in tool_messages["r2"].content
+    ai_call_ids = [tc["id"] for m in result["messages"] if isinstance(m, AIMessage) for tc in m.tool_calls]
+    assert ai_call_ids == ["r1", "e1", "r2"]
@@ -0,0 +1,238 @@
+"""Unit tests for SubAgentResultCache."""
+
+import asyncio
+from pathlib import Path
+
+from langchain.tools import ToolRuntime
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.utils import create_file_data
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.subagent_cache import SubAgentResultCache
+from deepagents.middleware.subagents import CompiledSubAgent, SubAgentMiddleware
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+def _counting_subagent(calls: list[str], files: dict[str, str] | None = None) -> CompiledSubAgent:
+    """A subagent that records each description it runs and optionally writes `files`."""
+
+    def run(state: dict) -> dict:
+        description = state["messages"][-1].content
+        calls.append(description)
+        written = {path: create_file_data(content) for path, content in (files or {}).items()}
+        return {**state, "files": {**state.get("files", {}), **written}, "messages": [AIMessage(content=f"answer to {description}")]}
+
+    return CompiledSubAgent(name="researcher", description="Researches.", runnable=RunnableLambda(run))
+
+
+def _tools(subagent: CompiledSubAgent, cache: SubAgentResultCache, backend: FilesystemBackend | None = None) -> dict:
+    middleware = SubAgentMiddleware(
+        default_model=GenericFakeChatModel(messages=iter([])),
+        subagents=[subagent],
+        general_purpose_agent=False,
+        task_batch_concurrency=2,
+        result_cache=cache,
+        backend=backend,
+    )
+    return {tool.name: tool for tool in middleware.tools}
+
+
+def _runtime(state: dict | None = None, store: InMemoryStore | None = None, thread_id: str | None = None) -> ToolRuntime:
+    return ToolRuntime(
+        state=state if state is not None else {"messages": []},
+        context=None,
+        tool_call_id="call_1",
+        store=store,
+        stream_writer=lambda _: None,
+        config={"configurable": {"thread_id": thread_id}} if thread_id is not None else {},
+    )
+
+
+def _answer(command: object) -> str:
+    return command.update["messages"][0].content  # type: ignore[attr-defined]
+
+
+def test_repeated_task_is_answered_from_cache() -> None:
+    """Test that the second identical task call does not run the subagent."""
+    calls: list[str] = []
+    cache = SubAgentResultCache()
+    task = _tools(_counting_subagent(calls), cache)["task"]
+
+    first = task.func(description="find the bug", subagent_type="researcher", runtime=_runtime())
+    second = task.func(description="find the bug", subagent_type="researcher", runtime=_runtime())
+    task.func(description="find another bug", subagent_type="researcher", runtime=_runtime())
+
+    assert calls == ["find the bug", "find another bug"]
+    assert _answer(first) == _answer(second) == "answer to find the bug"
+    assert second.update.keys() == {"messages"}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_entries_are_scoped_to_thread_and_backend(tmp_path: Path) -> None:
+    """Test that the same task in another thread or on another workspace runs again."""
+    calls: list[str] = []
+    cache = SubAgentResultCache()
+    task = _tools(_counting_subagent(calls), cache)["task"]
+
+    task.func(description="find the bug", subagent_type="researcher", runtime=_runtime(thread_id="a"))
+    task.func(description="find the bug", subagent_type="researcher", runtime=_runtime(thread_id="b"))
+    task.func(description="find the bug", subagent_type="researcher", runtime=_runtime(thread_id="a"))
+    assert calls == ["find the bug", "find the bug"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    (tmp_path / "one").mkdir()
+    (tmp_path / "two").mkdir()
+    one = _tools(_counting_subagent(calls), cache, FilesystemBackend(root_dir=tmp_path / "one"))["task"]
+    same = _tools(_counting_subagent(calls), cache, FilesystemBackend(root_dir=tmp_path / "one"))["task"]
+    two = _tools(_counting_subagent(calls), cache, FilesystemBackend(root_dir=tmp_path / "two"))["task"]
+    for tool in (one, same, two):
+        tool.func(description="list files", subagent_type="researcher", runtime=_runtime(thread_id="a"))
+    assert calls.count("list files") == 2
+
+
+def test_invalidation_is_limited_to_the_scope_of_the_write(tmp_path: Path) -> None:
+    """Test that a write drops the entries of its own thread and shared workspace only."""
+    calls: list[str] = []
+    cache = SubAgentResultCache()
+    task = _tools(_counting_subagent(calls), cache)["task"]
+    backend = FilesystemBackend(root_dir=tmp_path)
+    on_disk = _tools(_counting_subagent(calls), cache, backend)["task"]
+
+    def run(tool: object, thread_id: str) -> None:
+        tool.func(description=f"{thread_id} task", subagent_type="researcher", runtime=_runtime(thread_id=thread_id))  # type: ignore[attr-defined]
+
+    for tool in (task, on_disk):
+        run(tool, "a")
+        run(tool, "b")
+    # A write in thread "a" to state leaves thread "b" cached
+    cache.invalidate(_runtime(thread_id="a"))
+    run(task, "a")
+    run(task, "b")
+    assert calls == ["a task", "b task", "a task", "b task", "a task"]
+
+    # A write in thread "a" to the shared filesystem reaches thread "b" too
+    cache.invalidate(_runtime(thread_id="a"), backend)
+    run(on_disk, "b")
+    run(task, "b")
+    assert calls == ["a task", "b task", "a task", "b task", "a task", "b task"]
+
+
+def test_changed_files_in_state_miss_the_cache() -> None:
+    """Test that the key covers the files in state, so a different workspace misses."""
+    calls: list[str] = []
+    task = _tools(_counting_subagent(calls), SubAgentResultCache())["task"]
+
+    task.func(description="summarize", subagent_type="researcher", runtime=_runtime({"messages": [], "files": {"/a.txt": create_file_data("a")}}))
+    changed = {"messages": [], "files": {"/a.txt": {**create_file_data("b"), "modified_at": "later"}}}
+    task.func(description="summarize", subagent_type="researcher", runtime=_runtime(changed))
+
+    assert calls == ["summarize", "summarize"]
+
+
+def test_runs_that_write_are_not_cached() -> None:
+    """Test that a subagent run returning a state update is never cached."""
+    calls: list[str] = []
+    cache = SubAgentResultCache()
+    task = _tools(_counting_subagent(calls, files={"/out.txt": "x"}), cache)["task"]
+
+    first = task.func(description="write it", subagent_type="researcher", runtime=_runtime())
+    task.func(description="write it", subagent_type="researcher", runtime=_runtime())
+
+    assert "/out.txt" in first.update["files"]
+    assert calls == ["write it", "write it"]
+    assert cache.hits == 0
+
+
+def test_invalidate_ttl_and_size_bound() -> None:
+    """Test that invalidation, expiry and the entry limit all force a fresh run."""
+    calls: list[str] = []
+    cache = SubAgentResultCache(max_entries=1)
+    task = _tools(_counting_subagent(calls), cache)["task"]
+
+    def run(description: str) -> None:
+        task.func(description=description, subagent_type="researcher", runtime=_runtime())
+
+    run("a")
+    cache.invalidate()
+    run("a")
+    run("b")  # evicts "a"
+    run("a")
+    assert calls == ["a", "a", "b", "a"]
+
+    cache.ttl_seconds = 0
+    run("a")
+    assert calls == ["a", "a", "b", "a", "a"]
+
+
+def test_task_batch_uses_the_cache() -> None:
+    """Test that `task_batch` subtasks are answered from and recorded in the cache."""
+    calls: list[str] = []
+    tools = _tools(_counting_subagent(calls), SubAgentResultCache())
+    tools["task"].func(description="one", subagent_type="researcher", runtime=_runtime())
+
+    command = tools["task_batch"].func(
+        [{"subagent_type": "researcher", "description": "one"}, {"subagent_type": "researcher", "description": "two"}],
+        _runtime(),
+    )
+    tools["task"].func(description="two", subagent_type="researcher", runtime=_runtime())
+
+    assert sorted(calls) == ["one", "two"]
+    assert "answer to one" in _answer(command)
+    assert "answer to two" in _answer(command)
+
+
+def test_store_mode_shares_entries_and_generation() -> None:
+    """Test that with a store namespace, entries and invalidation go through the store."""
+    calls: list[str] = []
+    store = InMemoryStore()
+    cache = SubAgentResultCache(store_namespace=("subagent_cache",))
+    task = _tools(_counting_subagent(calls), cache)["task"]
+
+    async def run() -> None:
+        await task.coroutine(description="a", subagent_type="researcher", runtime=_runtime(store=store))
+        await task.coroutine(description="a", subagent_type="researcher", runtime=_runtime(store=store))
+        await cache.ainvalidate(_runtime(store=store))
+        await task.coroutine(description="a", subagent_type="researcher", runtime=_runtime(store=store))
+
+    asyncio.run(run())
+
+    assert calls == ["a", "a"]
+    assert cache.generation(_runtime(store=store)) == 1
+    # A second cache instance on the same store sees the stored entry
+    other = SubAgentResultCache(store_namespace=("subagent_cache",))
+    other_task = _tools(_counting_subagent(calls), other)["task"]
+    other_task.func(description="a", subagent_type="researcher", runtime=_runtime(store=store))
+    assert calls == ["a", "a"]
+
+
+def test_write_tool_call_in_parent_invalidates() -> None:
+    """Test that a write by the main agent between two identical tasks forces a second run."""
+    subagent_model = GenericFakeChatModel(messages=iter([AIMessage(content="Found it."), AIMessage(content="Found it again.")]))
+    task_call = {"name": "task", "args": {"description": "find the config", "subagent_type": "general-purpose"}}
+    parent_model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[{**task_call, "id": "t1"}]),
+                AIMessage(content="", tool_calls=[{**task_call, "id": "t2"}]),
+                AIMessage(content="", tool_calls=[{"name": "write_todos", "args": {"todos": []}, "id": "todo"}]),
+                AIMessage(content="", tool_calls=[{"name": "write_file", "args": {"file_path": "/notes.md", "content": "x"}, "id": "w"}]),
+                AIMessage(content="", tool_calls=[{**task_call, "id": "t3"}]),
+                AIMessage(content="Done."),
+            ]
+        )
+    )
+    cache = SubAgentResultCache()
+    agent = create_deep_agent(
+        model=parent_model,
+        subagents=[{"name": "general-purpose", "description": "Finds things.", "system_prompt": "Find.", "model": subagent_model}],
+        subagent_result_cache=cache,
+    )
+
+    result = agent.invoke({"messages": [HumanMessage(content="Go")]})
+
+    answers = {msg.tool_call_id: msg.content for msg in result["messages"] if msg.type == "tool" and msg.name == "task"}
+    assert answers == {"t1": "Found it.", "t2": "Found it.", "t3": "Found it again."}
+    assert (cache.hits, cache.misses) == (1, 2)
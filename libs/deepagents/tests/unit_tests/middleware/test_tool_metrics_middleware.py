@@ -0,0 +1,131 @@
+"""Unit tests for ToolMetricsMiddleware."""
+
+import json
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.tool_metrics import (
+    ToolCallRecord,
+    ToolMetricsMiddleware,
+    format_tool_metrics,
+    load_tool_metrics,
+    summarize_tool_metrics,
+)
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+@tool
+def dump_logs() -> str:
+    """Return a very large log."""
+    return "log line\n" * 20_000
+
+
+def _call(name: str, call_id: str, **args: object) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+def _record(tool: str, duration_ms: float, **overrides: object) -> ToolCallRecord:
+    record: ToolCallRecord = {
+        "ts": 0.0,
+        "tool": tool,
+        "tool_call_id": None,
+        "namespace": "",
+        "dispatch_ms": None,
+        "duration_ms": duration_ms,
+        "result_chars": 40,
+        "result_tokens": 10,
+        "evicted": False,
+        "status": "success",
+    }
+    record.update(overrides)  # type: ignore[typeddict-item]
+    return record
+
+
+def test_records_tool_calls_to_jsonl_and_callback(tmp_path: Path) -> None:
+    """Test that each tool call yields one record with timings, sizes and eviction."""
+    records: list[ToolCallRecord] = []
+    metrics = ToolMetricsMiddleware(path=tmp_path / "metrics.jsonl", callback=records.append)
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                _call("write_file", "w1", file_path="/a.txt", content="hello"),
+                _call("dump_logs", "d1"),
+                _call("read_file", "r2", file_path="/missing.txt"),
+                AIMessage(content="done"),
+            ]
+        )
+    )
+    agent = create_deep_agent(model=model, tools=[dump_logs], tool_metrics=metrics)
+
+    agent.invoke({"messages": [HumanMessage(content="go")]})
+    metrics.close()
+
+    assert [r["tool_call_id"] for r in records] == ["w1", "d1", "r2"]
+    write, dump, missing = records
+    assert write["tool"] == "write_file"
+    assert write["namespace"] == ""
+    assert write["dispatch_ms"] is not None
+    assert write["dispatch_ms"] >= 0
+    assert write["duration_ms"] >= 0
+    assert not write["evicted"]
+    # The metrics wrap FilesystemMiddleware, so they see the evicted (short) result
+    assert dump["evicted"]
+    assert dump["result_chars"] < len("log line\n" * 20_000)
+    assert dump["result_tokens"] == dump["result_chars"] // 4
+    assert missing["status"] == "error"
+    assert load_tool_metrics(tmp_path / "metrics.jsonl") == records
+
+
+def test_subagent_tool_calls_have_a_namespace() -> None:
+    """Test that tool calls made inside a subagent are recorded with its namespace."""
+    records: list[ToolCallRecord] = []
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                _call("task", "t1", description="list files", subagent_type="general-purpose"),
+                _call("ls", "l1", path="/"),
+                AIMessage(content="subagent done"),
+                AIMessage(content="done"),
+            ]
+        )
+    )
+    agent = create_deep_agent(model=model, tool_metrics=ToolMetricsMiddleware(callback=records.append))
+
+    agent.invoke({"messages": [HumanMessage(content="go")]})
+
+    by_id = {r["tool_call_id"]: r for r in records}
+    assert by_id["t1"]["namespace"] == ""
+    assert by_id["l1"]["namespace"] != ""
+
+
+def test_summary_percentiles_per_tool() -> None:
+    """Test that the report computes nearest-rank p50/p99 per tool."""
+    records = [_record("grep", float(ms)) for ms in range(1, 101)]
+    records += [_record("ls", 5.0, status="error", dispatch_ms=2.0), _record("ls", 7.0, evicted=True)]
+
+    summary = summarize_tool_metrics(records)
+
+    assert list(summary) == ["grep", "ls"]
+    assert summary["grep"]["count"] == 100
+    assert summary["grep"]["p50_ms"] == 50.0
+    assert summary["grep"]["p99_ms"] == 99.0
+    assert summary["grep"]["max_ms"] == 100.0
+    assert summary["ls"]["errors"] == 1
+    assert summary["ls"]["evicted"] == 1
+    assert summary["ls"]["dispatch_p99_ms"] == 2.0
+    assert format_tool_metrics(summary).splitlines()[1].split()[0] == "grep"
+    assert format_tool_metrics({}) == "No tool calls recorded."
+
+
+def test_load_skips_malformed_lines(tmp_path: Path) -> None:
+    """Test that loading a JSONL file skips lines that are not records."""
+    path = tmp_path / "metrics.jsonl"
+    path.write_text("\n".join([json.dumps(_record("glob", 3.0)), "not json", json.dumps(_record("glob", 9.0))]) + "\n")
+
+    summary = summarize_tool_metrics(load_tool_metrics(path))
+
+    assert summary["glob"]["count"] == 2
+    assert summary["glob"]["p99_ms"] == 9.0
@@ -0,0 +1,128 @@
+"""Unit tests for AgentGraphCache."""
+
+import asyncio
+import threading
+import time
+from functools import partial
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from deepagents.graph import create_deep_agent
+from deepagents.graph_cache import AgentGraphCache, config_key
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return query
+
+
+def test_config_key_compares_models_and_tools_by_value() -> None:
+    """Test that equal configurations built from fresh objects get the same key."""
+
+    def model(api_key: str = "key", temperature: float | None = None) -> ChatAnthropic:
+        return ChatAnthropic(model="claude-sonnet-4-5-20250929", api_key=api_key, temperature=temperature)
+
+    base = config_key({"model": model(), "tools": [lookup], "prompt": "hi"})
+    assert config_key({"model": model(), "tools": [lookup], "prompt": "hi"}) == base
+    assert base[1] == []
+    assert config_key({"model": model(temperature=0.5), "tools": [lookup], "prompt": "hi"})[0] != base[0]
+    assert config_key({"model": model(api_key="other"), "tools": [lookup], "prompt": "hi"})[0] != base[0]
+    assert config_key({"model": model(), "tools": [], "prompt": "hi"})[0] != base[0]
+
+
+def test_config_key_compares_other_objects_by_identity() -> None:
+    """Test that opaque objects and closures only match themselves and are pinned."""
+    saver = InMemorySaver()
+    key, pins = config_key({"checkpointer": saver, "hook": lambda: None})
+    assert pins[0] is saver
+    assert config_key({"checkpointer": saver, "hook": pins[1]})[0] == key
+    assert config_key({"checkpointer": InMemorySaver(), "hook": pins[1]})[0] != key
+
+
+def _first(value: int) -> int:
+    return value
+
+
+def _second(value: int) -> int:
+    return -value
+
+
+first_lambda = lambda value: value  # noqa: E731
+second_lambda = lambda value: -value  # noqa: E731
+
+
+def test_config_key_does_not_confuse_lambdas_or_partials() -> None:
+    """Test that callables without a unique qualified name are compared by identity."""
+    assert config_key({"hook": _first}) == config_key({"hook": _first})
+    assert config_key({"hook": _first})[0] != config_key({"hook": _second})[0]
+    assert config_key({"hook": first_lambda})[0] != config_key({"hook": second_lambda})[0]
+    one, two = partial(_first, 1), partial(_first, 2)
+    assert config_key({"hook": one})[0] != config_key({"hook": two})[0]
+    assert config_key({"hook": first_lambda})[1] == [first_lambda]
+
+
+def test_create_deep_agent_reuses_graph_for_equal_configuration() -> None:
+    """Test that equal create_deep_agent calls share one graph and sessions stay apart by thread."""
+    graphs = AgentGraphCache()
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="first"), AIMessage(content="second")]))
+    saver = InMemorySaver()
+
+    agent = create_deep_agent(model=model, system_prompt="Be brief.", checkpointer=saver, graph_cache=graphs)
+    same = create_deep_agent(model=model, system_prompt="Be brief.", checkpointer=saver, graph_cache=graphs)
+    other = create_deep_agent(model=model, system_prompt="Be verbose.", checkpointer=saver, graph_cache=graphs)
+
+    assert same is agent
+    assert other is not agent
+    assert (graphs.hits, graphs.misses, len(graphs)) == (1, 2, 2)
+
+    first = agent.invoke({"messages": [HumanMessage(content="one")]}, {"configurable": {"thread_id": "a"}})
+    second = same.invoke({"messages": [HumanMessage(content="two")]}, {"configurable": {"thread_id": "b"}})
+    assert [m.content for m in first["messages"]] == ["one", "first"]
+    assert [m.content for m in second["messages"]] == ["two", "second"]
+
+
+def test_least_recently_used_graph_is_dropped() -> None:
+    """Test that the cache keeps at most max_size graphs."""
+    graphs = AgentGraphCache(max_size=2)
+    for name in ("a", "b", "a", "c"):
+        graphs.get_or_build({"name": name}, object)
+    assert len(graphs) == 2
+    built: list[str] = []
+    graphs.get_or_build({"name": "a"}, lambda: built.append("a") or object())
+    graphs.get_or_build({"name": "b"}, lambda: built.append("b") or object())
+    assert built == ["b"]
+
+
+def test_concurrent_builds_of_one_configuration_run_once() -> None:
+    """Test that racing sync and async callers build a graph only once."""
+    graphs = AgentGraphCache()
+    builds: list[int] = []
+
+    def build() -> object:
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    threads = [threading.Thread(target=graphs.get_or_build, args=({"name": "sync"}, build)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+
+    async def abuild() -> object:
+        builds.append(1)
+        await asyncio.sleep(0.05)
+        return object()
+
+    async def race() -> list[object]:
+        return await asyncio.gather(*(graphs.aget_or_build({"name": "async"}, abuild) for _ in range(4)))
+
+    results = asyncio.run(race())
+    assert len(builds) == 2
+    assert all(result is results[0] for result in results)
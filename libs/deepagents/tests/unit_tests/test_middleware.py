@@ -13,7 +13,7 @@ from langgraph.types import Overwrite
 from deepagents.backends import CompositeBackend, StateBackend, StoreBackend
 from deepagents.backends.protocol import ExecuteResponse, SandboxBackendProtocol
 from deepagents.backends.utils import create_file_data, truncate_if_too_long, update_file_data
-from deepagents.middleware.filesystem import FileData, FilesystemMiddleware, FilesystemState
+from deepagents.middleware.filesystem import FileData, FilesystemMiddleware, FilesystemState, large_tool_result_path
 from deepagents.middleware.patch_tool_calls import PatchToolCallsMiddleware
 from deepagents.middleware.subagents import SubAgentMiddleware
 
@@ -66,27 +66,27 @@ class TestFilesystemMiddleware:
         middleware = FilesystemMiddleware()
         assert callable(middleware.backend)
         assert middleware._custom_system_prompt is None
-        assert len(middleware.tools) == 7  # All tools including execute
+        assert len(middleware.tools) == 9  # All tools including execute
 
     def test_init_with_composite_backend(self):
         backend_factory = lambda rt: build_composite_state_backend(rt, routes={"/memories/": (lambda r: StoreBackend(r))})
         middleware = FilesystemMiddleware(backend=backend_factory)
         assert callable(middleware.backend)
         assert middleware._custom_system_prompt is None
-        assert len(middleware.tools) == 7  # All tools including execute
+        assert len(middleware.tools) == 9  # All tools including execute
 
     def test_init_custom_system_prompt_default(self):
         middleware = FilesystemMiddleware(system_prompt="Custom system prompt")
         assert callable(middleware.backend)
         assert middleware._custom_system_prompt == "Custom system prompt"
-        assert len(middleware.tools) == 7  # All tools including execute
+        assert len(middleware.tools) == 9  # All tools including execute
 
     def test_init_custom_system_prompt_with_composite(self):
         backend_factory = lambda rt: build_composite_state_backend(rt, routes={"/memories/": (lambda r: StoreBackend(r))})
         middleware = FilesystemMiddleware(backend=backend_factory, system_prompt="Custom system prompt")
         assert callable(middleware.backend)
         assert middleware._custom_system_prompt == "Custom system prompt"
-        assert len(middleware.tools) == 7  # All tools including execute
+        assert len(middleware.tools) == 9  # All tools including execute
 
     def test_init_custom_tool_descriptions_default(self):
         middleware = FilesystemMiddleware(custom_tool_descriptions={"ls": "Custom ls tool description"})
@@ -619,6 +619,38 @@ class TestFilesystemMiddleware:
         )
         assert "Invalid regex pattern" in result
 
+    def test_grep_offset_and_head_limit_page_results(self):
+        files = {f"/f{i}.py": FileData(content=["hit"] * 400, modified_at="2021-01-01", created_at="2021-01-01") for i in range(3)}
+        state = FilesystemState(messages=[], files=files)
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={})
+        grep_search_tool = next(tool for tool in FilesystemMiddleware().tools if tool.name == "grep")
+
+        content = grep_search_tool.invoke({"pattern": "hit", "output_mode": "content", "offset": 398, "head_limit": 3, "runtime": runtime})
+        assert "/f0.py:\n  399: hit\n  400: hit\n/f1.py:\n  1: hit" in content
+        assert content.endswith("[Showing results 399-401. More results available: use offset=401 to see the next page.]")
+
+        # A file's count is only reported once all of its matches were fetched, across several backend pages
+        count = grep_search_tool.invoke({"pattern": "hit", "output_mode": "count", "offset": 1, "head_limit": 1, "runtime": runtime})
+        assert count.startswith("/f1.py: 400")
+        assert "use offset=2" in count
+
+        last = grep_search_tool.invoke({"pattern": "hit", "offset": 2, "head_limit": 5, "runtime": runtime})
+        assert last == "/f2.py"
+
+        assert grep_search_tool.invoke({"pattern": "hit", "head_limit": 0, "runtime": runtime}).startswith("Error:")
+
+    def test_glob_offset_and_head_limit_page_results(self):
+        files = {f"/f{i}.txt": FileData(content=["x"], modified_at=f"2021-01-0{i + 1}", created_at="2021-01-01") for i in range(5)}
+        state = FilesystemState(messages=[], files=files)
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={})
+        glob_search_tool = next(tool for tool in FilesystemMiddleware().tools if tool.name == "glob")
+
+        first = glob_search_tool.invoke({"pattern": "*.txt", "head_limit": 2, "runtime": runtime})
+        second = glob_search_tool.invoke({"pattern": "*.txt", "offset": 2, "head_limit": 3, "runtime": runtime})
+
+        assert first == "['/f4.txt', '/f3.txt']\n\n[Showing results 1-2. More results available: use offset=2 to see the next page.]"
+        assert second == "['/f2.txt', '/f1.txt', '/f0.txt']"
+
     def test_search_store_paginated_empty(self):
         """Test pagination with no items."""
         store = InMemoryStore()
@@ -854,6 +886,114 @@ class TestFilesystemMiddleware:
         assert lines[1].count("m") == 2000
         assert "     4\tline4" in lines[2]
 
+    def test_read_files_reads_ranges_and_reports_errors_per_file(self):
+        state = FilesystemState(
+            messages=[],
+            files={
+                "/a.py": create_file_data("a1\na2\na3"),
+                "/b.py": create_file_data("b1\nb2\nb3"),
+            },
+        )
+        read_files_tool = next(tool for tool in FilesystemMiddleware().tools if tool.name == "read_files")
+        result = read_files_tool.invoke(
+            {
+                "files": [{"file_path": "/a.py"}, {"file_path": "/missing.py"}, {"file_path": "/b.py", "offset": 1, "limit": 1}],
+                "runtime": ToolRuntime(state=state, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={}),
+            }
+        )
+        sections = result.split("\n\n")
+        assert sections[0] == "==> /a.py <==\n     1\ta1\n     2\ta2\n     3\ta3"
+        assert sections[1] == "==> /missing.py <==\nError: File '/missing.py' not found"
+        assert sections[2] == "==> /b.py <==\n     2\tb2"
+
+    def test_read_files_downloads_once_per_backend(self):
+        rt = ToolRuntime(
+            state={"messages": [], "files": {"/a.py": create_file_data("a"), "/b.py": create_file_data("b")}},
+            context=None,
+            tool_call_id="",
+            store=InMemoryStore(),
+            stream_writer=lambda _: None,
+            config={},
+        )
+        calls = []
+
+        class RecordingStateBackend(StateBackend):
+            def download_files(self, paths):
+                calls.append(("state", paths))
+                return super().download_files(paths)
+
+        class RecordingStoreBackend(StoreBackend):
+            def download_files(self, paths):
+                calls.append(("store", paths))
+                return super().download_files(paths)
+
+        store_backend = RecordingStoreBackend(rt)
+        store_backend.write("/notes.md", "remember")
+        backend = CompositeBackend(default=RecordingStateBackend(rt), routes={"/memories/": store_backend})
+        read_files_tool = next(tool for tool in FilesystemMiddleware(backend=backend).tools if tool.name == "read_files")
+        result = read_files_tool.invoke(
+            {
+                "files": [{"file_path": "/a.py"}, {"file_path": "/memories/notes.md"}, {"file_path": "/b.py"}, {"file_path": "/a.py", "limit": 1}],
+                "runtime": rt,
+            }
+        )
+
+        assert calls == [("state", ["/a.py", "/b.py"]), ("store", ["/notes.md"])]
+        assert "==> /memories/notes.md <==\n     1\tremember" in result
+        assert result.count("==> /a.py <==") == 2
+
+    def test_read_file_tail_and_byte_range_options(self, tmp_path):
+        from deepagents.backends.filesystem import FilesystemBackend
+
+        (tmp_path / "build.log").write_text("".join(f"step {i}\n" for i in range(1, 101)))
+        (tmp_path / "blob.bin").write_bytes(b"PK\x03\x04\x00\x00hello")
+        backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+        read_file_tool = next(tool for tool in FilesystemMiddleware(backend=backend).tools if tool.name == "read_file")
+        rt = ToolRuntime(state={"messages": [], "files": {}}, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={})
+
+        def read(**args: object) -> str:
+            return read_file_tool.invoke({"file_path": "/build.log", "runtime": rt, **args})
+
+        assert read(tail=2) == "[Last 2 lines of /build.log]\nstep 99\nstep 100"
+        assert read(start_byte=7, length=6) == "[Bytes 7-12 of /build.log]\nstep 2\n[More bytes may follow: use start_byte=13 to continue.]"
+        assert read(start_byte=5000) == "Error: Byte offset 5000 is at or past the end of '/build.log'"
+        assert read(tail=2, start_byte=0) == "Error: tail and start_byte cannot be combined"
+        assert read(tail=0) == "Error: tail must be a positive number of lines"
+        assert read(file_path="/missing.log", tail=5) == "Error: File '/missing.log' not found"
+
+        binary = read(file_path="/blob.bin", start_byte=0)
+        assert binary.splitlines() == [
+            "[Bytes 0-10 of /blob.bin, binary, shown as hex dump]",
+            "00000000  50 4b 03 04 00 00 68 65 6c 6c 6f                 PK....hello",
+        ]
+
+    def test_partial_reads_are_not_deduplicated(self):
+        middleware = FilesystemMiddleware()
+        state = {"messages": [], "files": {}}
+        content = "[Last 1 lines of /a.py]\nx = 1"
+
+        first = middleware.wrap_tool_call(self._read_request(state, "r1", tail=1), lambda _: ToolMessage(content=content, tool_call_id="r1"))
+        assert isinstance(first, ToolMessage)
+        assert first.content == content
+
+    def test_read_files_shares_token_budget(self):
+        from deepagents.middleware.filesystem import _format_read_files, _read_files_requests, _unique_paths
+
+        files = [{"file_path": "/big.txt"}, {"file_path": "/small.txt"}]
+        requests = _read_files_requests(files)
+        state = {"files": {"/big.txt": create_file_data("\n".join("x" * 30 for _ in range(100))), "/small.txt": create_file_data("s")}}
+        backend = StateBackend(ToolRuntime(state=state, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={}))
+        responses = backend.download_files(_unique_paths(requests))
+
+        result = _format_read_files(files, requests, responses, token_budget=100)
+
+        big, small = result.split("\n\n")
+        assert len(result) < 100 * 4 + 300
+        assert "[Truncated: output budget exhausted. Use read_file(file_path='/big.txt', offset=" in big
+        shown = big.count("\tx")
+        assert f"offset={shown})" in big
+        assert small.startswith("==> /small.txt <==\n[Not read: output budget exhausted.")
+
     def test_intercept_short_toolmessage(self):
         """Test that small ToolMessages pass through unchanged."""
         middleware = FilesystemMiddleware(tool_token_limit_before_evict=1000)
@@ -879,7 +1019,7 @@ class TestFilesystemMiddleware:
         result = middleware._intercept_large_tool_result(tool_message, runtime)
 
         assert isinstance(result, Command)
-        assert "/large_tool_results/test_123" in result.update["files"]
+        assert large_tool_result_path(large_content) in result.update["files"]
         assert "Tool result too large" in result.update["messages"][0].content
 
     def test_intercept_command_with_short_toolmessage(self):
@@ -912,7 +1052,7 @@ class TestFilesystemMiddleware:
         result = middleware._intercept_large_tool_result(command, runtime)
 
         assert isinstance(result, Command)
-        assert "/large_tool_results/test_123" in result.update["files"]
+        assert large_tool_result_path(large_content) in result.update["files"]
         assert "Tool result too large" in result.update["messages"][0].content
 
     def test_intercept_command_with_files_and_long_toolmessage(self):
@@ -931,7 +1071,7 @@ class TestFilesystemMiddleware:
 
         assert isinstance(result, Command)
         assert "/existing.txt" in result.update["files"]
-        assert "/large_tool_results/test_123" in result.update["files"]
+        assert large_tool_result_path(large_content) in result.update["files"]
         assert result.update["custom_key"] == "custom_value"
 
     def test_sanitize_tool_call_id(self):
@@ -955,7 +1095,10 @@ class TestFilesystemMiddleware:
         result = middleware._intercept_large_tool_result(tool_message, runtime)
 
         assert isinstance(result, Command)
-        assert "/large_tool_results/test_call_id" in result.update["files"]
+        file_path = large_tool_result_path(large_content)
+        assert file_path in result.update["files"]
+        assert file_path.count("/") == 2
+        assert "call" not in file_path
 
     def test_intercept_content_block_with_large_text(self):
         """Test that content blocks with large text get evicted and converted to string."""
@@ -971,7 +1114,7 @@ class TestFilesystemMiddleware:
         result = middleware._intercept_large_tool_result(tool_message, runtime)
 
         assert isinstance(result, Command)
-        assert "/large_tool_results/test_cb" in result.update["files"]
+        assert large_tool_result_path("x" * 5000) in result.update["files"]
         # After eviction, content is always converted to plain string
         returned_content = result.update["messages"][0].content
         assert isinstance(returned_content, str)
@@ -1007,7 +1150,7 @@ class TestFilesystemMiddleware:
 
         # All content types are evicted if large when converted to string
         assert isinstance(result, Command)
-        assert "/large_tool_results/test_other" in result.update["files"]
+        assert large_tool_result_path(str(content_blocks)) in result.update["files"]
 
     def test_intercept_list_content_gets_evicted_if_large(self):
         """Test that list content gets evicted if large when stringified."""
@@ -1024,7 +1167,7 @@ class TestFilesystemMiddleware:
 
         # List content is evicted if large when converted to string
         assert isinstance(result, Command)
-        assert "/large_tool_results/test_list" in result.update["files"]
+        assert large_tool_result_path(str(list_content)) in result.update["files"]
 
     def test_single_text_block_extracts_text_directly(self):
         """Test that single text block extracts text content directly, not stringified structure."""
@@ -1041,7 +1184,7 @@ class TestFilesystemMiddleware:
 
         assert isinstance(result, Command)
         # Check that the file contains actual text, not stringified dict
-        file_content = result.update["files"]["/large_tool_results/test_single"]["content"]
+        file_content = result.update["files"][large_tool_result_path("Hello world! " * 1000)]["content"]
         file_text = "\n".join(file_content)
         # Should start with the actual text, not with "[{" which would indicate stringified dict
         assert file_text.startswith("Hello world!")
@@ -1065,7 +1208,7 @@ class TestFilesystemMiddleware:
 
         assert isinstance(result, Command)
         # Check that the file contains stringified structure (starts with "[")
-        file_content = result.update["files"]["/large_tool_results/test_multi"]["content"]
+        file_content = result.update["files"][large_tool_result_path(str(content_blocks))]["content"]
         file_text = "\n".join(file_content)
         # Should be stringified list of dicts
         assert file_text.startswith("[{")
@@ -1088,13 +1231,101 @@ class TestFilesystemMiddleware:
 
         assert isinstance(result, Command)
         # Check that the file contains stringified structure
-        file_content = result.update["files"]["/large_tool_results/test_mixed"]["content"]
+        file_content = result.update["files"][large_tool_result_path(str(content_blocks))]["content"]
         file_text = "\n".join(file_content)
         assert file_text.startswith("[{")
         # Should contain both blocks in the stringified output
         assert "'type': 'text'" in file_text
         assert "'type': 'image'" in file_text
 
+    def test_intercept_deduplicates_identical_payloads_in_state(self):
+        """Test that evicting the same content twice references the stored copy."""
+        from langgraph.types import Command
+
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=100)
+        state = FilesystemState(messages=[], files={})
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={})
+
+        large_content = "same failing log " * 500
+        first = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_1"), runtime)
+        assert isinstance(first, Command)
+        file_path = large_tool_result_path(large_content)
+        assert file_path in first.update["files"]
+        assert first.update["evicted_tool_results"][file_path]["size"] == len(large_content)
+
+        state["files"] = first.update["files"]
+        state["evicted_tool_results"] = first.update["evicted_tool_results"]
+        second = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_2"), runtime)
+
+        assert isinstance(second, Command)
+        assert second.update["files"] == {}
+        assert file_path in second.update["messages"][0].content
+        assert second.update["messages"][0].tool_call_id == "call_2"
+        assert file_path in second.update["evicted_tool_results"]
+
+    def test_intercept_lru_cleanup_of_evicted_results(self):
+        """Test that the least recently used evicted results are deleted when over budget."""
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=100, max_evicted_results_size=2500)
+        old_path = "/large_tool_results/old"
+        recent_path = "/large_tool_results/recent"
+        state = FilesystemState(
+            messages=[],
+            files={
+                old_path: FileData(content=["a" * 1000], created_at="2021-01-01", modified_at="2021-01-01"),
+                recent_path: FileData(content=["b" * 1000], created_at="2021-01-01", modified_at="2021-01-01"),
+            },
+        )
+        state["evicted_tool_results"] = {
+            old_path: {"size": 1000, "last_used": 1.0},
+            recent_path: {"size": 1000, "last_used": 2.0},
+        }
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={})
+
+        large_content = "c" * 1000
+        result = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_1"), runtime)
+
+        new_path = large_tool_result_path(large_content)
+        assert result.update["files"][old_path] is None
+        assert recent_path not in result.update["files"]
+        assert new_path in result.update["files"]
+        assert result.update["evicted_tool_results"][old_path] is None
+        assert recent_path not in result.update["evicted_tool_results"]
+
+    def test_intercept_several_results_after_lru_cleanup(self):
+        """Test that a Command with several large results still evicts after an earlier one triggered LRU cleanup."""
+        from langgraph.types import Command
+
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=100, max_evicted_results_size=2500)
+        old_path = "/large_tool_results/old"
+        state = FilesystemState(
+            messages=[],
+            files={old_path: FileData(content=["a" * 2000], created_at="2021-01-01", modified_at="2021-01-01")},
+        )
+        state["evicted_tool_results"] = {old_path: {"size": 2000, "last_used": 1.0}}
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={})
+
+        messages = [ToolMessage(content=char * 1000, tool_call_id=f"call_{char}") for char in "bc"]
+        result = middleware._intercept_large_tool_result(Command(update={"messages": messages}), runtime)
+
+        assert result.update["files"][old_path] is None
+        assert result.update["evicted_tool_results"][old_path] is None
+        for char in "bc":
+            assert large_tool_result_path(char * 1000) in result.update["files"]
+
+    def test_intercept_references_payload_already_in_backend(self):
+        """Test that a payload the backend already holds is referenced without rewriting it."""
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=100)
+        large_content = "stored earlier " * 500
+        file_path = large_tool_result_path(large_content)
+        stored = FileData(content=[large_content], created_at="2021-01-01", modified_at="2021-01-01")
+        state = FilesystemState(messages=[], files={file_path: stored})
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={})
+
+        result = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_1"), runtime)
+
+        assert isinstance(result, ToolMessage)
+        assert file_path in result.content
+
     def test_execute_tool_returns_error_when_backend_doesnt_support(self):
         """Test that execute tool returns friendly error instead of raising exception."""
         state = FilesystemState(messages=[], files={})
@@ -1311,6 +1542,157 @@ class TestFilesystemMiddleware:
             if line.strip():  # Skip empty lines
                 assert len(line) <= 1010, f"Line {i} exceeds 1000 chars: {len(line)} chars"
 
+    def _read_request(self, state, tool_call_id, file_path="/a.py", name="read_file", **args: object):
+        from langchain.tools.tool_node import ToolCallRequest
+
+        runtime = ToolRuntime(state=state, context=None, tool_call_id=tool_call_id, store=None, stream_writer=lambda _: None, config={})
+        tool_call = {"name": name, "args": {"file_path": file_path, **args}, "id": tool_call_id, "type": "tool_call"}
+        return ToolCallRequest(tool_call=tool_call, tool=None, state=state, runtime=runtime)
+
+    def _apply(self, state, result):
+        """Apply a tool result to a plain-dict state the way the graph reducers would."""
+        from langgraph.types import Command
+
+        if isinstance(result, Command):
+            state["messages"] = [*state["messages"], *result.update["messages"]]
+            for key in ("files", "read_file_cache"):
+                if key in result.update:
+                    merged = {**state.get(key, {}), **result.update[key]}
+                    state[key] = {k: v for k, v in merged.items() if v is not None}
+        else:
+            state["messages"] = [*state["messages"], result]
+
+    def test_unchanged_reread_returns_notice(self):
+        """Test that re-reading the same unchanged range returns a short notice."""
+        middleware = FilesystemMiddleware(dedupe_reads=True)
+        state = {"messages": [], "files": {}}
+        content = "     1\tx = 1\n     2\tprint(x)"
+
+        first = middleware.wrap_tool_call(self._read_request(state, "r1"), lambda _: ToolMessage(content=content, tool_call_id="r1"))
+        assert first.update["messages"][0].content == content
+        assert "/a.py:0:500" in first.update["read_file_cache"]
+        self._apply(state, first)
+
+        second = middleware.wrap_tool_call(self._read_request(state, "r2"), lambda _: ToolMessage(content=content, tool_call_id="r2"))
+        assert isinstance(second, ToolMessage)
+        assert second.tool_call_id == "r2"
+        assert second.content.startswith("File unchanged since message 1 (read_file call r1)")
+
+        # A different range is a different cache entry.
+        request = self._read_request(state, "r3", limit=10)
+        third = middleware.wrap_tool_call(request, lambda _: ToolMessage(content=content, tool_call_id="r3"))
+        assert third.update["messages"][0].content == content
+
+    def test_changed_content_returns_full_read(self):
+        """Test that a content change on the backend (e.g. a newer mtime) yields a full read."""
+        middleware = FilesystemMiddleware(dedupe_reads=True)
+        state = {"messages": [], "files": {}}
+
+        old = ToolMessage(content="     1\told", tool_call_id="r1")
+        self._apply(state, middleware.wrap_tool_call(self._read_request(state, "r1"), lambda _: old))
+        result = middleware.wrap_tool_call(self._read_request(state, "r2"), lambda _: ToolMessage(content="     1\tnew", tool_call_id="r2"))
+
+        assert result.update["messages"][0].content == "     1\tnew"
+        assert result.update["read_file_cache"]["/a.py:0:500"]["tool_call_id"] == "r2"
+
+    def test_write_and_edit_invalidate_cached_reads(self):
+        """Test that mutating a file drops its cached reads but keeps other paths."""
+        middleware = FilesystemMiddleware(dedupe_reads=True)
+        state = {"messages": [], "files": {}}
+        content = "     1\tx = 1"
+        self._apply(state, middleware.wrap_tool_call(self._read_request(state, "r1"), lambda _: ToolMessage(content=content, tool_call_id="r1")))
+        request = self._read_request(state, "r2", file_path="/b.py")
+        self._apply(state, middleware.wrap_tool_call(request, lambda _: ToolMessage(content=content, tool_call_id="r2")))
+
+        edit = middleware.wrap_tool_call(
+            self._read_request(state, "e1", name="edit_file", old_string="1", new_string="1"),
+            lambda _: ToolMessage(content="Successfully replaced", tool_call_id="e1"),
+        )
+        assert edit.update["read_file_cache"] == {"/a.py:0:500": None}
+        self._apply(state, edit)
+
+        result = middleware.wrap_tool_call(self._read_request(state, "r3"), lambda _: ToolMessage(content=content, tool_call_id="r3"))
+        assert result.update["messages"][0].content == content
+        request = self._read_request(state, "r4", file_path="/b.py")
+        result_b = middleware.wrap_tool_call(request, lambda _: ToolMessage(content=content, tool_call_id="r4"))
+        assert isinstance(result_b, ToolMessage)
+        assert result_b.content.startswith("File unchanged")
+
+    def test_multi_edit_invalidates_cached_reads_of_every_edited_path(self):
+        from langchain.tools.tool_node import ToolCallRequest
+
+        middleware = FilesystemMiddleware(dedupe_reads=True)
+        state = {"messages": [], "files": {}}
+        for call_id, path in (("r1", "/a.py"), ("r2", "/b.py"), ("r3", "/c.py")):
+            request = self._read_request(state, call_id, file_path=path)
+            self._apply(state, middleware.wrap_tool_call(request, lambda _, c=call_id: ToolMessage(content="     1\tx", tool_call_id=c)))
+
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="m1", store=None, stream_writer=lambda _: None, config={})
+        edits = [{"file_path": "/a.py", "old_string": "x", "new_string": "y"}, {"file_path": "b.py", "old_string": "x", "new_string": "y"}]
+        tool_call = {"name": "multi_edit", "args": {"edits": edits}, "id": "m1", "type": "tool_call"}
+        result = middleware.wrap_tool_call(
+            ToolCallRequest(tool_call=tool_call, tool=None, state=state, runtime=runtime),
+            lambda _: ToolMessage(content="Successfully applied", tool_call_id="m1"),
+        )
+
+        assert result.update["read_file_cache"] == {"/a.py:0:500": None, "/b.py:0:500": None}
+
+    def test_multi_edit_tool_updates_state_files(self):
+        state = FilesystemState(messages=[], files={"/a.py": create_file_data("foo = 1\nprint(foo)"), "/b.py": create_file_data("foo")})
+        multi_edit_tool = next(tool for tool in FilesystemMiddleware().tools if tool.name == "multi_edit")
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="m1", store=None, stream_writer=lambda _: None, config={})
+
+        result = multi_edit_tool.invoke(
+            {
+                "edits": [
+                    {"file_path": "/a.py", "old_string": "foo", "new_string": "bar", "replace_all": True},
+                    {"file_path": "/b.py", "old_string": "foo", "new_string": "bar"},
+                ],
+                "runtime": runtime,
+            }
+        )
+        failed = multi_edit_tool.invoke({"edits": [{"file_path": "/a.py", "old_string": "missing", "new_string": "x"}], "runtime": runtime})
+
+        assert result.update["files"]["/a.py"]["content"] == ["bar = 1", "print(bar)"]
+        assert result.update["files"]["/b.py"]["content"] == ["bar"]
+        assert result.update["messages"][0].content == (
+            "Successfully applied 3 replacement(s) across 2 file(s): '/a.py' (2 replacement(s)), '/b.py' (1 replacement(s))"
+        )
+        assert failed.startswith("Error: Edit 1 of 1 failed for '/a.py': String not found in file: 'missing'")
+
+    def test_reread_after_history_loses_content_returns_full_read(self):
+        """Test that the notice is only used while the earlier content is still in the history."""
+        middleware = FilesystemMiddleware(dedupe_reads=True)
+        state = {"messages": [], "files": {}}
+        content = "     1\tx = 1"
+        self._apply(state, middleware.wrap_tool_call(self._read_request(state, "r1"), lambda _: ToolMessage(content=content, tool_call_id="r1")))
+
+        # e.g. summarization dropped the earlier messages
+        state["messages"] = []
+        result = middleware.wrap_tool_call(self._read_request(state, "r2"), lambda _: ToolMessage(content=content, tool_call_id="r2"))
+        assert result.update["messages"][0].content == content
+
+    def test_dedupe_reads_is_opt_in(self):
+        """Test that read deduplication is skipped unless enabled."""
+        state = {"messages": [], "files": {}}
+        message = ToolMessage(content="     1\tx = 1", tool_call_id="r1")
+
+        for middleware in (FilesystemMiddleware(), FilesystemMiddleware(dedupe_reads=False)):
+            assert middleware.wrap_tool_call(self._read_request(state, "r1"), lambda _: message) is message
+
+    def test_read_cache_drops_oldest_entries_past_the_bound(self):
+        """Test that recording a read beyond `max_cached_reads` evicts the oldest entries."""
+        middleware = FilesystemMiddleware(dedupe_reads=True, max_cached_reads=2)
+        state = {"messages": [], "files": {}}
+        for call_id, path in (("r1", "/a.py"), ("r2", "/b.py"), ("r3", "/c.py")):
+            request = self._read_request(state, call_id, file_path=path)
+            self._apply(state, middleware.wrap_tool_call(request, lambda _, c=call_id: ToolMessage(content="     1\tx", tool_call_id=c)))
+
+        assert list(state["read_file_cache"]) == ["/b.py:0:500", "/c.py:0:500"]
+        # Re-reading a cached path does not evict anything
+        request = self._read_request(state, "r4", file_path="/b.py")
+        assert isinstance(middleware.wrap_tool_call(request, lambda _: ToolMessage(content="     1\tx", tool_call_id="r4")), ToolMessage)
+
 
 class TestPatchToolCallsMiddleware:
     def test_first_message(self) -> None:
@@ -1320,15 +1702,8 @@ class TestPatchToolCallsMiddleware:
         ]
         middleware = PatchToolCallsMiddleware()
         state_update = middleware.before_agent({"messages": input_messages}, None)
-        assert state_update is not None
-        assert isinstance(state_update["messages"], Overwrite)
-        patched_messages = state_update["messages"].value
-        assert len(patched_messages) == 2
-        assert patched_messages[0].type == "system"
-        assert patched_messages[0].content == "You are a helpful assistant."
-        assert patched_messages[1].type == "human"
-        assert patched_messages[1].content == "Hello, how are you?"
-        assert patched_messages[1].id == "2"
+        # Nothing is dangling, so the history is left untouched
+        assert state_update is None
 
     def test_missing_tool_call(self) -> None:
         input_messages = [
@@ -1376,23 +1751,36 @@ class TestPatchToolCallsMiddleware:
         ]
         middleware = PatchToolCallsMiddleware()
         state_update = middleware.before_agent({"messages": input_messages}, None)
+        assert state_update is None
+
+    def test_tool_message_before_its_call_does_not_count(self) -> None:
+        input_messages = [
+            ToolMessage(content="stale", tool_call_id="123", id="1"),
+            AIMessage(content="", tool_calls=[ToolCall(id="123", name="read_file", args={})], id="2"),
+            HumanMessage(content="Never mind", id="3"),
+        ]
+        middleware = PatchToolCallsMiddleware()
+        state_update = middleware.before_agent({"messages": input_messages}, None)
         assert state_update is not None
-        assert isinstance(state_update["messages"], Overwrite)
         patched_messages = state_update["messages"].value
-        assert len(patched_messages) == 5
-        assert patched_messages[0].type == "system"
-        assert patched_messages[0].content == "You are a helpful assistant."
-        assert patched_messages[1].type == "human"
-        assert patched_messages[1].content == "Hello, how are you?"
-        assert patched_messages[2].type == "ai"
-        assert len(patched_messages[2].tool_calls) == 1
-        assert patched_messages[2].tool_calls[0]["id"] == "123"
-        assert patched_messages[2].tool_calls[0]["name"] == "get_events_for_days"
-        assert patched_messages[2].tool_calls[0]["args"] == {"date_str": "2025-01-01"}
-        assert patched_messages[3].type == "tool"
-        assert patched_messages[3].tool_call_id == "123"
-        assert patched_messages[4].type == "human"
-        assert patched_messages[4].content == "What is the weather in Tokyo?"
+        assert [m.type for m in patched_messages] == ["tool", "ai", "tool", "human"]
+        assert patched_messages[2].tool_call_id == "123"
+        assert "cancelled" in patched_messages[2].content
+
+    def test_only_dangling_calls_of_a_parallel_batch_are_patched(self) -> None:
+        input_messages = [
+            AIMessage(
+                content="",
+                tool_calls=[ToolCall(id="a", name="ls", args={}), ToolCall(id="b", name="glob", args={})],
+                id="1",
+            ),
+            ToolMessage(content="done", tool_call_id="a", id="2"),
+        ]
+        middleware = PatchToolCallsMiddleware()
+        state_update = middleware.before_agent({"messages": input_messages}, None)
+        assert state_update is not None
+        patched_messages = state_update["messages"].value
+        assert [(m.type, getattr(m, "tool_call_id", None)) for m in patched_messages] == [("ai", None), ("tool", "b"), ("tool", "a")]
 
     def test_two_missing_tool_calls(self) -> None:
         input_messages = [
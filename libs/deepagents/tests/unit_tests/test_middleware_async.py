@@ -811,3 +811,32 @@ class TestFilesystemMiddlewareAsync:
 
         assert "Async Very long output..." in result
         assert "truncated" in result
+
+    @pytest.mark.asyncio
+    async def test_aintercept_large_tool_result_uses_async_write(self):
+        """Test that async eviction writes through the backend's async API."""
+        from langchain_core.messages import ToolMessage
+
+        from deepagents.middleware.filesystem import large_tool_result_path
+
+        awrite_calls = []
+
+        class AsyncOnlyStateBackend(StateBackend):
+            def write(self, file_path, content):
+                msg = "sync write must not be called from the async path"
+                raise AssertionError(msg)
+
+            async def awrite(self, file_path, content):
+                awrite_calls.append(file_path)
+                return StateBackend.write(self, file_path, content)
+
+        middleware = FilesystemMiddleware(backend=lambda rt: AsyncOnlyStateBackend(rt), tool_token_limit_before_evict=100)
+        state = FilesystemState(messages=[], files={})
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={})
+
+        large_content = "x" * 5000
+        result = await middleware._aintercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_1"), runtime)
+
+        assert awrite_calls == [large_tool_result_path(large_content)]
+        assert large_tool_result_path(large_content) in result.update["files"]
+        assert "Tool result too large" in result.update["messages"][0].content
@@ -5,15 +5,32 @@ are invoked, how they return results, and how state is managed between parent
 and child agents.
 """
 
+import asyncio
+import contextvars
+import time
+
+import pytest
 from langchain.agents import create_agent
 from langchain.agents.middleware import TodoListMiddleware
 from langchain.agents.structured_output import ToolStrategy
+from langchain.tools import ToolRuntime
 from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.checkpoint.memory import InMemorySaver
 from pydantic import BaseModel, Field
 
+from deepagents.backends.utils import create_file_data
 from deepagents.graph import create_deep_agent
-from deepagents.middleware.subagents import CompiledSubAgent
+from deepagents.middleware import subagents as subagents_module
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.subagents import (
+    CompiledSubAgent,
+    SubAgent,
+    SubAgentMiddleware,
+    _prepare_subagent_state,
+    _returns_full_state,
+    _subagent_state_update,
+)
 from tests.unit_tests.chat_model import GenericFakeChatModel
 
 
@@ -686,3 +703,293 @@ class TestSubAgentsWithStructuredOutput:
         assert population_tool_message.content == expected_population_content, (
             f"Expected population ToolMessage content:\n{expected_population_content}\nGot:\n{population_tool_message.content}"
         )
+
+
+class TestLazySubAgentCompilation:
+    """Tests that subagent graphs are only compiled when a `task` call needs them."""
+
+    def test_subagents_compile_on_first_task_call_only(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        compiled: list[str] = []
+
+        def counting_create_agent(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+            compiled.append(kwargs["system_prompt"])
+            return create_agent(*args, **kwargs)
+
+        monkeypatch.setattr(subagents_module, "create_agent", counting_create_agent)
+
+        def task_call(call_id: str) -> AIMessage:
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": "task", "args": {"description": "Do it", "subagent_type": "worker-3"}, "id": call_id, "type": "tool_call"}],
+            )
+
+        parent_chat_model = GenericFakeChatModel(
+            messages=iter([task_call("call_1"), AIMessage(content="First done."), task_call("call_2"), AIMessage(content="Second done.")])
+        )
+        worker_model = GenericFakeChatModel(messages=iter([AIMessage(content="Worked."), AIMessage(content="Worked again.")]))
+        parent_agent = create_deep_agent(
+            model=parent_chat_model,
+            checkpointer=InMemorySaver(),
+            subagents=[
+                SubAgent(name=f"worker-{i}", description=f"Worker number {i}.", system_prompt=f"You are worker {i}.", tools=[], model=worker_model)
+                for i in range(10)
+            ],
+        )
+
+        # Building the agent compiles no subagent, but the task tool still lists all of them
+        assert compiled == []
+        task_tool = next(tool for tool in parent_agent.nodes["tools"].bound.tools_by_name.values() if tool.name == "task")
+        assert "- worker-9: Worker number 9." in task_tool.description
+        assert "- general-purpose:" in task_tool.description
+
+        config = {"configurable": {"thread_id": "lazy"}}
+        result = parent_agent.invoke({"messages": [HumanMessage(content="Go")]}, config=config)
+        assert [msg.content for msg in result["messages"] if msg.type == "tool"] == ["Worked."]
+        assert compiled == ["You are worker 3."]
+
+        # The compiled graph is reused by later task calls
+        parent_agent.invoke({"messages": [HumanMessage(content="Again")]}, config=config)
+        assert compiled == ["You are worker 3."]
+
+
+def _writer(name: str, files: dict[str, str], delay: float = 0.0) -> CompiledSubAgent:
+    """A subagent that returns the state it was given plus `files`, after `delay` seconds."""
+
+    def run(state: dict) -> dict:
+        time.sleep(delay)
+        written = {path: create_file_data(content) for path, content in files.items()}
+        return {**state, "files": {**state.get("files", {}), **written}, "messages": [AIMessage(content=f"{name} done")]}
+
+    return CompiledSubAgent(name=name, description=f"Writes {', '.join(files) or 'nothing'}.", runnable=RunnableLambda(run))
+
+
+def _batch_tool(subagents: list[CompiledSubAgent], concurrency: int = 4):  # noqa: ANN202
+    middleware = SubAgentMiddleware(default_model=GenericFakeChatModel(messages=iter([])), subagents=subagents, task_batch_concurrency=concurrency)
+    return next(tool for tool in middleware.tools if tool.name == "task_batch")
+
+
+def _runtime(state: dict) -> ToolRuntime:
+    return ToolRuntime(state=state, context=None, tool_call_id="batch_call", store=None, stream_writer=lambda _: None, config={})
+
+
+class TestTaskBatch:
+    """Tests for the `task_batch` tool."""
+
+    def test_disabled_by_default(self) -> None:
+        middleware = SubAgentMiddleware(default_model=GenericFakeChatModel(messages=iter([])))
+        assert [tool.name for tool in middleware.tools] == ["task"]
+        with pytest.raises(ValueError, match="at least 1"):
+            SubAgentMiddleware(default_model=GenericFakeChatModel(messages=iter([])), task_batch_concurrency=0)
+
+    def test_results_in_input_order_with_latency_and_merged_files(self) -> None:
+        tool = _batch_tool([_writer("slow", {"/a.txt": "a"}, delay=0.05), _writer("fast", {"/b.txt": "b"})])
+        parent_files = {"/existing.txt": create_file_data("keep")}
+
+        command = tool.func(
+            [{"subagent_type": "slow", "description": "write a"}, {"subagent_type": "fast", "description": "write b"}],
+            _runtime({"messages": [], "files": parent_files}),
+        )
+
+        # Only the files the subtasks changed are sent back
+        assert sorted(command.update["files"]) == ["/a.txt", "/b.txt"]
+        message = command.update["messages"][0]
+        assert message.tool_call_id == "batch_call"
+        assert message.content.index("## Task 1: slow") < message.content.index("## Task 2: fast")
+        assert "slow done" in message.content
+        assert "fast done" in message.content
+        latencies = message.artifact["tasks"]
+        assert [t["subagent_type"] for t in latencies] == ["slow", "fast"]
+        assert latencies[0]["latency_s"] >= 0.05
+        assert all(t["error"] is None for t in latencies)
+
+    def test_conflicting_writes_keep_the_later_task(self) -> None:
+        tool = _batch_tool([_writer("first", {"/same.txt": "one"}, delay=0.05), _writer("second", {"/same.txt": "two"})])
+
+        command = tool.func(
+            [{"subagent_type": "first", "description": "x"}, {"subagent_type": "second", "description": "y"}],
+            _runtime({"messages": [], "files": {}}),
+        )
+
+        assert command.update["files"]["/same.txt"]["content"] == ["two"]
+        assert "Tasks 1 and 2 both changed `/same.txt`; kept the result of task 2." in command.update["messages"][0].content
+
+    def test_failed_subtask_does_not_affect_others(self) -> None:
+        def fail(_state: dict) -> dict:
+            msg = "boom"
+            raise RuntimeError(msg)
+
+        broken = CompiledSubAgent(name="broken", description="Fails.", runnable=RunnableLambda(fail))
+        tool = _batch_tool([broken, _writer("ok", {"/ok.txt": "ok"})])
+
+        command = tool.func(
+            [{"subagent_type": "broken", "description": "x"}, {"subagent_type": "ok", "description": "y"}],
+            _runtime({"messages": []}),
+        )
+
+        content = command.update["messages"][0].content
+        assert "Error: RuntimeError: boom" in content
+        assert "ok done" in content
+        assert command.update["messages"][0].artifact["tasks"][0]["error"] == "RuntimeError: boom"
+        assert list(command.update["files"]) == ["/ok.txt"]
+
+    def test_subtasks_run_in_the_callers_context(self) -> None:
+        request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="unset")
+        seen: list[str] = []
+
+        def run(state: dict) -> dict:
+            seen.append(request_id.get())
+            return {**state, "messages": [AIMessage(content="done")]}
+
+        tool = _batch_tool([CompiledSubAgent(name="worker", description="Works.", runnable=RunnableLambda(run))])
+        token = request_id.set("req-1")
+        try:
+            tool.func([{"subagent_type": "worker", "description": f"job {i}"} for i in range(3)], _runtime({"messages": []}))
+        finally:
+            request_id.reset(token)
+
+        assert seen == ["req-1"] * 3
+
+    def test_unknown_subagent_type_runs_nothing(self) -> None:
+        tool = _batch_tool([_writer("ok", {"/ok.txt": "ok"})])
+        result = tool.func([{"subagent_type": "ok", "description": "x"}, {"subagent_type": "nope", "description": "y"}], _runtime({"messages": []}))
+        assert isinstance(result, str)
+        assert "nope" in result
+
+    async def test_async_batch_respects_concurrency_limit(self) -> None:
+        running = 0
+        peak = 0
+
+        async def run(state: dict) -> dict:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {**state, "messages": [AIMessage(content="done")]}
+
+        worker = CompiledSubAgent(name="worker", description="Works.", runnable=RunnableLambda(lambda s: s, afunc=run))
+        tool = _batch_tool([worker], concurrency=2)
+
+        command = await tool.coroutine([{"subagent_type": "worker", "description": f"job {i}"} for i in range(5)], _runtime({"messages": []}))
+
+        assert peak == 2
+        assert command.update["messages"][0].content.count("done") == 5
+        assert len(command.update["messages"][0].artifact["tasks"]) == 5
+
+    def test_task_batch_from_deep_agent(self) -> None:
+        parent_chat_model = GenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(
+                        content="",
+                        tool_calls=[
+                            {
+                                "name": "task_batch",
+                                "args": {
+                                    "tasks": [
+                                        {"subagent_type": "writer-a", "description": "Write a"},
+                                        {"subagent_type": "writer-b", "description": "Write b"},
+                                    ]
+                                },
+                                "id": "call_batch",
+                                "type": "tool_call",
+                            }
+                        ],
+                    ),
+                    AIMessage(content="Both done."),
+                ]
+            )
+        )
+        agent = create_deep_agent(
+            model=parent_chat_model,
+            subagents=[_writer("writer-a", {"/a.txt": "a"}), _writer("writer-b", {"/b.txt": "b"})],
+            task_batch_concurrency=2,
+        )
+
+        result = agent.invoke({"messages": [HumanMessage(content="Go")]})
+
+        assert sorted(result["files"]) == ["/a.txt", "/b.txt"]
+        tool_message = next(msg for msg in result["messages"] if msg.type == "tool")
+        assert "## Task 1: writer-a" in tool_message.content
+        assert "## Task 2: writer-b" in tool_message.content
+
+
+class TestSubAgentStateHandoff:
+    """Tests that subagents get only the state they accept and return only what they changed."""
+
+    def test_subagent_graph_only_receives_its_input_keys(self) -> None:
+        subagent = create_agent(model=GenericFakeChatModel(messages=iter([])), middleware=[FilesystemMiddleware()])
+        files = {"/a.txt": create_file_data("a")}
+        parent_state = {"messages": [HumanMessage(content="hi")], "files": files, "todos": [], "parent_only": "x"}
+
+        state = _prepare_subagent_state(subagent, "Do it", parent_state)
+
+        assert set(state) == {"messages", "files"}
+        assert state["files"] is files
+        assert state["messages"][0].content == "Do it"
+        # Runnables without a state schema get every non-excluded key
+        assert set(_prepare_subagent_state(RunnableLambda(lambda s: s), "Do it", parent_state)) == {"messages", "files", "parent_only"}
+
+    def test_update_contains_only_changed_files_and_keys(self) -> None:
+        kept, edited = create_file_data("same"), create_file_data("old")
+        parent_state = {"messages": [], "files": {"/kept.txt": kept, "/edited.txt": edited, "/deleted.txt": create_file_data("x")}, "note": "n"}
+        result = {
+            "messages": [AIMessage(content="done")],
+            "files": {"/kept.txt": kept, "/edited.txt": create_file_data("new"), "/added.txt": create_file_data("add")},
+            "note": "n",
+            "todos": [{"content": "t", "status": "completed"}],
+        }
+
+        update = _subagent_state_update(result, parent_state, full_state=True)
+
+        assert set(update) == {"files"}
+        assert update["files"]["/edited.txt"]["content"] == ["new"]
+        assert update["files"]["/added.txt"]["content"] == ["add"]
+        assert update["files"]["/deleted.txt"] is None
+        assert "/kept.txt" not in update["files"]
+
+    def test_runnable_returning_only_its_own_files_keeps_the_parents(self) -> None:
+        parent_files = {"/notes.md": create_file_data("notes"), "/src/app.py": create_file_data("print(1)")}
+        report = create_file_data("report")
+        subagent = CompiledSubAgent(
+            name="reporter",
+            description="Writes a report.",
+            runnable=RunnableLambda(lambda _: {"files": {"/report.md": report}, "messages": [AIMessage(content="done")]}),
+        )
+        middleware = SubAgentMiddleware(default_model=GenericFakeChatModel(messages=iter([])), subagents=[subagent], general_purpose_agent=False)
+        task = next(tool for tool in middleware.tools if tool.name == "task")
+        runtime = ToolRuntime(
+            state={"messages": [], "files": parent_files}, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={}
+        )
+
+        command = task.func(description="Write the report", subagent_type="reporter", runtime=runtime)
+
+        assert command.update["files"] == {"/report.md": report}
+        assert not _returns_full_state(subagent["runnable"])
+        assert _returns_full_state(create_agent(model=GenericFakeChatModel(messages=iter([])), middleware=[FilesystemMiddleware()]))
+
+    def test_task_without_file_changes_sends_no_files_back(self) -> None:
+        parent_chat_model = GenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(
+                        content="",
+                        tool_calls=[
+                            {"name": "task", "args": {"description": "Look", "subagent_type": "reader"}, "id": "call_look", "type": "tool_call"}
+                        ],
+                    ),
+                    AIMessage(content="Done."),
+                ]
+            )
+        )
+        saver = InMemorySaver()
+        agent = create_deep_agent(model=parent_chat_model, checkpointer=saver, subagents=[_writer("reader", {})])
+        config = {"configurable": {"thread_id": "handoff"}}
+        files = {"/big.txt": create_file_data("x" * 10_000)}
+
+        result = agent.invoke({"messages": [HumanMessage(content="Go")], "files": files}, config=config)
+
+        assert result["files"] == files
+        # The files channel was written once, by the input, so the file map was checkpointed once
+        versions = {checkpoint.checkpoint["channel_versions"].get("files") for checkpoint in saver.list(config)} - {None}
+        assert len(versions) == 1
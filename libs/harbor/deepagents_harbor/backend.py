@@ -1,19 +1,28 @@
 """Implement harbor backend."""
 
 import base64
+import binascii
 import shlex
 
 from deepagents.backends.protocol import (
     EditResult,
     ExecuteResponse,
+    FileDownloadResponse,
     FileInfo,
     GrepMatch,
     SandboxBackendProtocol,
     WriteResult,
 )
+from deepagents.backends.utils import page_from_window, parse_cursor
 from harbor.environments.base import BaseEnvironment
 
 
+def _page_command(cmd: str, skip: int, max_results: int | None) -> str:
+    """Wrap a command so only one page of its output lines (plus one to detect more) is returned."""
+    window = f" | head -n {max_results + 1}" if max_results is not None else ""
+    return f"{{ {cmd}\n}} | tail -n +{skip + 1}{window}"
+
+
 class HarborSandbox(SandboxBackendProtocol):
     """A sandbox implementation without assuming that python3 is available."""
 
@@ -123,6 +132,61 @@ awk -v offset={offset} -v limit={limit} '
         """Read file content with line numbers using shell commands."""
         raise NotImplementedError("Use aread instead")
 
+    async def _aread_bytes(self, file_path: str, read_command: str) -> FileDownloadResponse:
+        """Run a command that prints (part of) a file and return its output as raw bytes."""
+        safe_path = shlex.quote(file_path)
+        cmd = f"""
+if [ -d {safe_path} ]; then
+    echo is_directory
+elif [ ! -f {safe_path} ]; then
+    echo file_not_found
+elif [ ! -r {safe_path} ]; then
+    echo permission_denied
+else
+    echo ok
+    {read_command} 2>/dev/null | base64
+fi
+"""
+        result = await self.aexecute(cmd)
+
+        status, _, payload = result.output.lstrip().partition("\n")
+        status = status.strip()
+        if status != "ok":
+            error = (
+                status
+                if status in ("is_directory", "file_not_found", "permission_denied")
+                else "file_not_found"
+            )
+            return FileDownloadResponse(path=file_path, content=None, error=error)
+        try:
+            content = base64.b64decode(payload)
+        except binascii.Error:
+            return FileDownloadResponse(path=file_path, content=None, error="invalid_path")
+        return FileDownloadResponse(path=file_path, content=content, error=None)
+
+    async def aread_range(
+        self, file_path: str, start_byte: int = 0, length: int | None = None
+    ) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset with tail -c/head -c, transferring only the range."""
+        read_command = f"tail -c +{start_byte + 1} -- {shlex.quote(file_path)}"
+        if length is not None:
+            read_command += f" | head -c {length}"
+        return await self._aread_bytes(file_path, read_command)
+
+    def read_range(
+        self, file_path: str, start_byte: int = 0, length: int | None = None
+    ) -> FileDownloadResponse:
+        """Read raw bytes from a byte offset using shell commands."""
+        raise NotImplementedError("Use aread_range instead")
+
+    async def atail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file with tail -n, transferring only those lines."""
+        return await self._aread_bytes(file_path, f"tail -n {n_lines} -- {shlex.quote(file_path)}")
+
+    def tail(self, file_path: str, n_lines: int = 100) -> FileDownloadResponse:
+        """Read the last lines of a file using shell commands."""
+        raise NotImplementedError("Use atail instead")
+
     async def awrite(
         self,
         file_path: str,
@@ -270,13 +334,53 @@ done
         """List directory contents with metadata using shell commands."""
         raise NotImplementedError("Use als_info instead")
 
+    async def astat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up existence, type and size of several paths with a single shell command."""
+        if not paths:
+            return []
+        # One output line per path, in input order: d (directory), f|<bytes> (file) or m (missing)
+        checks = " ".join(shlex.quote(path) for path in paths)
+        cmd = f"""
+for entry in {checks}; do
+    if [ -d "$entry" ]; then
+        printf 'd\\n'
+    elif [ -e "$entry" ]; then
+        printf 'f|%s\\n' "$(wc -c < "$entry" | tr -d ' ')"
+    else
+        printf 'm\\n'
+    fi
+done
+"""
+        result = await self.aexecute(cmd)
+
+        lines = result.output.strip().split("\n")
+        infos: list[FileInfo | None] = []
+        for index, path in enumerate(paths):
+            line = lines[index] if index < len(lines) else "m"
+            if line == "d":
+                infos.append({"path": path, "is_dir": True})
+            elif line.startswith("f|") and line[2:].isdigit():
+                infos.append({"path": path, "is_dir": False, "size": int(line[2:])})
+            else:
+                infos.append(None)
+        return infos
+
+    def stat_many(self, paths: list[str]) -> list[FileInfo | None]:
+        """Look up existence, type and size of several paths."""
+        raise NotImplementedError("Use astat_many instead")
+
     async def agrep_raw(
         self,
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
-        """Search for pattern in files using grep."""
+        """Search for pattern in files using grep.
+
+        When paginating, the page is cut in the environment with `tail`/`head`.
+        """
         search_path = shlex.quote(path or ".")
 
         # Build grep command
@@ -291,11 +395,15 @@ done
         safe_pattern = shlex.quote(pattern)
 
         cmd = f"grep {grep_opts} {glob_pattern} -e {safe_pattern} {search_path} 2>/dev/null || true"
+        paginated = max_results is not None or cursor is not None
+        skip = parse_cursor(cursor)
+        if paginated:
+            cmd = _page_command(cmd, skip, max_results)
         result = await self.aexecute(cmd)
 
         output = result.output.rstrip()
         if not output:
-            return []
+            return page_from_window([], skip, max_results) if paginated else []
 
         # Parse grep output into GrepMatch objects
         matches: list[GrepMatch] = []
@@ -314,6 +422,8 @@ done
                 except ValueError:
                     continue
 
+        if paginated:
+            return page_from_window(matches, skip, max_results)
         return matches
 
     def grep_raw(
@@ -321,11 +431,19 @@ done
         pattern: str,
         path: str | None = None,
         glob: str | None = None,
+        max_results: int | None = None,
+        cursor: str | None = None,
     ) -> list[GrepMatch] | str:
         """Search for pattern in files using grep."""
         raise NotImplementedError("Use agrep_raw instead")
 
-    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    async def aglob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
         """Find files matching glob pattern using shell commands.
 
         Please note that this implementation does not currently support all glob
@@ -347,14 +465,15 @@ for file in {safe_pattern}; do
     fi
 done
 """
+        paginated = max_results is not None or cursor is not None
+        skip = parse_cursor(cursor)
+        if paginated:
+            cmd = _page_command(cmd, skip, max_results)
         result = await self.aexecute(cmd)
 
-        if result.exit_code != 0:
-            return []
-
         output = result.output.strip()
-        if not output:
-            return []
+        if result.exit_code != 0 or not output:
+            return page_from_window([], skip, max_results) if paginated else []
 
         # Parse output into FileInfo dicts
         file_infos: list[FileInfo] = []
@@ -370,8 +489,16 @@ done
                     }
                 )
 
+        if paginated:
+            return page_from_window(file_infos, skip, max_results)
         return file_infos
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+    def glob_info(
+        self,
+        pattern: str,
+        path: str = "/",
+        max_results: int | None = None,
+        cursor: str | None = None,
+    ) -> list[FileInfo]:
         """Find files matching glob pattern using shell commands."""
         raise NotImplementedError("Use aglob_info instead")